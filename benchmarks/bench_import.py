@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""
+Import time of the package: each statement is run in a new interpreter (the
+time of starting the interpreter is measured by 'python -c pass'). The heavy
+dependencies must only be imported by the modules which use them: the ones
+imported by each statement are saved in the 'extra_info' of the results.
+"""
+
+import os
+import subprocess
+import sys
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORTS = {
+  'python'              : 'pass',
+  'import wiki_utils'   : 'import wiki_utils',
+  'import deaccenttext' : 'from wiki_utils import deaccenttext',
+  'import v_GetRecord'  : 'from wiki_utils import v_GetRecord',
+  'import w_EntityInfo' : 'from wiki_utils import w_EntityInfo',
+  'import *'            : 'from wiki_utils import *',
+  }
+
+HEAVY_MODULES = ('pandas', 'numpy', 'requests', 'regex')
+
+def python(code):
+  env = dict(os.environ)
+  env['PYTHONPATH'] = os.pathsep.join(x for x in (ROOT, env.get('PYTHONPATH')) if x)
+  return subprocess.run([sys.executable, '-c', code], env=env, cwd=ROOT,
+                        capture_output=True, text=True, check=True).stdout
+
+@pytest.mark.parametrize('name', list(IMPORTS))
+def bench_import(benchmark, name):
+  statement = IMPORTS[name]
+  benchmark.pedantic(python, args=(statement,), rounds=5, iterations=1)
+  modules = python(f"import sys\n{statement}\n"
+                   f"print(' '.join(x for x in {HEAVY_MODULES!r} if x in sys.modules))")
+  benchmark.extra_info['modules'] = modules.split()
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks of the library overhead: requests replayed from the cassette
+(synthetic responses, see conftest.py and cassette.py) and functions which
+do not use the network.
+"""
+
+import pandas as pd
+import pytest
+from wiki_utils import (doChunks, w_EntityInfo, w_Wikipedias, w_Property,
+                        w_SearchByAuthority, deaccenttext, deaccentSeries,
+                        similarTopK)
+
+ENTITIES = ['Q9021', 'Q5879', 'Q1868', 'Q937', 'Q5582', 'Q762', 'Q1299',
+            'Q7186', 'Q5593', 'Q1067']
+TEXT = ("Pérez García, José María; Müller, Jürgen; Žižek, Slavoj; "
+        "Ibáñez, Ñuño; Dvořák, Antonín; Çelik, Gülşen; ") * 2000
+NAMES = TEXT.split('; ')
+
+
+def bench_doChunks(benchmark):
+  benchmark(doChunks, lambda x, chunksize: pd.DataFrame({'x': x}),
+            list(range(200000)), 1000)
+
+# The benchmarks which replay the cassette: name -> (function, args, kwargs).
+# After changing them, build the cassette again (see cassette.py).
+OFFLINE = {
+  'w_EntityInfo'       : (w_EntityInfo, (ENTITIES,), {'langsorder': 'es|en'}),
+  'w_Wikipedias'       : (w_Wikipedias, (ENTITIES,), {'wikilangs': 'es|en|fr'}),
+  'w_Property'         : (w_Property, (ENTITIES, 'P106|P166'),
+                          {'includeQ': True, 'langsorder': 'en'}),
+  'w_SearchByAuthority': (w_SearchByAuthority, ('P214',), {'langsorder': 'en'}),
+  }
+
+@pytest.mark.parametrize('name', list(OFFLINE))
+def bench_offline(offline, name):
+  f, args, kwargs = OFFLINE[name]
+  offline(f, *args, **kwargs)
+
+def bench_deaccenttext(benchmark):
+  benchmark(deaccenttext, TEXT)
+
+def bench_deaccentSeries(benchmark):
+  series = pd.Series(NAMES*10000)
+  benchmark(deaccentSeries, series)
+
+def bench_similarTopK(benchmark):
+  benchmark(similarTopK, NAMES*20, NAMES*500, k=3, deaccent=True, lower=True,
+            order=True, processes=1)
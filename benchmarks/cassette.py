@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+"""
+Build the cassette of the benchmarks (benchmarks/cassette.jsonl.gz) with the
+synthetic responses of SyntheticTransport, so the benchmarks do not need
+network and their results are comparable over time. Run it from the root of
+the repository when the requests of the benchmarks change:
+  python benchmarks/cassette.py
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, 'benchmarks')]
+
+from wiki_utils import Cassette, SyntheticTransport
+from conftest import CASSETTE
+from bench_overhead import OFFLINE
+
+class Recorder(Cassette):
+  """Cassette which records the responses of another transport (not the network)."""
+  def __init__(self, path, source):
+    super().__init__(path, mode='record')
+    self.source = source
+
+  def request(self, method, url, params=None, data=None, headers=None, session=None):
+    response = self.source.request(method, url, params, data, headers, session)
+    self.record(self.key(method, url, params, data), method, url, response)
+    return response
+
+if __name__ == '__main__':
+  if os.path.exists(CASSETTE):
+    os.remove(CASSETTE)
+  with Recorder(CASSETTE, SyntheticTransport(nrows=2000, seed=0)) as recorder:
+    for name, (f, args, kwargs) in OFFLINE.items():
+      f(*args, **kwargs)
+  print(f"{len(recorder.records)} responses recorded in {CASSETTE}")
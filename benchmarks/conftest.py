@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+"""
+Fixtures of the benchmarks: the functions are run replaying a cassette (see
+Cassette) without latency, so the network is not measured.
+
+The cassette is benchmarks/cassette.jsonl.gz (built with the synthetic
+responses of SyntheticTransport by benchmarks/cassette.py), or the file in
+the environment variable WIKI_UTILS_CASSETTE. A request which is not in the
+cassette fails: it is never recorded from the network.
+"""
+
+import os
+import pytest
+
+CASSETTE = os.environ.get('WIKI_UTILS_CASSETTE',
+                          os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                       'cassette.jsonl.gz'))
+
+@pytest.fixture
+def offline(benchmark):
+  """
+  Return a function run(f, *args, **kwargs) which measures f replaying the
+  cassette.
+  """
+  from wiki_utils import Cassette
+  def run(f, *args, **kwargs):
+    with Cassette(CASSETTE, mode='replay'):
+      return benchmark(f, *args, **kwargs)
+  return run
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of AuthorityIndex, with a LocalSPARQL store as the WDQS endpoint.
+"""
+
+import pytest
+from wiki_utils import wdqs, sparql
+
+pyoxigraph = pytest.importorskip('pyoxigraph')
+
+WD = 'http://www.wikidata.org/entity/'
+MODIFIED = '"2024-01-01T00:00:00Z"^^<http://www.w3.org/2001/XMLSchema#dateTime>'
+
+def triples(entities, modified=MODIFIED):
+  for k in entities:
+    yield f'<{WD}Q{k}> <http://www.wikidata.org/prop/direct/P214> "v{k}" .'
+    yield f'<{WD}Q{k}> <http://www.wikidata.org/prop/direct/P31> <{WD}Q5> .'
+    yield f'<{WD}Q{k}> <http://schema.org/dateModified> {modified} .'
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+  path = tmp_path / 'subset.nt'
+  path.write_text('\n'.join(triples(range(1, 251))) + '\n')
+  store = sparql.LocalSPARQL(str(path))
+  monkeypatch.setitem(sparql.SPARQL_ENDPOINTS, 'wdqs', store)
+  return store
+
+def ids(index):
+  return dict(index.con.execute("SELECT id, entity FROM ids WHERE property='P214'"))
+
+def test_buckets():
+  assert wdqs.AuthorityIndex.buckets(100, 200) == ['']
+  assert len(wdqs.AuthorityIndex.buckets(250, 20)) == 101
+
+def test_build(store):
+  index = wdqs.AuthorityIndex(':memory:')
+  index.build('P214', chunksize=20)
+  assert ids(index) == {f'v{k}': f'Q{k}' for k in range(1, 251)}
+  assert index.get('v7', 'VIAF') == ['Q7']
+
+def test_build_failed_bucket(store, monkeypatch):
+  index = wdqs.AuthorityIndex(':memory:')
+  index.build('P214', chunksize=20)
+  harvest = index.con.execute("SELECT * FROM harvests").fetchall()
+  reqWDQS = wdqs.reqWDQS
+  def failing(query, *args, **kwargs):
+    if '"07"' in query:
+      raise OSError('timeout')
+    return reqWDQS(query, *args, **kwargs)
+  monkeypatch.setattr(wdqs, 'reqWDQS', failing)
+  store.store.update('DELETE WHERE { <http://www.wikidata.org/entity/Q1> ?p ?o }')
+  with pytest.raises(OSError):
+    index.build('P214', chunksize=20)
+  assert len(ids(index)) == 250
+  assert index.con.execute("SELECT * FROM harvests").fetchall() == harvest
+
+def test_build_count_mismatch(store, monkeypatch):
+  index = wdqs.AuthorityIndex(':memory:')
+  reqWDQS = wdqs.reqWDQS
+  def counting(query, *args, **kwargs):
+    d = reqWDQS(query, *args, **kwargs)
+    if 'COUNT(*)' in query:
+      d['count'] = '300'
+    return d
+  monkeypatch.setattr(wdqs, 'reqWDQS', counting)
+  with pytest.raises(ValueError):
+    index.build('P214', chunksize=20)
+  assert ids(index) == {}
+
+def test_refresh(store, monkeypatch):
+  index = wdqs.AuthorityIndex(':memory:')
+  index.build('P214', chunksize=20)
+  index.con.execute("UPDATE harvests SET time='2024-06-01T00:00:00Z'")
+  newer = '"2024-07-01T00:00:00Z"^^<http://www.w3.org/2001/XMLSchema#dateTime>'
+  store.store.update(f'''DELETE WHERE {{ <{WD}Q7> <http://www.wikidata.org/prop/direct/P214> ?v }} ;
+    INSERT DATA {{ {" ".join(triples([7, 251], newer)).replace('"v7"', '"w7"')} }}''')
+  queries = []
+  reqWDQS = wdqs.reqWDQS
+  def counted(query, *args, **kwargs):
+    queries.append(query)
+    return reqWDQS(query, *args, **kwargs)
+  monkeypatch.setattr(wdqs, 'reqWDQS', counted)
+  index.refresh('P214', chunksize=20)
+  assert len(queries) == 101 and all('dateModified' in q for q in queries)
+  found = ids(index)
+  assert 'v7' not in found and found['w7'] == 'Q7' and found['v251'] == 'Q251'
+  time, count = index.con.execute("SELECT time, count FROM harvests").fetchone()
+  assert time > '2024-06-01T00:00:00Z' and count == 251
+  # A failed refresh keeps the identifiers and the harvest time
+  index.con.execute("UPDATE harvests SET time='2024-06-01T00:00:00Z'")
+  def failing(query, *args, **kwargs):
+    raise OSError('timeout')
+  monkeypatch.setattr(wdqs, 'reqWDQS', failing)
+  with pytest.raises(OSError):
+    index.refresh('P214', chunksize=20)
+  assert index.con.execute("SELECT time FROM harvests").fetchone()[0] == '2024-06-01T00:00:00Z'
+  assert len(ids(index)) == 251
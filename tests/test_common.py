@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of checkValues.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from wiki_utils.common import checkValues
+
+def test_valid():
+  assert checkValues(pd.Series(['Q1', ' Q2 ', '', 'Q1']), 'p', pattern=r'Q\d+') == ['Q1', 'Q2']
+  assert checkValues('Q3', 'p') == ['Q3']
+
+@pytest.mark.parametrize('values, positions', [
+  ([1, 2], [0, 1]),
+  (np.array([1.5, 2.5]), [0, 1]),
+  (['Q1', 2, ' ', None, 'x!', 'Q'], [1, 3, 4, 5]),
+  ])
+def test_invalid_positions(values, positions):
+  with pytest.raises(ValueError) as ex:
+    checkValues(values, 'p', pattern=r'Q\d+', forbidden='!')
+  assert ex.value.positions.tolist() == positions
+
+def test_empty():
+  for values in ([], ['  ', '']):
+    with pytest.raises(ValueError):
+      checkValues(values, 'p')
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of dumpLines, dumpScan and the wd_Dump* functions, using a small
+synthetic Wikidata JSON dump (written gzipped in a temporary directory).
+"""
+
+import gzip
+import json
+import os
+import sys
+import pandas as pd
+import pytest
+from wiki_utils import wdqs
+from wiki_utils.common import dumpLines
+from wiki_utils.wdqs import (dumpScan, wd_DumpEntities, wd_DumpLabelDesc,
+                             wd_DumpProperty, wd_DumpWikipedias, wd_DumpEntityInfo)
+
+#%% -- Fixture dump ----------------------------------------------------------
+
+def claim(p, value, rank='normal'):
+  if isinstance(value, dict):
+    datavalue = {'type': 'globecoordinate', 'value': value}
+  elif value.startswith('+'):
+    datavalue = {'type': 'time', 'value': {'time': value, 'precision': 11}}
+  elif value[0] in 'QP' and value[1:].isdigit():
+    datavalue = {'type': 'wikibase-entityid', 'value': {'id': value}}
+  else:
+    datavalue = {'type': 'string', 'value': value}
+  return {'mainsnak': {'snaktype': 'value', 'property': p, 'datavalue': datavalue},
+          'type': 'statement', 'rank': rank}
+
+def entity(qid, labels, claims=(), descriptions=None, sitelinks=None):
+  e = {'type': 'property' if qid[0] == 'P' else 'item', 'id': qid,
+       'labels': {k: {'language': k, 'value': v} for k, v in labels.items()},
+       'descriptions': {k: {'language': k, 'value': v} for k, v in (descriptions or {}).items()},
+       'claims': {}, 'sitelinks': {}}
+  for p, value, *rank in claims:
+    e['claims'].setdefault(p, []).append(claim(p, value, *rank))
+  for site, title in (sitelinks or {}).items():
+    e['sitelinks'][site] = {'site': site, 'title': title, 'badges': []}
+  return e
+
+ENTITIES = [
+  entity('Q1', {'es': 'Ana Pérez', 'en': 'Ana Perez'},
+         [('P31', 'Q5'), ('P21', 'Q6581072'), ('P106', 'Q36180'),
+          ('P106', 'Q1000', 'deprecated'), ('P19', 'Q10'),
+          ('P569', '+1950-01-01T00:00:00Z'), ('P214', '12345')],
+         descriptions={'es': 'escritora'},
+         sitelinks={'eswiki': 'Ana Pérez', 'enwiki': 'Ana Perez', 'commonswiki': 'Category:Ana'}),
+  entity('Q2', {'en': 'John Doe'}, [('P31', 'Q5'), ('P19', 'Q11')]),
+  entity('Q5', {'es': 'ser humano', 'en': 'human'}),
+  entity('Q10', {'es': 'Madrid', 'en': 'Madrid'},
+         [('P31', 'Q515'), ('P17', 'Q20'),
+          ('P625', {'latitude': 40.4, 'longitude': -3.7})]),
+  entity('Q11', {'en': 'Old town'}, [('P17', 'Q21')]),
+  entity('Q20', {'es': 'España', 'en': 'Spain'}, [('P31', 'Q6256')]),
+  entity('Q21', {'en': 'Old kingdom'}, [('P31', 'Q6256'), ('P31', 'Q3024240')]),
+  entity('Q99', {'en': 'Other country'}, [('P31', 'Q6256')]),
+  entity('Q1000', {'en': 'deprecated value'}),
+  entity('Q36180', {'es': 'escritor', 'en': 'writer'}),
+  entity('Q6581072', {'es': 'femenino', 'en': 'female'}),
+  entity('P106', {'en': 'occupation'}),
+]
+
+@pytest.fixture(scope='module')
+def dump(tmp_path_factory):
+  path = str(tmp_path_factory.mktemp('dump') / 'latest-all.json.gz')
+  with gzip.open(path, 'wt', encoding='utf-8') as f:
+    f.write('[\n' + ',\n'.join(json.dumps(e, ensure_ascii=False, separators=(',', ':'))
+                               for e in ENTITIES) + '\n]\n')
+  return path
+
+
+#%% -- Tests -----------------------------------------------------------------
+
+@pytest.mark.parametrize('processes', [1, 2])
+def test_dump_scan(dump, processes):
+  specs = [{'ids': {'Q10', 'Q1', 'Q404'}}, {'instanceof': {'Q5'}}]
+  entities = list(dumpScan(dump, specs, parts={'labels'}, processes=processes, batchsize=3))
+  assert [e['id'] for e in entities] == ['Q1', 'Q2', 'Q10']
+  assert set(entities[0]) == {'type', 'id', 'labels'}
+  entities = list(dumpScan(dump, [{'properties': {'P17', 'P625'}}], claims={'P17'},
+                           processes=processes, batchsize=3))
+  assert [e['id'] for e in entities] == ['Q10']
+  assert list(entities[0]['claims']) == ['P17']
+
+def test_dump_entities(dump):
+  ids = [e['id'] for e in wd_DumpEntities(dump, instanceof='Q5|Q515', properties='P19',
+                                          processes=1)]
+  assert ids == ['Q1', 'Q2']
+  e, = wd_DumpEntities(dump, ids='Q20', parts='labels', processes=1)
+  assert e['labels']['es']['value'] == 'España' and 'claims' not in e
+
+def test_dump_label_desc(dump):
+  d = wd_DumpLabelDesc(dump, ['Q1', 'Q2', 'Q404'], langsorder='es|en', processes=1)
+  expected = pd.DataFrame({'entity': ['Q1', 'Q2', 'Q404'],
+                           'labellang': ['es', 'en', ''],
+                           'label': ['Ana Pérez', 'John Doe', 'Q404'],
+                           'descriptionlang': ['es', '', ''],
+                           'description': ['escritora', '', '']},
+                          index=['Q1', 'Q2', 'Q404'])
+  pd.testing.assert_frame_equal(d, expected)
+
+def test_dump_property(dump):
+  d = wd_DumpProperty(dump, ['Q1', 'Q2'], 'P106|P19', includeQ=True, langsorder='es',
+                      processes=1)
+  expected = pd.DataFrame({'entity': ['Q1', 'Q2'],
+                           'instanceof': ['Q5', 'Q5'],
+                           'instanceofLabel': ['ser humano', 'ser humano'],
+                           'P106': ['Q36180', ''],
+                           'P106Label': ['escritor', ''],
+                           'P19': ['Q10', 'Q11'],
+                           'P19Label': ['Madrid', 'Q11']},
+                          index=['Q1', 'Q2'])
+  pd.testing.assert_frame_equal(d, expected)
+
+def test_dump_wikipedias(dump):
+  d = wd_DumpWikipedias(dump, ['Q1', 'Q2'], processes=1)
+  assert d.npages.tolist() == [2, 0]
+  assert d.loc['Q1', 'langs'] == 'es|en'
+  assert d.loc['Q1', 'pages'] == ('https://es.wikipedia.org/wiki/Ana_P%C3%A9rez|'
+                                  'https://en.wikipedia.org/wiki/Ana_Perez')
+  d = wd_DumpWikipedias(dump, ['Q1', 'Q2'], wikilangs='en', processes=1)
+  assert d.loc['Q1', 'names'] == 'Ana Perez'
+
+def test_dump_entity_info(dump, monkeypatch):
+  parsed = []
+  class CountingJSON:
+    def loads(self, line):
+      e = json.loads(line)
+      parsed.append(e['id'])
+      return e
+  monkeypatch.setattr(wdqs, 'json', CountingJSON())
+  d = wd_DumpEntityInfo(dump, ['Q1', 'Q2'], langsorder='es', processes=1)
+  r = d.loc['Q1']
+  assert (r.label, r.sexQ, r.sex) == ('Ana Pérez', 'Q6581072', 'femenino')
+  # As w_EntityInfo (entityInfoRecord), deprecated claims are not ignored
+  assert set(r.occupationQ.split('|')) == {'Q36180', 'Q1000'}
+  assert set(r.occupation.split('|')) == {'escritor', 'deprecated value'}
+  assert (r.bplaceQ, r.bplace, r.bplaceLat, r.bplaceLon, r.bcountryQ, r.bcountry) == \
+         ('Q10', 'Madrid', '40.4', '-3.7', 'Q20', 'España')
+  assert r.viafid == '12345'
+  r = d.loc['Q2']
+  assert (r.bplace, r.bcountryQ) == ('Old town', '')   # Q21 is not a country
+  # All the scans are filtered by identifiers: other countries are not parsed
+  assert 'Q99' not in parsed
+  assert len(parsed) == len(set(parsed))
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='needs a shell script')
+def test_dump_lines_decompressor_error(tmp_path, monkeypatch):
+  # A fake pigz which outputs some lines and fails (a truncated file)
+  pigz = tmp_path / 'pigz'
+  pigz.write_text("#!/bin/sh\nprintf 'a\\nb\\n'\nexit 1\n")
+  pigz.chmod(0o755)
+  monkeypatch.setenv('PATH', str(tmp_path) + os.pathsep + os.environ['PATH'])
+  lines = []
+  with pytest.raises(OSError):
+    for line in dumpLines(str(tmp_path / 'truncated.json.gz')):
+      lines.append(line)
+  assert lines == ['a\n', 'b\n']
+  # Closed before the end: no error
+  g = dumpLines(str(tmp_path / 'truncated.json.gz'))
+  assert next(g) == 'a\n'
+  g.close()
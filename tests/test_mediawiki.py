@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of MediaWikiDump and the md_* functions, using tiny SQL dumps of a
+fictitious project (written gzipped in a temporary directory).
+"""
+
+import gzip
+import pandas as pd
+import pytest
+from wiki_utils.mediawiki import (MediaWikiDump, md_WikidataEntity,
+                                  md_Redirects, md_PageOutLinks, md_PageInLinks)
+
+#%% -- Fixture dumps ---------------------------------------------------------
+
+DUMPS = {
+  'page': ("""CREATE TABLE `page` (
+  `page_id` int(8) unsigned NOT NULL AUTO_INCREMENT,
+  `page_namespace` int(11) NOT NULL DEFAULT 0,
+  `page_title` varbinary(255) NOT NULL DEFAULT '',
+  `page_is_redirect` tinyint(1) unsigned NOT NULL DEFAULT 0,
+  PRIMARY KEY (`page_id`)
+) ENGINE=InnoDB;""",
+    ["(1,0,'España',0),(2,0,'Max_Planck',0),(3,0,'Spain',1),(4,1,'España',0)",
+     "(5,0,'Madrid',0),(6,0,'Planck',1),(7,0,'Desambiguación',0),(8,0,'L\\'Hospitalet',0)"]),
+  'page_props': ("""CREATE TABLE `page_props` (
+  `pp_page` int(10) unsigned NOT NULL,
+  `pp_propname` varbinary(60) NOT NULL,
+  `pp_value` blob NOT NULL,
+  `pp_sortkey` float DEFAULT NULL,
+  PRIMARY KEY (`pp_page`,`pp_propname`)
+) ENGINE=InnoDB;""",
+    ["(1,'wikibase_item','Q29',NULL),(2,'wikibase_item','Q9021',NULL)",
+     "(5,'wikibase_item','Q2807',NULL),(7,'disambiguation','',NULL),(7,'wikibase_item','Q1',NULL)"]),
+  'redirect': ("""CREATE TABLE `redirect` (
+  `rd_from` int(8) unsigned NOT NULL DEFAULT 0,
+  `rd_namespace` int(11) NOT NULL DEFAULT 0,
+  `rd_title` varbinary(255) NOT NULL DEFAULT '',
+  `rd_interwiki` varbinary(32) DEFAULT NULL,
+  `rd_fragment` varbinary(255) DEFAULT NULL,
+  PRIMARY KEY (`rd_from`)
+) ENGINE=InnoDB;""",
+    ["(3,0,'España','',''),(6,0,'Max_Planck','','')"]),
+  'linktarget': ("""CREATE TABLE `linktarget` (
+  `lt_id` bigint(20) unsigned NOT NULL AUTO_INCREMENT,
+  `lt_namespace` int(11) NOT NULL,
+  `lt_title` varbinary(255) NOT NULL,
+  PRIMARY KEY (`lt_id`)
+) ENGINE=InnoDB;""",
+    ["(10,0,'España'),(11,0,'Madrid'),(12,0,'Max_Planck'),(13,1,'España')"]),
+  # Current schema (pl_target_id, needs linktarget)
+  'pagelinks': ("""CREATE TABLE `pagelinks` (
+  `pl_from` int(8) unsigned NOT NULL DEFAULT 0,
+  `pl_from_namespace` int(11) NOT NULL DEFAULT 0,
+  `pl_target_id` bigint(20) unsigned NOT NULL,
+  PRIMARY KEY (`pl_from`,`pl_target_id`)
+) ENGINE=InnoDB;""",
+    ["(1,0,11),(2,0,10),(4,1,11),(5,0,10)",
+     "(7,0,10),(7,0,12),(8,0,13)"]),
+  # Old schema (pl_namespace, pl_title): 'España' is in both statements
+  'pagelinks_old': ("""CREATE TABLE `pagelinks` (
+  `pl_from` int(8) unsigned NOT NULL DEFAULT 0,
+  `pl_namespace` int(11) NOT NULL DEFAULT 0,
+  `pl_title` varbinary(255) NOT NULL DEFAULT '',
+  `pl_from_namespace` int(11) NOT NULL DEFAULT 0,
+  PRIMARY KEY (`pl_from`,`pl_namespace`,`pl_title`)
+) ENGINE=InnoDB;""",
+    ["(1,0,'Madrid',0),(2,0,'España',0),(4,0,'Madrid',1),(5,0,'España',0)",
+     "(7,0,'España',0),(7,0,'Max_Planck',0),(8,1,'España',0)"]),
+}
+
+def writeDump(directory, name):
+  create, inserts = DUMPS[name]
+  table = create.split('`')[1]
+  path = str(directory / f'xxwiki-latest-{name}.sql.gz')
+  with gzip.open(path, 'wt', encoding='utf-8') as f:
+    f.write(f"-- MySQL dump\n\nDROP TABLE IF EXISTS `{table}`;\n{create}\n\n")
+    for values in inserts:
+      f.write(f"INSERT INTO `{table}` VALUES {values};\n")
+  return path
+
+@pytest.fixture(params=['pagelinks', 'pagelinks_old'])
+def dump(request, tmp_path):
+  names = ['page', 'page_props', 'redirect']
+  names += ['linktarget', 'pagelinks'] if request.param == 'pagelinks' else ['pagelinks_old']
+  d = MediaWikiDump(str(tmp_path / 'xxwiki.sqlite'))
+  d.load(*[writeDump(tmp_path, x) for x in names])
+  yield d
+  d.close()
+
+
+#%% -- Tests -----------------------------------------------------------------
+
+def test_wikidata_entity(dump):
+  df = md_WikidataEntity(dump, ['España', 'Spain', 'max_Planck', 'Desambiguación',
+                                "L'Hospitalet", 'Nada'])
+  expected = pd.DataFrame.from_dict({
+    'España':         {'status': 'OK', 'normalized': None, 'target': None, 'entity': 'Q29'},
+    'Spain':          {'status': 'OK', 'normalized': None, 'target': 'España', 'entity': 'Q29'},
+    'max_Planck':     {'status': 'OK', 'normalized': 'Max Planck', 'target': None, 'entity': 'Q9021'},
+    'Desambiguación': {'status': 'disambiguation', 'normalized': None, 'target': None, 'entity': 'Q1'},
+    "L'Hospitalet":   {'status': 'no_pageprops', 'normalized': None, 'target': None, 'entity': None},
+    'Nada':           {'status': 'missing', 'normalized': None, 'target': None, 'entity': None},
+    }, orient='index')
+  pd.testing.assert_frame_equal(df, expected)
+
+def test_redirects(dump):
+  assert md_Redirects(dump, ['España', 'Planck', 'Nada']) == {
+    'España': ['España', 'Spain'],
+    'Planck': ['Max Planck', 'Planck'],
+    'Nada': None}
+
+def outlinks(dump):
+  df = md_PageOutLinks(dump, ['España', 'Planck', 'Desambiguación', "L'Hospitalet", 'Nada'])
+  df['links'] = df['links'].map(lambda x: x if x is None else sorted(x))
+  return df
+
+def test_page_outlinks(dump):
+  expected = pd.DataFrame.from_dict({
+    'España':         {'status': 'OK', 'normalized': None, 'target': None, 'nlinks': 1, 'links': ['Madrid']},
+    'Planck':         {'status': 'OK', 'normalized': None, 'target': 'Max Planck', 'nlinks': 1, 'links': ['España']},
+    'Desambiguación': {'status': 'OK', 'normalized': None, 'target': None, 'nlinks': 2, 'links': ['España', 'Max Planck']},
+    "L'Hospitalet":   {'status': 'OK', 'normalized': None, 'target': None, 'nlinks': 0, 'links': []},
+    'Nada':           {'status': 'missing', 'normalized': None, 'target': None, 'nlinks': 0, 'links': None},
+    }, orient='index')
+  pd.testing.assert_frame_equal(outlinks(dump), expected)
+
+def test_page_inlinks(dump):
+  df = md_PageInLinks(dump, ['Spain', 'Madrid', 'Max Planck'])
+  assert df.loc['Spain', 'target'] == 'España'
+  assert df['nlinks'].tolist() == [3, 1, 1]
+  assert sorted(df.loc['Spain', 'linkshere']) == ['Desambiguación', 'Madrid', 'Max Planck']
+  assert df.loc['Madrid', 'linkshere'] == ['España']
+  assert md_PageInLinks(dump, 'Max Planck', redirects=False).loc['Max Planck', 'nlinks'] == 1
+
+def test_load_twice(dump, tmp_path):
+  before = outlinks(dump)
+  names = ['linktarget', 'pagelinks', 'pagelinks_old']
+  dump.load(*[writeDump(tmp_path, x) for x in names])
+  pd.testing.assert_frame_equal(outlinks(dump), before)
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the batch functions of the REST APIs when the redirects can not be
+obtained, with fake requests (no requests to the APIs).
+"""
+
+import pytest
+from wiki_utils import rest
+
+@pytest.fixture
+def failing(monkeypatch):
+  # m_Redirects returns None when the request to the MediaWiki API fails
+  monkeypatch.setattr(rest, 'm_Redirects', lambda *args, **kwargs: None)
+  def reqXTools(article, infotype, *args, **kwargs):
+    return {'articleinfo': {'page': article, 'revisions': 1},
+            'prose': {'words': 2}, 'links': {'links_in_count': 3}}[infotype]
+  monkeypatch.setattr(rest, 'reqXTools', reqXTools)
+  monkeypatch.setattr(rest, 'cachedPageViews',
+                      lambda page, *args, **kwargs: {'2024010100': 5})
+
+def test_pageinfo(failing):
+  assert rest.m_PageInfo('Max Planck')['page'] == 'Max Planck'
+
+def test_pageinfo_batch(failing):
+  d = rest.m_PageInfoBatch(['Max Planck', 'Marie Curie'])
+  assert d.page.tolist() == ['Max Planck', 'Marie Curie']
+
+def test_pageviews_batch(failing):
+  d = rest.m_PageViewsBatch(['Max Planck', 'Marie Curie'], '20240101', '20240131',
+                            redirects=True)
+  assert d.sum(axis=1).tolist() == [5, 5]
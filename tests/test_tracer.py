@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of Tracer, with synthetic WDQS responses (no requests to WDQS).
+"""
+
+import pickle
+import pytest
+import wiki_utils
+from wiki_utils import common, wdqs, SyntheticTransport
+
+@pytest.fixture
+def transport():
+  with SyntheticTransport(nrows=10) as t:
+    yield t
+
+def spans(tracer):
+  byid = {s['span_id']: s for s in tracer.spans}
+  return [(s['name'], byid[s['parent_id']]['name'] if s['parent_id'] else None)
+          for s in tracer.spans]
+
+@pytest.mark.parametrize('imported', ['star', 'package', 'module'])
+def test_imported_before_start(transport, imported):
+  namespace = {}
+  if imported == 'star':
+    exec('from wiki_utils import *', namespace)
+    w_isValid = namespace['w_isValid']
+  elif imported == 'package':
+    w_isValid = wiki_utils.w_isValid
+  else:
+    w_isValid = wdqs.w_isValid
+  with common.Tracer() as tracer:
+    w_isValid(['Q1', 'Q2'])
+  assert spans(tracer) == [('w_isValid', None), ('POST wdqs', 'w_isValid')]
+  w_isValid(['Q1'])
+  assert len(tracer.spans) == 2
+
+def test_functions(transport):
+  with common.Tracer(functions=['w_Property']) as tracer:
+    wiki_utils.w_isValid(['Q1'])
+  assert spans(tracer) == [('POST wdqs', None)]
+
+def test_no_tracer(transport):
+  assert common.TRACER is None
+  assert wiki_utils.w_isValid is wdqs.w_isValid
+  assert pickle.loads(pickle.dumps(wdqs.w_isValid)) is wdqs.w_isValid
+  assert len(wdqs.w_isValid(['Q1'])) == 1
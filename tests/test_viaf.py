@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of v_GetRecords, with a fake reqVIAF (no requests to VIAF).
+"""
+
+import collections
+import pytest
+from wiki_utils import viaf
+
+RECORDS = {'1': {'viafID': '1'}, '3': {'viafID': '3'}, '6': {'viafID': '6'},
+           '2': {'redirect': {'directto': '3'}},
+           '5': {'redirect': {'directto': '3'}},
+           '7': {'redirect': {'directto': '5'}},
+           '4': {'scavenged': {'VIAFCluster': {'viafID': '6'}}},
+           '8': {'redirect': {'directto': '9'}},
+           '9': {'redirect': {'directto': '8'}}}
+
+@pytest.fixture
+def calls(monkeypatch):
+  calls = collections.Counter()
+  def reqVIAF(viafid, limiter=None, attempts=3):
+    calls[viafid] += 1
+    return RECORDS.get(viafid)
+  monkeypatch.setattr(viaf, 'reqVIAF', reqVIAF)
+  return calls
+
+def test_get_records(calls):
+  redirects, failures = {}, {}
+  out = sorted(viaf.v_GetRecords(['1', '2', '4', '5', '7', '8', '404'],
+                                 redirects=redirects, failures=failures))
+  assert out == [('1', '1', 'original', {'viafID': '1'}),
+                 ('2', '3', 'redirect', {'viafID': '3'}),
+                 ('4', '6', 'scavenged', {'viafID': '6'}),
+                 ('5', '3', 'redirect', {'viafID': '3'}),
+                 ('7', '3', 'redirect', {'viafID': '3'})]
+  assert isinstance(failures['404'], LookupError)
+  assert isinstance(failures['8'], RecursionError)
+  assert redirects['4'] == ('scavenged', '6')
+  # The cluster shared by several redirections is requested once
+  assert calls['3'] == 1
+  assert max(calls.values()) == 1
+
+def test_get_records_memoized(calls):
+  redirects = {'2': ('redirect', '3'), '5': ('redirect', '3'), '4': ('scavenged', '6')}
+  out = sorted(x[:3] for x in viaf.v_GetRecords(['2', '4', '5'], redirects=redirects))
+  assert out == [('2', '3', 'redirect'), ('4', '6', 'scavenged'), ('5', '3', 'redirect')]
+  # The old records are not requested again
+  assert dict(calls) == {'3': 1, '6': 1}
+
+def test_load_restores_synchronous(tmp_path):
+  store = viaf.VIAFStore(str(tmp_path / 'viaf.db'))
+  mode = store.con.execute("PRAGMA synchronous").fetchone()[0]
+  empty = tmp_path / 'viaf-clusters.txt'
+  empty.write_text('')
+  store.load(str(empty), processes=1)
+  assert store.con.execute("PRAGMA synchronous").fetchone()[0] == mode
+  with pytest.raises(OSError):
+    store.load(str(tmp_path / 'missing.txt'), processes=1)
+  assert store.con.execute("PRAGMA synchronous").fetchone()[0] == mode
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Fri May  7 13:45:15 2021
+Rev 2022-02-16
+Rev 2022-05-30
+Rev 2022-06-20
+Rev 2022-07-05
+Rev 2022-09-12
+Rev 2023-05-25
+Rev 2023-10-06
+Rev 2023-11-18
+Rev 2024-05-19 vers. 1.2.5
+
+The package is divided into modules (see _MODULES), which are imported when
+one of their names is used for the first time, so importing the package is
+fast and a function only imports the dependencies of its module: i.e.
+"from wiki_utils import deaccenttext" does not import pandas nor requests.
+"from wiki_utils import *" imports all the modules.
+
+@author: Angel Zazo <angelzazo@usal.es>
+"""
+
+#%% Imports
+import sys
+import types
+import importlib
+
+#%% Names of each module of the package
+_MODULES = {
+  'common': ('user_agent', 'MW_LIMIT', 'VIAF_LIMIT', 'VIAF_RATE', 'REST_RATE',
+             'packageModules', 'loadModules', 'rebind', 'doChunks',
+             'HTTP_TRANSPORT', 'httpSend', 'httpRequest', 'Cassette', 'HOOKS',
+             'addHook', 'removeHook', 'currentEvent', 'requestEvent',
+             'instrumented', 'retrySleep', 'RequestMetrics', 'printHook',
+             'TRACER', 'currentSpan', 'span', 'spanPropagate', 'traced',
+             'Tracer',
+             'RateLimiter', 'retryAfter', 'getSession', 'reqREST',
+             'doConcurrent', 'checkValues', 'checkEntities', 'dumpLines'),
+  'text': ('deaccentTable', 'deaccenttext', 'deaccentSeries', 'similarPrepare',
+           'similar', 'SIMILAR_BLOCK', 'lcsMasks', 'lcsRatio', 'similarBlock',
+           'similarScores', 'similarMatrix', 'similarTopK', 'BlockingIndex',
+           'similarBlocked'),
+  'sparql': ('SPARQL_ENDPOINTS', 'SPARQL_PREFIXES', 'setEndpoint', 'reqSPARQL',
+             'sparqlString', 'reqSPARQLChunks', 'sparqlRewrite', 'LocalSPARQL'),
+  'mediawiki': ('reqMediaWiki', 'normalizedTitle', 'checkTitles', 'm_Search',
+                'm_WikidataEntity', 'm_Redirects', 'm_RedirectsDF',
+                'm_PagePrimaryImage', 'm_PageFiles', 'm_ImageURL',
+                'm_PageOutLinks', 'm_PageInLinks', 'sqlInsertRows',
+                'sqlDumpRows', 'MediaWikiDump', 'normalizeTitle',
+                'md_WikidataEntity', 'md_Redirects', 'md_PageOutLinks',
+                'md_PageInLinks'),
+  'wdqs': ('reqWDQS', 'w_isInstanceOf', 'w_Wikipedias', 'w_isValid',
+           'w_Property', 'w_Geoloc', 'w_LabelDesc', 'w_SearchByOccupation',
+           'AUTHORITIES', 'authorityProperty', 'w_SearchByIdentifiers',
+           'w_SearchByAuthority', 'w_SearchByInstanceof', 'w_SearchByLabel',
+           'entityInfoFields', 'entityInfoRecord', 'entityInfoComplete',
+           'w_EntityInfo', 'AuthorityIndex', 'ntTerm',
+           'materializeChunk', 'w_Materialize', 'DUMP_BATCH', 'COUNTRY_CLASSES',
+           'NOTCOUNTRY_CLASSES', 'NOT_WIKIPEDIAS', 'dumpValue',
+           'dumpClaimValues', 'dumpTerm', 'dumpMatch', 'dumpFilterLines',
+           'dumpScan', 'wd_DumpEntities', 'wd_DumpLabelDesc', 'wd_DumpProperty',
+           'dumpWikipedias', 'wd_DumpWikipedias', 'wd_DumpEntityInfo'),
+  'rest': ('pageviewsURL', 'MetricsCache', 'pageviewsBuckets',
+           'cachedPageViews', 'm_PageViews', 'm_PageViewsBatch', 'reqXTools',
+           'm_PageInfoType', 'pageInfoMerge', 'm_PageInfo', 'm_PageInfoBatch'),
+  'libraries': ('b_GetTTL', 'b_GenderTTL', 'b_SearchByLabel', 'b_SearchByLabels',
+                'labelMatches', 'genderRecords', 'b_Gender', 'b_GenderScrapping',
+                's_Gender', 'g_SearchLabel', 'g_SearchLabels', 'g_Gender',
+                'd_Gender', 'GENDER_SOURCES', 'GENDER_ALIASES',
+                'GENDER_VALUES', 'genderNormalize', 'genderConsensus',
+                'genderChunk', 'genderSource', 'l_Gender'),
+  'viaf': ('v_Autosuggest', 'v_AutosuggestPersonal', 'reqVIAFSearch',
+           'v_SearchIter', 'v_Search', 'v_SearchAnyField', 'v_SearchByName',
+           'v_SearchByTitle', 'v_GetRecord', 'v_GetProcessed', 'v_isPersonal',
+           'v_titles', 'v_gender', 'v_dates', 'v_occupations', 'v_sources',
+           'v_sourceId', 'v_sourcesX400', 'v_coauthors', 'v_wikipedias',
+           'v_allinfo', 'VIAF_BATCH', 'VIAF_TABLES', 'v_extract',
+           'v_extractBatch', 'v_allinfoFrames', 'reqVIAF', 'v_GetRecords',
+           'viafStoreRows', 'VIAFStore', 'reqVIAFStored', 'xmlToJSON',
+           'viafDumpRecord', 'viafDumpBatch'),
+  'bench': ('SYNTH_LANGS', 'SYNTH_CLASSES', 'WD', 'synthVariables',
+            'synthCardinality', 'synthWords', 'synthWDQS', 'synthEntities',
+            'SyntheticTransport', 'SCALING', 'scaling'),
+  }
+
+_EXPORTS = {name: module for module, names in _MODULES.items() for name in names}
+
+# Aliases of the dependencies (formerly exported by "from wiki_utils import *")
+_DEPENDENCIES = {'pd': 'pandas', 'np': 'numpy', 're': 'regex', 'requests': 'requests'}
+
+__all__ = list(_EXPORTS) + list(_DEPENDENCIES)
+
+
+#%% __getattr__(name)
+def __getattr__(name):
+  """Import the module of 'name' (the first time) and return its value."""
+  if name in _EXPORTS:
+    return getattr(importlib.import_module(f'{__name__}.{_EXPORTS[name]}'), name)
+  if name in _DEPENDENCIES:
+    return importlib.import_module(_DEPENDENCIES[name])
+  if name in _MODULES:
+    return importlib.import_module(f'{__name__}.{name}')
+  raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+
+
+#%% __dir__()
+def __dir__():
+  return sorted(set(globals()) | set(__all__) | set(_MODULES))
+
+
+#%% class _Package
+class _Package(types.ModuleType):
+  """
+  The names are not copied to the package (they are always read from their
+  modules), so assigning a name of a module, like
+  "wiki_utils.user_agent = '...'", rebinds it in all the modules which use it.
+  """
+  def __setattr__(self, name, value):
+    if name in _EXPORTS:
+      importlib.import_module(f'{__name__}.{_EXPORTS[name]}')
+      importlib.import_module(f'{__name__}.common').rebind(name, value)
+    else:
+      super().__setattr__(name, value)
+
+sys.modules[__name__].__class__ = _Package
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Synthetic WDQS results and scaling of the post-processing of the w_*
+functions. The benchmarks of the library overhead (pytest-benchmark) are in
+the 'benchmarks' directory of the repository, out of the package.
+
+@author: Angel Zazo <angelzazo@usal.es>
+"""
+
+#%% Imports
+from time import perf_counter
+import tracemalloc
+import pandas as pd
+import regex as re
+import numpy as np
+import json
+from .common import Cassette, rebind
+from .mediawiki import reqMediaWiki
+from .wdqs import (reqWDQS, w_EntityInfo, w_Property, w_SearchByAuthority,
+                   w_Wikipedias)
+
+
+#%% -- Synthetic WDQS results -------------------------------------------------
+# Payloads with the shape of the WDQS (CSV/JSON) and wbgetentities responses,
+# with any number of rows and realistic GROUP_CONCAT cardinalities, to study
+# how the parsing and cleanup stages of the w_* functions scale (see scaling)
+# without collecting huge real responses.
+
+SYNTH_LANGS = ['en', 'es', 'fr', 'de', 'it', 'pt', 'ru', 'ja', 'zh', 'ar', 'nl',
+               'pl', 'sv', 'ca', 'eu', 'gl', 'uk', 'fa', 'he', 'cs', 'fi', 'hu',
+               'ko', 'tr', 'ro', 'da', 'no', 'el', 'id', 'vi', 'sr', 'bg', 'sk',
+               'hr', 'et', 'lt', 'lv', 'sl', 'hy', 'ka']
+SYNTH_CLASSES = ['Q5']*20 + ['Q15632617', 'Q95074', 'Q4167410', 'Q11424', 'Q5398426']
+WD = 'http://www.wikidata.org/entity/'
+
+_synth_select = re.compile(r'(\((?:[^()]++|(?1))*\))|\?(\w+)')
+
+#%% synthVariables(sparql_query)
+def synthVariables(sparql_query):
+  """Return the names of the variables projected by a SELECT query."""
+  m = re.search(r'(?is)SELECT\s+(?:DISTINCT\s+)?(.*?)\s(?:WHERE|WITH)\s*\{', sparql_query)
+  variables = []
+  for t in _synth_select.finditer(m.group(1)):
+    if t.group(2) is not None:
+      variables.append(t.group(2))
+    else:
+      a = re.search(r'(?i)\bAS\s+\?(\w+)\s*\)$', t.group(1))
+      if a is not None:
+        variables.append(a.group(1))
+  return variables
+
+
+#%% synthCardinality(rng, n, mean, maxk=300, p0=0.0)
+def synthCardinality(rng, n, mean, maxk=300, p0=0.0):
+  """
+  Return n cardinalities (number of values of a GROUP_CONCAT) with a heavy
+  tailed (geometric) distribution of the given mean, at most maxk. A fraction
+  p0 of them are 0 (no values).
+  """
+  k = np.minimum(rng.geometric(1.0/mean, n), maxk)
+  k[rng.random(n) < p0] = 0
+  return k
+
+
+#%% synthWords(rng, n)
+def synthWords(rng, n):
+  """Return n random names (strings of two capitalized words)."""
+  syll = np.array(['ma', 'ri', 'to', 'lo', 'pe', 'sa', 'ne', 'ka', 'du', 'vi', 'ro', 'len'])
+  a = rng.integers(0, len(syll), (n, 5))
+  s = syll[a]
+  first = np.char.add(np.char.add(s[:,0], s[:,1]), s[:,2])
+  last = np.char.add(s[:,3], s[:,4])
+  return np.char.add(np.char.add(np.char.capitalize(first), ' '), np.char.capitalize(last)).tolist()
+
+
+#%% synthWDQS(sparql_query, nrows=10000, seed=0, mean=3, format='csv')
+def synthWDQS(sparql_query, nrows=10000, seed=0, mean=3, format='csv'):
+  """
+  Generate a synthetic WDQS response for the SELECT query: a column for each
+  variable projected, and a row for each entity in the VALUES clause (or
+  'nrows' rows, limited by LIMIT/OFFSET, if there is no VALUES clause). The
+  values depend on the name of the variables: entities (IRIs), labels,
+  GROUP_CONCAT of classes, properties (P...) and Wikipedia pages with
+  geometric cardinalities of mean 'mean', etc.
+
+  :param sparql_query: The SELECT query (as used by the w_* functions).
+  :param nrows: Number of rows of queries without a VALUES clause.
+  :param seed: Seed of the random generator.
+  :param mean: Mean cardinality of the GROUP_CONCAT values.
+  :param format: 'csv' (returns the text) or 'json' (returns a dict).
+  :return The CSV text or the SPARQL JSON results.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  """
+  rng = np.random.default_rng(seed)
+  variables = synthVariables(sparql_query)
+  values = re.search(r'VALUES\s+\?\w+\s*\{([^}]*)\}', sparql_query)
+  if values is not None:
+    entities = [WD + x[3:] for x in values.group(1).split()]
+  else:
+    limit = re.search(r'LIMIT\s+(\d+)\s+OFFSET\s+(\d+)', sparql_query)
+    first, n = 0, nrows
+    if limit is not None:
+      first = int(limit.group(2))
+      n = max(0, min(int(limit.group(1)), nrows - first))
+    entities = [f'{WD}Q{k}' for k in range(first + 1, first + n + 1)]
+  n = len(entities)
+  #
+  def concat(items, k):
+    ends = np.cumsum(k)
+    return ['|'.join(items[e-j:e]) for e,j in zip(ends, k)]
+  #
+  cols = dict()
+  kpages = synthCardinality(rng, n, mean, len(SYNTH_LANGS), p0=0.2)
+  kclass = synthCardinality(rng, n, 1.1, 5, p0=0.05)
+  for v in variables:
+    if v == 'count':
+      cols[v] = [str(nrows)]
+    elif v in ('entity', 'place'):
+      cols[v] = entities
+    elif v == 'country':
+      cols[v] = [f'{WD}Q{x}' for x in rng.integers(1, 250, n)]
+    elif v == 'instanceof':
+      cols[v] = concat([WD + x for x in rng.choice(SYNTH_CLASSES, kclass.sum())], kclass)
+    elif v == 'instanceofLabel':
+      cols[v] = concat(synthWords(rng, kclass.sum()), kclass)
+    elif v == 'npages':
+      cols[v] = kpages.astype(str).tolist()
+    elif v == 'langs':
+      cols[v] = ['|'.join(rng.permutation(SYNTH_LANGS)[:k]) for k in kpages]
+    elif v == 'names':
+      cols[v] = concat(synthWords(rng, kpages.sum()), kpages)
+    elif v == 'pages':
+      cols[v] = concat([f'https://xx.wikipedia.org/wiki/Page_{x}'
+                        for x in rng.integers(1, 10**8, kpages.sum())], kpages)
+    elif v in ('placeLat', 'placeLon'):
+      cols[v] = np.round(rng.uniform(-80, 80, n), 4).astype(str).tolist()
+    elif v.endswith('lang'):
+      cols[v] = rng.choice(['en', 'es', 'fr'], n).tolist()
+    elif re.match(r'^P\d+$', v):
+      k = synthCardinality(rng, n, mean/2, 50, p0=0.3)
+      cols[v] = concat([f'{WD}Q{x}' for x in rng.integers(1, 10**8, k.sum())], k)
+    elif re.match(r'^P\d+Label$', v):
+      k = synthCardinality(rng, n, mean/2, 50, p0=0.3)
+      cols[v] = concat(synthWords(rng, k.sum()), k)
+    else:   # Labels, descriptions, identifiers...
+      cols[v] = synthWords(rng, n)
+  #
+  if format == 'csv':
+    d = pd.DataFrame(cols, columns=variables)
+    return d.to_csv(index=False)
+  bindings = [{v:{'type': 'uri' if x.startswith('http') else 'literal', 'value': x}
+               for v,x in zip(variables, row) if x != ''}
+              for row in zip(*[cols[v] for v in variables])]
+  return {'head': {'vars': variables}, 'results': {'bindings': bindings}}
+
+
+#%% synthEntities(ids, seed=0, mean=3)
+def synthEntities(ids, seed=0, mean=3):
+  """
+  Generate a synthetic response of the 'wbgetentities' action of the
+  Wikibase API for the entities in 'ids' (as used by w_EntityInfo): labels,
+  descriptions, sitelinks and the claims of the mode 'human', with geometric
+  cardinalities of mean 'mean'.
+  """
+  rng = np.random.default_rng(seed)
+  def claim(p, vtype, value):
+    return {'mainsnak': {'snaktype': 'value', 'property': p,
+                         'datavalue': {'type': vtype, 'value': value}},
+            'type': 'statement', 'rank': 'normal',
+            'references': [{}]*int(rng.integers(0, 3))}
+  def item(p, k):
+    return [claim(p, 'wikibase-entityid', {'id': f'Q{x}'})
+            for x in rng.integers(1, 10**6, k)]
+  entities = dict()
+  for qid in ids:
+    langs = rng.permutation(SYNTH_LANGS)[:synthCardinality(rng, 1, mean, len(SYNTH_LANGS))[0]]
+    name = synthWords(rng, 1)[0]
+    year = int(rng.integers(1500, 2000))
+    claims = {'P31' : item('P31', 1),
+              'P21' : item('P21', 1),
+              'P19' : item('P19', 1),
+              'P20' : item('P20', int(rng.integers(0, 2))),
+              'P569': [claim('P569', 'time', {'time': f'+{year}-01-01T00:00:00Z'})],
+              'P106': item('P106', synthCardinality(rng, 1, mean, 30)[0]),
+              'P166': item('P166', synthCardinality(rng, 1, mean, 30, p0=0.5)[0]),
+              'P214': [claim('P214', 'string', str(rng.integers(10**6, 10**9)))]}
+    entities[qid] = {'type': 'item', 'id': qid,
+                     'labels': {l:{'language': l, 'value': name} for l in langs},
+                     'descriptions': {'en': {'language': 'en', 'value': 'synthetic entity'}},
+                     'claims': {p:c for p,c in claims.items() if len(c) > 0},
+                     'sitelinks': {l+'wiki': {'site': l+'wiki', 'title': name} for l in langs}}
+  return {'entities': entities, 'success': 1}
+
+
+#%% class SyntheticTransport(nrows=10000, seed=0, mean=3)
+class SyntheticTransport:
+  """
+  Transport for httpRequest (see Cassette) which answers the WDQS queries with
+  synthWDQS and the 'wbgetentities' requests with synthEntities, without
+  network. The time spent generating the responses is accumulated in the
+  attribute 'elapsed' (to subtract it in measures), and if tracemalloc is
+  tracing, its peak is reset after generating each response (so the peak
+  memory of the generation is not measured).
+
+  :param nrows: Number of rows of queries without a VALUES clause.
+  :param seed: Seed of the random generator.
+  :param mean: Mean cardinality of the GROUP_CONCAT values.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :example
+  >>> with SyntheticTransport(nrows=10**6):
+  ...   d = w_SearchByAuthority('P214', langsorder='en', chunksize=10**6)
+  """
+  def __init__(self, nrows=10000, seed=0, mean=3):
+    self.nrows = nrows
+    self.seed = seed
+    self.mean = mean
+    self.elapsed = 0.0
+    self.previous = None
+
+  __enter__ = Cassette.__enter__
+  __exit__ = Cassette.__exit__
+  install = Cassette.install
+  uninstall = Cassette.uninstall
+
+  def request(self, method, url, params=None, data=None, headers=None, session=None):
+    t0 = perf_counter()
+    args = dict(params or {}, **(data or {}))
+    if 'query' in args:
+      accept = (headers or {}).get('accept', '')
+      if 'json' in accept:
+        body = json.dumps(synthWDQS(args['query'], self.nrows, self.seed, self.mean, 'json'))
+        ctype = 'application/sparql-results+json'
+      else:
+        body = synthWDQS(args['query'], self.nrows, self.seed, self.mean, 'csv')
+        ctype = 'text/csv'
+    elif args.get('action') == 'wbgetentities':
+      body = json.dumps(synthEntities(args['ids'].split('|'), self.seed, self.mean))
+      ctype = 'application/json'
+    else:
+      raise LookupError(f"ERROR: SyntheticTransport does not support the request {method} {url}.")
+    r = Cassette.response({'url': url, 'status': 200, 'reason': 'OK',
+                           'headers': {'Content-Type': ctype}, 'body': body})
+    self.elapsed += perf_counter() - t0
+    if tracemalloc.is_tracing():
+      tracemalloc.reset_peak()
+    return r
+
+
+SCALING = {
+  'w_SearchByAuthority': lambda ids: w_SearchByAuthority('P214', langsorder='en', chunksize=len(ids)),
+  'w_Wikipedias'       : lambda ids: w_Wikipedias(ids, wikilangs='es|en|fr', chunksize=len(ids)),
+  'w_Property'         : lambda ids: w_Property(ids, 'P106|P166', includeQ=True, langsorder='en',
+                                                chunksize=len(ids)),
+  'w_EntityInfo'       : lambda ids: w_EntityInfo(ids, langsorder='en'),
+  }
+
+#%% scaling(name, sizes=(10**4, 10**5, 10**6), seed=0, mean=3, memory=True, plot=None)
+def scaling(name, sizes=(10**4, 10**5, 10**6), seed=0, mean=3, memory=True, plot=None):
+  """
+  Measure how the function 'name' (see SCALING) scales with the number of
+  rows of the responses, using synthetic responses (see SyntheticTransport).
+  For each size the time is split in the 'parse' stage (reqWDQS and
+  reqMediaWiki: conversion of the responses, without the time of generating
+  them) and the 'cleanup' stage (the rest of the function: post-processing
+  of the data-frames). The peak memory of each stage is measured (with
+  tracemalloc) in a second run, because tracemalloc slows down the execution:
+  the peak of the traced memory while the stage runs (including the memory
+  kept from the previous stages), without the generation of the responses.
+
+  :param name: The function in SCALING.
+  :param sizes: The numbers of rows.
+  :param seed: Seed of the random generator.
+  :param mean: Mean cardinality of the GROUP_CONCAT values.
+  :param memory: If True, measure the peak memory of the stages.
+  :param plot: If not None, a file name where a log-log plot of times and
+         memory against rows is saved (needs the matplotlib package).
+  :return A Pandas data-frame with columns 'rows', 'parse', 'cleanup',
+          'total' (seconds), 'parsePeakMB' and 'cleanupPeakMB'.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :example
+  >>> s = scaling('w_Wikipedias', sizes=[10**4, 10**5, 10**6], plot='wikipedias.png')
+  """
+  f = SCALING[name]
+  stages = {'reqWDQS': reqWDQS, 'reqMediaWiki': reqMediaWiki}
+  spent = [0.0]
+  peaks = {'parse': 0.0, 'cleanup': 0.0}
+  def stage(name):
+    # close the stage 'name' (peak of the traced memory since the last reset)
+    if tracemalloc.is_tracing():
+      peaks[name] = max(peaks[name], tracemalloc.get_traced_memory()[1] / 2**20)
+      tracemalloc.reset_peak()
+  def timed(req):
+    def wrapper(*args, **kwargs):
+      stage('cleanup')
+      t0 = perf_counter()
+      try:
+        return req(*args, **kwargs)
+      finally:
+        spent[0] += perf_counter() - t0
+        stage('parse')
+    return wrapper
+  #
+  results = []
+  wrappers = {x:timed(req) for x,req in stages.items()}
+  try:
+    for x, req in stages.items():
+      rebind(x, wrappers[x], req)
+    for n in sizes:
+      ids = [f'Q{k}' for k in range(1, n+1)]
+      spent[0] = 0.0
+      with SyntheticTransport(n, seed, mean) as transport:
+        t0 = perf_counter()
+        f(ids)
+        total = perf_counter() - t0
+      parse = spent[0] - transport.elapsed
+      cleanup = total - spent[0]
+      peak = {'parse': np.nan, 'cleanup': np.nan}
+      if memory:
+        peaks.update({'parse': 0.0, 'cleanup': 0.0})
+        with SyntheticTransport(n, seed, mean):
+          tracemalloc.start()
+          try:
+            f(ids)
+            stage('cleanup')
+          finally:
+            tracemalloc.stop()
+        peak = dict(peaks)
+      results.append({'rows': n, 'parse': parse, 'cleanup': cleanup,
+                      'total': total - transport.elapsed,
+                      'parsePeakMB': peak['parse'], 'cleanupPeakMB': peak['cleanup']})
+  finally:
+    for x, req in stages.items():
+      rebind(x, req, wrappers[x])
+  d = pd.DataFrame(results)
+  #
+  if plot is not None:
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    fig, ax = plt.subplots(1, 2, figsize=(10, 4))
+    for c in ['parse', 'cleanup', 'total']:
+      ax[0].loglog(d.rows, d[c], marker='o', label=c)
+    ax[0].set(xlabel='rows', ylabel='seconds', title=name)
+    ax[0].legend()
+    for c in ['parsePeakMB', 'cleanupPeakMB']:
+      ax[1].loglog(d.rows, d[c], marker='o', label=c[:-6])
+    ax[1].legend()
+    ax[1].set(xlabel='rows', ylabel='peak MB', title=name)
+    fig.tight_layout()
+    fig.savefig(plot)
+    plt.close(fig)
+  return d
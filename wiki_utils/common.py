@@ -0,0 +1,1109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Common infrastructure: chunked execution, HTTP transport, instrumentation,
+tracing, concurrent requests and validation of the parameters.
+
+@author: Angel Zazo <angelzazo@usal.es>
+"""
+
+#%% Imports
+# pandas and numpy are imported in the functions which use them, so the modules
+# that do not need them (text, viaf) are imported fast.
+import sys
+from time import time, sleep, perf_counter, time_ns
+import requests
+from http.cookiejar import http2time
+import regex as re
+from collections import Counter
+import threading
+import functools
+import itertools
+import os
+import random
+import hashlib
+import numbers
+import bisect
+import importlib
+import pkgutil
+import json
+import io
+import gzip
+import bz2
+import shutil
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+#%% GLOBAL VARIABLES
+# General user_agent header for Wikimedia, Wikidata, MediaWiki and VIAF requests
+# See https://www.mediawiki.org/wiki/API:Etiquette
+# See https://meta.wikimedia.org/wiki/User-Agent_policy.
+user_agent = "wikiTools Package - Python/%s.%s" % (sys.version_info[0], sys.version_info[1])
+
+# In MediaWiki API specifying titles through titles or pageids in the query API
+# is limited to 50 titles per query, or 500 for those with the "apihighlimits" right.
+# See https://www.mediawiki.org/wiki/API:Query#Additional_notes.
+MW_LIMIT = 50
+
+# See https://www.oclc.org/developer/api/oclc-apis/viaf/authority-cluster.en.html
+# VIAF API restriction is 250 maximun returned records.
+VIAF_LIMIT = 250
+
+# VIAF does not publish a rate limit: bulk functions (v_GetRecords) use a
+# moderate rate of requests per second to not be blocked.
+VIAF_RATE = 10
+
+# See https://wikimedia.org/api/rest_v1/#/Pageviews%20data
+# The Wikimedia REST API has a rate limit of 100 req/s.
+REST_RATE = 100
+
+
+#%% -- Package modules --------------------------------------------------------
+# The functions are distributed in the modules of the package, which import
+# the names they use from the others. To replace a function (or a global
+# variable) everywhere, as scaling does, it must be rebound in all the
+# modules which import it (see rebind).
+
+_package = __name__.rpartition('.')[0]
+
+#%% packageModules()
+def packageModules():
+  """The modules of the package that have been imported."""
+  return [m for k,m in list(sys.modules.items()) if k.startswith(_package + '.')]
+
+#%% loadModules()
+def loadModules():
+  """Import all the modules of the package."""
+  package = sys.modules[_package]
+  for m in pkgutil.iter_modules(package.__path__):
+    importlib.import_module(f'{_package}.{m.name}')
+  return packageModules()
+
+#%% rebind(name, value, current=None)
+def rebind(name, value, current=None):
+  """
+  Bind 'name' to 'value' in all the imported modules of the package which
+  have the name (bound to 'current', if it is not None).
+  """
+  for module in packageModules():
+    namespace = vars(module)
+    if name in namespace and (current is None or namespace[name] is current):
+      namespace[name] = value
+
+
+#%% doChunks(f, x, chunksize, **arg)
+def doChunks(f, x, chunksize, **arg):
+  """
+  Execute the function f(x,chunksize,...) in chunks of chunksize elements each.
+
+  The Wikidata and Wikimedia APIs impose limits on query execution. Wikidata,
+  for instance, has a timeout limit of 60 seconds, meaning that larger queries
+  involving more entities increase the risk of hitting this limit. Similarly,
+  Wikimedia APIs enforce restrictions on the number of titles or page IDs that
+  can be included in a single query. To prevent errors arising from these
+  limitations, this function executes the function 'f' sequentially over
+  chunks of elements.
+
+  :param f: The function to execute. The function is expected to return a
+            Pandas dataframe.
+  :param x: List of Wikidata entities or titles/pageids of Wikimedia pages.
+  :param chunksize: Maximum number of elements in `x` used in each execution.
+  :param arg: Parameters to be pased to the function. It is mandatory to
+              use named parameters (like a dict).
+  :return Concatenation of Pandas Dataframes returned by 'f' on each chunk of x.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  """
+  import pandas as pd
+  debug = 'debug' in arg and arg['debug'] == 'info'
+  if debug:
+    timeinit = time()
+  n = len(x)
+  nlim = int(n/chunksize)
+  for k in range(nlim+1):
+    offset = k*chunksize
+    x_list = x[offset:offset+chunksize]
+    if len(x_list)==0:
+      break
+    if debug:
+      t0=time()
+      print(f" INFO: Executing the function on elements from {offset+1} to {offset+len(x_list)}", end="", file=sys.stderr)
+    previous = getattr(_thread_local, 'chunk', None)
+    _thread_local.chunk = k
+    try:
+      with span('chunk', function=f.__name__, chunk=k, offset=offset, size=len(x_list)):
+        d = f(x_list, chunksize=chunksize, **arg)
+    finally:
+      _thread_local.chunk = previous
+    if debug:
+      print(f" ({time()-t0:.2f} seconds)", file=sys.stderr)
+    if d is None:
+      return None
+    if (k==0):
+      output = d
+    else:
+      if isinstance(d,dict):
+        output.update(d)
+      elif isinstance(d,tuple):
+        d0 = d[0]  # d[0] can be dict or Pandas-Datafreme,
+        d1 = d[1]  # d[1] always is a dict
+        output[1].update(d1)
+        if isinstance(d0,dict):
+          output[0].update(d0)
+        else:
+          output = (pd.concat([output[0], d0]), output[1])
+      else:
+        output = pd.concat([output, d])
+  if debug:
+    print(f" INFO: Total time {time()-timeinit:.2f} seconds", file=sys.stderr)
+  return(output)
+
+
+#%% -- HTTP transport ---------------------------------------------------------
+# All the HTTP requests of this module are sent by httpRequest. A transport
+# (see Cassette) can be installed to record the responses or to replay them
+# without network, for example to measure the overhead of the library apart
+# from the network latency (see the benchmarks directory).
+
+HTTP_TRANSPORT = None
+
+#%% httpSend(method, url, params=None, data=None, headers=None, session=None)
+def httpSend(method, url, params=None, data=None, headers=None, session=None):
+  """
+  Send the HTTP request using the requests package (or the session, if any).
+  Return the response.
+  """
+  sender = requests if session is None else session
+  if method == 'GET':
+    return sender.get(url=url, params=params, headers=headers)
+  if method == 'POST':
+    return sender.post(url=url, params=params, data=data, headers=headers)
+  raise ValueError(f"Method '{method}' is not supported")
+
+
+#%% httpRequest(method, url, params=None, data=None, headers=None, session=None)
+def httpRequest(method, url, params=None, data=None, headers=None, session=None):
+  """
+  Send an HTTP request (GET or POST) and return the response (a
+  requests.Response). If a transport is installed (see Cassette), the request
+  is sent through it. The event of the request in progress (see requestEvent)
+  is updated.
+
+  :param method: 'GET' or 'POST'.
+  :param url: The URL.
+  :param params: A dict with the parameters of the URL, if any.
+  :param data: A dict with the data of a POST request, if any.
+  :param headers: A dict with the headers, if any.
+  :param session: A requests.Session to send the request, if any.
+  :return The response.
+  """
+  ev = currentEvent()
+  if ev is None and len(HOOKS) > 0:
+    # A request not made by an instrumented function (see requestEvent)
+    with requestEvent(requests.utils.urlparse(url).netloc):
+      return httpRequest(method, url, params=params, data=data, headers=headers,
+                         session=session)
+  t0 = perf_counter()
+  try:
+    if HTTP_TRANSPORT is not None:
+      response = HTTP_TRANSPORT.request(method, url, params=params, data=data,
+                                        headers=headers, session=session)
+    else:
+      response = httpSend(method, url, params=params, data=data, headers=headers,
+                          session=session)
+  finally:
+    if ev is not None:
+      ev['server'] += perf_counter() - t0
+      ev['retries'] += 1
+      ev['endpoint'] = url
+      ev['method'] = method
+  if ev is not None:
+    ev['status'] = response.status_code
+    ev['bytes'] += len(response.content)
+  return response
+
+
+#%% class Cassette(path, mode='replay', latency=0, error429=0, retryafter=1, seed=0)
+class Cassette:
+  """
+  Record/replay transport for httpRequest. In 'record' mode the requests are
+  sent and the responses are appended to the cassette (a gzip compressed file
+  of JSON lines). In 'replay' mode the responses are returned from the
+  cassette, without network (an exception is raised if a request is not in
+  the cassette). In 'auto' mode, requests in the cassette are replayed and
+  the others are recorded.
+
+  Replayed responses can be delayed with an injected latency, and a fraction
+  of them can be replaced by 429 (Too Many Requests) responses, to test the
+  retry logic. The injected errors are pseudo-random but reproducible (see
+  'seed').
+
+  The cassette is installed with a 'with' statement (or with the method
+  install), and it is safe to be used from several threads.
+
+  :param path: The cassette file (created if not exists).
+  :param mode: 'replay', 'record' or 'auto'.
+  :param latency: Seconds added to each replayed response, or a tuple (min,
+         max) for a uniform random latency.
+  :param error429: Probability of replacing a replayed response by a 429
+         response. Not applied to consecutive requests of the same URL, so
+         retries succeed.
+  :param retryafter: Value of the Retry-After header of the 429 responses.
+  :param seed: Seed of the random generator of latencies and errors.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :example
+  >>> with Cassette('wdqs.jsonl.gz', mode='record'):
+  ...   d = w_EntityInfo(['Q9021', 'Q5879'], langsorder='es|en')
+  >>> with Cassette('wdqs.jsonl.gz', latency=(0.1, 0.5), error429=0.1):
+  ...   d = w_EntityInfo(['Q9021', 'Q5879'], langsorder='es|en')
+  """
+  def __init__(self, path, mode='replay', latency=0, error429=0, retryafter=1, seed=0):
+    if mode not in ('replay', 'record', 'auto'):
+      raise ValueError(f"Mode '{mode}' is not supported")
+    self.path = path
+    self.mode = mode
+    self.latency = latency
+    self.error429 = error429
+    self.retryafter = retryafter
+    self.random = random.Random(seed)
+    self.lock = threading.Lock()
+    self.last429 = None
+    self.previous = None
+    self.records = dict()
+    if os.path.exists(path):
+      with gzip.open(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+          rec = json.loads(line)
+          self.records[rec['key']] = rec
+
+  def __enter__(self):
+    self.install()
+    return self
+
+  def __exit__(self, *exc):
+    self.uninstall()
+
+  def install(self):
+    """Install the cassette as the transport of httpRequest."""
+    global HTTP_TRANSPORT
+    self.previous = HTTP_TRANSPORT
+    HTTP_TRANSPORT = self
+
+  def uninstall(self):
+    """Restore the previous transport."""
+    global HTTP_TRANSPORT
+    HTTP_TRANSPORT = self.previous
+
+  @staticmethod
+  def key(method, url, params, data):
+    """The key of a request: a hash of the method, URL, parameters and data."""
+    k = json.dumps([method, url, sorted((params or {}).items()),
+                    sorted((data or {}).items())], default=str)
+    return hashlib.sha1(k.encode('utf-8')).hexdigest()
+
+  def request(self, method, url, params=None, data=None, headers=None, session=None):
+    key = self.key(method, url, params, data)
+    with self.lock:
+      rec = self.records.get(key)
+    if rec is None or self.mode == 'record':
+      if self.mode == 'replay':
+        raise LookupError(f"ERROR: the request {method} {url} {params or data} is not in the cassette {self.path}.")
+      response = httpSend(method, url, params=params, data=data, headers=headers,
+                          session=session)
+      if response.status_code != 429:
+        self.record(key, method, url, response)
+      return response
+    #
+    with self.lock:
+      if isinstance(self.latency, tuple):
+        t = self.random.uniform(*self.latency)
+      else:
+        t = self.latency
+      inject = self.last429 != key and self.random.random() < self.error429
+      self.last429 = key if inject else None
+    if t > 0:
+      sleep(t)
+    if inject:
+      rec = {'url': rec['url'], 'status': 429, 'reason': 'Too Many Requests',
+             'headers': {'Retry-After': str(self.retryafter)}, 'body': ''}
+    return self.response(rec)
+
+  def record(self, key, method, url, response):
+    """Append the response to the cassette."""
+    rec = {'key'    : key,
+           'method' : method,
+           'url'    : response.url,
+           'status' : response.status_code,
+           'reason' : response.reason,
+           'headers': {k:v for k,v in response.headers.items()
+                       if k.lower() in ('content-type', 'retry-after')},
+           'body'   : response.text}
+    with self.lock:
+      self.records[key] = rec
+      with gzip.open(self.path, 'at', encoding='utf-8') as f:
+        f.write(json.dumps(rec) + '\n')
+
+  @staticmethod
+  def response(rec):
+    """Build a requests.Response from a record of the cassette."""
+    r = requests.Response()
+    r.status_code = rec['status']
+    r.reason = rec.get('reason')
+    r.url = rec['url']
+    r.headers = requests.structures.CaseInsensitiveDict(rec['headers'])
+    r.encoding = 'utf-8'
+    r._content = rec['body'].encode('utf-8')
+    return r
+
+
+#%% -- Instrumentation --------------------------------------------------------
+# Each request to a service (reqWDQS, reqSPARQL, reqMediaWiki, reqREST, VIAF
+# searches and records...) emits an event (a dict) to the hooks installed with
+# addHook. The event contains:
+# - 'service', 'endpoint', 'method' and 'status' (of the last HTTP attempt);
+# - 'function': the public function (w_*, m_*, v_*...) which made the request;
+# - 'chunk': the chunk index when the function is run by doChunks, else None;
+# - 'bytes': bytes received; 'retries': number of HTTP attempts - 1;
+# - 'server': seconds waiting the HTTP responses; 'sleep': seconds sleeping
+#   on 429 (or rate limited) responses; 'parse': the rest of the time (parsing
+#   the responses); 'total': total seconds; 'start': epoch of the request;
+# - 'error': the exception name, if the request raised an exception.
+# RequestMetrics is a hook that aggregates the events (counters and
+# histograms) and exports them in Prometheus/OpenMetrics text format.
+
+HOOKS = []
+
+_function_prefixes = ('w_', 'm_', 'v_', 'b_', 'g_', 's_', 'd_', 'wd_', 'md_')
+
+#%% addHook(hook)
+def addHook(hook):
+  """
+  Install a hook: a function called with each request event (see above).
+  Hooks are called from the thread which makes the request, so they must be
+  thread-safe.
+  """
+  HOOKS.append(hook)
+  return hook
+
+#%% removeHook(hook)
+def removeHook(hook):
+  """Uninstall a hook installed with addHook."""
+  HOOKS.remove(hook)
+
+#%% currentEvent()
+def currentEvent():
+  """The event of the request in progress in the current thread, or None."""
+  stack = getattr(_thread_local, 'events', None)
+  return stack[-1] if stack else None
+
+
+#%% class requestEvent(service)
+class requestEvent:
+  """
+  Context manager which builds the event of a request to 'service' and emits
+  it to the hooks on exit. httpRequest and retrySleep update the event in
+  progress. If no hook is installed, it does nothing.
+  """
+  def __init__(self, service):
+    self.service = service
+    self.event = None
+
+  def __enter__(self):
+    if len(HOOKS) == 0:
+      return None
+    function = None
+    frame = sys._getframe(1)
+    while frame is not None:
+      if frame.f_code.co_name.startswith(_function_prefixes):
+        function = frame.f_code.co_name
+        break
+      frame = frame.f_back
+    self.event = {'service': self.service, 'function': function,
+                  'chunk': getattr(_thread_local, 'chunk', None),
+                  'endpoint': None, 'method': None, 'status': None,
+                  'bytes': 0, 'retries': -1, 'server': 0.0, 'sleep': 0.0,
+                  'parse': 0.0, 'total': 0.0, 'start': time(), 'error': None}
+    self.t0 = perf_counter()
+    if not hasattr(_thread_local, 'events'):
+      _thread_local.events = []
+    _thread_local.events.append(self.event)
+    return self.event
+
+  def __exit__(self, exctype, exc, tb):
+    if self.event is None:
+      return
+    _thread_local.events.pop()
+    ev = self.event
+    ev['total'] = perf_counter() - self.t0
+    ev['parse'] = max(0.0, ev['total'] - ev['server'] - ev['sleep'])
+    ev['retries'] = max(0, ev['retries'])
+    if exctype is not None:
+      ev['error'] = exctype.__name__
+    for hook in list(HOOKS):
+      hook(ev)
+
+
+#%% instrumented(service)
+def instrumented(service):
+  """
+  Decorator: the calls to the decorated function are requests to 'service'
+  (see requestEvent). If service is None, the service is the first argument
+  of the function (see reqSPARQL).
+  """
+  def decorator(f):
+    @functools.wraps(f)
+    def wrapper(*args, **kwargs):
+      if len(HOOKS) == 0:
+        return f(*args, **kwargs)
+      with requestEvent(args[0] if service is None else service):
+        return f(*args, **kwargs)
+    return wrapper
+  return decorator
+
+
+#%% retrySleep(seconds)
+def retrySleep(seconds):
+  """Sleep before retrying a request, accounting the time in the event."""
+  ev = currentEvent()
+  if ev is not None:
+    ev['sleep'] += seconds
+  sleep(seconds)
+
+
+#%% class RequestMetrics(buckets=...)
+class RequestMetrics:
+  """
+  Hook (see addHook) which aggregates the request events: counters of
+  requests (by service, function and status), retries, errors, bytes and
+  seconds sleeping, and histograms of the server and parse times (by
+  service). Thread-safe.
+
+  :param buckets: Upper bounds (seconds) of the buckets of the histograms.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :example
+  >>> metrics = addHook(RequestMetrics())
+  >>> d = w_EntityInfo(entities, langsorder='es|en')
+  >>> metrics.summary()
+  >>> print(metrics.prometheus())
+  >>> metrics.write('/var/lib/node_exporter/wiki_utils.prom')
+  """
+  def __init__(self, buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)):
+    self.buckets = tuple(buckets)
+    self.lock = threading.Lock()
+    self.requests = Counter()
+    self.counters = {x: Counter() for x in ('retries', 'errors', 'bytes', 'sleep')}
+    self.histograms = {x: dict() for x in ('server', 'parse')}
+
+  def __call__(self, ev):
+    service = ev['service']
+    with self.lock:
+      self.requests[(service, ev['function'] or '', str(ev['status']))] += 1
+      self.counters['retries'][service] += ev['retries']
+      self.counters['errors'][service] += ev['error'] is not None
+      self.counters['bytes'][service] += ev['bytes']
+      self.counters['sleep'][service] += ev['sleep']
+      for x in ('server', 'parse'):
+        h = self.histograms[x].setdefault(service, [[0]*(len(self.buckets)+1), 0.0])
+        h[0][bisect.bisect_left(self.buckets, ev[x])] += 1
+        h[1] += ev[x]
+
+  def reset(self):
+    self.__init__(self.buckets)
+
+  def summary(self):
+    """A Pandas data-frame with the totals by service."""
+    import pandas as pd
+    with self.lock:
+      rows = []
+      for service, (counts, ssum) in self.histograms['server'].items():
+        n = sum(counts)
+        rows.append({'service': service, 'requests': n,
+                     'retries': self.counters['retries'][service],
+                     'errors' : self.counters['errors'][service],
+                     'bytes'  : self.counters['bytes'][service],
+                     'sleep'  : self.counters['sleep'][service],
+                     'server' : ssum,
+                     'parse'  : self.histograms['parse'][service][1]})
+    return pd.DataFrame(rows, columns=['service', 'requests', 'retries', 'errors',
+                                       'bytes', 'sleep', 'server', 'parse'])
+
+  def prometheus(self, prefix='wikiutils'):
+    """
+    The metrics in the Prometheus text exposition format (version 0.0.4, the
+    one of the node_exporter textfile collector): counters with the '_total'
+    suffix in the names of the metric families, and without '# EOF'.
+    """
+    def labels(**kw):
+      return '{' + ','.join(f'{k}="{v}"' for k,v in kw.items()) + '}'
+    out = []
+    with self.lock:
+      out.append(f'# HELP {prefix}_requests_total Requests by service, function and status.')
+      out.append(f'# TYPE {prefix}_requests_total counter')
+      for (service, function, status), n in sorted(self.requests.items()):
+        out.append(f'{prefix}_requests_total{labels(service=service, function=function, status=status)} {n}')
+      for name, unit, help in [('retries', 'total', 'Retried HTTP attempts.'),
+                               ('errors', 'total', 'Requests which raised an exception.'),
+                               ('bytes', 'total', 'Bytes received.'),
+                               ('sleep', 'seconds_total', 'Seconds sleeping before retries.')]:
+        out.append(f'# HELP {prefix}_{name}_{unit} {help}')
+        out.append(f'# TYPE {prefix}_{name}_{unit} counter')
+        for service, v in sorted(self.counters[name].items()):
+          out.append(f'{prefix}_{name}_{unit}{labels(service=service)} {v}')
+      for name in ('server', 'parse'):
+        metric = f'{prefix}_request_{name}_seconds'
+        out.append(f'# HELP {metric} Seconds of the requests in the {name} stage.')
+        out.append(f'# TYPE {metric} histogram')
+        for service, (counts, ssum) in sorted(self.histograms[name].items()):
+          cum = list(itertools.accumulate(counts))
+          for le, c in zip(self.buckets, cum):
+            out.append(f'{metric}_bucket{labels(service=service, le=le)} {c}')
+          out.append(f'{metric}_bucket{labels(service=service, le="+Inf")} {cum[-1]}')
+          out.append(f'{metric}_sum{labels(service=service)} {ssum}')
+          out.append(f'{metric}_count{labels(service=service)} {cum[-1]}')
+    return '\n'.join(out) + '\n'
+
+  def write(self, path, prefix='wikiutils'):
+    """Write the metrics in Prometheus text format (i.e. for the textfile collector)."""
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+      f.write(self.prometheus(prefix))
+    os.replace(tmp, path)
+
+
+#%% printHook(event)
+def printHook(ev):
+  """Hook which prints a line for each request event to stderr."""
+  print(f"{ev['service']} {ev['function']} chunk={ev['chunk']} status={ev['status']} "
+        f"bytes={ev['bytes']} server={ev['server']:.3f}s parse={ev['parse']:.3f}s "
+        f"sleep={ev['sleep']:.1f}s retries={ev['retries']}"
+        + (f" error={ev['error']}" if ev['error'] else ''), file=sys.stderr)
+
+
+#%% -- Tracing ----------------------------------------------------------------
+# A Tracer records spans (intervals of time with a parent span) of the public
+# functions (w_*, m_*, v_*...), of the chunks executed by doChunks and of the
+# requests (see requestEvent), so nested calls like w_EntityInfo -> w_Geoloc
+# -> w_LabelDesc can be displayed as a timeline (flame graph). The spans are
+# exported to a JSON file (Chrome trace-event format, which can be opened in
+# https://ui.perfetto.dev or chrome://tracing, or OTLP/JSON) or to an
+# OpenTelemetry collector (OTLP/HTTP). If no tracer is active, tracing costs
+# nothing.
+
+TRACER = None
+
+#%% currentSpan()
+def currentSpan():
+  """The span in progress in the current thread, or None."""
+  stack = getattr(_thread_local, 'spans', None)
+  return stack[-1] if stack else None
+
+
+#%% class span(name, kind='internal', **attributes)
+class span:
+  """
+  Context manager which records a span named 'name' in the active tracer (if
+  any). The span is a child of the span in progress in the current thread.
+  'kind' is 'internal' (functions, chunks...) or 'client' (requests).
+  """
+  def __init__(self, name, kind='internal', **attributes):
+    self.name = name
+    self.kind = kind
+    self.attributes = attributes
+    self.span = None
+
+  def __enter__(self):
+    tracer = TRACER
+    if tracer is None:
+      return None
+    self.span = tracer.open(self.name, self.kind, self.attributes, currentSpan())
+    if not hasattr(_thread_local, 'spans'):
+      _thread_local.spans = []
+    _thread_local.spans.append(self.span)
+    return self.span
+
+  def __exit__(self, exctype, exc, tb):
+    if self.span is None:
+      return
+    _thread_local.spans.pop()
+    self.span['end'] = time_ns()
+    if exctype is not None:
+      self.span['error'] = f'{exctype.__name__}: {exc}'
+
+
+#%% traced(f)
+def traced(f):
+  """
+  Decorator of the public functions (w_*, m_*, v_*...): while a tracer is
+  active (see Tracer) each call records a span, so the function is traced
+  however it was imported. If no tracer is active, it costs a comparison.
+  """
+  name = f.__name__
+  @functools.wraps(f)
+  def wrapper(*args, **kwargs):
+    tracer = TRACER
+    if tracer is None or (tracer.functions is not None and name not in tracer.functions):
+      return f(*args, **kwargs)
+    with span(name):
+      return f(*args, **kwargs)
+  return wrapper
+
+
+#%% spanPropagate(f)
+def spanPropagate(f):
+  """
+  Return f wrapped so that, when executed in other thread (see doConcurrent),
+  its spans are children of the span in progress in the current thread.
+  """
+  parent = currentSpan()
+  if TRACER is None or parent is None:
+    return f
+  @functools.wraps(f)
+  def wrapper(*args, **kwargs):
+    previous = getattr(_thread_local, 'spans', [])
+    _thread_local.spans = [parent]
+    try:
+      return f(*args, **kwargs)
+    finally:
+      _thread_local.spans = previous
+  return wrapper
+
+
+#%% class Tracer(service_name='wiki_utils', functions=None)
+class Tracer:
+  """
+  Record the spans of the functions of the package, of the chunks executed by
+  doChunks and of the requests to the services, while active (use it as a
+  context manager or call start()/stop()). The public functions are
+  decorated with 'traced', so their calls (including the nested calls
+  between them) are traced however they were imported, i.e. with
+  "from wiki_utils import *" before starting the tracer. Only one tracer can
+  be active.
+
+  :param service_name: Name of the service in the exported traces.
+  :param functions: List of names of the functions to trace. If None, all
+         the public functions (w_*, m_*, v_*, b_*, s_*, g_*, d_*, wd_*, md_*).
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :example
+  >>> with Tracer() as tracer:
+  >>>   d = w_EntityInfo(entities, langsorder='es|en')
+  >>> tracer.summary()
+  >>> tracer.write('entityinfo.json')                  # open in ui.perfetto.dev
+  >>> tracer.export('http://localhost:4318/v1/traces') # OpenTelemetry collector
+  """
+  def __init__(self, service_name='wiki_utils', functions=None):
+    self.service_name = service_name
+    self.functions = None if functions is None else set(functions)
+    self.trace_id = f'{random.getrandbits(128):032x}'
+    self.spans = []
+    self.lock = threading.Lock()
+
+  def open(self, name, kind, attributes, parent, start=None):
+    s = {'name': name, 'kind': kind, 'span_id': f'{random.getrandbits(64):016x}',
+         'parent_id': parent['span_id'] if parent is not None else None,
+         'start': time_ns() if start is None else start, 'end': None,
+         'thread': threading.get_ident(), 'attributes': attributes, 'error': None}
+    with self.lock:
+      self.spans.append(s)
+    return s
+
+  def trace(self, f):
+    """Return the function f (i.e. a function of the user) wrapped to record a span on each call."""
+    @functools.wraps(f)
+    def wrapper(*args, **kwargs):
+      with span(f.__name__):
+        return f(*args, **kwargs)
+    return wrapper
+
+  def hook(self, ev):
+    """Request hook (see addHook): records the span of a request."""
+    start = int(ev['start']*1e9)
+    s = self.open(f"{ev['method'] or 'request'} {ev['service']}", 'client',
+                  {'service': ev['service'], 'http.method': ev['method'],
+                   'http.url': ev['endpoint'], 'http.status_code': ev['status'],
+                   'bytes': ev['bytes'], 'retries': ev['retries'],
+                   'server': ev['server'], 'sleep': ev['sleep'], 'parse': ev['parse']},
+                  currentSpan(), start)
+    s['end'] = start + int(ev['total']*1e9)
+    if ev['error'] is not None:
+      s['error'] = ev['error']
+
+  def start(self):
+    global TRACER
+    if TRACER is not None:
+      raise RuntimeError('ERROR: a tracer is already active')
+    addHook(self.hook)
+    TRACER = self
+    return self
+
+  def stop(self):
+    global TRACER
+    if TRACER is not self:
+      return
+    TRACER = None
+    removeHook(self.hook)
+
+  def __enter__(self):
+    return self.start()
+
+  def __exit__(self, exctype, exc, tb):
+    self.stop()
+
+  def summary(self):
+    """
+    A Pandas data-frame with, for each span name, the number of spans, the
+    total seconds and the self seconds (total minus the seconds of the child
+    spans in the same thread), ordered by self seconds.
+    """
+    import pandas as pd
+    spans = [s for s in self.spans if s['end'] is not None]
+    child = Counter()
+    for s in spans:
+      if s['parent_id'] is not None:
+        child[(s['parent_id'], s['thread'])] += s['end'] - s['start']
+    d = pd.DataFrame({'name': [s['name'] for s in spans],
+                      'total': [(s['end']-s['start'])/1e9 for s in spans],
+                      'own': [(s['end']-s['start']-child[(s['span_id'], s['thread'])])/1e9 for s in spans]})
+    g = d.groupby('name')
+    d = pd.DataFrame({'count': g.size(), 'total': g['total'].sum(), 'self': g['own'].sum()})
+    return d.sort_values('self', ascending=False).reset_index()
+
+  def chrome(self):
+    """The spans in Chrome trace-event format (a dict)."""
+    pid = os.getpid()
+    events = []
+    for s in self.spans:
+      if s['end'] is None:
+        continue
+      args = {k:v for k,v in s['attributes'].items() if v is not None}
+      if s['error'] is not None:
+        args['error'] = s['error']
+      events.append({'name': s['name'], 'cat': s['kind'], 'ph': 'X', 'pid': pid,
+                     'tid': s['thread'], 'ts': s['start']/1000,
+                     'dur': (s['end']-s['start'])/1000, 'args': args})
+    return {'traceEvents': events, 'displayTimeUnit': 'ms',
+            'otherData': {'service': self.service_name, 'trace_id': self.trace_id}}
+
+  def otlp(self):
+    """The spans in OpenTelemetry OTLP/JSON format (a dict)."""
+    def value(v):
+      if isinstance(v, bool):
+        return {'boolValue': v}
+      if isinstance(v, numbers.Integral):
+        return {'intValue': str(v)}
+      if isinstance(v, numbers.Real):
+        return {'doubleValue': float(v)}
+      return {'stringValue': str(v)}
+    def attributes(d):
+      return [{'key': k, 'value': value(v)} for k,v in d.items() if v is not None]
+    spans = []
+    for s in self.spans:
+      if s['end'] is None:
+        continue
+      o = {'traceId': self.trace_id, 'spanId': s['span_id'], 'name': s['name'],
+           'kind': 3 if s['kind'] == 'client' else 1,
+           'startTimeUnixNano': str(s['start']), 'endTimeUnixNano': str(s['end']),
+           'attributes': attributes({**s['attributes'], 'thread.id': s['thread']}),
+           'status': {'code': 1} if s['error'] is None else {'code': 2, 'message': s['error']}}
+      if s['parent_id'] is not None:
+        o['parentSpanId'] = s['parent_id']
+      spans.append(o)
+    return {'resourceSpans': [{
+              'resource': {'attributes': attributes({'service.name': self.service_name})},
+              'scopeSpans': [{'scope': {'name': _package}, 'spans': spans}]}]}
+
+  def write(self, path, format='chrome'):
+    """Write the spans to a JSON file, in 'chrome' or 'otlp' format."""
+    if format not in ('chrome', 'otlp'):
+      raise ValueError("ERROR: format must be 'chrome' or 'otlp'")
+    with open(path, 'w', encoding='utf-8') as f:
+      json.dump(self.chrome() if format == 'chrome' else self.otlp(), f)
+
+  def export(self, endpoint='http://localhost:4318/v1/traces', headers=None, timeout=30):
+    """
+    Send the spans to an OpenTelemetry collector (OTLP/HTTP with JSON
+    encoding). The request is not sent through the installed transport.
+    """
+    h = {'Content-Type': 'application/json'}
+    if headers:
+      h.update(headers)
+    r = requests.post(endpoint, data=json.dumps(self.otlp()), headers=h, timeout=timeout)
+    r.raise_for_status()
+    return r
+
+
+#%% -- Concurrent requests ----------------------------------------------------
+# Helpers to launch requests concurrently (using threads) while respecting the
+# rate limits of the APIs.
+
+#%% RateLimiter(rate)
+class RateLimiter:
+  """
+  Thread-safe limiter of the number of calls per second. Each thread calls
+  the method wait() before launching a request, and the call sleeps until
+  the next slot is available. Slots are spaced 1/rate seconds.
+
+  :param rate: Maximum number of calls per second. If rate is None or 0, no
+         limit is applied.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  """
+  def __init__(self, rate):
+    self.interval = 1.0/rate if rate else 0.0
+    self.lock = threading.Lock()
+    self.nextslot = 0.0
+
+  def wait(self):
+    if self.interval == 0.0:
+      return
+    with self.lock:
+      now = time()
+      t = max(self.nextslot, now)
+      self.nextslot = t + self.interval
+    if t > now:
+      retrySleep(t - now)
+
+  def delay(self, seconds):
+    """Delay all the next slots 'seconds' seconds (i.e. on 429 responses)."""
+    with self.lock:
+      self.nextslot = max(self.nextslot, time() + seconds)
+
+
+#%% retryAfter(response, tmax=600)
+def retryAfter(response, tmax=600):
+  """
+  Return the number of seconds to wait from the 'Retry-After' header of a
+  429 status-code response. The header can be a number of seconds or an HTTP
+  date. Raise an exception if the number of seconds exceeds tmax.
+
+  :param response: The response (of requests package).
+  :param tmax: Maximum number of seconds allowed.
+  :return The number of seconds to wait (1 if header is not present).
+  """
+  t = response.headers.get('Retry-after', '1')
+  m = re.match(r'^\d+$', t)
+  if m is None:
+    t = int(http2time(t) - int(time()))
+  else:
+    t = int(t)
+  if t > tmax:
+    raise NameError(f"ERROR: receive a 429 status-code response, but retry-after > {tmax}")
+  return max(t, 0)
+
+
+#%% getSession()
+_thread_local = threading.local()
+
+def getSession():
+  """
+  Return a requests.Session (with the user_agent header) for the current
+  thread. Sessions reuse the TCP/TLS connections to the same host, but they
+  are not thread-safe, so each thread has its own session.
+  """
+  session = getattr(_thread_local, 'session', None)
+  if session is None:
+    session = requests.Session()
+    session.headers.update({'user-agent': user_agent})
+    _thread_local.session = session
+  return session
+
+
+#%% reqREST(url, params=None, limiter=None, attempts=3, debug=False)
+@instrumented('rest')
+def reqREST(url, params=None, limiter=None, attempts=3, debug=False):
+  """
+  Make a GET request to a REST API (Wikimedia REST API, XTools...) which
+  returns JSON, using the session of the current thread. On 429 responses
+  sleep the seconds indicated in 'Retry-After' header and retry. Safe to be
+  called from several threads.
+
+  :param url: The URL of the request.
+  :param params: A dict with the parameters of the request, if any.
+  :param limiter: A RateLimiter shared by the threads, or None.
+  :param attempts: Number of retries on 429 responses.
+  :param debug: If True shows the URL requested.
+  :return The JSON response, or None if the status code is 404 (not found).
+  :raise Exception: From response.raise_for_status() or other exception.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  """
+  session = getSession()
+  nt = 0
+  while True:
+    nt += 1
+    if limiter is not None:
+      limiter.wait()
+    response = httpRequest('GET', url=url, params=params, session=session)
+    if debug:
+      print(requests.utils.unquote(response.url), file=sys.stderr)
+    if response.status_code == 429 and nt <= attempts:
+      t = retryAfter(response)
+      print(f"Received a 429 status-code response. Sleeping {t} seconds", file=sys.stderr)
+      if limiter is not None:
+        limiter.delay(t)
+      retrySleep(t)
+      continue
+    if response.status_code == 404:
+      return None
+    response.raise_for_status()
+    return response.json()
+
+
+#%% doConcurrent(f, x, max_workers=8, **arg)
+def doConcurrent(f, x, max_workers=8, **arg):
+  """
+  Execute the function f(x_i, ...) for each element x_i of x concurrently,
+  using a pool of 'max_workers' threads. It is a generator: yields the
+  results as they are completed (not in order), so the caller can process
+  them as they arrive. An exception raised by f does not abort the others.
+  Only 2*max_workers tasks are submitted at a time (x is consumed as the
+  results are yielded), and when the generator is closed (i.e. the caller
+  raises on an error or breaks the loop) the pending tasks are cancelled.
+
+  :param f: The function to execute.
+  :param x: List of elements.
+  :param max_workers: Maximum number of threads.
+  :param arg: Parameters to be pased to the function. It is mandatory to
+              use named parameters (like a dict).
+  :return A generator of tuples (x_i, result, error). If f(x_i) raises an
+          exception, result is None and error is the exception, else error is
+          None.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  """
+  f = spanPropagate(f)
+  x = iter(x)
+  futures = dict()
+  executor = ThreadPoolExecutor(max_workers=max_workers)
+  def submit(n):
+    for xi in itertools.islice(x, n):
+      futures[executor.submit(f, xi, **arg)] = xi
+  try:
+    submit(2*max_workers)
+    while len(futures) > 0:
+      done, _ = wait(futures, return_when=FIRST_COMPLETED)
+      output = [(futures.pop(future), future) for future in done]
+      submit(len(done))
+      for xi, future in output:
+        try:
+          result = future.result()
+        except Exception as ex:
+          yield (xi, None, ex)
+        else:
+          yield (xi, result, None)
+  finally:
+    for future in futures:
+      future.cancel()
+    executor.shutdown(wait=True, cancel_futures=True)
+
+
+#%% checkValues(values, param, pattern=None, forbidden=None)
+def checkValues(values, param, pattern=None, forbidden=None):
+  """
+  Check with whole-array operations the values of a list of strings (a Python
+  list, a NumPy array or a Pandas series). Values are stripped and empty
+  values are removed. Non-empty values must match the regular expression
+  'pattern' (if set) and must not contain any of the characters in
+  'forbidden' (if set). All the invalid values are reported at once: the
+  ValueError raised has the attribute 'positions', a NumPy array with the
+  positions of the invalid values in the original list.
+
+  :param values: A string or a list (list, NumPy array or Pandas series) of
+         strings to check.
+  :param param: Name of the parameter checked, used in error messages.
+  :param pattern: Regular expression that all values must match, or None.
+  :param forbidden: String with characters not allowed in values, or None.
+  :return A list with the values checked, with duplicates removed preserving
+          order, or raises ValueError exception.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  """
+  import numpy as np
+  import pandas as pd
+  if isinstance(values, str):
+    values = [values]
+  elif not isinstance(values, (list, tuple, np.ndarray, pd.Series, pd.Index)):
+    values = list(values)  # sets, generators, dict keys...
+  values = pd.Series(np.asarray(values, dtype=object), dtype=object)
+  # Not strings are invalid values: they are masked out of the .str accessor,
+  # which fails if the series has no strings at all
+  isnull = ~values.map(lambda x: isinstance(x, str)).astype(bool)
+  s = values.where(~isnull, '').astype(object).str.strip()
+  s = s[isnull | (s != '')]
+  if len(s) == 0:
+    raise ValueError(f"Invalid value for parameter '{param}'")
+  invalid = isnull[s.index].to_numpy(copy=True)
+  if pattern is not None:
+    invalid |= ~s.str.fullmatch(pattern).fillna(False).to_numpy(dtype=bool)
+  if forbidden is not None:
+    invalid |= s.str.contains('[' + re.escape(forbidden) + ']', regex=True).fillna(False).to_numpy(dtype=bool)
+  if invalid.any():
+    positions = s.index.to_numpy()[invalid]
+    show = ', '.join(f"{p}: '{v}'" for p,v in zip(positions[:10], values.iloc[positions[:10]]))
+    more = f" and {len(positions)-10} more" if len(positions) > 10 else ''
+    ex = ValueError(f"Invalid values in parameter '{param}' ({len(positions)} values): {show}{more}")
+    ex.positions = positions
+    raise ex
+  # Remove duplicates preserving order
+  return pd.unique(s.to_numpy()).tolist()
+
+
+#%% checkEntities(entity_list)
+def checkEntities(entity_list):
+  """
+  Check if all Wikidata entities in entily_list have valid values. Return a
+  list of entities with duplicates removed or raise error. Note that the check
+  is made with whole-array operations (see `checkValues`), and all invalid
+  entities are reported at once.
+
+  :param entity_list: A Wikidata entity (Qxxx, Pxxx) or a list of entities
+         (list, NumPy array or Pandas series).
+  :return A list of entities or raises ValueError exception. The 'positions'
+          attribute of the exception contains the positions of invalid
+          entities in 'entity_list'.
+  """
+  return checkValues(entity_list, 'entity_list', pattern=r'(?:Q|P)\d+')
+
+
+
+#%% -- Compressed files ---------------------------------------------------
+# Decompression of the (big) dump files (see Wikidata JSON dumps and MediaWiki
+# SQL dumps).
+
+#%% dumpLines(path)
+def dumpLines(path):
+  """
+  Generator of the lines of a (possibly compressed) dump file. Files
+  compressed with gzip (.gz) or bzip2 (.bz2) are decompressed in a separate
+  process using pigz or lbzip2/pbzip2 (parallel decompressors) if they are
+  installed, else using the gzip or bz2 Python modules.
+
+  :param path: The dump file. Invalid UTF-8 bytes (binary columns of the SQL
+         dumps) are replaced.
+  :return A generator of lines (strings).
+  :raise OSError: If the decompressor fails (i.e. a truncated or corrupt
+         file), after the lines decompressed.
+  """
+  tools = []
+  if path.endswith('.gz'):
+    tools = ['pigz']
+  elif path.endswith('.bz2'):
+    tools = ['lbzip2', 'pbzip2']
+  for tool in tools:
+    if shutil.which(tool) is not None:
+      proc = subprocess.Popen([tool, '-dc', path], stdout=subprocess.PIPE)
+      complete = False
+      try:
+        yield from io.TextIOWrapper(proc.stdout, encoding='utf-8', errors='replace')
+        complete = True
+      finally:
+        proc.stdout.close()
+        if not complete:   # Generator closed before the end of the file
+          proc.terminate()
+        proc.wait()
+      if proc.returncode != 0:
+        raise OSError(f"ERROR: {tool} failed decompressing {path} (exit status {proc.returncode}). The file may be truncated or corrupt.")
+      return
+  if path.endswith('.gz'):
+    f = gzip.open(path, 'rt', encoding='utf-8', errors='replace')
+  elif path.endswith('.bz2'):
+    f = bz2.open(path, 'rt', encoding='utf-8', errors='replace')
+  else:
+    f = open(path, 'rt', encoding='utf-8', errors='replace')
+  with f:
+    yield from f
@@ -0,0 +1,755 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Functions to query the national libraries: BNE, SUDOC (IdRef), Getty and
+DNB (Culturegraph).
+
+@author: Angel Zazo <angelzazo@usal.es>
+"""
+
+#%% Imports
+import sys
+import pandas as pd
+import regex as re
+from .common import httpRequest, user_agent, RateLimiter, doConcurrent, traced
+from .sparql import reqSPARQL, reqSPARQLChunks, sparqlString
+from .viaf import VIAF_RATE, v_GetRecord, v_gender
+
+
+#%% -- BNE, GETTY ----------------------------------------------------------
+#
+# Uses SPARQL endpoint or HTTP to search in BNE (Biblioteca Nacional de España)
+# and Getty
+# The SPARQL endpoint have a erratic behavior.
+
+### Get the TTL triplet file (as string) from BNE identifier
+@traced
+def b_GetTTL(bneid):
+  """
+  Retrieve the TTL triplet file (as string) from BNE identifier. Use a simple
+  URL request.
+  :param benid: The identifier of a entity in BNE (XXxxxxxxx)
+  :return A string with the TTL file.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  """
+  if bneid == '':
+    return None
+  #
+  bneid = bneid.upper()
+  url = "https://datos.bne.es/persona/" + bneid + ".ttl"
+  response = httpRequest('GET', url=url, headers={'user-agent': user_agent})
+  response.raise_for_status()
+  return response.text
+
+### Get gender from a TTL triplet (as string)
+@traced
+def b_GenderTTL(bnettl):
+  """
+  Get gender or sex from a TTL triplet, if any, else "".
+
+  :param bneTTL: A string with the TTL file content.
+  :return A string with gender (in Spanish)
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  """
+  m = re.search(r'@prefix\s+ns(\d+):\s+<http://www\.rdaregistry\.info/Elements/a/>', bnettl)
+  if m is not None:
+    ns = m.group(1)
+  else:
+    return ""
+  m = re.search(ns+':P50116\s"([^"]+)', bnettl)
+  if m is None:
+    return ""
+  return m.group(1)
+
+### Search by Label (exact) usign the BNE Sparql endpoint.
+@traced
+def b_SearchByLabel(name, debug=False):
+  """
+  Use the SPARQL endpoint of datos.bne.es to search by label (exact search).
+  Return a Pandas dataframe or None.
+  :param name: Name to search (exact search)
+  :return A data-frame with label, gender, birthdate, deathdate, occupations,
+          and titles of works.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :examples:
+  >>> b = b_SearchByLabel('Escobar, Modesto')
+  """
+  query = f"""prefix ns1: <https://datos.bne.es/resource>
+prefix ns2: <https://datos.bne.es/def/>
+prefix ns4: <http://www.rdaregistry.info/Elements/a/>
+SELECT DISTINCT ?entity ?label ?genero ?fnac ?fmor
+ (GROUP_CONCAT(DISTINCT ?oc;separator="\\n") as ?ocs)
+ (GROUP_CONCAT(DISTINCT ?title;separator="\\n") as ?titles)
+WHERE {{
+  ?entity rdfs:label "{name}" .
+  ?entity rdf:type  ns2:C1005 .
+  OPTIONAL {{?entity ns2:P5001 ?label}}
+  OPTIONAL {{?entity ns4:P50116 ?genero}}
+  OPTIONAL {{?entity ns2:P5010 ?fnac}}
+  OPTIONAL {{?entity ns2:P5011 ?fmor}}
+  OPTIONAL {{?entity ns4:P50104 ?oc}}
+  OPTIONAL {{?bimo   ns2:OP3006|ns2:OP1001|ns2:OP3003 ?entity.
+             ?bimo   ns2:P3002|ns2:P1001  ?title.
+           }}
+}} GROUP BY ?entity ?label ?genero ?fnac ?fmor
+"""
+  if debug:
+    print(query, file=sys.stderr)
+  #
+  j = reqSPARQL('bne', query, method='GET')
+  #
+  bindings = j['results']['bindings']
+  if len(bindings) == 0:
+    if debug:
+      print('No bindings')
+    return None
+    #
+  data = list()
+  for b in bindings:  # cada b es un dict
+    d = {var:""  for var in j['head']['vars']}
+    for k in b:  # Los campos devuelto están en j['head']['vars']
+      d[k] = b[k]['value']
+      if k in ['ocs', 'titles']:
+        d[k] = d[k].split("\n")
+    data.append(d)
+    #
+  # return d
+  return pd.DataFrame.from_dict(data)
+
+### Search by a list of labels (exact) using the BNE Sparql endpoint.
+@traced
+def b_SearchByLabels(names, chunksize=200, max_workers=4, debug=False):
+  """
+  Use the SPARQL endpoint of datos.bne.es to search a list of labels (exact
+  search), as b_SearchByLabel does for one label. Many labels are sent in
+  each query (in a VALUES clause); the queries are sent concurrently (see
+  reqSPARQLChunks).
+
+  :param names: A list of names to search (exact search).
+  :param chunksize: Maximum number of names in each query.
+  :param max_workers: Maximum number of concurrent requests.
+  :return A data-frame with the name searched (column 'name'), entity, label,
+          gender, birthdate, deathdate, occupations and titles of works, in
+          the order of names (one row for each match), or None.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :examples:
+  >>> b = b_SearchByLabels(['Escobar, Modesto', 'Zazo, Ángel F.'])
+  """
+  if isinstance(names, str):
+    names = [names]
+  #
+  def query(chunk):
+    values = " ".join([sparqlString(x) for x in chunk])
+    return f"""prefix ns1: <https://datos.bne.es/resource>
+prefix ns2: <https://datos.bne.es/def/>
+prefix ns4: <http://www.rdaregistry.info/Elements/a/>
+SELECT DISTINCT ?name ?entity ?label ?genero ?fnac ?fmor
+ (GROUP_CONCAT(DISTINCT ?oc;separator="\\n") as ?ocs)
+ (GROUP_CONCAT(DISTINCT ?title;separator="\\n") as ?titles)
+WHERE {{
+  VALUES ?name {{ {values} }}
+  ?entity rdfs:label ?name .
+  ?entity rdf:type  ns2:C1005 .
+  OPTIONAL {{?entity ns2:P5001 ?label}}
+  OPTIONAL {{?entity ns4:P50116 ?genero}}
+  OPTIONAL {{?entity ns2:P5010 ?fnac}}
+  OPTIONAL {{?entity ns2:P5011 ?fmor}}
+  OPTIONAL {{?entity ns4:P50104 ?oc}}
+  OPTIONAL {{?bimo   ns2:OP3006|ns2:OP1001|ns2:OP3003 ?entity.
+             ?bimo   ns2:P3002|ns2:P1001  ?title.
+           }}
+}} GROUP BY ?name ?entity ?label ?genero ?fnac ?fmor
+"""
+  bindings = reqSPARQLChunks('bne', names, query, chunksize=chunksize,
+                             max_workers=max_workers, debug=debug)
+  if len(bindings) == 0:
+    return None
+  #
+  columns = ['name', 'entity', 'label', 'genero', 'fnac', 'fmor', 'ocs', 'titles']
+  return labelMatches(bindings, columns, names, split=['ocs', 'titles'])
+
+### Build the data-frame of the batch label searches, in the order of names
+def labelMatches(bindings, columns, names, split=()):
+  """
+  Build the data-frame of the batch label searches (b_SearchByLabels,
+  g_SearchLabels) from the bindings of all the chunks, sorted in the order of
+  the names searched.
+
+  :param bindings: The bindings (see reqSPARQLChunks).
+  :param columns: The variables of the query (the first one is the name).
+  :param names: The list of names searched.
+  :param split: Variables whose values are split by line breaks into lists.
+  :return A Pandas data-frame.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  """
+  data = list()
+  for b in bindings:  # cada b es un dict
+    d = {var: "" for var in columns}
+    for k in b:
+      if k in d:
+        d[k] = b[k]['value']
+    for k in split:
+      d[k] = d[k].split("\n") if d[k] != "" else []
+    data.append(d)
+  order = {x: k for k, x in enumerate(dict.fromkeys(names))}
+  data.sort(key=lambda d: order.get(d[columns[0]], len(order)))
+  return pd.DataFrame(data, columns=columns)
+
+### Build the records {identifier: {'label':..., 'gender':...}} from the
+### bindings of the gender queries, in the order of the identifiers list
+def genderRecords(bindings, var, pattern, id_list):
+  """
+  Build the records of the gender queries of BNE, SUDOC and GETTY from the
+  bindings of all the chunks. The records are in the order of id_list.
+
+  :param bindings: The bindings (see reqSPARQLChunks).
+  :param var: The variable of the entity ('bne', 'sudoc', 'getty').
+  :param pattern: Regular expression to extract the identifier (group 1)
+         from the URI of the entity.
+  :param id_list: The list of identifiers of the query.
+  :return A dict with identifier as key and a dict with 'label' and 'gender'
+          as value.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  """
+  d = dict()
+  for b in bindings:  # cada b es un dict
+    m = re.search(pattern, b[var]['value'])
+    ident = b[var]['value'] if m is None else m.group(1)
+    d[ident] = {}
+    for k in ['label', 'gender']:
+      d[ident][k] = ''
+      if k in b:
+        d[ident][k] = b[k]['value']
+  order = {x: k for k, x in enumerate(dict.fromkeys(id_list))}
+  return dict(sorted(d.items(), key=lambda x: order.get(x[0], len(order))))
+
+### Use the BNE Sparql endpoint to retrieve the gender of the records which
+### identifiers are in BNE_list
+@traced
+def b_Gender(BNE_list, chunksize=1500, max_workers=4, debug=False):
+  """
+  Use the BNE Sparql endpoint to retrieve the gender of the records which
+  identifiers ar in BNE_list.
+
+  :param BNE_list: A list with BNE identifiers
+  :param chunksize:
+   We think that the SPARQL Query API has a limit of 60 seconds to return any
+   request. The larger the number of entities in the query, the higher the risk
+   of reaching this limit, so it is necessary to make several requests with a
+   reduced number of entities. The parameter chunksize sets the maximum number
+   of entities to be sent in each query. If a request fails, the number of
+   entities is reduced automatically (see reqSPARQLChunks).
+  :param max_workers: Maximum number of concurrent requests.
+  :return A Pandas dataframe.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  """
+  if isinstance(BNE_list, str):
+    BNE_list = [BNE_list]
+  #
+  def query(chunk):
+    values = "ns1:" + " ns1:".join(chunk)
+    return f"""prefix ns1: <https://datos.bne.es/resource/>
+prefix ns4: <http://www.rdaregistry.info/Elements/a/>
+SELECT DISTINCT ?bne ?label
+(GROUP_CONCAT(DISTINCT ?sex;separator="|") as ?gender)
+WHERE {{
+  VALUES ?bne {{ {values} }}
+  OPTIONAL {{?bne rdfs:label ?label.}}
+  OPTIONAL {{?bne ns4:P50116 ?sex.}}
+}} GROUP BY ?bne ?label
+"""
+  bindings = reqSPARQLChunks('bne', BNE_list, query, chunksize=chunksize,
+                             max_workers=max_workers, debug=debug)
+  d = genderRecords(bindings, 'bne', 'https://datos.bne.es/resource/(.+)$', BNE_list)
+  if len(d) == 0:
+    return None
+  # Return a Pandas dataframe
+  return pd.DataFrame.from_dict(d, orient='index')
+
+### Scrapping: send a HTTP request to search in catalogo.bne.es for extract
+### the gender of a list of BNE identifiers. For each indetifier a complete
+### MARC record (in string format) is returned.
+@traced
+def b_GenderScrapping(BNE_list):
+  """
+  Creo que habrá que cortar en unos 500 cada vez.
+  """
+  if isinstance(BNE_list, str):
+    BNE_list = [BNE_list]
+  #
+  url = 'http://catalogo.bne.es/uhtbin/authoritybrowse.cgi?action=download&format=WBNMARA4&sel='
+  url += '|'.join(BNE_list)
+  print(url)
+  response = httpRequest('GET', url=url, headers={'user-agent': user_agent})
+  response.raise_for_status()
+  content = response.text
+  #
+  genres = dict()
+  for j,b in enumerate(BNE_list):
+    genres[b]=dict()
+    label = ''
+    genre = ''
+    ss = f'# {j+1}(.*?)\n(?:# {j+2}|</PRE>)'
+    m = re.search(ss, content, re.DOTALL)
+    if m is not None:
+      # Genre:
+      cc = m.group(1)
+      m2 = re.search('^375\s+\$a([^$\n]+)', cc, re.MULTILINE)
+      if m2 is not None:
+        genre = m2.group(1)
+      # Label (100 o 400)
+
+      m2 = re.search('^100\s+.?\s+\$a([^$\n]+)', cc, re.MULTILINE)
+      if m2 is not None:
+        label = m2.group(1)
+    genres[b]['label'] = label
+    genres[b]['gender'] = genre
+    #
+  #return genres
+  # Return a Pandas dataframe
+  return pd.DataFrame.from_dict(genres, orient='index')
+
+### Use the SUDOC Sparql endpoint to retrieve the gender of the records which
+### identifiers are in SUDOC_list
+@traced
+def s_Gender(SUDOC_list, chunksize=1500, max_workers=4, debug=False):
+  """
+  Use the SUDOC Sparql endpoint to retrieve the gender of the records which
+  identifiers are in SUDOC_list.
+
+  https://data.idref.fr/sparql
+
+  :param SUDOC_list: A list with SUDOC identifiers
+  :param chunksize:
+   We think that the SPARQL Query API has a limit of 60 seconds to return any
+   request. The larger the number of entities in the query, the higher the risk
+   of reaching this limit, so it is necessary to make several requests with a
+   reduced number of entities. The parameter chunksize sets the maximum number
+   of entities to be sent in each query. If a request fails, the number of
+   entities is reduced automatically (see reqSPARQLChunks).
+  :param max_workers: Maximum number of concurrent requests.
+  :return A Pandas data-frame
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  """
+  if isinstance(SUDOC_list, str):
+    SUDOC_list = [SUDOC_list]
+  #
+  def query(chunk):
+    values = " ".join([f"<http://www.idref.fr/{x}/id>" for x in chunk])
+    return f"""SELECT DISTINCT ?sudoc ?label
+(GROUP_CONCAT(DISTINCT ?sex;separator="|") as ?gender)
+WHERE {{
+  VALUES ?sudoc {{ {values} }}
+  OPTIONAL {{?sudoc skos:prefLabel ?label.}}
+  OPTIONAL {{?sudoc foaf:gender ?sex.}}
+}} GROUP BY ?sudoc ?label
+"""
+  bindings = reqSPARQLChunks('sudoc', SUDOC_list, query, chunksize=chunksize,
+                             max_workers=max_workers, debug=debug)
+  d = genderRecords(bindings, 'sudoc', '^http://www.idref.fr/([^/]+)/id', SUDOC_list)
+  if len(d) == 0:
+    return None
+  # Return a Pandas dataframe
+  return pd.DataFrame.from_dict(d, orient='index')
+
+### Use the GETTY Sparql endpoint to search for labels
+@traced
+def g_SearchLabel(label, debug=False):
+  """
+  Use the GETTY Sparql endpoint to search for labels
+  https://vocab.getty.edu/queries#Finding_Subjects
+
+  :param label: name of authors to search. It's better to use this format:
+       last-name AND first-name (do not include year)
+  :return A Pandas dataframe.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  """
+  query = f"""SELECT DISTINCT ?getty ?label ?gender
+WHERE {{
+  ?getty luc:term "{label}";
+         skos:inScheme ulan:;
+         gvp:parentStringAbbrev "Persons, Artists";
+         gvp:prefLabelGVP/xl:literalForm ?label.
+  OPTIONAL {{?getty foaf:focus/gvp:biographyPreferred/schema:gender/rdfs:label ?gender.
+            FILTER(LANG(?gender)='en'). }}
+}}
+"""
+  if debug:
+    print(query, file=sys.stderr)
+  #
+  j = reqSPARQL('getty', query)
+  bindings = j['results']['bindings']
+  if len(bindings) == 0:
+    return None
+  #
+  d = dict()
+  for b in bindings:  # cada b es un dict
+    sudoc = b['getty']['value'].replace('http://vocab.getty.edu/ulan/','')
+    d[sudoc] = {}
+    for k in ['label', 'gender']:
+      d[sudoc][k] = ''
+      if k in b:
+        d[sudoc][k] = b[k]['value']
+  # return d
+  # Return a Pandas dataframe
+  return pd.DataFrame.from_dict(d, orient='index')
+
+
+### Use the GETTY Sparql endpoint to search for a list of labels
+@traced
+def g_SearchLabels(labels, chunksize=50, max_workers=4, debug=False):
+  """
+  Use the GETTY Sparql endpoint to search for a list of labels, as
+  g_SearchLabel does for one label. Each query searches many labels, one
+  luc:term alternative (UNION) for each one; the queries are sent
+  concurrently (see reqSPARQLChunks).
+  https://vocab.getty.edu/queries#Finding_Subjects
+
+  :param labels: A list of names of authors to search. It's better to use
+       this format: last-name AND first-name (do not include year)
+  :param chunksize: Maximum number of labels in each query.
+  :param max_workers: Maximum number of concurrent requests.
+  :return A Pandas dataframe with the label searched (column 'name'), the
+          ULAN identifier (column 'getty'), label and gender, in the order of
+          labels (one row for each match), or None.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  """
+  if isinstance(labels, str):
+    labels = [labels]
+  #
+  def query(chunk):
+    alternatives = "\n  UNION\n".join(
+      [f"  {{ BIND({sparqlString(x)} AS ?name) ?entity luc:term {sparqlString(x)} }}"
+       for x in chunk])
+    return f"""SELECT DISTINCT ?name ?entity ?label ?gender
+WHERE {{
+{alternatives}
+  ?entity skos:inScheme ulan:;
+          gvp:parentStringAbbrev "Persons, Artists";
+          gvp:prefLabelGVP/xl:literalForm ?label.
+  OPTIONAL {{?entity foaf:focus/gvp:biographyPreferred/schema:gender/rdfs:label ?gender.
+            FILTER(LANG(?gender)='en'). }}
+}}
+"""
+  bindings = reqSPARQLChunks('getty', labels, query, chunksize=chunksize,
+                             max_workers=max_workers, debug=debug)
+  if len(bindings) == 0:
+    return None
+  #
+  df = labelMatches(bindings, ['name', 'entity', 'label', 'gender'], labels)
+  df['entity'] = df['entity'].str.replace('http://vocab.getty.edu/ulan/', '', regex=False)
+  return df.rename(columns={'entity': 'getty'})
+
+
+### Use the GETTY Sparql endpoint to retrieve the gender of the records which
+### identifiers are in GETTY_list
+@traced
+def g_Gender(GETTY_list, chunksize=10000, max_workers=4, debug=False):
+  """
+  Use the GETTY Sparql endpoint to retrieve the gender of the records which
+  identifiers are in GETTY_list.
+
+  https://vocab.getty.edu/sparql
+
+  :param GETTY_list: A list with GETTY identifiers
+  :param chunksize:
+   We think that the SPARQL Query API has a limit of 60 seconds to return any
+   request. The larger the number of entities in the query, the higher the risk
+   of reaching this limit, so it is necessary to make several requests with a
+   reduced number of entities. The parameter chunksize sets the maximum number
+   of entities to be sent in each query. If a request fails, the number of
+   entities is reduced automatically (see reqSPARQLChunks).
+  :param max_workers: Maximum number of concurrent requests.
+  :return A Pandas data-frame
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  """
+  if isinstance(GETTY_list, str):
+    GETTY_list = [GETTY_list]
+  #
+  def query(chunk):
+    values = "ulan:" + " ulan:".join(chunk)
+    return f"""SELECT DISTINCT ?getty ?label ?gender
+WHERE {{
+  VALUES ?getty {{ {values} }}
+  OPTIONAL {{?getty gvp:prefLabelGVP/xl:literalForm ?label}}
+  OPTIONAL {{?getty foaf:focus/gvp:biographyPreferred/schema:gender/rdfs:label ?gender.
+            FILTER(LANG(?gender)='en').
+           }}
+}}
+"""
+  bindings = reqSPARQLChunks('getty', GETTY_list, query, chunksize=chunksize,
+                             max_workers=max_workers, debug=debug)
+  d = genderRecords(bindings, 'getty', 'http://vocab.getty.edu/ulan/(.+)$', GETTY_list)
+  if len(d) == 0:
+    return None
+  return d
+
+
+### Use a HHTP request to DNB catalog to retrive the gender of a record which
+### identifier is known.
+@traced
+def d_Gender(DNB_id, debug=False):
+  """
+  Use the HTTP request to retrieve the gender of a records from DNV catalog.
+
+  https://hub.culturegraph.org/entityfacts/DNB_id
+
+  :param DNB_id: one idenfifier of DNB catalog
+  :return A string with gender (in English).
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  """
+  url = 'https://hub.culturegraph.org/entityfacts/' + DNB_id
+  #
+  if debug:
+    print(url)
+  #
+  response = httpRequest('GET', url=url, headers={'user-agent': user_agent})
+  response.raise_for_status()
+  j = response.json()
+  if 'gender' not in j:
+    return ""
+  m = re.search("([^#]+)$", j['gender']['@id'])
+  return m.group(1)
+
+
+#%% -- Gender from all the sources ----------------------------------------
+#
+# The sources are queried concurrently, each one with its own chunk size
+# (number of identifiers per request), rate limit (requests per second) and
+# number of threads. BNE, SUDOC and GETTY resolve a chunk of identifiers in
+# one SPARQL query; DNB and VIAF need one HTTP request per identifier.
+GENDER_SOURCES = {
+  'BNE':   {'chunksize': 1500, 'rate': 1, 'max_workers': 2},
+  'SUDOC': {'chunksize': 1500, 'rate': 1, 'max_workers': 2},
+  'GETTY': {'chunksize': 5000, 'rate': 1, 'max_workers': 2},
+  'DNB':   {'chunksize': 1, 'rate': 10, 'max_workers': 8},
+  'VIAF':  {'chunksize': 1, 'rate': VIAF_RATE, 'max_workers': 8},
+}
+
+# Other names of the sources accepted as columns of the identifiers table
+GENDER_ALIASES = {'IDREF': 'SUDOC', 'ULAN': 'GETTY', 'GND': 'DNB'}
+
+# Values of gender of the sources (lowercase) and their normalized value
+GENDER_VALUES = {
+  'female': 'female', 'femenino': 'female', 'mujer': 'female', 'f': 'female',
+  'a': 'female', 'woman': 'female', 'feminine': 'female', 'féminin': 'female',
+  'femme': 'female', 'weiblich': 'female',
+  'male': 'male', 'masculino': 'male', 'hombre': 'male', 'm': 'male',
+  'b': 'male', 'man': 'male', 'masculine': 'male', 'masculin': 'male',
+  'homme': 'male', 'männlich': 'male',
+  'u': 'unknown', 'unknown': 'unknown', 'desconocido': 'unknown',
+  'notknown': 'unknown', 'inconnu': 'unknown', 'unbekannt': 'unknown',
+}
+
+#%% genderNormalize(value)
+def genderNormalize(value):
+  """
+  Normalize a gender value returned by any source (BNE, SUDOC, GETTY, DNB or
+  VIAF) to 'female', 'male' or 'unknown'. URIs are reduced to their last
+  segment (i.e. 'https://d-nb.info/standards/vocab/gnd/gender#male'), and
+  several values separated by '|' (from GROUP_CONCAT) are normalized one by
+  one: if they do not agree they are returned joined by '|'.
+
+  :param value: The gender value (a string, or None/NaN).
+  :return The normalized value, the original value in lowercase if it is not
+          known, or '' if there is no value.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :example
+  >>> genderNormalize('masculino')
+  'male'
+  """
+  if not isinstance(value, str):
+    return ''
+  normalized = []
+  for v in value.split('|'):
+    v = re.sub(r'^.*[/#]', '', v.strip()).lower()
+    if v == '':
+      continue
+    v = GENDER_VALUES.get(v, v)
+    if v not in normalized:
+      normalized.append(v)
+  return '|'.join(normalized)
+
+#%% genderConsensus(values)
+def genderConsensus(values):
+  """
+  Return the consensus of the normalized gender values of several sources:
+  the most frequent 'female' or 'male' value. Other values (unknown, empty)
+  do not vote.
+
+  :param values: An iterable with normalized gender values.
+  :return A tuple (consensus, agreement), where consensus is 'female',
+          'male', 'conflict' (tie) or '' (no votes), and agreement is the
+          number of sources which agree with the consensus.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  """
+  votes = {'female': 0, 'male': 0}
+  for v in values:
+    if v in votes:
+      votes[v] += 1
+  if votes['female'] == votes['male']:
+    return ('conflict' if votes['female'] > 0 else '', 0)
+  if votes['female'] > votes['male']:
+    return ('female', votes['female'])
+  return ('male', votes['male'])
+
+#%% genderChunk(ids, source, limiter=None, store=None)
+def genderChunk(ids, source, limiter=None, store=None):
+  """
+  Retrieve the (original) gender values of a chunk of identifiers from a
+  source. Used by l_Gender().
+
+  :param ids: A tuple with identifiers of the source.
+  :param source: 'BNE', 'SUDOC', 'GETTY', 'DNB' or 'VIAF'.
+  :param limiter: A RateLimiter shared by all the chunks of the source, or
+         None. It is waited before each request.
+  :param store: A VIAFStore used for the VIAF records, or None.
+  :return A dict with identifier as key and the gender value as value.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  """
+  ids = list(ids)
+  d = dict()
+  if source in ('DNB', 'VIAF'):
+    for x in ids:
+      if limiter is not None:
+        limiter.wait()
+      if source == 'DNB':
+        d[x] = d_Gender(x)
+      else:
+        _, viaf = v_GetRecord(x, check=True, store=store)
+        d[x] = v_gender(viaf)
+    return d
+  #
+  if limiter is not None:
+    limiter.wait()
+  if source == 'BNE':
+    output = b_Gender(ids, chunksize=len(ids), max_workers=1)
+  elif source == 'SUDOC':
+    output = s_Gender(ids, chunksize=len(ids), max_workers=1)
+  elif source == 'GETTY':
+    output = g_Gender(ids, chunksize=len(ids), max_workers=1)
+  else:
+    raise ValueError(f"Unknown source '{source}'")
+  if output is None:
+    return d
+  if isinstance(output, pd.DataFrame):
+    output = output.to_dict(orient='index')
+  for x, v in output.items():
+    d[x] = v['gender']
+  return d
+
+#%% genderSource(ids, source, chunksize, rate, max_workers, store, failures)
+def genderSource(ids, source, chunksize=None, rate=None, max_workers=None,
+                 store=None, failures=None):
+  """
+  Retrieve the gender values of the identifiers from a source, sending the
+  chunks concurrently under the rate limit of the source. Used by l_Gender().
+
+  :param ids: A list with unique identifiers of the source.
+  :param source: 'BNE', 'SUDOC', 'GETTY', 'DNB' or 'VIAF'.
+  :param chunksize, rate, max_workers: If None, the value in
+         GENDER_SOURCES[source] is used.
+  :param store: A VIAFStore used for the VIAF records, or None.
+  :param failures: A dict where the failed chunks are stored (key: tuple
+         (source, first_identifier), value: the exception), or None to print
+         them to stderr.
+  :return A dict with identifier as key and the gender value as value.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  """
+  conf = GENDER_SOURCES[source]
+  chunksize = chunksize or conf['chunksize']
+  rate = conf['rate'] if rate is None else rate
+  max_workers = max_workers or conf['max_workers']
+  #
+  chunks = [tuple(ids[k:k+chunksize]) for k in range(0, len(ids), chunksize)]
+  limiter = RateLimiter(rate)
+  d = dict()
+  for chunk, result, error in doConcurrent(genderChunk, chunks,
+                                           max_workers=max_workers,
+                                           source=source, limiter=limiter,
+                                           store=store):
+    if error is not None:
+      if failures is None:
+        print(f"ERROR: {source} chunk from '{chunk[0]}' ({len(chunk)} identifiers): {error}", file=sys.stderr)
+      else:
+        failures[(source, chunk[0])] = error
+      continue
+    d.update(result)
+  return d
+
+#%% l_Gender(table, sources=None, store=None, failures=None, raw=False)
+def l_Gender(table, sources=None, store=None, failures=None, raw=False):
+  """
+  Federated resolution of the gender of a table of authors identified in
+  several sources: BNE, SUDOC (IdRef), GETTY (ULAN), DNB (GND) and VIAF. All
+  the sources are queried at the same time, each one with its own chunk size
+  and rate limit (see GENDER_SOURCES). The values are normalized (see
+  genderNormalize()) and a consensus is computed for each author.
+
+  :param table: A Pandas dataframe (or a dict of lists) with one row per
+         author and one column per source with its identifier (column names
+         are 'BNE', 'SUDOC', 'GETTY', 'DNB', 'VIAF' or their aliases 'IDREF',
+         'ULAN', 'GND', in any case). Empty cells are ignored, other columns
+         are not used.
+  :param sources: A dict to override the parameters of GENDER_SOURCES for
+         some sources, i.e. {'BNE': {'chunksize': 500}}, or None.
+  :param store: A VIAFStore used for the VIAF records, or None.
+  :param failures: A dict where the failed requests are stored, or None to
+         print them to stderr (see genderSource()).
+  :param raw: If True, the original values of the sources are also
+         returned, in the columns '<source>_raw'.
+  :return A Pandas dataframe with the index of table and the columns
+          '<source>_gender' (one for each source in table), 'consensus' and
+          'agreement' (number of sources which agree with the consensus).
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :example
+  >>> df = pd.DataFrame({'BNE': ['XX1718747'], 'VIAF': ['29550309']})
+  >>> l_Gender(df)
+  """
+  if not isinstance(table, pd.DataFrame):
+    table = pd.DataFrame(table)
+  sources = sources or {}
+  #
+  columns = dict()  # source -> column of the table
+  for c in table.columns:
+    source = str(c).upper()
+    source = GENDER_ALIASES.get(source, source)
+    if source in GENDER_SOURCES:
+      columns[source] = c
+  if len(columns) == 0:
+    raise ValueError(f"The table has no columns of sources: {', '.join(GENDER_SOURCES)}")
+  #
+  ids = dict()  # source -> Series of identifiers (without empty cells)
+  for source, c in columns.items():
+    s = table[c].dropna().astype(str).str.strip()
+    if source == 'BNE':
+      s = s.str.upper()
+    ids[source] = s[s != '']
+  #
+  def resolve(source):
+    return genderSource(list(dict.fromkeys(ids[source])), source,
+                        store=store, failures=failures,
+                        **sources.get(source, {}))
+  #
+  output = pd.DataFrame(index=table.index)
+  for source, result, error in doConcurrent(resolve, list(columns),
+                                            max_workers=len(columns)):
+    if error is not None:
+      if failures is None:
+        print(f"ERROR: {source}: {error}", file=sys.stderr)
+      else:
+        failures[(source, None)] = error
+      result = {}
+    values = ids[source].map(result).reindex(table.index)
+    if raw:
+      output[f'{source}_raw'] = values.fillna('')
+    output[f'{source}_gender'] = values.map(genderNormalize)
+  #
+  # Same order of columns than GENDER_SOURCES
+  output = output[[c for s in GENDER_SOURCES for c in (f'{s}_raw', f'{s}_gender') if c in output]]
+  gcolumns = [c for c in output.columns if c.endswith('_gender')]
+  consensus = [genderConsensus(row) for row in output[gcolumns].itertuples(index=False)]
+  output['consensus'] = [c for c, _ in consensus]
+  output['agreement'] = [a for _, a in consensus]
+  return output
+
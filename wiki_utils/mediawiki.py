@@ -0,0 +1,1588 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Functions which use the MediaWiki Action API (m_*) and the MediaWiki SQL
+dumps (md_*).
+
+@author: Angel Zazo <angelzazo@usal.es>
+"""
+
+#%% Imports
+import sys
+from time import time
+import requests
+import pandas as pd
+import regex as re
+from os.path import splitext   # split path in name and extension
+import unicodedata
+import sqlite3
+from .common import (MW_LIMIT, checkValues, doChunks, dumpLines, httpRequest,
+                     instrumented, retrySleep, traced, user_agent)
+
+
+#%% -- MediaWiki API ------------------------------------------------------------
+# MediaWiki API: provides direct, high-level access to the data contained in
+# MediaWiki databases over the web.
+# See https://www.mediawiki.org/wiki/API:Main_page
+# See https://en.wikipedia.org/w/api.php
+
+#%% reqMediaWiki(query, project='en.wikipedia.org', method='GET', attempts=2,
+#                debug=False)
+@instrumented('mediawiki')
+def reqMediaWiki(query, project='en.wikipedia.org', method='GET', attempts=2, debug=False):
+  """
+  Use requests package to retrieve responses in JSON format using the
+  MediaWiki REST API with the query search indicated in query. For MediaWiki
+  requests only user_agent is necessary in the request headers (see
+  https://www.mediawiki.org/wiki/API:Etiquette ) The standard and default
+  output format in MediaWiki is JSON. All other formats are discouraged. The
+  output format should always be specified using the request param "format"
+  in the "query" request.
+
+  :param query: A dict with de (key, values) pairs with the search.
+  :param project: The Wikimedia project to search. Default en.wikipedia.org.
+  :param method: The method used in the request. Default 'GET'.
+      Note in https://www.mediawiki.org/wiki/API:Etiquette#Request_limit:
+      "Whenever you're reading data from the web service API, you should try to
+      use GET requests if possible, not POST, as the latter are not cacheable."
+  :param attempts: On "ratelimited" errors, the number of times the request is
+         retried using a 60 seconds interval between retries. Default 2, if
+         attempts==0 no retries are done.
+  :return j: The response in JSON format or None on errors. Errors can be
+          produced by means of response.raise_for_status() error or because
+          the number of ratelimited errors attemps is achived.
+
+  Note: MediaWiki API has a limit of 50 titles en each query (using "|" as
+        separator). If a query contains more than 50 titles this function
+        show an error and returns None. Other functions in this module use the
+        function m_doChunked() to make sucesive requests with a maximum of 50
+        titles each.
+  """
+  if not isinstance(query, dict) or project.strip() == "":
+    raise ValueError("Parameter 'query' or parameter 'project' or both are invalid")
+  #
+  if 'titles' in query:
+    articles = query['titles'].split('|')
+    if len(articles) > MW_LIMIT:
+      raise ValueError(f"The number of articles ({len(articles)}) exceeds the MediaWiki API limit ({MW_LIMIT})")
+  #
+  url = "https://" + project + "/w/api.php"
+  nt = 0
+  while True:
+    nt += 1
+    if method=='GET':
+      response = httpRequest('GET', url=url, params=query, headers={'user-agent': user_agent})
+    elif method=='POST':
+      response = httpRequest('POST', url=url, data=query, headers={'user-agent': user_agent})
+    else:
+      raise ValueError(f"Method '{method}' is not supported")
+    #
+    response.raise_for_status()
+    if debug=="query":
+      print("Quoted URL:\n", response.url, file=sys.stderr)
+      print("Unquoted URL:\n", requests.utils.unquote(response.url), file=sys.stderr)
+
+    j = response.json()
+    #
+    if debug and 'warnings' in j:
+      for x,y in j['warnings'].items():
+        print(f"WARNINGS: {x}: {y['warnings']}")
+    if 'error' not in j:
+      return j
+    # See https://www.mediawiki.org/wiki/API:Etiquette#Request_limit
+    if j['error']['code'] == 'ratelimited':
+      if nt <= attempts:
+        print(f"WARNING: Ratelimited error. Sleeping {60*nt} seconds", )
+        retrySleep(60*nt)
+      else:
+        raise NameError(f'{nt} ratelimited attemps achieved, aborting.')
+    else:
+       raise NameError(f"ERROR: reqMediaWiki: {j['error']['code']}: {j['error']['info']}")
+
+
+#%% normalizedTitle(title, q)
+def normalizedTitle(title, q):
+  """
+  Return the normalized and the redirect title (also normalized), if any, from
+  the query part of the JSON response of a MediaWiki search. The response of
+  the MediaWiki API query (https://www.mediawiki.org/wiki/API:Query) includes
+  original page titles and possibily normalized and redirected titles, if
+  the API needs to obtain them. For a original title, this function returns
+  them, if any.
+
+  :param title: The title likely to be found in q.
+  :param q: The query part of the JSON response (j['query']) from a Mediawiki
+         search. Note that this part contains some titles, so it is necessary
+         to search the original "title" in that part.
+  :return A list with the normalized and redirected page title (target, also
+          normalized) found for the title. None on errors.
+  """
+  anorm = title
+  # Is normalized (and possibly encoded)? # See https://phabricator.wikimedia.org/T29849#2594624
+  # It is supposed that order is: first, NFC normalization, then, uppercase normalization.
+  if 'normalized' in q:
+    for nn in q['normalized']:
+      # NFC normalization
+      if 'fromencoded' in nn and nn['fromencoded'] and requests.utils.quote(anorm) == nn['from']:
+        anorm = nn['to']
+      # Uppercase normalization
+      if nn['from'] == anorm:
+        anorm = nn['to']
+        break
+
+  normalized = None if anorm == title else anorm
+  # ¿Is it a redirect? The normalized titles is used.
+  target = None
+  if 'redirects' in q:
+    for nn in q['redirects']:
+      if nn['from'] == anorm:
+        target = nn['to']
+        break
+  #
+  return [normalized, target]
+
+#%% checkTitles(titles)
+def checkTitles(titles):
+  """
+  Check if titles are valid, i.e, they not contain forbidden characteres (#<>[]{}|)
+  See https://en.wikipedia.org/wiki/Wikipedia:Naming_conventions_(technical_restrictions)#Forbidden_characters
+  (note that "_" is excluded in this function). The check is made with
+  whole-array operations (see `checkValues`), and all invalid titles are
+  reported at once.
+
+  :param titles A title or a list of titles for cheking (list, NumPy array or
+         Pandas series).
+  :return The titles with duplicates removed, otherwise, raise ValueError
+          exception. The 'positions' attribute of the exception contains the
+          positions of invalid titles in 'titles'.
+  """
+  return checkValues(titles, 'titles', forbidden="#<>[]|{}")  # "_" excluded
+
+#%% m_Search(string, mode='title', project='en.wikipedia.org',
+#            profile="engine_autoselect", limit=30, debug=False)
+@traced
+def m_Search(string, mode='title', project='en.wikipedia.org',
+             profile="engine_autoselect", limit=30, debug=False):
+  """
+  Search pages in the Wikimedia 'project' that contain 'string' in the
+  title or in the body of the article, depending on whether mode='title' or
+  mode='text', which uses the PrefixSearch API or the CirrusSearch API,
+  respectively. Returns a Pandas dataframe with pages found, ordered by
+  relevance and the Wikidata entity of pages.
+
+  The function uses a "generator" of the search API, so it is possible to
+  obtain additional information, in our case the "wikibase_item".
+
+  :param string: String to search. Note that APIs performs a NFC Unicode
+         normalization on search string.
+  :param mode: If mode='title', then the query uses the PrefixSearch API. If
+         mode='text', it uses the CirrusSearch API.
+
+         The PrefixSearch API searchs wikimedia pages by title. Depending on
+         the search engine backend, this might include typo correction,
+         redirect avoidance, stop-word removal, or other heuristics.
+         See https://www.mediawiki.org/wiki/API:Prefixsearch
+
+         The CirrusSearch API does a "full text search", which is an "indexed
+         search": all pages are stored in the wiki database, and all the words
+         in the non-redirect pages are stored in the search database, which is
+         an index to practically the full text of the wiki. The "indexed
+         search" use text processing: lower-case transformation, diacritic
+         reduction, eliminate stop words and stemming. In addition, this API
+         allows advanced searches, because it uses ElasticSearch as a search
+         engine. For example, filters can be used: 'intitle' or 'incategory',
+         including regular expresions. For example: 'intitle:"Max Planck"'
+         o 'intitle:/regex/i'. More options exists, please, see
+         https://www.mediawiki.org/wiki/Help:CirrusSearch .
+         Note that the function, when in mode='text' only one profile is used:
+         the 'engine_autoselect' profile, which is used only for sortings
+         results.
+
+  :param project: The Wikimedia project, defaults "en.wikipedia.org".
+  :param profile: This parameter sets the search type. If mode='title', options
+         are: strict, normal, normal-subphrases, fuzzy, fast-fuzzy,
+         fuzzy-subphrases, classic and engine_autoselect (default). If
+         mode='text', the function not use the parameter 'profile', because
+         only use "engine_autoselect" option of the "search" action of the API
+         (see https://www.mediawiki.org/w/api.php?action=help&modules=query%2Bsearch )
+  :param limit: Maximun number of page titles returned.
+  :param debug: For debugging purposes (defauls False). If debug!=False the
+         query launched is shown.
+  :return: A data-frame with order (by relevance), page titles, status and
+           Wikidata entities found. None if no entities are found.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  """
+  #
+  if string.strip() =='':
+    raise NameError("The 'string' parameter must be set.")
+  #
+  if mode=='title':
+    query = {
+      "format"       : "json",
+      "formatversion": "2",
+      "redirects"    : '1',      #  Operative with Prefixsearch using generators
+      "action"       : "query",
+      "generator"    : 'prefixsearch',
+      "gpsnamespace" : "0",
+      "gpsprofile"   : profile,
+      "gpslimit"     : ("max" if limit>500 else limit),  # in API "max" == 500
+      "prop"         : "pageprops",
+      "ppprop"       : 'wikibase_item|disambiguation',
+      "gpssearch"    : string  }
+  elif mode=='text':
+    query = {
+      "format"       : "json",
+      "formatversion": "2",
+      "action"       : "query",
+      "generator"    : 'search',
+      "gsrprop"      : "",
+      "gsrnamespace" : "0",
+      "gsrqiprofile": "engine_autoselect",
+      "gsrlimit"     : ("max" if limit>500 else limit),   # in API "max" == 500
+      # "srwhat"     : 'text',  # title is disable; nearmatch not returns results
+      # "srenablerewrites" : "1",
+      # "srinfo"     : "totalhits|suggestion|rewrittenquery",
+      # "gsrsort"     : "relevance",
+      'prop'         : 'pageprops',
+      "ppprop"       : 'wikibase_item|disambiguation',
+      "gsrsearch"    : string  }
+  else:
+    raise ValueError("Invalid value for parameter 'mode'")
+  #
+  output=[]
+  #
+  getlimit = False
+  while(True): # While there are "continue" responses
+    j = reqMediaWiki(query=query, project=project, debug=debug)
+    #
+    if 'query' not in j:  # There are not results.
+      break
+    #
+    # Note that the response includes an "index" which is the order of the
+    # returned in the "gsrsort" parameter (relevante by default). It is
+    # important to retrieve results in that order.
+    for page in j['query']['pages']:          # With formatversion=2 q["pages"] is a list
+      title  = page['title']
+      index  = page['index']
+      entity = None
+      if 'pageprops' not in page:    # No pageprops, so no wikidata_item
+        status = "no_pageprops"
+      elif 'wikibase_item' not in page['pageprops']:   # No wikibase_item
+        status = "no_wikibase_item"
+      else:
+        status = "disambiguation" if 'disambiguation' in page['pageprops'] else 'OK'
+        entity = page['pageprops']['wikibase_item']
+      #
+      output.append({'index' : index,
+                     'title' : title,
+                     'status': status,
+                     'entity': entity})
+      if len(output) >= limit:
+        getlimit = True
+        break
+    #
+    if getlimit:
+      break
+    # 'Continue' response?
+    if 'continue' in j:
+      if debug:
+        print("INFO: continue response.", file=sys.stderr)
+      query.update(j['continue'])
+    else:
+      break
+  # Finally return de dict output as a Pandas data-frame, order by relevance
+  if len(output) == 0:
+    return None
+  return pd.DataFrame.from_dict(sorted(output, key=lambda x: x['index']))
+
+
+
+#%% m_WikidataEntity(titles, project='en.wikipedia.org', chunksize=MW_LIMIT, debug=False)
+@traced
+def m_WikidataEntity(titles, project='en.wikipedia.org', chunksize=MW_LIMIT, debug=False):
+  """
+  Use reqMediaWiki to check if page titles are in a Wikimedia project and
+  returns the Wikidata entity for them. Automatically resolves redirects. If a
+  title is invalid (contains forbidden characters) in the Wikimedia project,
+  the "status" column of the returned Pandas data-frame is set to "invalid." If
+  the title does not exist, that column is set to "missing". If the page is a
+  disambiguation page, then "disambiguation" is set in that column. If the page
+  title exists (and not it is a disambiguation page), then 'OK' is set in that
+  column. Note that additional columns are "normalized" and "target". The
+  "normalized" column contains the normalized title of the page, if it is
+  different from the original title, else None. The "target" columns contains
+  the title of the target page if any, else None. For a title, if the status
+  column is disambiguation or OK, then the column "entity" constains the
+  Wikidata entity for the page.
+
+  Note that duplicate titles are removed before searches. Note also that for
+  two different titles with the same normalized or target title, the same
+  information is returned for both.
+
+  See https://www.mediawiki.org/w/api.php?action=help&modules=query%2Bpageprops
+
+  :param titles: A title or a list of titles to search for.
+  :param project: Wikimedia project, defaults "en.wikipedia.org"
+  :param chunksize: If the number of titles exceed chunksize (the limit is 50
+         for the MediaWiki API), then query are made in chunks if chunsize.
+  :param debug: For debugging purposes (default False). If debug='info'
+         information about chunked queries is shown. If debug='query' also the
+         query launched is shown.
+  :return A Pandas data-frame with columns "title", "status", "nomalized", "target"
+          and "entity".
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :examples:
+  >>> m_WikidataEntity('Max Planck', project='es.wikipedia.org')
+             status normalized redirect entity
+  Max Planck     OK       None     None  Q9021
+
+  >>> m_WikidataEntity(['Max', 'Cervante', 'humanist'])
+                    status normalized    target   entity
+  Max       disambiguation       None      None  Q225238
+  Cervante         missing       None      None     None
+  humanist              OK   Humanist  Humanism   Q46158
+
+  >>> # Note that "a%CC%8C" is an "a" + combining caron (the diacritic mark: ˇ)
+  >>> a = requests.utils.unquote("a%CC%8C")
+  >>> m_WikidataEntity(['Max Planck', a, 'Max', 'Cervante', 'humanist'])
+                      status normalized    target   entity
+  Max Planck              OK       None      None    Q9021
+  ǎ                      OK          Ǎ     Caron   Q26948
+  Max         disambiguation       None      None  Q225238
+  Cervante           missing       None      None     None
+  humanist                OK   Humanist  Humanism   Q46158
+  >>> # Search 3D films:
+  ... w = w_SearchByInstanceof(instanceof='Q229390', langsorder = 'en', debug = 'info')
+  ... films = list(w.entityLabel.values)
+  ... m = m_WikidataEntity(films[:125], debug=True)
+  """
+  # Checking titles
+  titles = checkTitles(titles)
+  #
+  # Chunked requests?
+  n = len(titles)
+  if n>chunksize:
+    if debug:
+      print(f"INFO: The number of titles ({n}) exceeds the MediaWiki API limit ({chunksize}): doing chunked requests.", file=sys.stderr)
+    return doChunks(m_WikidataEntity, titles, chunksize=MW_LIMIT, project=project, debug=debug)
+  ###
+  query = {"format"        : 'json',
+           "formatversion" : '2',
+           "redirects"     : '1',      # Automatically resolve redirects in query+titles, etc.
+           "action"        : 'query',
+           "prop"          : 'pageprops',
+           "ppprop"        : 'wikibase_item|disambiguation',
+           "titles"        : '|'.join(titles)}
+  #
+  output = dict()
+  #
+  # Note that for query "pageprops" continue responses are not expected
+  # to happen when only request wikibase_item and disambiguation, but...
+  while True:
+    j = reqMediaWiki(query=query, project=project, debug=debug)
+
+    if j is None or "query" not in j:
+      return None
+    #
+    q = j['query']
+    for title in titles:
+      normalized, target = normalizedTitle(title, q)
+      # Get the firts not None element:
+      anorm = next(n for n in [target, normalized, title] if n is not None)
+      #
+      for page in q['pages']:      # With formatversion=2 q["pages"] is a list
+        if anorm == page['title']:
+          item = None
+          if 'invalid' in page:      # Invalid response: ¿malformed title?
+            status = "invalid"
+          elif 'missing' in page:
+            status = "missing"
+          elif 'pageprops' not in page:    # No pageprops, so no wikidata_item
+            status = "no_pageprops"
+          elif 'wikibase_item' not in page['pageprops']:   # No wikibase_item
+            status = "no_wikibase_item"
+          else:
+            status = "disambiguation" if 'disambiguation' in page['pageprops'] else 'OK'
+            item = page['pageprops']['wikibase_item']
+          #
+          output[title] = {# 'title'     : title,
+                           'status'    : status,
+                           'normalized': normalized,
+                           'target'    : target,
+                           'entity'    : item}
+    # ¿"continue" response? Only query 2 properties, it is certain that a
+    # continue response will not happen, but...
+    if 'continue' in j:
+      print("INFO: continue response.", file=sys.stderr)
+      query.update(j['continue'])
+    else:
+      break
+  # Finally return de dict output as a Pantad data-frame.
+  return pd.DataFrame.from_dict(output, orient='index')
+
+
+#%% m_Redirects(titles, project="en.wikipedia.org", chunksize=MW_LIMIT, debug=False)
+@traced
+def m_Redirects(titles, project="en.wikipedia.org", chunksize=MW_LIMIT, debug=False):
+  """
+  Obtain the redirection pages to the article titles in the Wikimedia project,
+  restricted to namespace 0. Return a dictionary, each key is a title and the
+  value are a list of redirections. In this list the first elemnent is the
+  target of the page title requested and contains all page source, each
+  redirects to it. The first page is also normalized. If the title requested
+  is invalid or missing in the project, then the value of the dict for it it
+  set to None.
+
+  :param titles: A title or a list of titles to redirects search for.
+  :param project: The Wikimedia project, defaults "en.wikipedia.org"
+  :param chunksize: If the number of titles exceed chunksize (the limit is 50
+         for the MediaWiki API), then query are made in chunks if chunsize.
+  :param debug: For debugging purposes (default False). If debug='info'
+         information about chunked queries is shown. If debug='query' also the
+         query launched is shown.
+  :return A dict.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :examples:
+  >>> m_Redirects(['Max', 'Eustaquio Celada', 'humanist', 'Cervante'])
+  """
+  # Checking titles
+  titles = checkTitles(titles)
+  #
+  # Chunked requests?
+  n = len(titles)
+  if n>chunksize:
+    if debug:
+      print(f"INFO: The number of titles ({n}) exceeds the MediaWiki API limit ({chunksize}): doing chunked requests.", file=sys.stderr)
+    return doChunks(m_Redirects, titles, chunksize, project=project, debug=debug)
+  ###
+  query = {
+      "format"       : "json",
+      "formatversion": "2",
+      "redirects"    : "1",        # Automatically resolve redirects in query+titles, etc.
+      "action"       : "query",
+      "prop"         : "redirects",
+      "rdnamespace"  : "0",        # Only from namespace = 0
+      "rdprop"       : "title",
+      "rdlimit"      : "max",      # Change to 5 for testing
+      "titles"       : '|'.join(titles),
+  }
+  #
+  output = dict()
+  #
+  while True:
+    j = reqMediaWiki(query=query, project=project, debug=debug)
+    #
+    if j is None or "query" not in j:
+      return None
+    #
+    q = j['query']
+    for title in titles:
+      normalized, target = normalizedTitle(title, q)
+      # Get the firts not None element:
+      anorm = next(n for n in [target, normalized, title] if n is not None)
+      #
+      for page in q['pages']:      # With formatversion=2 q["pages"] is a list
+        if anorm == page['title']:
+          # Any continue response includes the same "normalized" and "redirects" info
+          # When query is requested in the firts time, no "continue" key exists
+          # in the "query" dict; only it is possible in succesive continue request.
+          if 'continue' not in query:
+            if 'invalid' in page or 'missing' in page:
+              output[title] = [] # None
+              break
+            else:
+              output[title] = [anorm]
+          # But redirects can be different in continue responses:
+          if 'redirects' in page:   #  redirected titles
+            redirects = [r["title"] for r in page["redirects"]]
+          else:
+            redirects = []
+          #
+          output[title].extend(redirects)
+
+    # continue response
+    if 'continue' in j:
+      print("INFO: continue response.", file=sys.stderr)
+      query.update(j['continue'])
+    else:
+      break
+  # Check None
+  for k,v in output.items():
+    if len(v) == 0:
+      output[k] = None
+  # Finally return a dict
+  return output
+
+#%% m_RedirectsDF(titles, project="en.wikipedia.org", chunksize=MW_LIMIT, debug=False)
+@traced
+def m_RedirectsDF(titles, project="en.wikipedia.org", chunksize=MW_LIMIT, debug=False):
+  """
+  Obtain the redirection pages to the article titles in the Wikimedia project,
+  restricted to namespace 0. Return a Pandas data-frame with columns "status",
+  "normalized", "target" and "redirects". The "status" column is set to
+  "invalid", "missing" or "disambiguatoin" if the corresponding title is
+  invalid, not exists or is a disambiguaton page, else "OK". The "normalize"
+  columns contains the normalized title if any. The "redirect" column contains
+  None if title is invalid or missing, else a list of redirects titles of the
+  page. Note that all redirected title to the target is included in this list.
+  The firts element in the list is the target title of the rest of the pages in
+  the list.
+
+  :param titles: A title or a list of titles to redirects search for.
+  :param project: The Wikimedia project, defaults "en.wikipedia.org"
+  :param chunksize: If the number of titles exceed chunksize (the limit is 50
+         for the MediaWiki API), then query are made in chunks if chunsize.
+  :param debug: For debugging purposes (default False). If debug='info'
+         information about chunked queries is shown. If debug='query' also the
+         query launched is shown.
+  :return A pandas Data-frame.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :example:
+  >>> m_Redirects(['Max', 'Eustaquio Celada', 'humanist', 'Cervante'], chunksize=4)
+  """
+  # Checking titles
+  titles = checkTitles(titles)
+  #
+  # Chunked requests?
+  n = len(titles)
+  if n>chunksize:
+    if debug:
+      print(f"INFO: The number of titles ({n}) exceeds the MediaWiki API limit ({chunksize}): doing chunked requests.", file=sys.stderr)
+    return doChunks(m_RedirectsDF, titles, chunksize, project=project, debug=debug)
+  ###
+  query = {
+      "format"       : "json",
+      "formatversion": "2",
+      "redirects"    : "1",        # Automatically resolve redirects in query+titles, etc.
+      "action"       : "query",
+      "prop"         : "redirects|pageprops",
+      "rdnamespace"  : "0",        # Only from namespace = 0
+      "rdprop"       : "title",
+      "rdlimit"      : "max",      # Change to 5 for testing
+      "ppprop"       : "wikibase_item|disambiguation",
+      "titles"       : '|'.join(titles),
+  }
+  #
+  output = dict()
+  #
+  while True:
+    j = reqMediaWiki(query=query, project=project, debug=debug)
+    #
+    if j is None or "query" not in j:
+      return None
+    #
+    q = j['query']
+    for title in titles:
+      output[title] = {'title': title}
+      #
+      normalized, target = normalizedTitle(title, q)
+      # Get the firts not None element:
+      anorm = next(n for n in [target, normalized, title] if n is not None)
+      #
+      for page in q['pages']:      # With formatversion=2 q["pages"] is a list
+        if anorm == page['title']:
+          item = None
+          # Any continue response includes the same "normalized" and "redirects" info
+          # When query is requested in the firts time, no "continue" key exists
+          # in the "query" dict; only it is possible in succesive continue request.
+          if 'continue' not in query:
+            if 'invalid' in page:      # Invalid response: ¿malformed title?
+              status = "invalid"
+            elif 'missing' in page:
+              status = "missing"
+            elif 'pageprops' not in page:    # No pageprops, so no wikidata_item
+              status = "no_pageprops"
+            elif 'wikibase_item' not in page['pageprops']:   # No wikibase_item
+              status = "no_wikibase_item"
+            else:
+              status = "disambiguation" if 'disambiguation' in page['pageprops'] else 'OK'
+              item = page['pageprops']['wikibase_item']
+
+            output[title].update({'status'    : status,
+                                  'normalized': normalized,
+                                  'target'    : target,
+                                  'entity'    : item})
+            #
+          output[title].update({'redirects' : [] if item is None else [anorm]})
+          if 'redirects' in page:   #  redirected titles
+            redirects = [r["title"] for r in page["redirects"]]
+          else:
+            redirects = []
+          #
+          output[title]['redirects'].extend(redirects)
+    # continue response
+    if 'continue' in j:
+      print("INFO: continue response.", file=sys.stderr)
+      query.update(j['continue'])
+    else:
+      break
+  # Check None
+  for k,v in output.items():
+    if len(v['redirects']) == 0:
+      v['redirects'] = None
+  # Finally return a DF
+  return pd.DataFrame.from_dict(output, orient='index')
+  return output
+
+
+#%% m_PagePrimaryImage(titles, project='en.wikipedia.org', chunksize=MW_LIMIT,
+#                      debug=False)
+@traced
+def m_PagePrimaryImage(titles, project='en.wikipedia.org', chunksize=MW_LIMIT,
+                       debug=False):
+  """
+  Use reqMediaWiki to return the URL of the image associated with the
+  Wikipedia pages, if any. Automatically resolves redirects. If a
+  title is invalid (contains forbidden characters) in the Wikimedia project,
+  the "status" column of the returned Pandas data-frame is set to "invalid." If
+  the title does not exist, that column is set to "missing". If the page title
+  exists, then  'OK' is set in that column. Note that additional columns are
+  "normalized" and "target". The "normalized" column contains the normalized
+  title of the page, if it is different from the original title, else None.
+  The "target" columns contains the title of the target page if any, else None.
+  For a title, if the status column is OK, then the column "image" constains
+  the image URL of the page, if any, else None. Note that the URL returned
+  by the API is percent-escaped.
+
+  Note that exists a action=query with prop=pageprop and ppprop="page_image_free"
+  which also returns the primary image of the page, but not complete URL is
+  returned with it. We want to know the complete URL for downloading de image
+  in the future, so the funtion uses prop=pageimages.
+
+  Note that duplicate titles are removed before searches. Note also that for
+  two different titles with the same normalized or target title, the same
+  information is returned for both.
+
+  See https://www.mediawiki.org/w/api.php?action=help&modules=query%2Bpageimages
+
+  :param titles: A title or a list of titles to search for.
+  :param project: Wikimedia project, defaults "en.wikipedia.org"
+  :param chunksize: If the number of titles exceed chunksize (the limit is 50
+         for the MediaWiki API), then query are made in chunks if chunsize.
+  :param debug: For debugging purposes (default False). If debug='info'
+         information about chunked queries is shown. If debug='query' also the
+         query launched is shown.
+  :return A Pandas data-frame with columns "status", "nomalized", "target"
+          and "image".
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :examples:
+  >>> m_PagePrimaryImage('Max Planck', project='es.wikipedia.org')
+             status normalized redirect image
+  Max Planck     OK       None     None https://upload.wikimedia.org/wikipedia/commons...
+
+  >>> m_PagePrimaryImage(['Max', 'Cervante', 'humanist'])
+             status normalized    target  image
+  Max            OK       None      None  None
+  Cervante  missing       None      None  None
+  humanist       OK   Humanist  Humanism  https://upload.wikimedia.org/wikipedia/commons...
+
+  >>> # Note that "a%CC%8C" is an "a" + combining caron (the diacritic mark: ˇ)
+  >>> a = requests.utils.unquote("a%CC%8C")
+  >>> m_PagePrimaryImage(['Max Planck', a, 'Max', 'Cervante', 'humanist'])
+               status normalized    target  image
+  Max Planck       OK       None      None  https://upload.wikimedia.org/wikipedia/commons...
+  ǎ               OK          Ǎ     Caron  None
+  Max              Ok       None      None  None
+  Cervante    missing       None      None  None
+  humanist         OK   Humanist  Humanism  https://upload.wikimedia.org/wikipedia/commons...
+  >>> # Search 3D films, get Wikipedia pages in English and get primary images.:
+  ... w = w_SearchByInstanceof(instanceof='Q229390', langsorder = 'en', debug = 'info')
+  ... wk = w_Wikipedias(w.entity, wikilangs='en')
+  ... films = wk.names[wk.names!='']
+  ... m = m_PagePrimaryImage(films, debug='info')
+  """
+  # Checking titles
+  titles = checkTitles(titles)
+  #
+  # Chunked requests?
+  n = len(titles)
+  if n>chunksize:
+    if debug:
+      print(f"INFO: The number of titles ({n}) exceeds the MediaWiki API limit ({MW_LIMIT}): doing chunked requests.", file=sys.stderr)
+    return doChunks(m_PagePrimaryImage, titles, chunksize, project=project, debug=debug)
+  ###
+  query = {"format"        : 'json',
+           "formatversion" : '2',
+           "redirects"     : '1',          # Automatically resolve redirects in query+titles, etc.
+           "action"        : 'query',
+           "prop"          : 'pageimages',
+           "piprop"        : 'original',
+           "pilimit"       : "max",        # Change to 2 to test
+           "titles"        : '|'.join(titles)}
+  #
+  output = dict()
+  #
+  # Note that for query "pageimages" continue responses are not expected
+  # to happen (only exists one image URL per page, if any)
+  j = reqMediaWiki(query=query, project=project, debug=debug)
+  #
+  if j is None or "query" not in j:
+    return None
+  #
+  q = j['query']
+  for title in titles:
+    normalized, target = normalizedTitle(title, q)
+    # Get the firts not None element:
+    anorm = next(n for n in [target, normalized, title] if n is not None)
+    #
+    for page in q['pages']:      # With formatversion=2 q["pages"] is a list
+      if anorm == page['title']:
+        image = None
+        if 'invalid' in page:      # Invalid response: ¿malformed title?
+          status = "invalid"
+        elif 'missing' in page:
+          status = "missing"
+        elif 'pageid' not in page:
+          status = 'no pageid'
+        else:
+          status = 'OK'
+          # image = ''
+          if 'original' in page and 'source' in page['original']:
+            image = page['original']['source']
+        #
+        output[title] = {'status'    : status,
+                         'normalized': normalized,
+                         'target'    : target,
+                         'image'     : image}
+  # Finally return de dict output as a Pantad data-frame.
+  return pd.DataFrame.from_dict(output, orient='index')
+
+
+#%% m_PageFiles(titles, project='en.wikipedia.org', chunksize=MW_LIMIT,
+#               exclude_ext='svg,webp,xcf', debug=False)
+@traced
+def m_PageFiles(titles, project='en.wikipedia.org', chunksize=MW_LIMIT,
+                exclude_ext='svg,webp,xcf', debug=False):
+  """
+  Search for all URL files in the Wikipedia pages, usually image files. Exclude
+  files with extensions in exclude_ext parameter. Also exclude files without
+  extension.
+
+  See https://en.wikipedia.org/w/api.php?action=help&modules=query%2Bimages
+
+  Note that this query returns the name of the files, not the URL of the files.
+  If you need the URL for downloding it is necessary to make a search for
+  imageinfo (see the function m_ImageURL()). Also note that the name of the
+  image is not percent-encoded, because it is not a URL. Also note that a
+  generator (see example) return all images, but not references which images
+  belongss to each title.
+  https://en.wikipedia.org/w/api.php?format=json&formatversion=2&redirects=1&action=query&generator=images&gimlimit=max&prop=imageinfo&iiprop=url&titles=Cervantes
+
+  :param titles: A title or a list of titles to search for.
+  :param project: Wikimedia project, defaults "en.wikipedia.org"
+  :param exclude_ext: Extensions of file to exclude in results. Default
+         'svg,webp,xcf'.
+  :return A Pandas data-frame with four columns. The "status" column is set to
+          "invalid", "missing" of "OK" if title is not valid, does not exists
+          o is valid, respectively. The "normalized" and "target" columns
+          contains the normalized and the page destiny if the original title
+          has any. The column "files" contains the files in the page (excluding
+          ones have extensions in the "exclude_ext" paramenter), as a Python
+          list.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :examples:
+  >>> # Search 3D films:
+  >>> # Search 3D films, get Wikipedia pages in English and get primary images.:
+  ... w = w_SearchByInstanceof(instanceof='Q229390', langsorder = 'en', debug = 'info')
+  ... wk = w_Wikipedias(w.entity, wikilangs='en')
+  ... films = wk.names[wk.names!='']
+  ... m = m_PageFiles(films, debug='info')
+  """
+  # Checking titles
+  titles = checkTitles(titles)
+  #
+  # Chunked requests?
+  n = len(titles)
+  if n>chunksize:
+    if debug:
+      print(f"INFO: The number of titles ({n}) exceeds the MediaWiki API limit ({MW_LIMIT}): doing chunked requests.", file=sys.stderr)
+    return doChunks(m_PageFiles, titles, chunksize, project=project,
+                       exclude_ext=exclude_ext, debug=debug)
+  #
+  # Extensions to exclude (ignoring case)
+  exts = [x.lower() for x in re.split('\W+', exclude_ext)]
+  ###
+  query = {"format"        : 'json',
+           "formatversion" : '2',
+           "redirects"     : '1',       # Automatically resolve redirects in query+titles, etc.
+           "action"        : 'query',
+           "prop"          : 'images',
+           "imlimit"       : 'max',
+           "titles"        : '|'.join(titles)}
+  #
+  output = dict()
+  #
+  while(True):  # While there are "continue" responses
+    j = reqMediaWiki(query=query, project=project, debug=debug)
+    #
+    q = j['query']
+    for title in titles:
+      normalized, target = normalizedTitle(title, q)
+      # Get the firts not None element:
+      anorm = next(n for n in [target, normalized, title] if n is not None)
+      #
+      for page in q['pages']:      # With formatversion=2 q["pages"] is a list
+        if anorm == page['title']:
+          # Any continue response includes the same "normalized" and "redirects" info
+          # When query is requested in the firts time, no "continue" key exists
+          # in the "query" dict; only it is possible in succesive continue request.
+          if 'continue' not in query:
+            if 'invalid' in page:      # Invalid response: ¿malformed title?
+              status = "invalid"
+            elif 'missing' in page:
+              status = "missing"
+            elif 'pageid' not in page:
+              status = 'no pageid'
+            else:
+              status = 'OK'
+            #
+            output[title] = {'status'    : status,
+                             'normalized': normalized,
+                             'target'    : target,
+                             'nfiles'    : 0,
+                             'files'     : None if status != 'OK' else []}
+            #
+          if 'images' in page:
+            images = list()
+            for image in page['images']:
+              img = image['title']
+              fn, ext = splitext(img)   # ext include the dot ".ext"
+              if ext=='' or ext[1:] in exts:
+                continue
+              images.append(image['title'])
+            output[title]['nfiles'] += len(images)
+            output[title]['files'].extend(images)
+    #
+    # continue response
+    if 'continue' in j:
+      print("INFO: continue response.", file=sys.stderr)
+      query.update(j['continue'])
+    else:
+      break
+  # Finally return de dict output as a Pantad data-frame.
+  return pd.DataFrame.from_dict(output, orient='index')
+
+#%% m_ImageURL(titles, project='en.wikipedia.org', chunksize=MW_LIMIT, debug=False)
+@traced
+def m_ImageURL(titles, project='en.wikipedia.org', chunksize=MW_LIMIT, debug=False):
+  """
+  Return the URL of the titles (titles in the File namespace, in which all of
+  Wikipedia's media content resides) in the Wikipedia project. Returns the URL
+  of the Wikimedia Commons space. Note that the titles must be prefixed with
+  a "file" prefix: "File:" in the English Wikipedia, "Archivo:" in the Spanish
+  Wikipedia and so on.
+
+  See https://www.mediawiki.org/w/api.php?action=help&modules=query%2Bimageinfo
+
+  :param titles: A titles or a list of titles to search for (prefixed with "File:").
+  :param project: Wikimedia project, defaults "en.wikipedia.org"
+  :return A dict with titles (file images) and the associated URL. The URL is
+          percent-escaped as returned by the API.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :examples:
+  >>> # Search 3D films
+  ... w = w_SearchByInstanceof(instanceof='Q229390', langsorder = 'en', debug = 'info')
+  ... films = list(w.entityLabel.values)
+  ... m = m_PageFiles(films, debug='info')
+  ... filenames = [f for l in m.files.values for f in l]
+  ... urls = m_ImageURL(filenames[:350], debug='info')
+  """
+  # Checking titles
+  titles = checkTitles(titles)
+  #
+  # Chunked requests?
+  n = len(titles)
+  if n>chunksize:
+    if debug:
+      print(f"INFO: The number of titles ({n}) exceeds the MediaWiki API limit ({MW_LIMIT}): doing chunked requests.", file=sys.stderr)
+    return doChunks(m_ImageURL, titles, chunksize, project=project, debug=debug)
+  ###
+  query = {"format"        : 'json',
+           "formatversion" : '2',
+           "redirects"     : '1',       # Automatically resolve redirects in query+titles, etc.
+           "action"        : 'query',
+           "prop"          : 'imageinfo',
+           "iiprop"        : "url",  #  "url|size",
+           "iilimit"       : 'max',
+           "titles"        : '|'.join(titles)}
+  #
+  output = dict()
+  #
+  # Note that for query "imageinfo" continue responses are not expected
+  # to happen (only exists one image URL per image, if any)
+  j = reqMediaWiki(query=query, project=project, debug=debug)
+  #
+  if j is None or "query" not in j:
+    return None
+  #
+  q = j['query']
+  for title in titles:
+    normalized, target = normalizedTitle(title, q)
+    # Get the firts not None element:
+    anorm = next(n for n in [target, normalized, title] if n is not None)
+    #
+    for page in q['pages']:      # With formatversion=2 q["pages"] is a list
+      if anorm == page['title']:
+        if 'known' in page:      # Note that "known" appears next to "missing"
+          status = 'OK'
+        elif 'invalid' in page:      # Invalid response: ¿malformed title?
+          status = "invalid"
+        elif 'missing' in page:
+          status = "missing"
+        elif "filehidden" in page:
+          status = "filehidden"
+        else:
+          status = 'OK'
+        #
+        output[title] = {'status'    : status,
+                         'normalized': normalized,
+                         'target'    : target,
+                         # 'URL'       : None if status != 'OK' else ""
+                         }
+        #
+        if 'imageinfo' in page: # formatversion2 returns a list with only one element
+          output[title]['URL'] = page['imageinfo'][0]['url']
+        else:
+          output[title]['URL'] = None
+  # Finally return de dict output as a Pantad data-frame.
+  return pd.DataFrame.from_dict(output, orient='index')
+
+
+#%% m_PageOutLinks(titles, project='en.wikipedia.org', chunksize=MW_LIMIT, debug=False)
+@traced
+def m_PageOutLinks(titles, project='en.wikipedia.org', chunksize=MW_LIMIT, debug=False):
+  """
+  Return for each page all outgoing links it has to other pages in the
+  Wikimedia project. Only in namespace 0. Note that redirects is in effect,
+  then the outgoing links from the target page are returned.
+
+  See https://www.mediawiki.org/w/api.php?action=help&modules=query%2Blinks
+
+  :param titles: A title or a list of titles to search for.
+  :param project: Wikimedia project, defaults "en.wikipedia.org"
+
+  :return A Pandas data-frame with four columns. The "status" column is set to
+          "invalid", "missing" of "OK" if title is not valid, does not exists
+          o is valid, respectively. The "normalized" and "target" columns
+          contains the normalized and the page destiny if the original title
+          has any. The column "links" contains the links to othes pages in the
+          Wikimedia project in namespace 0.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :examples
+  >>> # Search 3D films, get Wikipedia pages in English and get primary images.:
+  ... w = w_SearchByInstanceof(instanceof='Q229390', langsorder = 'en', debug = 'info')
+  ... wk = w_Wikipedias(w.entity, wikilangs='en')
+  ... films = wk.names[wk.names!='']
+  ... m = m_PageOutLinks(films[:25], debug='info')
+  """
+  # Checking titles
+  titles = checkTitles(titles)
+  #
+  # Chunked requests?
+  n = len(titles)
+  if n>chunksize:
+    if debug:
+      print(f"INFO: The number of titles ({n}) exceeds the MediaWiki API limit ({MW_LIMIT}): doing chunked requests.", file=sys.stderr)
+    return doChunks(m_PageOutLinks, titles, chunksize, project=project, debug=debug)
+  ###
+  query = {"format"        : 'json',
+           "formatversion" : '2',
+           "redirects"     : '1',        # Automatically resolve redirects in query+titles, etc.
+           "action"        : 'query',
+           "prop"          : 'links',
+           "plnamespace"   : '0',
+           "pllimit"       : 'max',
+           "titles"        : '|'.join(titles)}
+  #
+  output = dict()
+  #
+  while(True):  # While there are "continue" responses
+    j = reqMediaWiki(query=query, project=project, debug=debug)
+    #
+    if j is None or "query" not in j:
+      return None
+    #
+    q = j['query']
+    for title in titles:
+      normalized, target = normalizedTitle(title, q)
+      # Get the firts not None element:
+      anorm = next(n for n in [target, normalized, title] if n is not None)
+      #
+      for page in q['pages']:      # With formatversion=2 q["pages"] is a list
+        if anorm == page['title']:
+          # Any continue response includes the same "normalized" and "redirects" info
+          # When query is requested in the firts time, no "continue" key exists
+          # in the "query" dict; only it is possible in succesive continue request.
+          if 'continue' not in query:
+            if 'invalid' in page:      # Invalid response: ¿malformed title?
+              status = "invalid"
+            elif 'missing' in page:
+              status = "missing"
+            elif 'pageid' not in page:
+              status = 'no pageid'
+            else:
+              status = 'OK'
+            #
+            output[title] = {'status'    : status,
+                             'normalized': normalized,
+                             'target'    : target,
+                             'nlinks'    : 0,
+                             'links'     : None if status != 'OK' else []}
+            #
+          if 'links' in page:
+            links = [d['title'] for d in page['links']]
+            output[title]['nlinks'] += len(links)
+            output[title]['links'].extend(links)
+    #
+    # continue response
+    if 'continue' in j:
+      if debug:
+        print("  INFO: continue response.", file=sys.stderr)
+      query.update(j['continue'])
+    else:
+      break
+  # Finally return de dict output as a Pantad data-frame.
+  return pd.DataFrame.from_dict(output, orient='index')
+
+#%% m_PageInLinks(titles, project='en.wikipedia.org', redirects=True,
+#                 chunksize=MW_LIMIT, debug=False)
+@traced
+def m_PageInLinks(titles, project='en.wikipedia.org', redirects=True,
+                  chunksize=MW_LIMIT, debug=False):
+  """
+  Return for each page all incoming links it has from other pages in the
+  Wikimedia project (incoming_links). Only in namespace 0. Note that possible
+  redirects to the page are not included. If redirects=True, then the function
+  returns all incoming links to redirects and target page.
+
+  See https://www.mediawiki.org/w/api.php?action=help&modules=query%2Blinkshere
+
+  :param titles: A title or a list of titles to search for.
+  :param project: Wikimedia project, defaults "en.wikipedia.org"
+
+  :return A Pandas data-frame with four columns. The "status" column is set to
+          "invalid", "missing" of "OK" if title is not valid, does not exists
+          o is valid, respectively. The "normalized" and "target" columns
+          contains the normalized and the page destiny if the original title
+          has any. The column "linkshere" contains the in-links from other
+          pages in the Wikimedia project in namespace=0
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :examples
+  >>> # Search 3D films, get Wikipedia pages in English and get primary images.:
+  ... w = w_SearchByInstanceof(instanceof='Q229390', langsorder = 'en', debug = 'info')
+  ... wk = w_Wikipedias(w.entity, wikilangs='en')
+  ... films = wk.names[wk.names!='']
+  ... m = m_PageInLinks(films[:25], debug='info')
+  """
+  # Checking titles
+  titles = checkTitles(titles)
+  #
+  if redirects:
+    # Obtain all redirects of any target page in titles
+    titlestarget = m_Redirects(titles, project)
+    titles = [x for v in titlestarget.values() if v is not None for x in v ]  # Flatten the titlestarget
+    # Adding titles invalid or missing (title: None)
+    titles.extend([x for x in titlestarget.keys() if titlestarget[x] is None])
+    # Remove duplicates preserving order
+    titles = list(dict.fromkeys(titles))
+  #
+  # Chunked requests?
+  n = len(titles)
+  if debug and redirects:
+    print(f"INFO: Parameter 'redirects' is True: The number of redirects to all titles in list is: {n}.", file=sys.stderr)
+
+  if n>chunksize:
+    if debug:
+      print(f"INFO: The number of titles ({n}) exceeds the MediaWiki API limit ({MW_LIMIT}): doing chunked requests.", file=sys.stderr)
+      timeinit = time()
+      #
+    output=dict()
+    n = len(titles)
+    nlim = int(n/chunksize)
+    for k in range(nlim+1):
+      offset = k*chunksize
+      x_list = titles[offset:offset+chunksize]
+      if len(x_list)==0:
+        break
+      if debug:
+        t0=time()
+        print(f" INFO: Executing the function on elements from {offset+1} to {offset+len(x_list)}", end="", file=sys.stderr)
+      # Note that d is a dataframe
+      d = m_PageInLinks(x_list, project=project, redirects=False, chunksize=chunksize, debug=debug)
+      if debug:
+        print(f" ({time()-t0:.2f} seconds)", file=sys.stderr)
+      if (k==0):
+        output = d
+      else: # Note that d is a dataframe
+        output = pd.concat([output, d])
+    if debug:
+      print(f" INFO: Total time {time()-timeinit:.2f} seconds", file=sys.stderr)
+      #
+    if not redirects:
+      return output
+      #
+    # Redirects = True -> dataframe -> to dict -> to dataframe
+    outputtarget = dict()
+    for title,tredir in titlestarget.items():
+      outputtarget[title] = output.loc[title].to_dict()
+      if tredir is None:
+        continue
+      linkshere = []
+      for t in tredir:
+        linkshere.extend(output.loc[t]['linkshere'])
+      # Remove duplicates preserving order
+      linkshere = list(dict.fromkeys(linkshere))
+      outputtarget[title]['nlinks']    = len(linkshere)
+      outputtarget[title]['linkshere'] = linkshere
+    return pd.DataFrame.from_dict(outputtarget, orient='index')
+  #
+  query = {"format"        : 'json',
+           "formatversion" : '2',
+           # "redirects"     : '1',
+           "action"        : 'query',
+           "prop"          : 'linkshere',
+           "lhnamespace"   : '0',
+           "lhprop"        : "title",
+           # "lhshow"        : "!redirect",
+           "lhlimit"       : 'max',
+           "titles"        : '|'.join(titles)}
+  #
+  output = dict()
+  #
+  while(True):  # While there are "continue" responses
+    j = reqMediaWiki(query=query, project=project, debug=debug)
+    #
+    if j is None or "query" not in j:
+      return None
+    #
+    q = j['query']
+    #
+    for title in titles:
+      normalized, target = normalizedTitle(title, q)
+      # Get the firts not None element:
+      anorm = next(n for n in [target, normalized, title] if n is not None)
+      #
+      for page in q['pages']:      # With formatversion=2 q["pages"] is a list
+        if anorm == page['title']:
+          # Any continue response includes the same "normalized" and "redirects" info
+          # When query is requested in the firts time, no "continue" key exists
+          # in the "query" dict; only it is possible in succesive continue request.
+          if 'continue' not in query:
+            if 'invalid' in page:      # Invalid response: ¿malformed title?
+              status = "invalid"
+            elif 'missing' in page:
+              status = "missing"
+            elif 'pageid' not in page:
+              status = 'no pageid'
+            else:
+              status = 'OK'
+            #
+            output[title] = {'status'    : status,
+                             'normalized': normalized,
+                             'target'    : target,
+                             'nlinks'    : 0,
+                             'linkshere' : []}
+          if 'linkshere' in page:
+            links = [d['title'] for d in page['linkshere']]
+            output[title]['nlinks'] += len(links)
+            output[title]['linkshere'].extend(links)
+    #
+    # continue response
+    if 'continue' in j:
+      if debug:
+        print("  INFO: continue response.", file=sys.stderr)
+      query.update(j['continue'])
+    else:
+      break
+
+  # Finally return de dict output as a Panda data-frame.
+  if not redirects:
+    return pd.DataFrame.from_dict(output, orient='index')
+  # Redirects = True
+  outputtarget = dict()
+  for title,tredir in titlestarget.items():
+    outputtarget[title] = output[title]
+    if tredir is None:
+      continue
+    linkshere = []
+    for t in tredir:
+      linkshere.extend(output[t]['linkshere'])
+    # Remove duplicates preserving order
+    linkshere = list(dict.fromkeys(linkshere))
+    outputtarget[title]['nlinks']    = len(linkshere)
+    outputtarget[title]['linkshere'] = linkshere
+  return pd.DataFrame.from_dict(outputtarget, orient='index')
+
+
+#%% -- MediaWiki SQL dumps ---------------------------------------------------
+# The SQL dumps of a Wikimedia project (https://dumps.wikimedia.org/eswiki/)
+# contain its database tables as MySQL INSERT statements. The tables page,
+# page_props, redirect, pagelinks and linktarget are loaded (only namespace 0)
+# in a local SQLite database (see MediaWikiDump), without a MySQL server, and
+# the md_* functions return the same information as m_WikidataEntity,
+# m_Redirects, m_PageOutLinks and m_PageInLinks, which are very slow for all
+# the pages of a project.
+
+_sql_token = re.compile(r"\(|\)|'((?:[^'\\]|\\.)*)'|NULL|[^,()'\s;]+", re.S)
+_sql_escape = re.compile(r"\\(.)", re.S)
+_sql_escapes = {'0': '\0', 'n': '\n', 'r': '\r', 't': '\t', 'Z': '\x1a', 'b': '\b'}
+
+#%% sqlInsertRows(line)
+def sqlInsertRows(line):
+  """
+  Parse a MySQL "INSERT INTO `table` VALUES (...),(...);" statement (a line of
+  a SQL dump) and return a list of tuples. Strings are unescaped, numbers are
+  returned as int (or float), and NULL as None.
+  """
+  rows = []
+  row = None
+  for m in _sql_token.finditer(line, line.find(' VALUES ') + 8):
+    tok = m.group(0)
+    if tok == '(':
+      row = []
+    elif tok == ')':
+      rows.append(tuple(row))
+      row = None
+    elif row is None:
+      continue
+    elif m.group(1) is not None:
+      s = m.group(1)
+      if '\\' in s:
+        s = _sql_escape.sub(lambda e: _sql_escapes.get(e.group(1), e.group(1)), s)
+      row.append(s)
+    elif tok == 'NULL':
+      row.append(None)
+    else:
+      try:
+        row.append(int(tok))
+      except ValueError:
+        row.append(float(tok))
+  return rows
+
+
+#%% sqlDumpRows(path)
+def sqlDumpRows(path):
+  """
+  Stream a MediaWiki SQL dump file (see dumpLines). Return a tuple (table,
+  columns, rows): the name of the table and its columns (from the CREATE
+  TABLE statement) and a generator of lists of rows (tuples), one list for
+  each INSERT statement.
+  """
+  lines = dumpLines(path)
+  table = None
+  columns = []
+  for line in lines:
+    m = re.match(r"CREATE TABLE `(\w+)`", line)
+    if m is not None:
+      table = m.group(1)
+      for line in lines:
+        if line.startswith(')'):
+          break
+        m = re.match(r"\s+`(\w+)`", line)
+        if m is not None:
+          columns.append(m.group(1))
+      break
+  if table is None:
+    raise ValueError(f"ERROR: {path} is not a SQL dump (no CREATE TABLE statement).")
+  #
+  def inserts():
+    for line in lines:
+      if line.startswith('INSERT INTO'):
+        yield sqlInsertRows(line)
+  return table, columns, inserts()
+
+
+#%% class MediaWikiDump(path)
+class MediaWikiDump:
+  """
+  Local index (a SQLite database) of the pages, redirects, Wikidata entities
+  and links of a Wikimedia project, loaded from its SQL dumps. Only pages in
+  namespace 0 are loaded. Titles are stored with spaces, as the MediaWiki API
+  returns them.
+
+  The dumps are loaded with the 'load' method, in any order. The pagelinks
+  dumps of the current schema (pl_target_id) need the linktarget dump; the
+  old schema (pl_namespace, pl_title) is also supported.
+
+  :param path: The file of the SQLite database (created if not exists).
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :example
+  >>> dump = MediaWikiDump('eswiki.sqlite')
+  >>> dump.load('eswiki-latest-page.sql.gz', 'eswiki-latest-page_props.sql.gz',
+  ...           'eswiki-latest-redirect.sql.gz', 'eswiki-latest-linktarget.sql.gz',
+  ...           'eswiki-latest-pagelinks.sql.gz', debug=True)
+  >>> md_WikidataEntity(dump, ['Max Planck', 'Cervante'])
+  """
+  def __init__(self, path):
+    self.path = path
+    self.con = sqlite3.connect(path)
+    with self.con:
+      self.con.execute("""CREATE TABLE IF NOT EXISTS page (
+        id INTEGER PRIMARY KEY, title TEXT, redirect INTEGER)""")
+      self.con.execute("""CREATE TABLE IF NOT EXISTS props (
+        page INTEGER PRIMARY KEY, entity TEXT, disambiguation INTEGER)""")
+      self.con.execute("""CREATE TABLE IF NOT EXISTS redirect (
+        page INTEGER PRIMARY KEY, target TEXT)""")
+      self.con.execute("""CREATE TABLE IF NOT EXISTS linktarget (
+        id INTEGER PRIMARY KEY, title TEXT)""")
+      # Unique before loading: the old pagelinks schema inserts the titles
+      # with INSERT OR IGNORE
+      self.con.execute("CREATE UNIQUE INDEX IF NOT EXISTS linktarget_title ON linktarget(title)")
+      # A dump loaded again does not duplicate the links
+      self.con.execute("""CREATE TABLE IF NOT EXISTS links (
+        source INTEGER, target INTEGER, PRIMARY KEY (source, target))""")
+
+  def close(self):
+    self.con.close()
+
+  def load(self, *paths, debug=False):
+    """
+    Load the SQL dumps (page, page_props, redirect, linktarget or pagelinks;
+    the table is obtained from the dump) and build the indexes.
+    """
+    self.con.execute("PRAGMA journal_mode=OFF")
+    self.con.execute("PRAGMA synchronous=OFF")
+    for path in paths:
+      t0 = time()
+      table, columns, inserts = sqlDumpRows(path)
+      if debug:
+        print(f"INFO: Loading table '{table}' from {path}", end="", file=sys.stderr)
+      loader = getattr(self, '_load_' + table, None)
+      if loader is None:
+        raise ValueError(f"ERROR: table '{table}' is not supported.")
+      c = {x:i for i,x in enumerate(columns)}
+      n = 0
+      with self.con:
+        for rows in inserts:
+          n += loader(c, rows)
+      if debug:
+        print(f" ({n} rows, {time()-t0:.2f} seconds)", file=sys.stderr)
+    with self.con:
+      self.con.execute("CREATE UNIQUE INDEX IF NOT EXISTS page_title ON page(title)")
+      self.con.execute("CREATE INDEX IF NOT EXISTS redirect_target ON redirect(target)")
+      self.con.execute("CREATE INDEX IF NOT EXISTS links_target ON links(target)")
+
+  def _load_page(self, c, rows):
+    ns, id, title, redirect = c['page_namespace'], c['page_id'], c['page_title'], c['page_is_redirect']
+    rows = [(r[id], r[title].replace('_', ' '), r[redirect]) for r in rows if r[ns] == 0]
+    self.con.executemany("INSERT OR REPLACE INTO page VALUES (?,?,?)", rows)
+    return len(rows)
+
+  def _load_page_props(self, c, rows):
+    page, name, value = c['pp_page'], c['pp_propname'], c['pp_value']
+    entity = [(r[page], r[value]) for r in rows if r[name] == 'wikibase_item']
+    disamb = [(r[page],) for r in rows if r[name] == 'disambiguation']
+    self.con.executemany("""INSERT INTO props VALUES (?,?,0)
+      ON CONFLICT(page) DO UPDATE SET entity=excluded.entity""", entity)
+    self.con.executemany("""INSERT INTO props VALUES (?,NULL,1)
+      ON CONFLICT(page) DO UPDATE SET disambiguation=1""", disamb)
+    return len(entity) + len(disamb)
+
+  def _load_redirect(self, c, rows):
+    page, ns, title, iw = c['rd_from'], c['rd_namespace'], c['rd_title'], c['rd_interwiki']
+    rows = [(r[page], r[title].replace('_', ' ')) for r in rows
+            if r[ns] == 0 and not r[iw]]
+    self.con.executemany("INSERT OR REPLACE INTO redirect VALUES (?,?)", rows)
+    return len(rows)
+
+  def _load_linktarget(self, c, rows):
+    id, ns, title = c['lt_id'], c['lt_namespace'], c['lt_title']
+    rows = [(r[id], r[title].replace('_', ' ')) for r in rows if r[ns] == 0]
+    self.con.executemany("INSERT OR REPLACE INTO linktarget VALUES (?,?)", rows)
+    return len(rows)
+
+  def _load_pagelinks(self, c, rows):
+    source, fromns = c['pl_from'], c['pl_from_namespace']
+    if 'pl_target_id' in c:
+      target = c['pl_target_id']
+      rows = [(r[source], r[target]) for r in rows if r[fromns] == 0]
+    else:
+      # Old schema: the titles are stored in the linktarget table
+      ns, title = c['pl_namespace'], c['pl_title']
+      titles = list({r[title].replace('_', ' ') for r in rows if r[fromns] == 0 and r[ns] == 0})
+      self.con.executemany("INSERT OR IGNORE INTO linktarget(title) VALUES (?)",
+                           [(t,) for t in titles])
+      ids = dict()
+      for chunk in range(0, len(titles), 500):
+        tt = titles[chunk:chunk+500]
+        ids.update(self.con.execute(f"""SELECT title, id FROM linktarget
+          WHERE title IN ({','.join('?'*len(tt))})""", tt).fetchall())
+      rows = [(r[source], ids[r[title].replace('_', ' ')]) for r in rows
+              if r[fromns] == 0 and r[ns] == 0]
+    self.con.executemany("INSERT OR IGNORE INTO links VALUES (?,?)", rows)
+    return len(rows)
+
+  def resolve(self, title, redirects=True):
+    """
+    Return a dict with the 'status' ('invalid', 'missing' or 'OK'),
+    'normalized', 'target' and 'page' (the id of the target page) of the
+    title, as the MediaWiki API resolves it with redirects=1 (or without
+    following redirects if redirects=False).
+    """
+    anorm = normalizeTitle(title)
+    normalized = None if anorm == title else anorm
+    output = {'status': 'OK', 'normalized': normalized, 'target': None, 'page': None}
+    if anorm == '':
+      output['status'] = 'invalid'
+      return output
+    row = self.con.execute("SELECT id, redirect FROM page WHERE title=?", (anorm,)).fetchone()
+    if redirects and row is not None and row[1]:
+      target = self.con.execute("SELECT target FROM redirect WHERE page=?", (row[0],)).fetchone()
+      if target is not None:
+        output['target'] = target[0]
+        row = self.con.execute("SELECT id, redirect FROM page WHERE title=?", target).fetchone()
+    if row is None:
+      output['status'] = 'missing'
+    else:
+      output['page'] = row[0]
+    return output
+
+  def title(self, page):
+    """The title of a page id."""
+    return self.con.execute("SELECT title FROM page WHERE id=?", (page,)).fetchone()[0]
+
+  def redirects(self, title):
+    """The titles of the pages which redirect to the title."""
+    return [x for x, in self.con.execute("""SELECT page.title FROM redirect
+      JOIN page ON page.id=redirect.page WHERE redirect.target=?""", (title,))]
+
+  def outlinks(self, page):
+    """The titles of the pages (namespace 0) linked from the page id."""
+    return [x for x, in self.con.execute("""SELECT linktarget.title FROM links
+      JOIN linktarget ON linktarget.id=links.target WHERE links.source=?""", (page,))]
+
+  def inlinks(self, title):
+    """The titles of the pages (namespace 0) which link to the title."""
+    return [x for x, in self.con.execute("""SELECT page.title FROM linktarget
+      JOIN links ON links.target=linktarget.id JOIN page ON page.id=links.source
+      WHERE linktarget.title=?""", (title,))]
+
+
+#%% normalizeTitle(title)
+def normalizeTitle(title):
+  """
+  Normalize a page title as MediaWiki does (for the projects in which the first
+  letter is case insensitive): NFC normalization, underscores as spaces,
+  consecutive spaces collapsed and the first letter in uppercase.
+  """
+  title = unicodedata.normalize('NFC', title).replace('_', ' ')
+  title = re.sub(r'\s+', ' ', title).strip()
+  return title[:1].upper() + title[1:]
+
+
+#%% md_WikidataEntity(dump, titles)
+@traced
+def md_WikidataEntity(dump, titles):
+  """
+  Same as m_WikidataEntity, but using the SQL dumps of the project loaded in
+  a MediaWikiDump.
+
+  :param dump: A MediaWikiDump.
+  :param titles: A title or a list of titles to search for.
+  :return The same data-frame as m_WikidataEntity.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  """
+  titles = checkTitles(titles)
+  output = dict()
+  for title in titles:
+    r = dump.resolve(title)
+    item = None
+    status = r['status']
+    if status == 'OK':
+      props = dump.con.execute("SELECT entity, disambiguation FROM props WHERE page=?",
+                               (r['page'],)).fetchone()
+      if props is None:
+        status = "no_pageprops"
+      elif props[0] is None:
+        status = "no_wikibase_item"
+      else:
+        status = "disambiguation" if props[1] else 'OK'
+        item = props[0]
+    output[title] = {'status'    : status,
+                     'normalized': r['normalized'],
+                     'target'    : r['target'],
+                     'entity'    : item}
+  return pd.DataFrame.from_dict(output, orient='index')
+
+
+#%% md_Redirects(dump, titles)
+@traced
+def md_Redirects(dump, titles):
+  """
+  Same as m_Redirects, but using the SQL dumps of the project loaded in a
+  MediaWikiDump.
+
+  :param dump: A MediaWikiDump.
+  :param titles: A title or a list of titles to redirects search for.
+  :return The same dict as m_Redirects.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  """
+  titles = checkTitles(titles)
+  output = dict()
+  for title in titles:
+    r = dump.resolve(title)
+    if r['status'] != 'OK':
+      output[title] = None
+      continue
+    anorm = dump.title(r['page'])
+    output[title] = [anorm] + dump.redirects(anorm)
+  return output
+
+
+#%% md_PageOutLinks(dump, titles)
+@traced
+def md_PageOutLinks(dump, titles):
+  """
+  Same as m_PageOutLinks, but using the SQL dumps of the project loaded in a
+  MediaWikiDump.
+
+  :param dump: A MediaWikiDump.
+  :param titles: A title or a list of titles to search for.
+  :return The same data-frame as m_PageOutLinks.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  """
+  titles = checkTitles(titles)
+  output = dict()
+  for title in titles:
+    r = dump.resolve(title)
+    links = None if r['status'] != 'OK' else dump.outlinks(r['page'])
+    output[title] = {'status'    : r['status'],
+                     'normalized': r['normalized'],
+                     'target'    : r['target'],
+                     'nlinks'    : 0 if links is None else len(links),
+                     'links'     : links}
+  return pd.DataFrame.from_dict(output, orient='index')
+
+
+#%% md_PageInLinks(dump, titles, redirects=True)
+@traced
+def md_PageInLinks(dump, titles, redirects=True):
+  """
+  Same as m_PageInLinks, but using the SQL dumps of the project loaded in a
+  MediaWikiDump. If redirects=True, the incoming links to the redirects of
+  the page are also included.
+
+  :param dump: A MediaWikiDump.
+  :param titles: A title or a list of titles to search for.
+  :param redirects: Include the incoming links to the redirects.
+  :return The same data-frame as m_PageInLinks.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  """
+  titles = checkTitles(titles)
+  output = dict()
+  for title in titles:
+    r = dump.resolve(title, redirects)
+    linkshere = []
+    if r['status'] == 'OK':
+      anorm = dump.title(r['page'])
+      tredir = [anorm] + (dump.redirects(anorm) if redirects else [])
+      for t in tredir:
+        linkshere.extend(dump.inlinks(t))
+      # Remove duplicates preserving order
+      linkshere = list(dict.fromkeys(linkshere))
+    output[title] = {'status'    : r['status'],
+                     'normalized': r['normalized'],
+                     'target'    : r['target'],
+                     'nlinks'    : len(linkshere),
+                     'linkshere' : linkshere}
+  return pd.DataFrame.from_dict(output, orient='index')
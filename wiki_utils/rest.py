@@ -0,0 +1,596 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Functions which use the WikiMedia REST API (pageviews) and XTools.
+
+@author: Angel Zazo <angelzazo@usal.es>
+"""
+
+#%% Imports
+import sys
+from time import time
+import requests
+import pandas as pd
+import numpy as np
+from collections import Counter
+import threading
+import json
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from .common import REST_RATE, RateLimiter, doConcurrent, reqREST, traced
+from .mediawiki import checkTitles, m_Redirects
+
+
+#%% -- WikiMedia REST API ------------------------------------------------------
+#  The Wikimedia REST API provides e.g. pageviews and aggregate edit stats
+#' See https://www.mediawiki.org/wiki/Wikimedia_REST_API
+#' See https://www.mediawiki.org/wiki/XTools/API/Page (xtools.wmcloud.org)
+#' See https://en.wikipedia.org/api/rest_v1/
+#'
+#' Note that this API uses "article" to refer a page title. We also use this
+#' approach. In this API only one article is allowed in each request.
+
+#%% pageviewsURL(article, start, end, project, access, agent, granularity)
+def pageviewsURL(article, start, end, project="en.wikipedia.org",
+                 access="all-access", agent="all-agents", granularity="monthly"):
+  """
+  Return the URL of the Wikimedia REST API to get the number of views of one
+  article (see m_PageViews). The article title is percent-encoded (also "/").
+  """
+  art = requests.utils.quote(article.replace(" ", "_"), safe='')
+  return ("https://wikimedia.org/api/rest_v1/metrics/pageviews/per-article/"
+          f"{project}/{access}/{agent}/{art}/{granularity}/{start}/{end}")
+
+
+#%% MetricsCache(path, ttl=7*24*3600, margin=2)
+class MetricsCache:
+  """
+  Local cache (a SQLite database) for the number of views of articles
+  (Wikimedia REST API) and for the XTools responses.
+
+  Pageviews are stored by time bucket (day or month), with key (project,
+  access, agent, article, granularity, bucket). The views of a closed bucket
+  never change, so they are stored permanently; a bucket is closed if it ended
+  more than 'margin' days ago (the API publishes the data of a day some hours
+  later). Open buckets are never stored, so they are always requested.
+
+  The XTools responses (see m_PageInfoType and m_PageInfo) change with the
+  page, so they are stored with the time they were obtained, and they are
+  valid only for 'ttl' seconds.
+
+  The cache is safe to be used from several threads.
+
+  :param path: The file of the SQLite database (created if not exists).
+  :param ttl: Time-to-live of the XTools responses, in seconds (default 7 days).
+  :param margin: Number of days after which a bucket is closed (default 2).
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :example
+  >>> cache = MetricsCache('metrics.sqlite')
+  >>> v = m_PageViews('Max Planck', '20230101', '20231231', cache=cache)
+  >>> # Only the months after 2023 are requested to the API:
+  ... v = m_PageViews('Max Planck', '20230101', '20240630', cache=cache)
+  """
+  def __init__(self, path, ttl=7*24*3600, margin=2):
+    self.path = path
+    self.ttl = ttl
+    self.margin = margin
+    self.lock = threading.Lock()
+    self.con = sqlite3.connect(path, check_same_thread=False)
+    with self.lock, self.con:
+      self.con.execute("""CREATE TABLE IF NOT EXISTS pageviews (
+        project TEXT, access TEXT, agent TEXT, article TEXT, granularity TEXT,
+        bucket TEXT, views INTEGER,
+        PRIMARY KEY (project, access, agent, article, granularity, bucket))""")
+      self.con.execute("""CREATE TABLE IF NOT EXISTS xtools (
+        project TEXT, infotype TEXT, article TEXT, fetched REAL, response TEXT,
+        PRIMARY KEY (project, infotype, article))""")
+
+  def close(self):
+    self.con.close()
+
+  def isClosed(self, bucketend):
+    """True if the bucket which ends on date 'bucketend' is closed."""
+    today = datetime.now(timezone.utc).date()
+    return bucketend <= today - timedelta(days=self.margin)
+
+  def getViews(self, project, access, agent, article, granularity, buckets):
+    """Return a dict bucket -> views of the cached buckets in 'buckets'."""
+    if len(buckets) == 0:
+      return dict()
+    with self.lock:
+      rows = self.con.execute("""SELECT bucket, views FROM pageviews
+        WHERE project=? AND access=? AND agent=? AND article=? AND granularity=?
+        AND bucket BETWEEN ? AND ?""",
+        (project, access, agent, article, granularity, min(buckets), max(buckets))).fetchall()
+    return {b:v for b,v in rows if b in buckets}
+
+  def putViews(self, project, access, agent, article, granularity, views):
+    """Store the views of closed buckets: 'views' is a dict bucket -> views."""
+    rows = [(project, access, agent, article, granularity, b, v) for b,v in views.items()]
+    with self.lock, self.con:
+      self.con.executemany("INSERT OR REPLACE INTO pageviews VALUES (?,?,?,?,?,?,?)", rows)
+
+  def getXTools(self, project, infotype, article):
+    """Return the cached XTools response if it is not expired, else None."""
+    with self.lock:
+      row = self.con.execute("""SELECT fetched, response FROM xtools
+        WHERE project=? AND infotype=? AND article=?""",
+        (project, infotype, article)).fetchone()
+    if row is None or time() - row[0] > self.ttl:
+      return None
+    return json.loads(row[1])
+
+  def putXTools(self, project, infotype, article, response):
+    """Store the XTools response."""
+    with self.lock, self.con:
+      self.con.execute("INSERT OR REPLACE INTO xtools VALUES (?,?,?,?,?)",
+                       (project, infotype, article, time(), json.dumps(response)))
+
+
+#%% pageviewsBuckets(start, end, granularity)
+def pageviewsBuckets(start, end, granularity):
+  """
+  Return the time buckets (days or months) which overlap the interval from
+  'start' to 'end' (format YYYYMMDD or YYYYMMDDHH). Each bucket is a tuple
+  (timestamp, first day, last day, inside), where timestamp has the format
+  of the Wikimedia REST API (YYYYMMDD00) and 'inside' is True if the bucket
+  is fully inside the interval.
+  """
+  first = datetime.strptime(str(start)[:8], '%Y%m%d').date()
+  last  = datetime.strptime(str(end)[:8], '%Y%m%d').date()
+  buckets = []
+  if granularity == 'daily':
+    d = first
+    while d <= last:
+      buckets.append((f"{d:%Y%m%d}00", d, d, True))
+      d += timedelta(days=1)
+  elif granularity == 'monthly':
+    d = first.replace(day=1)
+    while d <= last:
+      nextmonth = (d + timedelta(days=32)).replace(day=1)
+      dlast = nextmonth - timedelta(days=1)
+      buckets.append((f"{d:%Y%m%d}00", d, dlast, d >= first and dlast <= last))
+      d = nextmonth
+  else:
+    raise ValueError(f"Granularity '{granularity}' is not supported")
+  return buckets
+
+
+#%% cachedPageViews(article, start, end, project, access, agent, granularity,
+#                   cache=None, limiter=None, debug=False)
+def cachedPageViews(article, start, end, project="en.wikipedia.org",
+                    access="all-access", agent="all-agents",
+                    granularity="monthly", cache=None, limiter=None, debug=False):
+  """
+  Return a dict timestamp -> views of one article (no redirects), requesting
+  to the Wikimedia REST API only the buckets which are not in the cache (a
+  MetricsCache), if any. Only one request is made, from the first to the
+  last missing bucket. The closed buckets requested are stored in the cache
+  (with 0 views if the API returns nothing for them). Buckets with 0 views
+  are not included in the returned dict, as the API does.
+  """
+  if cache is None:
+    url = pageviewsURL(article, start, end, project, access, agent, granularity)
+    j = reqREST(url, limiter=limiter, debug=debug)
+    if j is None or 'items' not in j:
+      return dict()
+    return {item['timestamp']:item['views'] for item in j['items']}
+  #
+  key = (project, access, agent, article, granularity)
+  buckets = pageviewsBuckets(start, end, granularity)
+  cached = cache.getViews(*key, {b[0] for b in buckets if b[3]})
+  missing = [b for b in buckets if b[0] not in cached]
+  views = {b:v for b,v in cached.items() if v > 0}
+  if len(missing) == 0:
+    return views
+  # Request from the first to the last missing bucket (within start-end)
+  if missing[0][0] == buckets[0][0]:
+    mstart = str(start)
+  else:
+    mstart = f"{missing[0][1]:%Y%m%d}"
+  if missing[-1][0] == buckets[-1][0]:
+    mend = str(end)
+  else:
+    mend = f"{missing[-1][2]:%Y%m%d}"
+  url = pageviewsURL(article, mstart, mend, project, access, agent, granularity)
+  j = reqREST(url, limiter=limiter, debug=debug)
+  fetched = dict()
+  if j is not None and 'items' in j:
+    fetched = {item['timestamp']:item['views'] for item in j['items']}
+  views.update({b:v for b,v in fetched.items() if v > 0})
+  # Store the closed buckets fully inside the interval
+  closed = {b[0]:fetched.get(b[0], 0) for b in missing if b[3] and cache.isClosed(b[2])}
+  if len(closed) > 0:
+    cache.putViews(*key, closed)
+  return views
+
+
+#%% m_PageViews(article, start, stop, project, access, agent, granularity)
+@traced
+def m_PageViews(article,           # title of the article (without "_")
+      start, end,                  # first/last day to include (YYYYMMDD or YYYYMMDDHH)
+      project = "en.wikipedia.org", # Filter by Wikimedia project
+      access  = "all-access",       # Filter by access method: all-access, desktop, mobile-app, mobile-web
+      agent   = "all-agents",       # Filter by agent type: all-agents, user, spider, automated
+      granularity = "monthly",      # time unit for the response data: daily, monthly
+      redirects = False,
+      cache = None,
+      debug=False):
+  """
+  Use the Wikimedia REST API (https://wikimedia.org/api/rest_v1/) to get the
+  number of views one article has in a Wikimedia project in a date interval
+  (see granularity). If redirect=True, then get the number of views of all
+  articles that redirects to the article which is the target of the original
+  page.
+
+  The API has a rate limit of 100 req/s, but with a sequential search the speed
+  limit is never reached due to network latency. For many articles use
+  the m_PageViewsBatch function, which makes concurrent requests.
+  [See https://wikimedia.org/api/rest_v1/#/Pageviews%20data]
+
+  :param article: The title of the article to search. Only one article is allowed.
+  :param start,end: First and last day to include (format YYYYMMDD or YYYYMMDDHH)
+  :param project: The Wikimedia project, defaults en.wikipedia.org
+  :param access:  Filter by access method: all-access (default), desktop, mobile-app, mobile-web
+  :param agent:   Filter by agent type: all-agents, user (default), spider, automated
+  :param granularity:  Time unit for the response data: daily, monthly (default)
+  :param redirects: Boolean for including the views of all redirections of the
+         page (defaults: False). If redirects=True then the "normalized" column
+         element of the returned data-frame contains the target of the
+         redirection, and the "index" element contains the original title of
+         the article.  If a page is just a target of other pages, and you want
+         to know the total number of views that page have (including views of
+         redirections), it is also necessary set redirects=True, otherwise only
+         you have the views of that page.
+  :param cache: A MetricsCache to store the views of closed days or months.
+         If set, only the buckets not in the cache are requested to the API
+         (default None: no cache).
+  :param debug: If True shows the query launched.
+  :return A Counter with the number of views by granularity.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  """
+  if article.strip() == '':
+    return None
+
+  articles = [article]
+  if redirects:
+    r = m_Redirects(article, project)
+    if r[article] is not None:  # None if article is invalid or missing
+      articles = r[article]
+
+  views = Counter()
+  for art in articles:
+    views.update(cachedPageViews(art, start, end, project, access, agent,
+                                 granularity, cache=cache, debug=debug))
+  #
+  return views
+
+#%% m_PageViewsBatch(articles, start, end, project, access, agent, granularity,
+#                    redirects=False, max_workers=16, rate=REST_RATE, stream=False,
+#                    cache=None, debug=False)
+@traced
+def m_PageViewsBatch(articles, start, end, project="en.wikipedia.org",
+                     access="all-access", agent="all-agents",
+                     granularity="monthly", redirects=False, max_workers=16,
+                     rate=REST_RATE, stream=False, cache=None, debug=False):
+  """
+  Batch version of m_PageViews: get the number of views of many articles of a
+  Wikimedia project in a date interval using the Wikimedia REST API. The
+  per-article requests are made concurrently (see doConcurrent), using at most
+  'rate' requests per second (the API limit is 100 req/s).
+
+  If redirects=True, the redirects of all articles are obtained first (using
+  m_Redirects, in chunks) and the views of the redirects are folded into the
+  views of the article (note that two articles with the same target page
+  get the same views). Each distinct page is requested only once.
+
+  :param articles: A title or a list of titles of the articles.
+  :param start,end: First and last day to include (format YYYYMMDD or YYYYMMDDHH)
+  :param project: The Wikimedia project, defaults en.wikipedia.org
+  :param access:  Filter by access method: all-access (default), desktop, mobile-app, mobile-web
+  :param agent:   Filter by agent type: all-agents (default), user, spider, automated
+  :param granularity:  Time unit for the response data: daily, monthly (default)
+  :param redirects: If True, include the views of all redirections of the
+         pages (defaults: False).
+  :param max_workers: Maximum number of concurrent requests.
+  :param rate: Maximum number of requests per second.
+  :param stream: If False (default), returns a data-frame. If True returns a
+         generator which yields tuples in long format (article, page,
+         timestamp, views) as the responses arrive, where 'page' is the
+         article itself or one of its redirects.
+  :param cache: A MetricsCache to store the views of closed days or months
+         (see m_PageViews). Default None: no cache.
+  :param debug: For debugging purposes (default False). If debug='info'
+         information about the progress is shown. If debug='query' also the
+         URLs requested are shown.
+  :return A Pandas data-frame of integers with one row per article (index)
+          and one column per timestamp (YYYYMMDDHH, sorted), or a generator
+          if stream=True. Articles without views have a row of zeros.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :example
+  >>> v = m_PageViewsBatch(['Max Planck', 'Albert Einstein'], '20230101', '20231231')
+  >>> v = m_PageViewsBatch(['Max Planck', 'Albert Einstein'], '20230101', '20230131',
+                           granularity='daily', redirects=True)
+  >>> for article, page, timestamp, views in m_PageViewsBatch(l, '20230101',
+  ...                                     '20231231', stream=True):
+  ...   pass
+  """
+  articles = checkTitles(articles)
+  #
+  # pages: dict page -> list of articles in which its views are folded
+  pages = dict()
+  if redirects:
+    if debug:
+      print(f"INFO: Searching redirects of {len(articles)} articles.", file=sys.stderr)
+    r = m_Redirects(articles, project, debug=debug) or {}  # None if the request fails
+    for article in articles:
+      for page in (r.get(article) or [article]):
+        pages.setdefault(page, []).append(article)
+  else:
+    pages = {article:[article] for article in articles}
+  if debug:
+    print(f"INFO: Requesting the views of {len(pages)} pages.", file=sys.stderr)
+  #
+  limiter = RateLimiter(rate)
+  def fetch(page):
+    views = cachedPageViews(page, start, end, project, access, agent, granularity,
+                            cache=cache, limiter=limiter, debug=(debug=='query'))
+    return sorted(views.items())
+  #
+  def rows():
+    for page, items, error in doConcurrent(fetch, pages, max_workers=max_workers):
+      if error is not None:
+        raise error
+      for article in pages[page]:
+        for timestamp, views in items:
+          yield (article, page, timestamp, views)
+  #
+  if stream:
+    return rows()
+  #
+  df = pd.DataFrame(list(rows()), columns=['article', 'page', 'timestamp', 'views'])
+  timestamps = np.sort(df.timestamp.unique())
+  matrix = np.zeros((len(articles), len(timestamps)), dtype=np.int64)
+  irow = pd.Index(articles).get_indexer(df.article)
+  icol = pd.Index(timestamps).get_indexer(df.timestamp)
+  np.add.at(matrix, (irow, icol), df.views.to_numpy(dtype=np.int64))
+  return pd.DataFrame(matrix, index=articles, columns=timestamps)
+
+#%% reqXTools(article, infotype, project, cache=None, limiter=None, debug=False)
+def reqXTools(article, infotype="articleinfo", project="en.wikipedia.org",
+              cache=None, limiter=None, debug=False):
+  """
+  Return the JSON response of the XTools Page API for one article and one
+  infotype (see m_PageInfoType), or None if the page is not found. If
+  'cache' (a MetricsCache) is set, the response is taken from it when it has
+  not expired, else it is requested and stored.
+  """
+  if cache is not None:
+    j = cache.getXTools(project, infotype, article)
+    if j is not None:
+      return j
+  art = requests.utils.quote(article.replace(" ", "_"), safe='')
+  url = f"https://xtools.wmflabs.org/api/page/{infotype}/{project}/{art}"
+  j = reqREST(url, limiter=limiter, debug=debug)
+  if cache is not None and j is not None:
+    cache.putXTools(project, infotype, article, j)
+  return j
+
+#%% m_PageInfoType(article, infotype="articleinfo", project="en.wikipedia.org", redirects=True,
+#                  cache=None, debug=False)
+@traced
+def m_PageInfoType(article, infotype="articleinfo", project="en.wikipedia.org",
+                   redirects=True, cache=None, debug=False):
+  """
+  Obtain information in JSON format about an article in the Wikimedia project
+  or None on errors. Uses the wmflabs API. The XTools Page API endpoints offer
+  data related to a single page.
+
+   See https://www.mediawiki.org/wiki/XTools/API/Page [xtools.wmflabs.org].
+   The URL of the API starts with 'https://xtools.wmcloud.org/api/page/'
+
+  :param article: The title of the article to search. Only one article is allowed.
+  :param project: The Wikimedia project, defaults en.wikipedia.org.
+  :param infotype: The type of information to request: articleinfo, prose, links
+     articleinfo: Get basic information about the history of a page.
+     prose: Get statistics about the prose (characters, word count, etc.) and
+            referencing of a page.
+     links: Get the number of incoming and outgoing links and redirects to the
+            given page.
+     Note that the API also offer theses options: top_editors, assessments,
+     bot_data and automated_edits.
+
+  :param redirects: If redirects=TRUE, then the information is obtained
+         from the destiny of the page. In that case, the "original" element
+         of the returned list contains the original page, and the "page"
+         element the target page. Also, if infotype='links', the sum of the
+         in-links of all redirections is assigned to links_in_count.
+   NOTE: With "articleinfo" and "links" options the API gives information
+       about the page itself, not about the possible page to which it redirects
+       (a target page). However, with the "prose" option, information is
+       provided on the target page.
+  :param cache: A MetricsCache to store the XTools responses for a while (see
+         its 'ttl' parameter). Default None: no cache.
+  :param debug: If True shows the query launched.
+  :return A dict with the information about the page.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  """
+  #
+  if infotype == 'prose':
+    # Redirect is ignored
+    articles = [article]
+  elif redirects:
+    r = m_Redirects(article, project)
+    articles = r[article] or [article]  # None if article is invalid or missing
+    if infotype == 'articleinfo':
+      articles = articles[0:1]
+  else:
+    articles = [article]
+
+  for i in range(len(articles)):
+    j = reqXTools(articles[i], infotype, project, cache=cache, debug=debug)
+    if j is None:
+      if i==0:
+        return None
+      continue
+    #
+    if i==0:
+      d = j
+    else:    # only i>0 if infotype == 'links':
+      d['links_out_count'] += j['links_out_count']
+      d['links_ext_count'] += j['links_ext_count']
+      d['links_in_count']  += j['links_in_count']
+      d['redirects_count'] += j['redirects_count']
+      d['elapsed_time']    += j['elapsed_time']
+    #
+  return d
+
+
+#%% pageInfoMerge(articleinfo, prose, links)
+def pageInfoMerge(articleinfo, prose, links):
+  """
+  Merge the XTools responses about one page in a dict (see m_PageInfo). The
+  counts of the 'links' responses (a list: one for the page and one for each
+  redirect to it) are summed.
+  """
+  output = dict()
+  for j in [articleinfo, prose]:
+    if j is not None:
+      output.update(j)
+  links = [j for j in links if j is not None]
+  if len(links) > 0:
+    d = dict(links[0])
+    for j in links[1:]:
+      for k in ['links_out_count', 'links_ext_count', 'links_in_count',
+                'redirects_count', 'elapsed_time']:
+        d[k] += j[k]
+    output.update(d)
+  output.pop('elapsed_time', None)
+  return output
+
+
+#%% m_PageInfo(article, project="en.wikipedia.org", redirects=True, cache=None, debug=False)
+@traced
+def m_PageInfo(article, project="en.wikipedia.org", redirects=True, cache=None,
+               debug=False):
+  """
+  Obtain information in JSON format about an article in the Wikimedia project
+  or None on errors. Uses the wmflabs API. The XTools Page API endpoints offer
+  data related to a single page. The dict information contains information
+  about 'articleinfo', 'prose' and 'links'. Note that the API also offer
+  theses options: top_editors, assessments, bot_data and automated_edits. The
+  information returned with each options is:
+
+     articleinfo: Get basic information about the history of a page.
+
+     prose: Get statistics about the prose (characters, word count, etc.) and
+            referencing of a page.
+
+     links: Get the number of incoming and outgoing links and redirects to the
+            given page.
+
+   IMPORTANT: With "articleinfo" and "links" options the API gives information
+       about the page itself, not about the possible page to which it redirects
+       (a target page). However, with the "prose" option, information is
+       provided on the target page.
+
+   See https://www.mediawiki.org/wiki/XTools/API/Page [xtools.wmflabs.org].
+   The URL of the API starts with 'https://xtools.wmcloud.org/api/page/'
+
+  :param article: The title of the article to search. Only one article is allowed.
+  :param project: The Wikimedia project, defaults en.wikipedia.org.
+
+  :param redirects: If redirects=True, then the information is obtained
+         from the destiny of the page. In that case, for infotype='links, the
+         sum of the in-links of all redirections is assigned to links_in_count.
+  :param cache: A MetricsCache to store the XTools responses for a while (see
+         its 'ttl' parameter). Default None: no cache.
+  :param debug: If True shows the query launched.
+  :return A dict with the information about the page.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  """
+  # The redirects are searched only once for all infotypes
+  articles = [article]
+  if redirects:
+    r = m_Redirects(article, project) or {}  # None if the request fails
+    articles = r.get(article) or [article]  # None if article is invalid or missing
+  #
+  articleinfo = reqXTools(articles[0], 'articleinfo', project, cache=cache, debug=debug)
+  if articleinfo is None:
+    return None
+  prose = reqXTools(article, 'prose', project, cache=cache, debug=debug)  # Redirect is ignored
+  links = [reqXTools(art, 'links', project, cache=cache, debug=debug) for art in articles]
+  return pageInfoMerge(articleinfo, prose, links)
+
+
+#%% m_PageInfoBatch(articles, project="en.wikipedia.org", redirects=True,
+#                   max_workers=8, rate=None, cache=None, debug=False)
+@traced
+def m_PageInfoBatch(articles, project="en.wikipedia.org", redirects=True,
+                    max_workers=8, rate=None, cache=None, debug=False):
+  """
+  Batch version of m_PageInfo: obtain the XTools 'articleinfo', 'prose' and
+  'links' information about many articles of a Wikimedia project. The
+  redirects of all articles are obtained once, in chunks (see m_Redirects),
+  then the XTools requests are made concurrently (see doConcurrent). Each
+  distinct request (infotype, page) is made only once, although some
+  articles share pages.
+
+  :param articles: A title or a list of titles of the articles.
+  :param project: The Wikimedia project, defaults en.wikipedia.org.
+  :param redirects: If redirects=True, then the information is obtained
+         from the destiny of the pages, and the in-links of all redirections
+         are summed (see m_PageInfo).
+  :param max_workers: Maximum number of concurrent requests to the XTools
+         host. Please, be gentle with XTools.
+  :param rate: Maximum number of requests per second, or None (no limit).
+  :param cache: A MetricsCache to store the XTools responses for a while (see
+         its 'ttl' parameter). Default None: no cache.
+  :param debug: For debugging purposes (default False). If debug='info'
+         information about the progress is shown. If debug='query' also the
+         URLs requested are shown.
+  :return A Pandas data-frame with one row per article (index of the
+          data-frame) and one column per field of the XTools responses. The
+          rows of articles not found are void (NaN).
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :example
+  >>> d = m_PageInfoBatch(['Max Planck', 'Albert Einstein', 'humanist'])
+  """
+  articles = checkTitles(articles)
+  #
+  pages = {article:[article] for article in articles}
+  if redirects:
+    if debug:
+      print(f"INFO: Searching redirects of {len(articles)} articles.", file=sys.stderr)
+    r = m_Redirects(articles, project, debug=debug) or {}  # None if the request fails
+    pages = {article:(r.get(article) or [article]) for article in articles}
+  # Distinct requests
+  tasks = set()
+  for article, arts in pages.items():
+    tasks.add(('articleinfo', arts[0]))
+    tasks.add(('prose', article))
+    tasks.update(('links', art) for art in arts)
+  if debug:
+    print(f"INFO: Doing {len(tasks)} XTools requests.", file=sys.stderr)
+  #
+  limiter = RateLimiter(rate)
+  def fetch(task):
+    infotype, art = task
+    return reqXTools(art, infotype, project, cache=cache, limiter=limiter,
+                     debug=(debug=='query'))
+  #
+  responses = dict()
+  for task, j, error in doConcurrent(fetch, tasks, max_workers=max_workers):
+    if error is not None:
+      raise error
+    responses[task] = j
+  #
+  output = dict()
+  for article, arts in pages.items():
+    articleinfo = responses[('articleinfo', arts[0])]
+    if articleinfo is None:
+      output[article] = dict()
+      continue
+    output[article] = pageInfoMerge(articleinfo, responses[('prose', article)],
+                                    [responses[('links', art)] for art in arts])
+  return pd.DataFrame.from_dict(output, orient='index').reindex(articles)
@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SPARQL endpoints: requests to the SPARQL endpoints of the services (WDQS,
+BNE, SUDOC, Getty) and a local in-process endpoint.
+
+@author: Angel Zazo <angelzazo@usal.es>
+"""
+
+#%% Imports
+import sys
+import pandas as pd
+import regex as re
+import numpy as np
+import gzip
+import bz2
+from threading import Lock
+from .common import httpRequest, instrumented, user_agent, RateLimiter, \
+                    retryAfter, retrySleep, doConcurrent
+
+
+#%% -- SPARQL endpoints ------------------------------------------------------
+# The SPARQL endpoint of each service can be changed with setEndpoint, for
+# example to use a local mirror of WDQS (Blazegraph, QLever...), or to use an
+# in-process triple store (see LocalSPARQL) loaded from a N-Triples subset.
+
+SPARQL_ENDPOINTS = {'wdqs' : 'https://query.wikidata.org/sparql',
+                    'bne'  : 'https://datos.bne.es/sparql',
+                    'sudoc': 'https://data.idref.fr/sparql',
+                    'getty': 'https://vocab.getty.edu/sparql'}
+
+# Prefixes predefined in WDQS and in the other endpoints, which are declared in
+# the queries sent to a LocalSPARQL store if the queries do not declare them.
+SPARQL_PREFIXES = {
+  'wd'      : 'http://www.wikidata.org/entity/',
+  'wdt'     : 'http://www.wikidata.org/prop/direct/',
+  'p'       : 'http://www.wikidata.org/prop/',
+  'ps'      : 'http://www.wikidata.org/prop/statement/',
+  'pq'      : 'http://www.wikidata.org/prop/qualifier/',
+  'wikibase': 'http://wikiba.se/ontology#',
+  'bd'      : 'http://www.bigdata.com/rdf#',
+  'geof'    : 'http://www.opengis.net/def/geosparql/function/',
+  'schema'  : 'http://schema.org/',
+  'rdf'     : 'http://www.w3.org/1999/02/22-rdf-syntax-ns#',
+  'rdfs'    : 'http://www.w3.org/2000/01/rdf-schema#',
+  'owl'     : 'http://www.w3.org/2002/07/owl#',
+  'xsd'     : 'http://www.w3.org/2001/XMLSchema#',
+  'skos'    : 'http://www.w3.org/2004/02/skos/core#',
+  'foaf'    : 'http://xmlns.com/foaf/0.1/',
+  'xl'      : 'http://www.w3.org/2008/05/skos-xl#',
+  'gvp'     : 'http://vocab.getty.edu/ontology#',
+  'ulan'    : 'http://vocab.getty.edu/ulan/',
+  }
+
+#%% setEndpoint(service, endpoint)
+def setEndpoint(service, endpoint):
+  """
+  Set the SPARQL endpoint used for a service: 'wdqs' (reqWDQS and all w_*
+  functions), 'bne' (b_* functions), 'sudoc' (s_Gender) or 'getty' (g_*
+  functions).
+
+  :param service: The service.
+  :param endpoint: The URL of the SPARQL endpoint, or a LocalSPARQL store.
+  :return The previous endpoint (to restore it later).
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :example
+  >>> setEndpoint('wdqs', 'http://localhost:7001/api/wikidata')   # QLever mirror
+  >>> old = setEndpoint('wdqs', LocalSPARQL('subset.nt.gz'))
+  >>> w_LabelDesc(['Q9021'])
+  >>> setEndpoint('wdqs', old)
+  """
+  if service not in SPARQL_ENDPOINTS:
+    raise ValueError(f"ERROR: service '{service}' is unknown. Use one of: {', '.join(SPARQL_ENDPOINTS)}")
+  previous = SPARQL_ENDPOINTS[service]
+  SPARQL_ENDPOINTS[service] = endpoint
+  return previous
+
+
+#%% reqSPARQL(service, sparql_query, method='POST')
+@instrumented(None)
+def reqSPARQL(service, sparql_query, method='POST'):
+  """
+  Send a SELECT query to the SPARQL endpoint of the service (see setEndpoint)
+  and return the JSON response (a dict). Used by the functions of BNE, SUDOC
+  and Getty. For WDQS use reqWDQS.
+
+  :param service: The service ('bne', 'sudoc', 'getty'...).
+  :param sparql_query: The query in SPARQL language.
+  :param method: GET or POST, default 'POST'.
+  :return A dict with the SPARQL JSON results.
+  :raise Exception: From response.raise_for_status() or other exception.
+  """
+  endpoint = SPARQL_ENDPOINTS[service]
+  if not isinstance(endpoint, str):
+    return endpoint.query(sparql_query)
+  params = {'format': 'json',
+            'query': sparql_query}
+  if method=='GET':
+    response = httpRequest('GET', url=endpoint, params=params, headers={'user-agent': user_agent})
+  elif method=='POST':
+    response = httpRequest('POST', url=endpoint, data=params, headers={'user-agent': user_agent})
+  else:
+    raise ValueError(f"Method '{method}' is not supported")
+  response.raise_for_status()
+  return response.json()
+
+
+#%% sparqlString(value)
+def sparqlString(value):
+  """
+  Return the value as a SPARQL string literal (between double quotes), with
+  the backslashes, double quotes and line breaks escaped.
+
+  :param value: A string.
+  :return The SPARQL literal.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :example
+  >>> sparqlString('Pérez "Pepe", José')
+  '"Pérez \\\\"Pepe\\\\", José"'
+  """
+  value = value.replace('\\', '\\\\').replace('"', '\\"')
+  value = value.replace('\n', '\\n').replace('\r', '\\r')
+  return '"' + value + '"'
+
+
+#%% reqSPARQLChunks(service, items, query, chunksize=1500, minchunk=50,
+#                   max_workers=4, attempts=3, rate=None, method='POST', debug=False)
+def reqSPARQLChunks(service, items, query, chunksize=1500, minchunk=50,
+                    max_workers=4, attempts=3, rate=None, method='POST',
+                    debug=False):
+  """
+  Send a SELECT query for a long list of items (i.e. identifiers in a VALUES
+  clause) to the SPARQL endpoint of the service, splitting the list in chunks
+  which are requested concurrently, and return all the bindings. The chunk
+  size is adapted to the endpoint: when a request fails (timeout, 5xx
+  status-code...) its chunk is returned to the queue and the chunk size is
+  halved (not less than minchunk); after several consecutive successes the
+  chunk size is doubled again, but not more than 3/4 of the smallest chunk
+  which failed, so the size converges to what the endpoint supports. A chunk
+  of minchunk items is retried 'attempts' times. On 429 responses all the requests wait
+  the time in the 'Retry-After' header. Other 4xx errors are not retried.
+
+  :param service: The service ('bne', 'sudoc', 'getty'...), see reqSPARQL.
+  :param items: A list with the items (duplicates are removed).
+  :param query: A function query(chunk) which returns the SPARQL query for a
+         list of items.
+  :param chunksize: Maximum number of items in each request.
+  :param minchunk: Minimum number of items in each request.
+  :param max_workers: Maximum number of concurrent requests.
+  :param attempts: Number of attempts of a chunk of minchunk items.
+  :param rate: Maximum number of requests per second, or None.
+  :param method: GET or POST, default 'POST'.
+  :param debug: For debugging purposes (default False). If debug='info'
+         information about the chunks is shown, if True the queries too.
+  :return A list with the bindings of all the chunks (not in order).
+  :raise Exception: The error of a chunk which fails in all the attempts.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :example
+  >>> def query(chunk):
+  ...   values = " ".join(f"<{x}>" for x in chunk)
+  ...   return f"SELECT ?s ?o WHERE {{VALUES ?s {{ {values} }} ?s foaf:gender ?o}}"
+  >>> bindings = reqSPARQLChunks('sudoc', uris, query, chunksize=1000)
+  """
+  pending = list(dict.fromkeys(items))
+  if len(pending) == 0:
+    return []
+  minchunk = max(1, min(minchunk, chunksize))
+  state = {'size': chunksize, 'ceiling': chunksize, 'successes': 0}
+  failed = dict()   # chunk -> number of failed attempts
+  lock = Lock()
+  limiter = RateLimiter(rate)
+  if debug:
+    print(f"INFO: {len(pending)} items, chunks of {chunksize} items.", file=sys.stderr)
+  #
+  def giveBack(chunk):
+    with lock:
+      pending[0:0] = chunk
+  #
+  def worker(k):
+    bindings = []
+    while True:
+      with lock:
+        if len(pending) == 0:
+          return bindings
+        chunk = pending[:state['size']]
+        del pending[:len(chunk)]
+      limiter.wait()
+      sparql_query = query(chunk)
+      if debug is True:
+        print(sparql_query, file=sys.stderr)
+      try:
+        j = reqSPARQL(service, sparql_query, method=method)
+      except Exception as ex:
+        response = getattr(ex, 'response', None)
+        status = 0 if response is None else response.status_code
+        if status == 429:
+          t = retryAfter(response)
+          print(f"Received a 429 status-code response. Sleeping {t} seconds",
+                file=sys.stderr)
+          limiter.delay(t)
+          giveBack(chunk)
+          continue
+        if 400 <= status < 500:
+          raise
+        with lock:
+          state['successes'] = 0
+          if len(chunk) > minchunk:
+            state['size'] = max(minchunk, min(state['size'], len(chunk)//2))
+            state['ceiling'] = max(minchunk, min(state['ceiling'], 3*len(chunk)//4))
+            retry = 0
+          else:
+            key = tuple(chunk)
+            failed[key] = failed.get(key, 0) + 1
+            retry = failed[key]
+            if retry >= attempts:
+              raise
+        if debug:
+          print(f"INFO: Request of {len(chunk)} items failed ({ex}). Chunk size: {state['size']}.", file=sys.stderr)
+        if retry > 0:
+          retrySleep(2**retry)
+        giveBack(chunk)
+        continue
+      bindings.extend(j['results']['bindings'])
+      with lock:
+        state['successes'] += 1
+        if state['successes'] >= 4 and state['size'] < state['ceiling']:
+          state['size'] = min(state['ceiling'], 2*state['size'])
+          state['successes'] = 0
+  #
+  n = min(max_workers, -(-len(pending)//chunksize))
+  output = []
+  error = None
+  for _, bindings, ex in doConcurrent(worker, range(n), max_workers=n):
+    if ex is not None:
+      with lock:   # Stop the other workers
+        del pending[:]
+      error = error or ex
+      continue
+    output.extend(bindings)
+  if error is not None:
+    raise error
+  return output
+
+
+_label_service = re.compile(r'SERVICE\s+wikibase:label\s*\{([^{}]*)\}', re.S)
+_label_language = re.compile(r'bd:serviceParam\s+wikibase:language\s+"([^"]*)"\s*\.?')
+_label_triple = re.compile(r'(\?\w+)\s+(rdfs:label|schema:description|skos:altLabel)\s+\?(\w+)\s*\.?')
+_geof = re.compile(r'geof:(longitude|latitude)\((\?\w+)\)')
+
+#%% sparqlRewrite(sparql_query, prefixes=SPARQL_PREFIXES)
+def sparqlRewrite(sparql_query, prefixes=SPARQL_PREFIXES):
+  """
+  Rewrite a WDQS query to be run by a standard SPARQL 1.1 engine (see
+  LocalSPARQL):
+  - The prefixes used and not declared are declared.
+  - The label service (SERVICE wikibase:label) is replaced by OPTIONAL
+    patterns for each language, in order, and a BIND(COALESCE(...)). As
+    WDQS does, if an entity has no label, its identifier (Qxxx) is the label,
+    and the label of a literal is the literal itself. Both the manual mode
+    (?x rdfs:label ?xLabel) and the automatic mode (?xLabel variables) are
+    supported.
+  - The Blazegraph functions geof:longitude and geof:latitude are replaced by
+    string functions over the WKT literal "Point(lon lat)".
+  - The variables in GROUP_CONCAT are converted with STR(), as Blazegraph
+    does with the IRIs.
+  Other services (wikibase:mwapi) are not supported.
+  """
+  def labels(m):
+    block = m.group(1)
+    lang = _label_language.search(block)
+    langs = lang.group(1).replace('[AUTO_LANGUAGE]', 'en').split(',') if lang else ['en']
+    triples = _label_triple.findall(block)
+    if len(triples) == 0:   # Automatic mode
+      triples = [('?'+v, 'rdfs:label', v+'Label') for v in
+                 dict.fromkeys(re.findall(r'\?(\w+)Label\b', sparql_query))]
+      triples += [('?'+v, 'schema:description', v+'Description') for v in
+                  dict.fromkeys(re.findall(r'\?(\w+)Description\b', sparql_query))]
+    output = []
+    for s, p, o in triples:
+      # The subject can be unbound (in OPTIONAL patterns): then it is replaced
+      # by an IRI without labels, so the OPTIONAL patterns do not bind it.
+      output.append(f'BIND(COALESCE({s}, <urn:unbound>) AS ?{o}__s)')
+      options = []
+      for k, l in enumerate(langs):
+        output.append(f'OPTIONAL {{?{o}__s {p} ?{o}__{k}. FILTER(LANG(?{o}__{k})="{l.strip()}")}}')
+        options.append(f'?{o}__{k}')
+      if p == 'rdfs:label':
+        options.append(f'IF(isLiteral({s}), {s}, STRAFTER(STR({s}), STR(wd:)))')
+      output.append(f'BIND(COALESCE({", ".join(options)}) AS ?{o})')
+    return '\n'.join(output)
+  #
+  query = _label_service.sub(labels, sparql_query)
+  query = _geof.sub(lambda m: f'xsd:decimal(STRBEFORE(STRAFTER(STR({m.group(2)}), "Point("), " "))'
+                    if m.group(1)=='longitude' else
+                    f'xsd:decimal(STRBEFORE(STRAFTER(STRAFTER(STR({m.group(2)}), "Point("), " "), ")"))',
+                    query)
+  query = re.sub(r'GROUP_CONCAT\(\s*(DISTINCT\s+)?(\?\w+)\s*;', r'GROUP_CONCAT(\1STR(\2);', query)
+  declared = set(re.findall(r'(?i)PREFIX\s+(\w*):', query))
+  used = set(re.findall(r'(?<![\w?$<])([A-Za-z]\w*):', re.sub(r'<[^>\s]*>|"[^"]*"', '', query)))
+  header = [f'PREFIX {x}: <{prefixes[x]}>' for x in sorted(used - declared) if x in prefixes]
+  return '\n'.join(header + [query])
+
+
+#%% class LocalSPARQL(*paths, directory=None, prefixes=SPARQL_PREFIXES)
+class LocalSPARQL:
+  """
+  In-process SPARQL store, loaded from N-Triples files (a subset of Wikidata,
+  see w_Materialize), to be used as the endpoint of a service (see
+  setEndpoint). Queries are rewritten to run in a standard SPARQL 1.1 engine
+  (see sparqlRewrite), so the w_* functions run against it unchanged (except
+  those that use the wikibase:mwapi service).
+
+  Uses the Oxigraph engine (pyoxigraph package).
+
+  :param paths: N-Triples files (.nt, .nt.gz or .nt.bz2) loaded in the store.
+  :param directory: If not None, the store is saved in (or opened from, if
+         exists) this directory, else it is in memory.
+  :param prefixes: Prefixes declared in the queries if they are not.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :example
+  >>> store = LocalSPARQL('humans.nt.gz')
+  >>> setEndpoint('wdqs', store)
+  >>> p = w_Property(['Q9021'], Pproperty='P21|P569', langsorder='es|en')
+  """
+  def __init__(self, *paths, directory=None, prefixes=SPARQL_PREFIXES):
+    try:
+      import pyoxigraph
+    except ImportError:
+      raise ImportError("LocalSPARQL needs the 'pyoxigraph' package (pip install pyoxigraph).")
+    self.prefixes = prefixes
+    self.store = pyoxigraph.Store(directory)
+    for path in paths:
+      self.load(path)
+
+  def load(self, path):
+    """Load a N-Triples file (.nt, .nt.gz or .nt.bz2) in the store."""
+    if path.endswith('.gz'):
+      f = gzip.open(path, 'rb')
+    elif path.endswith('.bz2'):
+      f = bz2.open(path, 'rb')
+    else:
+      f = open(path, 'rb')
+    with f:
+      import pyoxigraph
+      self.store.bulk_load(f, format=pyoxigraph.RdfFormat.N_TRIPLES)
+
+  def query(self, sparql_query):
+    """Run a SELECT query and return the SPARQL JSON results (a dict)."""
+    solutions = self.store.query(sparqlRewrite(sparql_query, self.prefixes))
+    variables = [v.value for v in solutions.variables]
+    bindings = []
+    for s in solutions:
+      b = dict()
+      for var in variables:
+        if s[var] is not None:
+          b[var] = self.term(s[var])
+      bindings.append(b)
+    return {'head': {'vars': variables}, 'results': {'bindings': bindings}}
+
+  def term(self, term):
+    """The SPARQL JSON representation of a RDF term."""
+    kind = type(term).__name__
+    if kind == 'NamedNode':
+      return {'type': 'uri', 'value': term.value}
+    if kind == 'BlankNode':
+      return {'type': 'bnode', 'value': term.value}
+    output = {'type': 'literal', 'value': term.value}
+    if term.language:
+      output['xml:lang'] = term.language
+    elif term.datatype.value != 'http://www.w3.org/2001/XMLSchema#string':
+      output['datatype'] = term.datatype.value
+    return output
+
+  def request(self, sparql_query, format='json'):
+    """
+    Same as reqWDQS: return the JSON results (a dict) or, if format='csv', a
+    Pandas data-frame of strings.
+    """
+    j = self.query(sparql_query)
+    if format == 'json':
+      return j
+    if format == 'csv':
+      data = [{k:v['value'] for k,v in b.items()} for b in j['results']['bindings']]
+      d = pd.DataFrame(data, columns=j['head']['vars'], dtype=str)
+      return d.replace('', np.nan)
+    raise ValueError(f"Format '{format}' is not supported by LocalSPARQL")
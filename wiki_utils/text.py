@@ -0,0 +1,556 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Simple text processing.
+
+@author: Angel Zazo <angelzazo@usal.es>
+"""
+
+#%% Imports
+import regex as re
+import unicodedata
+import functools
+import heapq
+import math
+import multiprocessing
+from difflib import SequenceMatcher
+
+
+#%% -- Simple text processing  ---------------------------------------------
+
+#%% class _DeaccentTable(excludechars)
+class _DeaccentTable(dict):
+  """
+  Translation table (see str.translate) of deaccenttext: maps each codepoint
+  to its NFKD decomposition without the characters of the categories Mn, Cc,
+  Cf, Lm and So (or to itself if it is in 'excludechars'). It is filled the
+  first time each codepoint is found.
+  """
+  def __init__(self, excludechars):
+    super().__init__()
+    self.excludechars = excludechars
+
+  def __missing__(self, code):
+    c = chr(code)
+    if c in self.excludechars:
+      value = c
+    else:
+      value = ''.join(ch for ch in unicodedata.normalize("NFKD", c)
+                      if unicodedata.category(ch) not in ['Mn', 'Cc', 'Cf', 'Lm', 'So'])
+    self[code] = value
+    return value
+
+
+#%% deaccentTable(excludechars)
+@functools.lru_cache(maxsize=None)
+def deaccentTable(excludechars):
+  """The translation table of deaccenttext for 'excludechars' (cached)."""
+  return _DeaccentTable(excludechars)
+
+
+#%% deaccenttext(text, excludechars='ñÑ')
+def deaccenttext(text, excludechars='ñÑ'):
+  """
+  This function removes accents from the text (except for the letters in
+  excludechars string) and returns a normalized Unicode string (NFKC).
+  Note that the 'excludechars' string must be Unicode NFKC normalized.
+  """
+  if not text.isascii():    # ASCII strings are already NFKC normalized
+    text = unicodedata.normalize("NFKC", text)
+  text = text.translate(deaccentTable(excludechars))
+  return text if text.isascii() else unicodedata.normalize("NFKC", text)
+
+
+#%% deaccentSeries(s, excludechars='ñÑ')
+def deaccentSeries(s, excludechars='ñÑ'):
+  """
+  Apply deaccenttext to the values of a Pandas series (or a list). Each
+  distinct value is processed only once. The values that are not strings
+  (i.e. NaN) are returned unchanged.
+
+  :param s: A Pandas series, or a list of strings.
+  :param excludechars: See deaccenttext.
+  :return A Pandas series (with the index of 's').
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  """
+  import numpy as np
+  import pandas as pd
+  if not isinstance(s, pd.Series):
+    s = pd.Series(s, dtype=object)
+  codes, uniques = pd.factorize(s)
+  values = [deaccenttext(x, excludechars) if isinstance(x, str) else x for x in uniques]
+  values = np.array(values + [np.nan], dtype=object)
+  result = pd.Series(values[codes], index=s.index, name=s.name, dtype=object)
+  missing = codes == -1
+  if missing.any():
+    result[missing] = s[missing]
+  return result
+
+
+#%% similarPrepare(s, deaccent=False, lower=False, order=False, mode="char", stops=set())
+def similarPrepare(s, deaccent=False, lower=False, order=False, mode="char", stops=set()):
+  """
+  Preprocess the string s as similar() does before comparing it: returns a
+  string, or a list of terms (\w+) if mode is not "char" and there are no
+  stop words. See similar for the parameters.
+  """
+  if deaccent:
+    s = deaccenttext(s)
+  if lower:
+    s = s.lower()
+  if mode != "char":
+    s = re.findall(r"\w+", s)
+    if len(stops)>0:
+      s = " ".join([x for x in s if x not in stops])
+  if order:
+    if mode == 'char':
+      s = " ".join(sorted(re.findall(r"\w+", s)))
+    else:
+      s = sorted(s)
+  return s
+
+
+#%% similar(a, b, deaccent=False, lower=False, order=False, mode="char", stops=set())
+def similar(a, b, deaccent=False, lower=False, order=False, mode="char", stops=set()):
+  """
+  Return SequenceMatcher.ratio() between strings a and b. If mode is "char"
+  comparisons are made as char, else comparisons are made as terms (\w+). In
+  mode "text" a set of stop words can be used in parameter 'stops'. To
+  compare many strings use similarMatrix or similarTopK.
+  """
+  a = similarPrepare(a, deaccent, lower, order, mode, stops)
+  b = similarPrepare(b, deaccent, lower, order, mode, stops)
+  return SequenceMatcher(None, a, b).ratio()
+
+
+#%% -- Batch similarity -------------------------------------------------------
+# similarMatrix and similarTopK compare many strings: each string is
+# preprocessed once (see similarPrepare) and the pairs are compared with the
+# ratio 2*LCS/T (LCS is the length of the longest common subsequence and T the
+# total length), computed with a bit-parallel algorithm (or with the package
+# rapidfuzz, if it is installed). This ratio is usually equal to (and never
+# lower than) SequenceMatcher.ratio(); with compat=True the SequenceMatcher
+# ratio of similar() is computed instead. The queries are distributed in
+# blocks to a pool of processes.
+
+SIMILAR_BLOCK = 64
+
+#%% lcsMasks(a)
+def lcsMasks(a):
+  """The bit masks of the positions of each element (char or term) of a."""
+  masks = {}
+  bit = 1
+  for x in a:
+    masks[x] = masks.get(x, 0) | bit
+    bit <<= 1
+  return masks
+
+
+#%% lcsRatio(a, b, masks=None)
+def lcsRatio(a, b, masks=None):
+  """
+  Return 2*LCS(a,b)/(len(a)+len(b)), where LCS(a,b) is the length of the
+  longest common subsequence of a and b (strings or lists of terms), computed
+  with the bit-parallel algorithm of Crochemore et al. (2001). The masks of a
+  (see lcsMasks) can be given to compare a with many strings.
+  """
+  m = len(a)
+  n = m + len(b)
+  if n == 0:
+    return 1.0
+  if m == 0:
+    return 0.0
+  if masks is None:
+    masks = lcsMasks(a)
+  full = (1 << m) - 1
+  v = full
+  for y in b:
+    u = v & masks.get(y, 0)
+    if u:
+      v = ((v + u) | (v - u)) & full
+  return 2*(m - bin(v).count('1'))/n
+
+
+_similar_args = None
+
+def _similarInit(candidates, k, cutoff, compat):
+  global _similar_args
+  _similar_args = (candidates, k, cutoff, compat)
+
+#%% similarBlock(queries, candidates=None, k=None, cutoff=0.0, compat=False)
+def similarBlock(queries, candidates=None, k=None, cutoff=0.0, compat=False):
+  """
+  Compare each preprocessed query with all the preprocessed candidates. If k
+  is None, return a list with the row of scores (NumPy array) of each query,
+  else a list with the top-k (lists of tuples (score, icandidate)) with score
+  >= cutoff. The candidates which cannot reach the scores of the top-k by
+  their length are not compared. This is the function run by the processes
+  of the pool in similarMatrix and similarTopK (which pass the arguments
+  through _similarInit).
+  """
+  import numpy as np
+  if candidates is None:
+    candidates, k, cutoff, compat = _similar_args
+  lengths = [len(b) for b in candidates]
+  output = []
+  for a in queries:
+    m = len(a)
+    if compat:
+      matcher = SequenceMatcher(None, a, '')
+      def score(b):
+        matcher.set_seq2(b)
+        return matcher.ratio()
+    else:
+      masks = lcsMasks(a)
+      def score(b):
+        return lcsRatio(a, b, masks)
+    if k is None:
+      output.append(np.fromiter((score(b) for b in candidates), dtype=float,
+                                count=len(candidates)))
+      continue
+    heap = []    # (score, -icandidate) of the best k
+    for j, b in enumerate(candidates):
+      threshold = heap[0][0] if len(heap) >= k else cutoff
+      n = m + lengths[j]
+      bound = 2*min(m, lengths[j])/n if n > 0 else 1.0
+      if bound < threshold or (len(heap) >= k and bound <= threshold):
+        continue
+      s = score(b)
+      if s < cutoff:
+        continue
+      if len(heap) < k:
+        heapq.heappush(heap, (s, -j))
+      elif (s, -j) > heap[0]:
+        heapq.heapreplace(heap, (s, -j))
+    output.append([(s, -j) for s, j in sorted(heap, reverse=True)])
+  return output
+
+
+#%% similarScores(queries, candidates, k=None, cutoff=0.0, compat=False, processes=None)
+def similarScores(queries, candidates, k=None, cutoff=0.0, compat=False, processes=None):
+  """
+  Compare the preprocessed queries with the preprocessed candidates (see
+  similarBlock) in blocks of SIMILAR_BLOCK queries, using rapidfuzz if it is
+  installed (and not compat), else a pool of 'processes' processes (default
+  None: the number of CPUs; with processes=1 the main process is used).
+  Return the list of results of each query (see similarBlock).
+  """
+  import numpy as np
+  try:
+    if compat:
+      raise ImportError
+    from rapidfuzz.process import cdist
+    from rapidfuzz.distance import Indel
+  except ImportError:
+    cdist = None
+  blocks = [queries[i:i+SIMILAR_BLOCK] for i in range(0, len(queries), SIMILAR_BLOCK)]
+  if cdist is not None:
+    output = []
+    for block in blocks:
+      scores = cdist(block, candidates, scorer=Indel.normalized_similarity,
+                     dtype=np.float64, workers=-1 if processes is None else processes)
+      for row in scores:
+        if k is None:
+          output.append(row)
+          continue
+        idx = np.flatnonzero(row >= cutoff)
+        if len(idx) > k:
+          # The k best, and the first candidates in case of ties
+          threshold = np.partition(row[idx], len(idx)-k)[len(idx)-k]
+          best = idx[row[idx] > threshold]
+          idx = np.concatenate([best, idx[row[idx] == threshold][:k-len(best)]])
+        idx = idx[np.lexsort((idx, -row[idx]))]
+        output.append([(row[j], j) for j in idx])
+    return output
+  if processes == 1 or len(blocks) <= 1:
+    return [x for block in blocks for x in similarBlock(block, candidates, k, cutoff, compat)]
+  with multiprocessing.Pool(processes, initializer=_similarInit,
+                            initargs=(candidates, k, cutoff, compat)) as pool:
+    return [x for output in pool.imap(similarBlock, blocks) for x in output]
+
+
+#%% similarMatrix(a, b, deaccent=False, lower=False, order=False, mode="char",
+#                 stops=set(), compat=False, processes=None)
+def similarMatrix(a, b, deaccent=False, lower=False, order=False, mode="char",
+                  stops=set(), compat=False, processes=None):
+  """
+  Return the matrix of similarities between the strings of the list a (rows)
+  and the strings of the list b (columns). Each string is preprocessed only
+  once (see similar for the parameters deaccent, lower, order, mode and
+  stops).
+
+  :param a: List of strings (list, NumPy array or Pandas series).
+  :param b: List of strings.
+  :param compat: If True, the scores are the SequenceMatcher.ratio() of
+         similar(), else the ratio 2*LCS/T (much faster).
+  :param processes: Number of processes. Default None (the number of CPUs).
+  :return A NumPy array of shape (len(a), len(b)).
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :example
+  >>> similarMatrix(['Cervantes, Miguel de'], ['Miguel de Cervantes', 'Cervantes'],
+                    deaccent=True, lower=True, order=True)
+  """
+  import numpy as np
+  prepared = {}
+  for s in list(a) + list(b):
+    if s not in prepared:
+      prepared[s] = similarPrepare(s, deaccent, lower, order, mode, stops)
+  rows = similarScores([prepared[s] for s in a], [prepared[s] for s in b],
+                       compat=compat, processes=processes)
+  if len(rows) == 0:
+    return np.zeros((0, len(b)))
+  return np.vstack(rows)
+
+
+#%% similarTopK(queries, candidates, k=5, cutoff=0.0, deaccent=False, lower=False,
+#               order=False, mode="char", stops=set(), compat=False, processes=None)
+def similarTopK(queries, candidates, k=5, cutoff=0.0, deaccent=False, lower=False,
+                order=False, mode="char", stops=set(), compat=False, processes=None):
+  """
+  For each query, return the k most similar candidates with similarity >=
+  cutoff. Each string is preprocessed only once (see similar for the
+  parameters deaccent, lower, order, mode and stops), and the candidates are
+  compared with all the queries without building the whole matrix of
+  similarities.
+
+  :param queries: List of strings (list, NumPy array or Pandas series).
+  :param candidates: List of strings.
+  :param k: Number of candidates returned for each query.
+  :param cutoff: Minimum similarity of the candidates returned.
+  :param compat: If True, the scores are the SequenceMatcher.ratio() of
+         similar(), else the ratio 2*LCS/T (much faster).
+  :param processes: Number of processes. Default None (the number of CPUs).
+  :return A Pandas data-frame with columns 'iquery' and 'query' (position and
+          value of the query), 'icandidate' and 'candidate' (position and value
+          of the candidate), 'score' and 'rank' (1 the best candidate of the
+          query), ordered by query and rank.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :example
+  >>> headings = [v_titles(v_GetRecord(x)) ...]
+  >>> similarTopK(names, headings, k=3, cutoff=0.8, deaccent=True, lower=True, order=True)
+  """
+  import pandas as pd
+  queries = list(queries)
+  candidates = list(candidates)
+  prepared = {}
+  for s in queries + candidates:
+    if s not in prepared:
+      prepared[s] = similarPrepare(s, deaccent, lower, order, mode, stops)
+  results = similarScores([prepared[s] for s in queries], [prepared[s] for s in candidates],
+                          k=k, cutoff=cutoff, compat=compat, processes=processes)
+  rows = [(i, queries[i], j, candidates[j], float(s), r+1)
+          for i, top in enumerate(results) for r, (s, j) in enumerate(top)]
+  return pd.DataFrame(rows, columns=['iquery', 'query', 'icandidate', 'candidate',
+                                     'score', 'rank'])
+
+
+#%% -- Blocking index ---------------------------------------------------------
+# Comparing all the pairs of two big lists of names (see similarTopK) is
+# quadratic. A BlockingIndex returns for each query a small set of candidate
+# names, which are then compared (see similarBlocked). The names are
+# normalized with deaccenttext and lowered, and indexed by:
+# - 'ngram': the character n-grams of the name. The candidates have a Dice
+#   coefficient of n-grams >= threshold with the query. Only the postings of
+#   the rarest n-grams of the query are read (prefix filtering), the rest of
+#   the names can not reach the threshold.
+# As the stop words in text retrieval, the keys (n-grams, surnames...) of more
+# than 'maxdf' names are not read to find candidates, so a query only reads a
+# few short postings.
+# - 'tokens': the sorted terms of the name (so "Pérez, José" = "José Pérez").
+# - 'surname': the surname and the initial of the first name ("perez|j"),
+#   from the formats "Surname(s), Name(s)" and "Name(s) Surname".
+# The birth years (i.e. from v_dates) are used to discard the candidates with
+# a known birth year farther than 'yeartol' years from the birth year of the
+# query. Names can be added, updated and removed at any time.
+
+#%% class BlockingIndex(keys=('ngram', 'tokens', 'surname'), n=3, threshold=0.4,
+#                       maxdf=500, yeartol=1, excludechars='ñÑ', stops=set())
+class BlockingIndex:
+  """
+  Inverted index of names to generate the candidates of name matching (see
+  above).
+
+  :param keys: The keys used to generate the candidates: 'ngram', 'tokens'
+         and/or 'surname'.
+  :param n: Length of the character n-grams.
+  :param threshold: Minimum Dice coefficient of the n-grams of the candidates
+         found by the key 'ngram'.
+  :param maxdf: The keys of more than maxdf names are not used to find
+         candidates (None: all are used).
+  :param yeartol: Maximum difference between birth years, or None to not
+         use the birth years.
+  :param excludechars: See deaccenttext.
+  :param stops: A set of stop words, not indexed (normalized, i.e. 'de').
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :example
+  >>> index = BlockingIndex()
+  >>> index.update(viafids, headings, dates)     # dates as v_dates: 'byear:dyear'
+  >>> index.candidates('Perez Garcia, Jose', dates='1950:')
+  >>> index.remove(viafid)
+  """
+  def __init__(self, keys=('ngram', 'tokens', 'surname'), n=3, threshold=0.4,
+               maxdf=500, yeartol=1, excludechars='ñÑ', stops=set()):
+    for key in keys:
+      if key not in ('ngram', 'tokens', 'surname'):
+        raise ValueError(f"ERROR: key '{key}' is not supported")
+    self.keys = tuple(keys)
+    self.n = n
+    self.threshold = threshold
+    self.maxdf = maxdf
+    self.yeartol = yeartol
+    self.excludechars = excludechars
+    self.stops = set(stops)
+    self.records = {}   # id -> (name, grams, tokens key, surname key, birth year)
+    self.postings = {key: dict() for key in self.keys}   # value -> set of ids
+
+  def __len__(self):
+    return len(self.records)
+
+  def __contains__(self, id):
+    return id in self.records
+
+  def analyze(self, name, dates=None):
+    """Return the (grams, tokens key, surname key, birth year) of a name."""
+    text = deaccenttext(name, self.excludechars).lower()
+    tokens = [x for x in re.findall(r"\w+", text) if x not in self.stops]
+    grams = frozenset()
+    if 'ngram' in self.keys:
+      s = ' ' + ' '.join(tokens) + ' '
+      grams = frozenset(s[i:i+self.n] for i in range(max(1, len(s)-self.n+1)))
+    surname = None
+    if ',' in text:
+      last, first = text.split(',', 1)
+      last = [x for x in re.findall(r"\w+", last) if x not in self.stops]
+      first = [x for x in re.findall(r"\w+", first) if x not in self.stops]
+      if last:
+        surname = last[0] + '|' + (first[0][0] if first else '')
+    elif len(tokens) > 0:
+      surname = tokens[-1] + '|' + (tokens[0][0] if len(tokens) > 1 else '')
+    return grams, ' '.join(sorted(tokens)), surname, self.birthyear(dates)
+
+  @staticmethod
+  def birthyear(dates):
+    """The birth year of dates ('byear:dyear', as v_dates, or a year), or None."""
+    if dates is None:
+      return None
+    if isinstance(dates, (int, float)):
+      return None if dates != dates else int(dates)    # NaN
+    m = re.match(r'\s*(-?\d+)', str(dates))
+    return int(m.group(1)) if m else None
+
+  def add(self, id, name, dates=None):
+    """Add (or update) the name with identifier 'id'."""
+    if id in self.records:
+      self.remove(id)
+    grams, tokens, surname, year = self.analyze(name, dates)
+    self.records[id] = (name, grams, tokens, surname, year)
+    for key, values in (('ngram', grams), ('tokens', (tokens,)), ('surname', (surname,))):
+      if key in self.postings:
+        postings = self.postings[key]
+        for v in values:
+          if v:
+            postings.setdefault(v, set()).add(id)
+
+  def update(self, ids, names, dates=None):
+    """Add (or update) the names with identifiers 'ids' (and birth 'dates')."""
+    if dates is None:
+      dates = [None]*len(ids)
+    for id, name, d in zip(ids, names, dates):
+      self.add(id, name, d)
+    return self
+
+  def remove(self, id):
+    """Remove the name with identifier 'id' (if indexed)."""
+    record = self.records.pop(id, None)
+    if record is None:
+      return
+    name, grams, tokens, surname, year = record
+    for key, values in (('ngram', grams), ('tokens', (tokens,)), ('surname', (surname,))):
+      if key in self.postings:
+        postings = self.postings[key]
+        for v in values:
+          ids = postings.get(v)
+          if ids is not None:
+            ids.discard(id)
+            if len(ids) == 0:
+              del postings[v]
+
+  def candidates(self, name, dates=None, limit=None):
+    """
+    Return the list of identifiers of the candidates for the name (and birth
+    'dates'), the candidates with more n-grams in common first. If limit is
+    not None, at most 'limit' candidates are returned.
+    """
+    grams, tokens, surname, year = self.analyze(name, dates)
+    maxdf = len(self.records) if self.maxdf is None else self.maxdf
+    found = set()
+    for key, value in (('tokens', tokens), ('surname', surname)):
+      if key in self.postings and value:
+        ids = self.postings[key].get(value, ())
+        if len(ids) <= maxdf:
+          found.update(ids)
+    if 'ngram' in self.postings and len(grams) > 0:
+      postings = self.postings['ngram']
+      # A candidate with Dice >= t has at least o = t*|q|/(2-t) n-grams of
+      # the query q, so it has one of the |q|-o+1 rarest n-grams of q; and it
+      # has between t*|q|/(2-t) and (2-t)*|q|/t n-grams
+      t = self.threshold
+      o = max(1, math.ceil(t*len(grams)/(2 - t) - 1e-9))
+      lmin = t*len(grams)/(2 - t) - 1e-9
+      lmax = (2 - t)*len(grams)/t + 1e-9 if t > 0 else math.inf
+      rarest = sorted(grams, key=lambda g: len(postings.get(g, ())))[:len(grams)-o+1]
+      ids = set()
+      for g in rarest:
+        if len(postings.get(g, ())) > maxdf:
+          break
+        ids.update(postings.get(g, ()))
+      ids -= found
+      records = self.records
+      for id in ids:
+        cgrams = records[id][1]
+        n = len(cgrams)
+        if lmin <= n <= lmax and 2*len(grams & cgrams) >= t*(len(grams) + n):
+          found.add(id)
+    if year is not None and self.yeartol is not None:
+      found = [id for id in found if self.records[id][4] is None
+               or abs(self.records[id][4] - year) <= self.yeartol]
+    found = sorted(found, key=lambda id: (-len(grams & self.records[id][1]), str(id)))
+    return found if limit is None else found[:limit]
+
+
+#%% similarBlocked(queries, index, k=5, cutoff=0.0, dates=None, limit=None,
+#                  deaccent=True, lower=True, order=False, mode="char", stops=set(),
+#                  compat=False)
+def similarBlocked(queries, index, k=5, cutoff=0.0, dates=None, limit=None,
+                   deaccent=True, lower=True, order=False, mode="char", stops=set(),
+                   compat=False):
+  """
+  Like similarTopK, but each query is only compared with its candidates in
+  the BlockingIndex 'index' (see BlockingIndex.candidates).
+
+  :param queries: List of strings.
+  :param index: A BlockingIndex with the candidate names.
+  :param dates: List of birth dates of the queries (see BlockingIndex), or None.
+  :param limit: Maximum number of candidates of each query, or None.
+  :return A Pandas data-frame with columns 'iquery', 'query', 'id' (of the
+          candidate in the index), 'candidate', 'score' and 'rank'.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  """
+  import pandas as pd
+  queries = list(queries)
+  if dates is None:
+    dates = [None]*len(queries)
+  prepared = {}
+  def prepare(s):
+    if s not in prepared:
+      prepared[s] = similarPrepare(s, deaccent, lower, order, mode, stops)
+    return prepared[s]
+  rows = []
+  for i, (q, d) in enumerate(zip(queries, dates)):
+    ids = index.candidates(q, d, limit)
+    if len(ids) == 0:
+      continue
+    names = [index.records[id][0] for id in ids]
+    top = similarBlock([prepare(q)], [prepare(x) for x in names], k, cutoff, compat)[0]
+    rows += [(i, q, ids[j], names[j], float(s), r+1) for r, (s, j) in enumerate(top)]
+  return pd.DataFrame(rows, columns=['iquery', 'query', 'id', 'candidate', 'score', 'rank'])
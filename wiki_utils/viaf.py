@@ -0,0 +1,1714 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Functions to query VIAF: Virtual International Authority File (v_*).
+
+@author: Angel Zazo <angelzazo@usal.es>
+"""
+
+#%% Imports
+import sys
+from time import time
+import requests
+import regex as re
+import unicodedata
+import json
+import zlib
+import sqlite3
+import os
+import multiprocessing
+from functools import partial
+from xml.etree import ElementTree
+from threading import Lock
+from concurrent.futures import Future
+from .common import (VIAF_LIMIT, VIAF_RATE, httpRequest, instrumented,
+                     retrySleep, RateLimiter, retryAfter, getSession,
+                     doConcurrent, dumpLines, traced)
+from .text import deaccenttext
+
+
+#%% VIAF API ---------------------------------------------------------------
+# VIAF API to search using HTTP.
+# See https://www.oclc.org/developer/api/oclc-apis/viaf/authority-cluster.en.html
+#
+# Other APIs: https://www.oclc.org/developer/api/oclc-apis.en.html
+
+@traced
+def v_Autosuggest(author, deaccent=True):
+  """
+  Search the name of the author from the VIAF AutoSuggest API and returns
+  information in JSON format of the records found. Note that only returns a
+  maximum of 10 records.
+
+  See: https://www.oclc.org/developer/api/oclc-apis/viaf/authority-cluster.en.html
+
+  Note that records returned by Autosuggest API are not VIAF cluster records.
+  Each returned record in 'result' claim contains the sources (authority
+  catalog or database) and the identifier in them. In contrast, a VIAF record
+  is considered a "cluster record," which is the result of combining records
+  from many sources: libraries around the world into a single record.
+
+  Author is deaccentered before search if deaccent=True.
+
+  :param author: String to search for author. Please, see the structure of the
+         author string to obtain better results:
+         author:  last name, first name[,] [([year_of_bird][-year_of_death])]
+
+  :param deaccent: String is deaccentered before search if deaccent=True.
+  :return A list with the 'result' claims or None.
+          Note that the same author can be more than one time if he/she has
+          more than one name in VIAF.
+  :raise Exception: From response.raise_for_status() or other exception.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :example
+  >>> results = v_Autosuggest('Albaladejo, Luis')
+  >>> # It is easy conveting as Pandas dataframe
+  ... df = pd.DataFrame.from_dict(results)
+  """
+  if deaccent:
+    author = deaccenttext(author)
+  #
+  # headers = {'user-agent': user_agent}  # Not necessary for VIAF API
+  url = "http://www.viaf.org/viaf/AutoSuggest"
+  params = {'query': author}
+  response = httpRequest('GET', url=url, params=params) #, headers=headers)
+  response.raise_for_status()
+  j = response.json()
+  if 'result' in j:
+    return j['result']
+  return None
+
+@traced
+def v_AutosuggestPersonal(author, deaccent=True):
+  """
+  Return only the results of type "Personal" using the VIAF AutoSuggest API.
+
+  :param author: String to search for author. Please, see the structure of the
+         author string to obtain better results:
+         author:  last name, first name[,] [([year_of_bird][-year_of_death])]
+  :param deaccent: String is deaccentered before search if deaccent=True.
+  :return A list with the 'result' claims of nametype='personel' or None.
+          Note that the same author can be more than one time if he/she has
+          more than one name in VIAF.
+  :raise Exception: From response.raise_for_status() or other exception.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :example
+  >>> results = v_AutosuggestPersonal('Albaladejo, Luis')
+  >>> # It is easy conveting as Pandas dataframe
+  ... df = pd.DataFrame.from_dict(results)
+  """
+  response = v_Autosuggest(author, deaccent)
+  if response is None:
+    return None
+  output = list()
+  for record in response:
+    if record['nametype'] == 'personal':
+      output.append(record)
+  return output
+
+### Search interface
+@instrumented('viaf')
+def reqVIAFSearch(params, limiter=None, attempts=3, debug=False):
+  """
+  Make a request to the VIAF Search API with the parameters 'params' (see
+  v_Search), using the session of the current thread. On 429 responses sleep
+  the seconds indicated in 'Retry-After' header and retry; the delay is also
+  applied to the threads which share the RateLimiter.
+
+  :param params: A dict with the parameters of the request.
+  :param limiter: A RateLimiter shared by the threads, or None.
+  :param attempts: Number of retries on 429 responses.
+  :param debug: If True shows the URL requested.
+  :return The JSON response.
+  :raise Exception: From response.raise_for_status() or other exception.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  """
+  url = "https://www.viaf.org/viaf/search"
+  # headers = {'user-agent': user_agent}  # Not necessary for VIAF API
+  session = getSession()
+  nt = 0
+  while True:
+    nt += 1
+    if limiter is not None:
+      limiter.wait()
+    response = httpRequest('GET', url=url, params=params, session=session)
+    if debug:
+      print(requests.utils.unquote(response.url), file=sys.stderr)
+    if response.status_code == 429 and nt <= attempts:
+      t = retryAfter(response)
+      print(f"Received a 429 status-code response. Sleeping {t} seconds", file=sys.stderr)
+      if limiter is not None:
+        limiter.delay(t)
+      retrySleep(t)
+      continue
+    response.raise_for_status()
+    return response.json()
+
+
+@traced
+def v_SearchIter(CQL_query, schema='JSON', start=1, nmax=30, store=None,
+                 max_workers=4, rate=VIAF_RATE, attempts=3, debug=False):
+  """
+  Run the CQL_query using the VIAF Search API as v_Search does, but it is a
+  generator: the records are yielded as the pages of results arrive (the
+  first page, and then the others, which are requested concurrently, not in
+  order). The requests share a rate limit, and on 429 responses all of them
+  wait the seconds indicated in 'Retry-After' header.
+
+  :param CQL_query: String with the search in CQL language.
+  :param schema: The schema of the record. Only supports 'JSON' or 'brief'
+         (see v_Search).
+  :param start: Position of the first record (starting in 1).
+  :param nmax: Maximum number of records.
+  :param store: A VIAFStore where the records found are stored (only if
+         schema='JSON'), or None.
+  :param max_workers: Maximum number of concurrent requests.
+  :param rate: Maximum number of requests per second.
+  :param attempts: Number of retries on 429 responses.
+  :param debug: If True shows the URLs requested.
+  :return A generator of tuples (position, viafid, record), where position
+          is the position of the record in the results.
+  :raise Exception: From response.raise_for_status() or other exception.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :example
+  >>> for position, viafid, record in v_SearchIter('local.personalNames = "Diaz"', nmax=1000):
+  ...   print(position, viafid, v_gender(record))
+  """
+  # Record schema values that are valid for our proccesing are:
+  # 'info:srw/schema/1/JSON'  [very similar to http://viaf.org/VIAFCluster]
+  # and 'http://viaf.org/BriefVIAFCluster', but last not includes birthDate,
+  # deathDate, gender and occupation.
+  if schema == 'JSON':
+    recordSchema = 'info:srw/schema/1/JSON'
+  elif schema == 'brief':
+    recordSchema = 'http://viaf.org/BriefVIAFCluster'
+  else:
+    raise ValueError(f"ERROR in v_SearchIter(): schema '{schema}' is not valid.")
+  params = {'httpAccept' : 'application/json',
+            'recordSchema'   : recordSchema,
+            # 'recordSchema' : 'info:srw/schema/1/JSON',
+            # 'recordSchema' : 'http://viaf.org/VIAFCluster',
+            # 'recordSchema' : 'http://viaf.org/BriefVIAFCluster',
+            # 'recordSchema' : 'info:srw/schema/1/JSONLINKS',
+            # 'recordSchema' : 'info:srw/schema/1/unimarc-v0.1',
+            # 'recordSchema' : 'http://www.w3.org/1999/02/22-rdf-syntax-ns',
+            'query' : CQL_query}
+  limiter = RateLimiter(rate)
+  #
+  def page(first, size=None):
+    if size is None:  # The last page may be smaller
+      size = min(VIAF_LIMIT, end - first)
+    j = reqVIAFSearch(dict(params, startRecord=first, maximumRecords=size),
+                      limiter=limiter, attempts=attempts, debug=debug)
+    j = j['searchRetrieveResponse']
+    records = [x['record']['recordData'] for x in j.get('records', [])]
+    if schema == 'JSON':
+      records = [(first + i, x['viafID'], x) for i, x in enumerate(records)]
+      if store is not None:
+        store.putMany({v:x for _, v, x in records}, origin='search')
+    else:
+      records = [(first + i, x['viafID']['#text'], x) for i, x in enumerate(records)]
+    return int(j['numberOfRecords']), records
+  #
+  maxrecords = nmax if nmax < VIAF_LIMIT else VIAF_LIMIT
+  nrecords, records = page(start, maxrecords)
+  yield from records
+  # The number of records is known: request the other pages concurrently
+  end = start + min(nmax, nrecords + 1 - start)
+  offsets = range(start + maxrecords, end, VIAF_LIMIT)
+  if debug and len(offsets) > 0:
+    print(f"INFO: Number of records found ({nrecords}) excedes the maximun per request API limit ({maxrecords}). Doing {len(offsets)} requests more.", file = sys.stderr)
+  for _, result, error in doConcurrent(page, offsets, max_workers=max_workers):
+    if error is not None:
+      raise error
+    yield from (r for r in result[1] if r[0] < end)
+
+
+@traced
+def v_Search(CQL_query, schema='JSON', start=1, nmax=30, store=None,
+             max_workers=4, debug=False):
+  """
+  Run the CQL_query using the VIAF Search API and returns a list of records
+  found. The search string is formed using the CQL_query syntax of the API.
+  Note that returned records use the record schema set in the recordSchema
+  parameter. Record schema values that are valid for our proccesing are:
+  - 'info:srw/schema/1/JSON'  [very similar to http://viaf.org/VIAFCluster]
+  - 'http://viaf.org/BriefVIAFCluster'
+
+  The brief schema not includes birthDate, deathDate, gender and occupation,
+  but is fast to check if titles (works) match.
+
+  If the number of records found is greater than 250 (API restrictions),
+  successive requests are made: after the first one the number of records is
+  known, so the other pages are requested concurrently (using 'max_workers'
+  threads) and merged in order. On 429 responses all the requests wait the
+  seconds indicated in 'Retry-After' header and they are retried. See
+  v_SearchIter to process the records as the pages arrive.
+  See https://www.oclc.org/developer/api/oclc-apis/viaf/authority-cluster.en.html
+
+  The relational operator in search must be included in the CQL_query. The API
+  supports:
+
+    =     (one or more terms in the same field (title/name/alternative))
+    exact (search the exact string, including any punctuation)
+    any   (for any of a list of terms)
+    all   (for all the listed terms in any field (title/name/alternative))
+    <
+    >
+    <=
+    >=
+    not
+
+  For example:
+    'local.names = "Diaz Francisco', searching in each field 1xx, 4xx, 5xx.
+    'local.names all "Diaz Francisco', searching is in concatenation of all
+                                      the fields 1xx, 4xx, 5xx (word 'Diaz' and
+                                      'Francisco' can be in differents fields)
+
+  :param CQL_query: String with the search in CQL language.
+  :param recordSchema: The schema of the record. Only supports 'JSON' or 'brief'.
+         If schema=JSON, then recordSchema='info:srw/schema/1/JSON' (default).
+         If schema=brief, then recordSchema='http://viaf.org/BriefVIAFCluster'
+  :param nmax: Maximun number of record returned.
+  :param store: A VIAFStore where the records found are stored (only if
+         schema='JSON'), or None.
+  :param max_workers: Maximum number of concurrent requests.
+  :return A dict with the records found {viafId : record, viafID: record}, or
+          None if an error occurs (the error is shown in stderr).
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  """
+  if schema not in ('JSON', 'brief'):
+    print("ERROR in v_Search(): recordSchema parameter is not valid.", file=sys.stderr)
+    return None
+  try:
+    records = sorted(v_SearchIter(CQL_query, schema=schema, start=start, nmax=nmax,
+                                  store=store, max_workers=max_workers, debug=debug),
+                     key=lambda r: r[0])
+  except Exception as ex:
+    print(f'Error in "v_Search": {ex}', file=sys.stderr)
+    print(f'Error in "v_Search": {CQL_query}', file=sys.stderr)
+    return None
+  output = {viafid:record for _, viafid, record in records}
+  if debug:
+    print(f' INFO: Retrieved {len(output)} records.', file=sys.stderr)
+  return output
+
+### Search a string in any Field
+@traced
+def v_SearchAnyField(string, op="=", schema='JSON', start=1, nmax=30, store=None,
+                     debug=False):
+  """
+  Search 'string' in all fields, case insensitive, using the operator "op"
+  (defaults "=").
+
+  This function is a wrapper to v_Search, using this CQL_Query:
+    'cql.any op "string"'
+
+  :param string: It is the string to search.
+  :param op: The operator used in the search.
+  :param schema: The schema of the record. Only supports 'JSON' or 'brief'.
+  :param nmax: Maximun number of record returned.
+  :param store: A VIAFStore where the records found are stored (see v_Search).
+  :return A dict with the records found.
+  :raise Exception: From response.raise_for_status() or other exception.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  """
+  string = string.replace('"', "'")
+  CQL_query = 'cql.any ' + op + ' "' + string + '"'
+  return v_Search(CQL_query, schema=schema, start=start, nmax=nmax, store=store,
+                  debug=debug)
+
+### Search for author names
+@traced
+def v_SearchByName(name, mode='personalNames', op="=", schema='JSON', start=1,
+                  nmax=30, store=None, debug=False):
+  """
+  Search for names of author.
+  This function is a wrapper to v_Search, using one of this modes:
+
+    'local.mainHeadingEl op "name"'
+    'local.names op "name"'
+    'local.personalNames op "name"'
+
+  :param name: It is the name to search for. For betters results use one of
+         this format for the name:
+
+    - If year of bird or death is not known:
+        name: last-name, first-name
+        name: first-name last-name
+
+    - If year of bird or death is not known:
+      last-name, first-name, year_of_bird-year_of_death
+
+  :param mode: mode applied in the search:
+
+    - 'mainHeadingEl': Search preferred Name - names which are the preferred
+       form in an authority record (1xx fields of the MARC records):
+        1xx: Main Entry: Personal name (100), corporate name (110), meeting
+             name (111), uniform title (130)
+
+    - 'names': Search Names within the authority record (1xx, 4xx, 5xx fields)
+        1xx: Heading: Personal name (100), corporate name (110), meeting
+                      name (111), uniform title (130), Events, ...
+        4xx: See From Tracing: Personal name (400), corporate name (410),
+             meeting name (411), uniform title (430), Events...
+        5xx: See Also From Tracing: Personal name (500), corporate name (510),
+             meeting name (511), uniform title (530), Events...
+
+    - 'personalNames': Search Personal Names within the authority record:
+        100: Heading - Personal Name (NR)
+        400: See From Tracing - Personal Name (R)
+        500: See Also From Tracing - Personal Name (R)
+
+  :param op: The operator used in the search.
+  :param schema: The schema of the record. Only supports 'JSON' or 'brief'.
+  :param nmax: Maximum number of VIAF records to return.
+  :param store: A VIAFStore where the records found are stored (see v_Search).
+  :return A list with the records found.
+  :raise Exception: From response.raise_for_status() or other exception.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :example
+  >>> j = v_SearchByName('Albaladejo, Luis', mode='personalNames')
+  ... viaf = j[list(j.keys())[0]]   # Get first record
+  ... g = v_sources(viaf)
+  """
+  name = name.replace('"', "'")
+  if mode== 'mainHeadingEl':
+    CQL_query = 'local.mainHeadingEl ' + op + ' "' + name + '"'
+  elif mode == 'names':
+    CQL_query = 'local.names ' + op + ' "' + name + '"'
+  elif mode == 'personalNames':
+    CQL_query = 'local.personalNames ' + op + ' "' + name + '"'
+  else:
+    raise ValueError(f"ERROR in v_Search(): mode '{mode}' is invalid.")
+  #
+  return v_Search(CQL_query, schema=schema, start=start, nmax=nmax, store=store,
+                  debug=debug)
+
+### Search for titles in VIAF
+@traced
+def v_SearchByTitle(title, op="=", schema='JSON', start=1, nmax=30, store=None,
+                    debug=False):
+  """
+  This function is a wrapper to v_Search, using this CQL_Query:
+    'local.title all "title"'
+  The search is performed with the "=" operator by default, case insentive.
+
+  :param title: It is the title to search.
+  :param op: The operator used in the search.
+  :param schema: The schema of the record. Only supports 'JSON' or 'brief'.
+  :param nmax: Maximum number of VIAF records to return.
+  :param store: A VIAFStore where the records found are stored (see v_Search).
+  :return A list with the records found.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :example
+  >>> j = v_SearchByTitle('La vida perdularia', op='exact')
+  ... viaf = j[list(j.keys())[0]]   # Get first record
+  ... titles = v_titles(viaf)
+  """
+  title = title.replace('"', "'")
+  CQL_query = 'local.title ' + op + ' "' + title + '"'
+  return v_Search(CQL_query, schema=schema, start=start, nmax=nmax, store=store,
+                  debug=debug)
+
+### Get a record from VIAF
+@instrumented('viaf')
+@traced
+def v_GetRecord(viafid, record_format='viaf.json', check=False, store=None,
+                refresh=False):
+  """
+  Obtain the record cluster identified by 'viafid' from VIAF, in the format
+  indicated in 'record_format'. Note that the returned record may be a VIAF
+  cluster record or a redirect/scavenged record: the function returns a tuple
+  with original, redirect or scavenged record.
+
+  :param viafid The VIAF identifier.
+  :param record_format 'viaf.json' (default) or "viaf.xml" (please, see
+         https://www.oclc.org/developer/api/oclc-apis/viaf/authority-cluster.en.html)
+  :param check: If check=True and the record is a redirect/scavenged, then
+         returns a tuple with the ('redirection', viafid_of_the_redirection) or
+         ('scavenged', record_scavenged). If record is not a redirect or
+         scavenged record, then returns a tuple with ('original', record).
+         If check=False (default), only return the VIAF record, if any.
+  :param store: A VIAFStore where the record is looked up and stored (only
+         for record_format='viaf.json'), or None.
+  :param refresh: If True a stored record is checked with a conditional
+         request to VIAF, although it is not expired.
+  :return A VIAF record or a tuple.
+  :raise Exception: From response.raise_for_status() or other exception.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :example
+  >>> viaf = v_GetRecord('29550309')
+  """
+  #
+  viafid = f"{viafid}"  # Perhaps viafid is an int
+  # headers = {'user-agent': user_agent} # Not necessary for VIAF API
+  url = "http://viaf.org/viaf/" + viafid + '/' + record_format
+  #
+  if store is not None and record_format == 'viaf.json':
+    j = reqVIAFStored(viafid, store, refresh=refresh)
+    if j is None:
+      raise LookupError(f"VIAF record '{viafid}' not found")
+    if check is True:
+      if 'redirect' in j:
+        viafid = j['redirect']['directto']
+        _, j = v_GetRecord(viafid, record_format, check, store, refresh)
+        return ('redirect', j)
+      if 'scavenged' in j:
+        return ('scavenged', j['scavenged']['VIAFCluster'])
+      return ('original', j)
+    return(j)
+  #
+  # response = requests.get(url=url, params=params, headers=headers)
+  response = httpRequest('GET', url=url, session=getSession()) # headers=headers)
+  response.raise_for_status()
+  if record_format == 'viaf.xml':
+    text = response.text
+    # Detect it is a redirection
+    if check is True:
+      m = re.search(r'<ns0:directto>([^<]+)</ns0:directto>', text)
+      if m is not None:
+        viafid = m.group(1)
+        _, text = v_GetRecord(viafid, record_format, check)
+        return ('redirect', text)
+      m = re.search(r'<ns0:scavenged>([^<]+)</ns0:scavenged>', text)
+      if m is not None:
+        return ('scavenged', m.group(1))
+      return ('original', text)
+    return(text)
+  #
+  j = response.json()
+  if check is True:
+    if 'redirect' in j:
+      viafid = j['redirect']['directto']
+      _, j = v_GetRecord(viafid, record_format, check)
+      return ('redirect', j)
+    if 'scavenged' in j:
+      return ('scavenged', j['scavenged']['VIAFCluster'])
+    return ('original', j)
+  return(j)
+
+### Return a MARC21 or Unimarc record  record from source
+@traced
+def v_GetProcessed(record_id, source='lc'):
+  """
+  Return a MARC21 or Unimarc record from the authority source using the
+  identifier in that source.
+
+  See: https://www.oclc.org/developer/api/oclc-apis/viaf/authority-source.en.html
+
+  :param record_id: The identifier in the authority source.
+  :param source: Authority source (library).
+  :raise Exception: From response.raise_for_status() or other exception.
+  :return The record in MARC21 or Unimarc Name Authority records format.
+  :raise Exception: From response.raise_for_status() or other exception.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :example
+  >>> record = v_GetProcessed('XX5637072', 'BNE')
+  """
+  if record_id == '':
+    return None
+  #
+  if isinstance(record_id, int):
+    record_id = str(record_id)
+  #
+  url = "http://viaf.org/processed/" + source + '|' + record_id
+  headers = {#'user-agent': user_agent,  # Not necessary for VIAF API
+             'accept' : 'application/marc21+xml'}
+  response = httpRequest('GET', url=url, headers=headers)
+  try:
+    response.raise_for_status()
+  except Exception as ex:
+    print("Excepción en v_Processed", ex)
+    return ''
+  return response.text
+
+### Check if a VIAF record is "Personal", i.e., about a person, not a book,
+### not an organization, etc.
+@traced
+def v_isPersonal(viaf):
+  """
+  Return True if the VIAF record has nameType == "Personal"
+  :param viaf: A VIAF cluster record (in JSON format)
+  :raise Exception: From response.raise_for_status() or other exception.
+  :return True if the VIAF record has nameType == "Personal", else False
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :example
+  >>> j = v_SearchAnyField('Pérez García, Luis', namx=5)
+  ... for vid, viaf in j.items():
+  ...     print(f"{vid} \t isPersonal:{v_isPersonal(viaf)}")
+  """
+  if 'nameType' in viaf:
+    if viaf['nameType'] == 'Personal':
+      return True
+    if '#text' in viaf['nameType'] and viaf['nameType']['#text'] == 'Personal':
+      return True
+  return False
+
+@traced
+def v_titles(viaf, normNFKC=True):
+  """
+  Return titles of works from the VIAF record. Note that the VIAF record musts
+  be in JSON format.
+
+  :param viaf: A VIAF cluster record (in JSON format)
+  :param normNFKC: If Unicode NFKC normalization must be applied on titles.
+  :return A list of titles of works.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :example
+  >>> j = v_SearchByName('Pérez García, Luis', mode='personalNames')
+  ... viaf = j[list(j.keys())[0]]   # Get first record
+  ... titles = v_titles(viaf)
+  """
+  titles = list()
+  if ('titles' in viaf and viaf['titles'] is not None
+      and 'work' in viaf['titles'] and viaf['titles']['work'] is not None):
+    # viaf['titles']['work'] puede ser 1 dict o una lista de dict
+    if isinstance(viaf['titles']['work'], dict):
+      tit = viaf['titles']['work']['title']
+      titles.append(str(tit))
+    else:
+      for t in viaf['titles']['work']:
+        tit = t['title']
+        if isinstance(tit, list):
+          for t2 in tit:
+            titles.append(str(t2))
+        else:
+          titles.append(str(tit))
+    if normNFKC:
+      titles = [unicodedata.normalize("NFKC", x) for x in titles]
+  return titles
+
+@traced
+def v_gender(viaf):
+  """
+  Return the gender of the author from the VIAF record. Note that the VIAF
+  record musts be in JSON format.
+
+  :param viaf: A VIAF cluster record (in JSON format)
+  :return The gender: female, male, u (undefined) or "" (no gender field in record.)
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :example
+  >>> j = v_SearchByName('Pérez García, Luis', mode='personalNames')
+  ... for vid, viaf in j.items():
+  ...     print(f"{vid} \t gender:{v_gender(viaf)}")
+  """
+  if 'fixed' in viaf:
+    if viaf['fixed']['gender'] == 'a':
+      return "female"
+    if viaf['fixed']['gender'] == 'b':
+      return "male"
+    return viaf['fixed']['gender']
+  return ""
+
+@traced
+def v_dates(viaf):
+  """
+  Return bird year and death year from the VIAF cluster record with this
+  format byear:dyear. Note that the VIAF record musts be in JSON format.
+
+  :param viaf: VIAF cluster record (in JSON format).
+  :return The bird year and death year in the form: byear:dyear.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :example
+  >>> j = v_SearchByName('Pérez García, Luis', mode='personalNames')
+  ... for vid, viaf in j.items():
+  ...     print(f"{vid} \t dates={v_dates(viaf)}")
+  """
+  byear = dyear = ''
+  if 'birthDate' in viaf:
+    byear = viaf['birthDate'][:4]
+    if byear == '0':
+      byear = ''
+  if 'deathDate' in viaf:
+    dyear = viaf['deathDate'][:4]
+    if dyear == '0':
+      dyear = ''
+  return byear + ':' + dyear
+
+@traced
+def v_occupations(viaf, normNFKC=True):
+  """
+  Return the occupations from the VIAF record. Note that the VIAF record musts
+  be in JSON format.
+
+  :param viaf: VIAF cluster record (in JSON format).
+  :param normNFKC: If Unicode NFKC normalization must be applied on occupations.
+  return: A list with the occupations.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :example
+  >>> j = v_SearchByName('Pérez García, Luis', mode='personalNames')
+  ... viaf = j['48071603']
+  ... occupation = v_occupations(viaf)
+  """
+  occs = []
+  sources = ['JPG', 'LC', 'BNE']
+  if 'occupation' in viaf and 'data' in viaf['occupation']:
+    # viaf['occupation']['data'] puede ser 1 dict o una lista de dict
+    if isinstance(viaf['occupation']['data'], dict):
+      oc = viaf['occupation']['data']['text']
+      so = viaf['occupation']['data']['sources']
+      if so['s'] in sources:
+        occs.append(oc)
+    else:
+      for t in viaf['occupation']['data']:
+        oc = t['text']
+        so = t['sources']
+        if isinstance(so['s'], list):
+          for s in so['s']:
+            if s in sources:
+              occs.append(str(oc))
+              break # para que no tome oc varias veces si están 'JPG' y 'LC'
+        else:
+          if so['s'] in sources:
+            occs.append(str(oc))
+    if normNFKC:
+      occs = [unicodedata.normalize("NFKC",x) for x in occs]
+  return occs
+
+@traced
+def v_sources(viaf, normNFKC=True):
+  """
+  Return the text of all sources id from the VIAF record using the
+  mainHeadings data. Note that the VIAF record musts be in JSON format.
+
+  :param viaf: VIAF cluster record (in JSON format).
+  :param normNFKC: If Unicode NFKC normalization must be applied on author names.
+  :return A dict with all text (name) and sources.
+       text1 -> dict: {source1: id , source2: id, ...}
+       text2 -> dict: {source1: id , source2: id, ...}
+       ...
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :example
+  >>> j = v_SearchByName('Pérez García, Luis', mode='personalNames')
+  ... viaf = j[list(j.keys())[0]]   # Get first record
+  ... sources = v_sources(viaf)
+  >>> # Convert the dict returned to a Pandas data-frame:
+  ... df = pd.DataFrame.from_dict(sources, orient='index')
+  """
+  texts = dict()
+  vv = viaf['mainHeadings']['data']
+  if not isinstance(vv, list): # Solo un elemento, lo pongo como list
+    vv = [vv]
+  for l in vv:                # cada l es un dict()
+    sources = l['sources']['sid']
+    if not isinstance(sources, list):
+      sources = [sources]
+    name = l['text']
+    s = dict()
+    # Add viafID itself
+    # s['viafID'] = viaf['viafID']
+    for source in sources:
+      library, ident = source.split('|')
+      s[library] = ident
+    texts[name] = s
+  #
+  if normNFKC:
+    texts = {unicodedata.normalize("NFKC",x):y for x,y in texts.items()}
+  return texts
+
+@traced
+def v_sourceId(viaf, source, normNFKC=True):
+  """
+  Return the text and the identifier that the VIAF record has in the source(s).
+  Note that the VIAF record musts be in JSON format.
+
+  :param viaf: The VIAF cluster record (in JSON format).
+  :param source: The source (LC, WKP, JPG, BNE...). More than one source can
+         be set, using '|' as separator.
+  :param normNFKC: If Unicode NFKC normalization must be applied on author names.
+  :return A dict with keys the source(s) and values a tuple (term, identifier)
+          if source is in the VIAF cluster record. If the source does no exists
+          in the viaf record, return a void tuple for the source.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :example
+  >>> j = v_SearchByName('Pérez García, Luis', mode='personalNames')
+  ... viaf = j[list(j.keys())[0]]   # Get first record
+  ... sources = v_sourceId(viaf, 'BNE|LC')
+  >>> # Convert the dict returned to a Pandas data-frame:
+  ... df = pd.DataFrame.from_dict(sources, orient='index')
+  """
+  texts = v_sources(viaf, normNFKC=normNFKC)
+  sources = {x:None for x in source.split('|')}
+  for text,idents in texts.items():
+    for library, ident in idents.items():
+      for s in source.split('|'):
+       if library == s:
+         sources[s] = (text, ident)
+  return sources
+
+@traced
+def v_sourcesX400(viaf, x='x400', normNFKC=True):
+  """
+  Return the normalized text of all sources id from the VIAF record using the
+  x400s/x500s data of the VIAF cluster record.
+  Note that the VIAF record musts be in JSON format.
+
+  :param viaf: VIAF cluster record (in JSON format).
+  :param x: If must be used x400 or x500 source.
+  :param normNFKC: If Unicode NFKC normalization must be applied on author names.
+  :return A dict with all text (name) and sources:
+         text1 -> dict: {source1: id , source2: id, ...}
+         text2 -> dict: {source1: id , source2: id, ...}
+         ...
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :example:
+  >>> j = v_SearchByName('Pérez García, Luis', mode='personalNames')
+  ... viaf = j[list(j.keys())[0]]    # Get first record
+  ... sources = v_sourcesX400(viaf)
+  >>> # Convert the dict returned to a Pandas data-frame:
+  ... df = pd.DataFrame.from_dict(sources, orient='index')
+  """
+  texts = dict()
+  xx = x + 's'
+  if xx not in viaf:
+    return texts
+  vv = viaf[xx][x]
+  if not isinstance(vv, list): # Solo un elemento, lo pongo como list
+    vv = [vv]
+  for v in vv:                # cada l es un dict()
+    text = v['datafield']['normalized']
+    sources = v['sources']['sid']
+    if not isinstance(sources, list): # Solo un elemento, lo pongo como list
+      sources = [sources]
+    s = dict()
+    for source in sources:
+      library, ident = source.split('|')
+      s[library] = ident
+    texts[text] = s
+  #
+  if normNFKC:
+    texts = {unicodedata.normalize("NFKC",x):y for x,y in texts.items()}
+  return texts
+
+@traced
+def v_coauthors(viaf, normNFKC=True):
+  """
+  Return the coauthors from the VIAF record. Note that the VIAF record musts
+  be in JSON format.
+
+  :param viaf: VIAF cluster record (in JSON format).
+  :param normNFKC: If Unicode NFKC normalization must be applied on author names.
+  :return A dict inwith coauthors as keys and the count of works they
+          colaborate as values.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :example:
+  >>> j = v_SearchByName('Pérez García, Luis', mode='personalNames')
+  ... viaf = j[list(j.keys())[0]]    # Get first record
+  ... coauthors = v_coauthors(viaf)
+  """
+  coauthors = dict()
+  if 'coauthors' in viaf and 'data' in viaf['coauthors']:
+    # viaf['coauthors']['data'] puede ser 1 dict o una lista de dict
+    if isinstance(viaf['coauthors']['data'], dict):
+      author = viaf['coauthors']['data']['text']
+      count  = viaf['coauthors']['data']['@count']
+      coauthors[author] = count
+    else:
+      for t in viaf['coauthors']['data']:
+        author = t['text']
+        count  = t['@count']
+        coauthors[author] = count
+    #
+    if normNFKC:
+      coauthors = {unicodedata.normalize("NFKC",x):y for x,y in coauthors.items()}
+  return coauthors
+
+@traced
+def v_wikipedias(viaf):
+  """
+  Return the Wikipedia pages (URL) from the VIAF record. Note that the VIAF
+  record musts be in JSON format.
+
+  :param viaf: The VIAF cluster record (in 1/JSON or BriefVIAFCluster format).
+  :return A list with the URL of the Wikipedia pages in the VIAF cluster
+          record or a void list if no Wikipedia pages are in record.
+  :raise Exception: From response.raise_for_status() or other exception.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :example:
+  >>> j = v_SearchByName('Pérez García, Luis', mode='personalNames')
+  ... viaf = j[list(j.keys())[0]]    # Get first record
+  ... wkp = v_wikipedias(viaf)
+  """
+  if 'xLinks' not in viaf or viaf['xLinks'] is None or 'xLink' not in viaf['xLinks']:
+    return []
+  #
+  wikis = list()
+  xLinks = viaf['xLinks']['xLink']
+  if '#text' in xLinks:  # Only one => set as list
+    xLinks = [xLinks]
+  for l in xLinks:
+    url = l['#text']
+    m = re.match('https?://[^.]+.wikipedia.org', url)
+    if m is not None:
+      wikis.append(url)
+  return wikis
+
+@traced
+def v_allinfo(viaf, normNFKC=True):
+  """
+  Returns all data of interest from the VIAF record. Note that the VIAF
+  record musts be in JSON format.
+
+  :param viaf: The VIAF cluster record (in 1/JSON or BriefVIAFCluster format).
+  :param normNFKC: If Unicode NFKC normalization must be applied on names,
+         titles and occupations.
+  :return A dict.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  """
+  return {
+    'viafId': viaf['viafID'],
+    'gender': v_gender(viaf),
+    'dates' : v_dates(viaf),
+    'sources':v_sources(viaf, normNFKC=normNFKC),
+    'sourcesX400':v_sourcesX400(viaf, normNFKC=normNFKC),
+    'titles': v_titles(viaf, normNFKC=normNFKC),
+    'occupations' : v_occupations(viaf, normNFKC=normNFKC),
+    'coauthors' : v_coauthors(viaf, normNFKC=normNFKC),
+    'wikipedias': v_wikipedias(viaf)
+    }
+
+
+#%% -- VIAF columnar extraction -----------------------------------------------
+# v_allinfo calls a function for each field, and each one walks the record
+# again. v_extract walks the record once and returns rows of tables, so many
+# records can be converted to DataFrames (see v_allinfoFrames).
+
+# Number of records of each batch processed by the pool in v_allinfoFrames.
+VIAF_BATCH = 500
+
+# Wikipedia URLs in the xLinks of the VIAF records (see v_wikipedias).
+_viaf_wikipedia = re.compile('https?://[^.]+.wikipedia.org')
+
+# Tables returned by v_extract, and their columns.
+VIAF_TABLES = {
+  'clusters'   : ('viafId', 'personal', 'gender', 'byear', 'dyear', 'dates'),
+  'titles'     : ('viafId', 'title'),
+  'sources'    : ('viafId', 'heading', 'name', 'source', 'id'),
+  'coauthors'  : ('viafId', 'coauthor', 'count'),
+  'occupations': ('viafId', 'occupation'),
+  'wikipedias' : ('viafId', 'url'),
+  }
+
+#%% v_extract(viaf, normNFKC=True, tables=None)
+@traced
+def v_extract(viaf, normNFKC=True, tables=None):
+  """
+  Extract the data of interest from the VIAF record (the data returned by
+  v_allinfo) walking the record once. The data is returned as rows of the
+  tables of VIAF_TABLES: 'clusters' (one row), and 'titles', 'sources'
+  (headings 'main', from mainHeadings, and 'x400'), 'coauthors',
+  'occupations' and 'wikipedias' (one row per element).
+
+  :param viaf: The VIAF cluster record (in 1/JSON or BriefVIAFCluster format),
+         as a dict or as a JSON string.
+  :param normNFKC: If Unicode NFKC normalization must be applied on names,
+         titles and occupations.
+  :param tables: A dict table -> list where the rows are appended, or None
+         (a new one is created).
+  :return The dict 'tables'.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  """
+  if tables is None:
+    tables = {t:[] for t in VIAF_TABLES}
+  if isinstance(viaf, (str, bytes)):
+    viaf = json.loads(viaf)
+  normalize = unicodedata.normalize
+  #
+  def norm(x):
+    if not isinstance(x, str):
+      x = str(x)
+    if normNFKC and not x.isascii():  # ASCII strings are NFKC normalized
+      return normalize("NFKC", x)
+    return x
+  #
+  def aslist(x):
+    return x if isinstance(x, list) else [x]
+  #
+  vid = viaf['viafID']
+  if isinstance(vid, dict):  # BriefVIAFCluster
+    vid = vid['#text']
+  byear = viaf.get('birthDate', '')[:4]
+  dyear = viaf.get('deathDate', '')[:4]
+  byear = '' if byear == '0' else byear
+  dyear = '' if dyear == '0' else dyear
+  gender = viaf['fixed']['gender'] if 'fixed' in viaf else ''
+  gender = {'a': 'female', 'b': 'male'}.get(gender, gender)
+  tables['clusters'].append((vid, v_isPersonal(viaf), gender, byear, dyear,
+                             byear + ':' + dyear))
+  #
+  rows = tables['titles']
+  works = viaf.get('titles')
+  works = works.get('work') if works is not None else None
+  if works is not None:
+    for t in aslist(works):
+      t = t['title']
+      if isinstance(t, list):
+        rows.extend([(vid, norm(x)) for x in t])
+      else:
+        rows.append((vid, norm(t)))
+  #
+  rows = tables['sources']
+  for l in aslist(viaf['mainHeadings']['data']):
+    name = norm(l['text'])
+    for source in aslist(l['sources']['sid']):
+      library, _, ident = source.partition('|')
+      rows.append((vid, 'main', name, library, ident))
+  if 'x400s' in viaf:
+    for v in aslist(viaf['x400s']['x400']):
+      name = norm(v['datafield']['normalized'])
+      for source in aslist(v['sources']['sid']):
+        library, _, ident = source.partition('|')
+        rows.append((vid, 'x400', name, library, ident))
+  #
+  rows = tables['coauthors']
+  if 'coauthors' in viaf and 'data' in viaf['coauthors']:
+    for t in aslist(viaf['coauthors']['data']):
+      rows.append((vid, norm(t['text']), t['@count']))
+  #
+  rows = tables['occupations']
+  if 'occupation' in viaf and 'data' in viaf['occupation']:
+    for t in aslist(viaf['occupation']['data']):
+      if any(x in ('JPG', 'LC', 'BNE') for x in aslist(t['sources']['s'])):
+        rows.append((vid, norm(t['text'])))
+  #
+  rows = tables['wikipedias']
+  xLinks = viaf.get('xLinks')
+  if xLinks is not None and 'xLink' in xLinks:
+    for l in aslist(xLinks['xLink']):
+      if _viaf_wikipedia.match(l['#text']) is not None:
+        rows.append((vid, l['#text']))
+  return tables
+
+#%% v_extractBatch(records, normNFKC=True)
+@traced
+def v_extractBatch(records, normNFKC=True):
+  """
+  Apply v_extract to the VIAF records of the list 'records' (dicts or JSON
+  strings), and return the dict with the rows of all of them.
+  """
+  tables = {t:[] for t in VIAF_TABLES}
+  for viaf in records:
+    v_extract(viaf, normNFKC=normNFKC, tables=tables)
+  return tables
+
+#%% v_allinfoFrames(records, normNFKC=True, processes=1, batchsize=VIAF_BATCH)
+@traced
+def v_allinfoFrames(records, normNFKC=True, processes=1, batchsize=VIAF_BATCH):
+  """
+  Extract the data of interest (see v_allinfo) from many VIAF records, as
+  Pandas data-frames: 'clusters', with a row per record, and the tables
+  (exploded) 'titles', 'sources', 'coauthors', 'occupations' and
+  'wikipedias', with the column 'viafId' to join them (see v_extract). Each
+  record is walked once.
+
+  The records can be processed by a pool of processes, in batches of
+  'batchsize' records. Passing the records as JSON strings (for example, as
+  they are read from a file) the parsing is also done by the pool; passing
+  dicts, they are serialized to be sent to the processes, so a pool is only
+  worthwhile for big batches.
+
+  :param records: An iterable of VIAF records (dicts or JSON strings), or a
+         dict viafid -> record (as v_Search returns).
+  :param normNFKC: If Unicode NFKC normalization must be applied on names,
+         titles and occupations.
+  :param processes: Number of processes. Default 1 (records are processed in
+         the main process). If None, the number of CPUs.
+  :param batchsize: Number of records in each batch.
+  :return A dict table -> data-frame.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :example
+  >>> j = v_SearchByName('Pérez García, Luis', mode='personalNames', nmax=500)
+  >>> t = v_allinfoFrames(j)
+  >>> t['clusters'].merge(t['titles'], on='viafId')
+  """
+  import pandas as pd
+  if isinstance(records, dict):
+    records = records.values()
+  if processes == 1:
+    tables = v_extractBatch(records, normNFKC=normNFKC)
+  else:
+    def batches():
+      batch = []
+      for viaf in records:
+        batch.append(viaf)
+        if len(batch) >= batchsize:
+          yield batch
+          batch = []
+      if len(batch) > 0:
+        yield batch
+    tables = {t:[] for t in VIAF_TABLES}
+    with multiprocessing.Pool(processes) as pool:
+      for result in pool.imap(partial(v_extractBatch, normNFKC=normNFKC), batches()):
+        for t, rows in result.items():
+          tables[t].extend(rows)
+  frames = {t:pd.DataFrame(tables[t], columns=columns)
+            for t, columns in VIAF_TABLES.items()}
+  frames['coauthors']['count'] = pd.to_numeric(frames['coauthors']['count'], errors='coerce')
+  return frames
+
+#%% -- VIAF bulk fetching ----------------------------------------------------
+# v_GetRecord obtains one cluster per call, and follows the redirects with new
+# synchronous requests. v_GetRecords obtains many clusters concurrently, with a
+# shared rate limit, and memoizes the redirections found: a redirect already
+# known is followed without a new request.
+
+#%% reqVIAF(viafid, record_format='viaf.json', limiter=None, attempts=3,
+#           headers=None, raw=False)
+@instrumented('viaf')
+def reqVIAF(viafid, record_format='viaf.json', limiter=None, attempts=3,
+            headers=None, raw=False):
+  """
+  Get the record identified by 'viafid' from VIAF (a cluster record or a
+  redirect/scavenged record, as is), using the session of the current thread.
+  On 429 responses sleep the seconds indicated in 'Retry-After' header and
+  retry. Safe to be called from several threads.
+
+  :param viafid: The VIAF identifier.
+  :param record_format: 'viaf.json' (default) or 'viaf.xml'.
+  :param limiter: A RateLimiter shared by the threads, or None.
+  :param attempts: Number of retries on 429 responses.
+  :param headers: A dict with the headers of the request, if any (e.g. the
+         validators of a conditional request, see VIAFStore).
+  :param raw: If True return the response (status code 200, 304 or 404).
+  :return The JSON record (or the text if record_format='viaf.xml'), or None
+          if the status code is 404 (not found).
+  :raise Exception: From response.raise_for_status() or other exception.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  """
+  url = f"http://viaf.org/viaf/{viafid}/{record_format}"
+  session = getSession()
+  nt = 0
+  while True:
+    nt += 1
+    if limiter is not None:
+      limiter.wait()
+    response = httpRequest('GET', url=url, headers=headers, session=session)
+    if response.status_code == 429 and nt <= attempts:
+      t = retryAfter(response)
+      print(f"Received a 429 status-code response. Sleeping {t} seconds", file=sys.stderr)
+      if limiter is not None:
+        limiter.delay(t)
+      retrySleep(t)
+      continue
+    if response.status_code == 404:
+      return response if raw else None
+    response.raise_for_status()
+    if raw:
+      return response
+    return response.text if record_format == 'viaf.xml' else response.json()
+
+
+#%% v_GetRecords(viafids, allinfo=False, normNFKC=True, redirects=None,
+#                failures=None, store=None, refresh=False, max_workers=8,
+#                rate=VIAF_RATE, attempts=3, debug=False)
+@traced
+def v_GetRecords(viafids, allinfo=False, normNFKC=True, redirects=None,
+                 failures=None, store=None, refresh=False, max_workers=8,
+                 rate=VIAF_RATE, attempts=3, debug=False):
+  """
+  Obtain the VIAF clusters identified by 'viafids', using a pool of threads
+  which share a rate limit. Redirect records are followed until the current
+  cluster, and scavenged records return the cluster included in them (as
+  v_GetRecord with check=True). It is a generator: the records are yielded as
+  they are obtained (not in order), so they are not kept in memory.
+
+  The redirections found are stored in the dict 'redirects': pass the same
+  dict in several calls (or a dict saved from a previous one) and the known
+  redirections (and scavenged records) will be followed without requesting
+  the old record again. When several VIAF identifiers redirect to the same
+  cluster, it is requested only once.
+  A VIAF identifier which can not be obtained (not found, HTTP error, too
+  many redirections...) does not abort the others: it is stored in the dict
+  'failures' with the exception raised.
+
+  If a VIAFStore is set in 'store', the records (and redirections) are
+  obtained from it, and only the records not stored or expired are requested
+  to VIAF (expired records with a conditional request), and then stored. If
+  allinfo=True the records stored by v_Search are also used.
+
+  :param viafids: A VIAF identifier or a list of them. Duplicates are removed.
+  :param allinfo: If True yield the dict returned by v_allinfo instead of the
+         VIAF cluster record (it is computed in the threads).
+  :param normNFKC: Parameter of v_allinfo.
+  :param redirects: A dict where the redirections are stored and looked up:
+         old viafid -> ('redirect', current viafid) or ('scavenged', viafid
+         of the cluster included). If None a new dict is used.
+  :param failures: A dict where the VIAF identifiers not obtained are stored
+         with the exception raised (viafid -> exception). If None, failures
+         are only shown in stderr.
+  :param store: A VIAFStore, or None.
+  :param refresh: If True the records stored are checked with a conditional
+         request to VIAF, although they are not expired.
+  :param max_workers: Maximum number of concurrent requests.
+  :param rate: Maximum number of requests per second.
+  :param attempts: Number of retries on 429 responses.
+  :param debug: If True shows the VIAF identifiers as they are obtained.
+  :return A generator of tuples (viafid, current_viafid, kind, record) where
+          kind is 'original', 'redirect' or 'scavenged', and record is the
+          VIAF cluster record or the v_allinfo dict.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :example
+  >>> failures = {}
+  >>> for viafid, current, kind, info in v_GetRecords(['29550309', '113230702'], allinfo=True, failures=failures):
+  ...   print(viafid, current, kind, info['gender'])
+  """
+  if isinstance(viafids, (str, int)):
+    viafids = [viafids]
+  viafids = list(dict.fromkeys(f"{v}".strip() for v in viafids))
+  if any(not v.isdigit() for v in viafids):
+    raise ValueError("Invalid value for parameter 'viafids'")
+  if redirects is None:
+    redirects = {}
+  limiter = RateLimiter(rate)
+  lock = Lock()
+  origins = ('cluster', 'dump', 'search') if allinfo else ('cluster', 'dump')
+  responses = {}   # viafid -> Future with the response (in flight or shared)
+  targets = set()  # viafids reached through a redirection: responses kept
+  #
+  def request(current, shared):
+    # Request the record of 'current' once, although several viafids of the
+    # list redirect to it. The responses of the targets of redirections
+    # ('shared') are kept while the generator runs, the others are dropped
+    # when they are obtained.
+    with lock:
+      if shared:
+        targets.add(current)
+      future = responses.get(current)
+      owner = future is None
+      if owner:
+        future = responses[current] = Future()
+    if owner:
+      try:
+        if store is not None:
+          j = reqVIAFStored(current, store, limiter=limiter, attempts=attempts,
+                            origins=origins, refresh=refresh)
+        else:
+          j = reqVIAF(current, limiter=limiter, attempts=attempts)
+        future.set_result(j)
+      except Exception as ex:
+        future.set_exception(ex)
+      finally:
+        with lock:
+          if current not in targets:
+            del responses[current]
+    return future.result()
+  #
+  def fetch(viafid):
+    kind = 'original'
+    current = viafid
+    chain = []
+    while True:
+      with lock:
+        hop = redirects.get(current)
+      if hop is None and store is not None:
+        hop = store.getRedirect(current)
+      if hop is not None and hop[0] == 'scavenged' and store is not None:
+        hop = None   # The store keeps the cluster included in the old record
+      if hop is None:
+        j = request(current, current != viafid)
+        if j is None:
+          raise LookupError(f"VIAF record '{current}' not found")
+        if 'redirect' in j:
+          hop = ('redirect', f"{j['redirect']['directto']}")
+          with lock:
+            redirects[current] = hop
+        elif 'scavenged' in j:
+          j = j['scavenged']['VIAFCluster']
+          hop = ('scavenged', f"{j.get('viafID', current)}")
+          with lock:
+            redirects[current] = hop
+            # The cluster included is the response of its viafid
+            if hop[1] not in responses:
+              targets.add(hop[1])
+              responses[hop[1]] = Future()
+              responses[hop[1]].set_result(j)
+          current = hop[1]
+          kind = 'scavenged'
+          break
+        else:
+          break
+      # Known redirection (or scavenged record): do not request the old
+      # record again, follow it
+      kind = 'scavenged' if 'scavenged' in (kind, hop[0]) else 'redirect'
+      chain.append(current)
+      current = hop[1]
+      if current in chain:
+        raise RecursionError(f"Redirection cycle for VIAF record '{viafid}': {chain}")
+    if allinfo:
+      j = v_allinfo(j, normNFKC=normNFKC)
+    return (current, kind, j)
+  #
+  for viafid, result, error in doConcurrent(fetch, viafids, max_workers=max_workers):
+    if error is not None:
+      if failures is not None:
+        failures[viafid] = error
+      else:
+        print(f"VIAF record '{viafid}' not obtained: {error!r}", file=sys.stderr)
+      continue
+    if debug:
+      print(viafid, result[0], result[1], file=sys.stderr)
+    yield (viafid,) + result
+
+
+#%% -- VIAF local store -------------------------------------------------------
+# The VIAF cluster records are big (tens or hundreds of KB in JSON) and they are
+# requested again and again. VIAFStore keeps them compressed in a SQLite
+# database, with the redirections found.
+
+#%% viafStoreRows(records, level=9)
+def viafStoreRows(records, level=9):
+  """
+  Return the rows to be stored in a VIAFStore for the records of a dict
+  viafid -> record (as VIAF returns them: cluster, redirect or scavenged
+  records): a tuple of lists with the rows of the records (viafid, kind,
+  compressed record), of the redirections (viafid, kind, target) and of the
+  crosswalk (source, id, viafid, name), from the mainHeadings of the records.
+  Used by VIAFStore.putMany and by the processes which parse the VIAF dumps.
+  """
+  rows, redirects, crosswalk = [], [], []
+  for viafid, j in records.items():
+    viafid = f"{viafid}"
+    if 'redirect' in j:
+      redirects.append((viafid, 'redirect', f"{j['redirect']['directto']}"))
+      continue
+    kind = 'original'
+    if 'scavenged' in j:
+      kind = 'scavenged'
+      j = j['scavenged']['VIAFCluster']
+      redirects.append((viafid, 'scavenged', f"{j.get('viafID', viafid)}"))
+    else:
+      vv = j.get('mainHeadings', {}).get('data', [])
+      for l in (vv if isinstance(vv, list) else [vv]):
+        sources = l['sources']['sid']
+        for source in (sources if isinstance(sources, list) else [sources]):
+          library, _, ident = source.partition('|')
+          crosswalk.append((library, ident, viafid, str(l['text'])))
+    rows.append((viafid, kind, zlib.compress(json.dumps(j, ensure_ascii=False,
+                  separators=(',', ':')).encode('utf-8'), level)))
+  return rows, redirects, crosswalk
+
+
+#%% class VIAFStore(path, ttl=None, level=9)
+class VIAFStore:
+  """
+  Local store (a SQLite database) of VIAF cluster records, keyed by the VIAF
+  identifier. The records are stored in compact JSON compressed with zlib,
+  with the time they were obtained and the validators of the response (ETag
+  and Last-Modified headers), so expired records can be refreshed with a
+  conditional request (see reqVIAFStored). If ttl=None the records never
+  expire.
+
+  Each record has an origin: 'cluster' if obtained from the VIAF cluster API
+  (v_GetRecord, v_GetRecords), 'dump' if loaded from a VIAF clusters dump
+  (see load), or 'search' if obtained from the search API (v_Search, using
+  schema='JSON'), whose records are similar but not equal. Records from the
+  cluster API or from a dump replace the records from the search API, but not
+  the reverse.
+
+  The store also keeps the redirections found, as v_GetRecords does:
+  old viafid -> ('redirect', current viafid) or ('scavenged', viafid of the
+  cluster included in the scavenged record). The scavenged records are
+  stored with the cluster included in them.
+
+  The store also has a crosswalk between the identifiers of the sources of
+  VIAF (libraries and other authority files) and the VIAF identifiers, with
+  the headings of the clusters stored and with the links of the VIAF links
+  dump (see load). See the methods viafIds, sources and sourceId.
+
+  The store is safe to be used from several threads.
+
+  :param path: The file of the SQLite database (created if not exists).
+  :param ttl: Time-to-live of the records, in seconds, or None.
+  :param level: The zlib compression level (0-9).
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :example
+  >>> store = VIAFStore('viaf.sqlite', ttl=180*24*3600)
+  >>> viaf = v_GetRecord('29550309', store=store)   # Requested to VIAF
+  >>> viaf = v_GetRecord('29550309', store=store)   # Read from the store
+  >>> j = v_SearchByName('Albaladejo, Luis', store=store)
+  >>> rows = [info for _, _, _, info in v_GetRecords(list(j), allinfo=True, store=store)]
+  >>> # Load the VIAF dumps, see https://viaf.org/viaf/data/
+  >>> store.load('viaf-20240804-clusters.xml.gz', 'viaf-20240804-links.txt.gz', debug=True)
+  >>> store.viafIds('BNE', 'XX1718747')
+  """
+  ORIGINS = ('cluster', 'dump', 'search')
+
+  def __init__(self, path, ttl=None, level=9):
+    self.path = path
+    self.ttl = ttl
+    self.level = level
+    self.lock = Lock()
+    self.con = sqlite3.connect(path, check_same_thread=False)
+    with self.lock, self.con:
+      self.con.execute("""CREATE TABLE IF NOT EXISTS records (
+        viafid TEXT PRIMARY KEY, kind TEXT, origin TEXT, fetched REAL,
+        etag TEXT, modified TEXT, record BLOB)""")
+      self.con.execute("""CREATE TABLE IF NOT EXISTS redirects (
+        viafid TEXT PRIMARY KEY, kind TEXT, target TEXT) WITHOUT ROWID""")
+      self.con.execute("""CREATE TABLE IF NOT EXISTS crosswalk (
+        source TEXT, id TEXT, viafid TEXT, name TEXT,
+        PRIMARY KEY (source, id, viafid)) WITHOUT ROWID""")
+      self.con.execute("CREATE INDEX IF NOT EXISTS crosswalk_viafid ON crosswalk(viafid)")
+      self.con.execute("""CREATE TABLE IF NOT EXISTS loaded (
+        path TEXT PRIMARY KEY, lines INTEGER, complete INTEGER)""")
+
+  def close(self):
+    self.con.close()
+
+  def __len__(self):
+    with self.lock:
+      return self.con.execute("SELECT count(*) FROM records").fetchone()[0]
+
+  def __contains__(self, viafid):
+    return self.getRecord(viafid) is not None or self.getRedirect(viafid) is not None
+
+  @staticmethod
+  def decompress(blob):
+    return json.loads(zlib.decompress(blob).decode('utf-8'))
+
+  def isExpired(self, fetched):
+    """True if a record obtained at time 'fetched' is expired."""
+    return self.ttl is not None and time() - fetched > self.ttl
+
+  def getRecord(self, viafid, origins=ORIGINS):
+    """
+    Return a tuple (kind, record, fetched, etag, modified) with the record
+    stored of 'viafid' (not following the redirections), if its origin is in
+    'origins', else None. Kind is 'original' or 'scavenged'.
+    """
+    with self.lock:
+      row = self.con.execute("""SELECT kind, origin, fetched, etag, modified, record
+        FROM records WHERE viafid=?""", (f"{viafid}",)).fetchone()
+    if row is None or row[1] not in origins:
+      return None
+    return (row[0], self.decompress(row[5]), row[2], row[3], row[4])
+
+  def getRedirect(self, viafid):
+    """Return the redirection (kind, target) of 'viafid', or None."""
+    with self.lock:
+      row = self.con.execute("SELECT kind, target FROM redirects WHERE viafid=?",
+                             (f"{viafid}",)).fetchone()
+    return None if row is None else tuple(row)
+
+  def get(self, viafid, origins=ORIGINS):
+    """
+    Return a tuple (current_viafid, kind, record), following the redirections
+    stored (as v_GetRecords), or None if the record is not stored. Expired
+    records are also returned.
+    """
+    viafid = f"{viafid}"
+    kind = 'original'
+    chain = []
+    while True:
+      hop = self.getRedirect(viafid)
+      if hop is None or hop[0] != 'redirect' or viafid in chain:
+        break
+      chain.append(viafid)
+      kind = 'redirect'
+      viafid = hop[1]
+    entry = self.getRecord(viafid, origins)
+    if entry is None:
+      return None
+    if entry[0] == 'scavenged':
+      return (f"{entry[1].get('viafID', viafid)}", 'scavenged', entry[1])
+    return (viafid, kind, entry[1])
+
+  def put(self, viafid, record, origin='cluster', etag=None, modified=None):
+    """
+    Store the record of 'viafid' as returned by VIAF: a cluster record, a
+    redirect record (only the redirection is stored) or a scavenged record.
+    """
+    self.putMany({viafid: record}, origin=origin, etag=etag, modified=modified)
+
+  def putMany(self, records, origin='cluster', etag=None, modified=None):
+    """
+    Store the records of a dict viafid -> record (see put). Records from the
+    search API (origin='search') do not replace the records from the cluster
+    API or from a dump.
+    """
+    rows, redirects, crosswalk = viafStoreRows(records, self.level)
+    with self.lock, self.con:
+      self.write(rows, redirects, crosswalk, origin, etag, modified)
+
+  def write(self, rows, redirects, crosswalk, origin, etag=None, modified=None):
+    """Insert the rows returned by viafStoreRows (the lock must be held)."""
+    fetched = time()
+    rows = [(v, k, origin, fetched, etag, modified, r) for v, k, r in rows]
+    if origin != 'search':
+      sql = "INSERT OR REPLACE INTO records VALUES (?,?,?,?,?,?,?)"
+    else:
+      sql = """INSERT INTO records VALUES (?,?,?,?,?,?,?) ON CONFLICT(viafid)
+               DO UPDATE SET kind=excluded.kind, fetched=excluded.fetched,
+               record=excluded.record WHERE origin=excluded.origin"""
+    self.con.executemany(sql, rows)
+    self.con.executemany("INSERT OR REPLACE INTO redirects VALUES (?,?,?)", redirects)
+    self.con.executemany("""INSERT INTO crosswalk VALUES (?,?,?,?)
+      ON CONFLICT DO UPDATE SET name=coalesce(excluded.name, name)""", crosswalk)
+
+  def viafIds(self, source, ident):
+    """
+    Return the list of VIAF identifiers of the identifier 'ident' of the
+    source 'source' (LC, BNE, DNB, WKP...), using the crosswalk.
+    """
+    with self.lock:
+      rows = self.con.execute("SELECT viafid FROM crosswalk WHERE source=? AND id=?",
+                              (source, f"{ident}")).fetchall()
+    return [r[0] for r in rows]
+
+  def sources(self, viafid, normNFKC=True):
+    """
+    Return the names and the identifiers in the sources of the VIAF cluster
+    'viafid', using the crosswalk, with the same format as v_sources: a dict
+    name -> dict {source: id, ...}. The identifiers loaded from the links dump
+    have not name: they are in name ''.
+    """
+    with self.lock:
+      rows = self.con.execute("SELECT name, source, id FROM crosswalk WHERE viafid=?",
+                              (f"{viafid}",)).fetchall()
+    texts = dict()
+    for name, library, ident in rows:
+      if name is None:
+        name = ''
+      elif normNFKC:
+        name = unicodedata.normalize("NFKC", name)
+      texts.setdefault(name, dict())[library] = ident
+    return texts
+
+  def sourceId(self, viafid, source, normNFKC=True):
+    """
+    Return the name and the identifier that the VIAF cluster 'viafid' has in
+    the source(s), using the crosswalk, with the same format as v_sourceId: a
+    dict with keys the source(s) ('|' as separator) and values a tuple (name,
+    identifier), or None if the source is not in the cluster.
+    """
+    sources = {x:None for x in source.split('|')}
+    for text, idents in self.sources(viafid, normNFKC=normNFKC).items():
+      for library, ident in idents.items():
+        if library in sources and (sources[library] is None or sources[library][0] == ''):
+          sources[library] = (text, ident)
+    return sources
+
+  def load(self, *paths, processes=None, batchsize=VIAF_BATCH, debug=False):
+    """
+    Load the VIAF dumps (see https://viaf.org/viaf/data/): the clusters dumps
+    (one record per line, in XML or JSON, optionally preceded by the VIAF
+    identifier and a tab) into the records of the store and the crosswalk,
+    and the links dumps (files with 'links' in their name, lines with the
+    VIAF URI, a tab and 'source|id' or 'source@URL') into the crosswalk.
+
+    The lines are parsed in batches of 'batchsize' lines by a pool of
+    'processes' processes (see dumpScan), and each batch is committed with
+    the number of lines loaded of the dump. If the load is interrupted, a new
+    call continues after the last batch loaded (the previous lines are read
+    again, but not parsed). A dump already loaded is skipped.
+
+    :param paths: The dump files (.gz, .bz2 or not compressed).
+    :param processes: Number of parsing processes. Default None (the number
+           of CPUs). If processes=1, lines are parsed in the main process.
+    :param batchsize: Number of lines in each batch.
+    :param debug: If True shows the progress of the load.
+    """
+    # The dump is loaded without syncing to disk (each batch is committed, so an
+    # interrupted load continues), the previous mode is restored at the end
+    with self.lock:
+      synchronous = self.con.execute("PRAGMA synchronous").fetchone()[0]
+      self.con.execute("PRAGMA synchronous=OFF")
+    try:
+      for path in paths:
+        with self.lock:
+          row = self.con.execute("SELECT lines, complete FROM loaded WHERE path=?",
+                                 (path,)).fetchone()
+        done, complete = row if row is not None else (0, 0)
+        if complete:
+          if debug:
+            print(f"INFO: '{path}' is already loaded", file=sys.stderr)
+          continue
+        t0 = time()
+        kind = 'links' if 'links' in os.path.basename(path) else 'clusters'
+        if debug:
+          print(f"INFO: Loading {kind} dump '{path}'" +
+                (f" from line {done}" if done > 0 else ""), file=sys.stderr)
+        #
+        def batches():
+          batch = []
+          for n, line in enumerate(dumpLines(path)):
+            if n < done:
+              continue
+            batch.append(line)
+            if len(batch) >= batchsize:
+              yield batch
+              batch = []
+          if len(batch) > 0:
+            yield batch
+        #
+        parse = partial(viafDumpBatch, kind=kind, level=self.level)
+        if processes == 1:
+          results = map(parse, batches())
+        else:
+          pool = multiprocessing.Pool(processes)
+          results = pool.imap(parse, batches())
+        try:
+          for nlines, rows, redirects, crosswalk in results:
+            done += nlines
+            with self.lock, self.con:
+              self.write(rows, redirects, crosswalk, 'dump')
+              self.con.execute("INSERT OR REPLACE INTO loaded VALUES (?,?,0)", (path, done))
+            if debug:
+              print(f"\r INFO: {done} lines ({time()-t0:.0f} seconds)", end="", file=sys.stderr)
+        finally:
+          if processes != 1:
+            pool.terminate()
+        with self.lock, self.con:
+          self.con.execute("INSERT OR REPLACE INTO loaded VALUES (?,?,1)", (path, done))
+        if debug:
+          print(f"\n INFO: '{path}' loaded ({time()-t0:.2f} seconds)", file=sys.stderr)
+    finally:
+      with self.lock:
+        self.con.execute(f"PRAGMA synchronous={synchronous}")
+
+  def touch(self, viafid):
+    """Update the time of the record of 'viafid' (not modified in VIAF)."""
+    with self.lock, self.con:
+      self.con.execute("UPDATE records SET fetched=? WHERE viafid=?",
+                       (time(), f"{viafid}"))
+
+  def vacuum(self):
+    """Rebuild the database file to reclaim the space of replaced records."""
+    with self.lock:
+      self.con.execute("VACUUM")
+
+
+#%% reqVIAFStored(viafid, store, limiter=None, attempts=3,
+#                 origins=('cluster', 'dump'), refresh=False)
+def reqVIAFStored(viafid, store, limiter=None, attempts=3,
+                  origins=('cluster', 'dump'), refresh=False):
+  """
+  Get the record identified by 'viafid' as reqVIAF does, but using the
+  VIAFStore 'store': a stored record is returned if it is not expired (and
+  refresh=False); else it is requested to VIAF (a conditional request if it
+  is stored, using its validators) and stored. The record is returned as
+  VIAF returns it, so a scavenged record includes the cluster record, and a
+  redirection stored is returned as a redirect record.
+
+  :param viafid: The VIAF identifier.
+  :param store: A VIAFStore.
+  :param limiter: A RateLimiter shared by the threads, or None.
+  :param attempts: Number of retries on 429 responses.
+  :param origins: Origins of the stored records which can be returned (see
+         VIAFStore).
+  :param refresh: If True a stored record is checked with a conditional
+         request, although it is not expired.
+  :return The JSON record, or None if the status code is 404 (not found).
+  :raise Exception: From response.raise_for_status() or other exception.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  """
+  hop = store.getRedirect(viafid)
+  if hop is not None and hop[0] == 'redirect':
+    # The redirections of VIAF are permanent
+    return {'redirect': {'directto': hop[1]}}
+  entry = store.getRecord(viafid, origins)
+  headers = None
+  if entry is not None:
+    kind, j, fetched, etag, modified = entry
+    if kind == 'scavenged':
+      j = {'scavenged': {'VIAFCluster': j}}
+    if not refresh and not store.isExpired(fetched):
+      return j
+    headers = {}
+    if etag is not None:
+      headers['If-None-Match'] = etag
+    if modified is not None:
+      headers['If-Modified-Since'] = modified
+  response = reqVIAF(viafid, limiter=limiter, attempts=attempts,
+                     headers=headers or None, raw=True)
+  if response.status_code == 304 and entry is not None:
+    store.touch(viafid)
+    return j
+  if response.status_code == 404:
+    return None
+  j = response.json()
+  store.put(viafid, j, etag=response.headers.get('ETag'),
+            modified=response.headers.get('Last-Modified'))
+  return j
+
+
+#%% -- VIAF dumps -------------------------------------------------------------
+# OCLC publishes the VIAF clusters and links as dumps (https://viaf.org/viaf/data/).
+# They are loaded into a VIAFStore (see VIAFStore.load). The XML records of the
+# clusters dump are converted to the JSON format of the VIAF API (the same
+# conversion VIAF does: attributes in '@name' keys, the text of elements with
+# attributes in '#text', and repeated elements in lists), so the v_* functions
+# can be used with them.
+
+# A line of the links dump: VIAF URI, tab, 'source|id' or 'source@URL'.
+_viaf_link = re.compile(r'^\S*?(\d+)\t([^|@\t]+)[|@](.+)$')
+
+#%% xmlToJSON(element)
+def xmlToJSON(element):
+  """
+  Convert an XML element (of xml.etree.ElementTree) to the JSON format of the
+  VIAF API, without namespaces. Return a string or a dict.
+  """
+  d = {'@' + k.rpartition('}')[2]:v for k,v in element.attrib.items()}
+  for child in element:
+    key = child.tag.rpartition('}')[2]
+    value = xmlToJSON(child)
+    if key not in d:
+      d[key] = value
+    elif isinstance(d[key], list):
+      d[key].append(value)
+    else:
+      d[key] = [d[key], value]
+  text = element.text.strip() if element.text is not None else ''
+  if len(d) == 0:
+    return text
+  if text != '':
+    d['#text'] = text
+  return d
+
+#%% viafDumpRecord(line)
+def viafDumpRecord(line):
+  """
+  Parse a line of the VIAF clusters dump (XML or JSON, optionally preceded by
+  the VIAF identifier and a tab). Return a tuple (viafid, record), with the
+  record in the JSON format of the VIAF API, or None for empty lines.
+  """
+  line = line.strip()
+  if line == '':
+    return None
+  if line[0] not in '<{':
+    _, _, line = line.partition('\t')
+  if line.startswith('{'):
+    j = json.loads(line)
+  else:
+    j = xmlToJSON(ElementTree.fromstring(line))
+  viafid = j['viafID'] if 'viafID' in j else j.get('redirect', {}).get('viafID')
+  if isinstance(viafid, dict):
+    viafid = viafid['#text']
+  return (viafid, j)
+
+#%% viafDumpBatch(lines, kind='clusters', level=9)
+def viafDumpBatch(lines, kind='clusters', level=9):
+  """
+  Parse the lines of a VIAF dump (kind 'clusters' or 'links') and return a
+  tuple (number of lines, records rows, redirections rows, crosswalk rows),
+  see viafStoreRows. Invalid lines are shown in stderr and skipped.
+  """
+  if kind == 'links':
+    crosswalk = []
+    for line in lines:
+      m = _viaf_link.match(line.rstrip('\n'))
+      if m is not None:
+        crosswalk.append((m.group(2), m.group(3), m.group(1), None))
+    return (len(lines), [], [], crosswalk)
+  records = dict()
+  for line in lines:
+    try:
+      r = viafDumpRecord(line)
+    except Exception as ex:
+      print(f"Invalid line in VIAF dump: {ex!r}", file=sys.stderr)
+      continue
+    if r is not None and r[0] is not None:
+      records[r[0]] = r[1]
+  return (len(lines),) + viafStoreRows(records, level)
@@ -0,0 +1,2818 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Functions which use the Wikidata Query Service (w_*), the materialization of
+Wikidata subgraphs and the Wikidata JSON dumps (wd_*).
+
+@author: Angel Zazo <angelzazo@usal.es>
+"""
+
+#%% Imports
+import sys
+from time import time
+import requests
+import pandas as pd
+import regex as re
+import numpy as np
+from io import StringIO
+import json
+import gzip
+import multiprocessing
+import sqlite3
+from .common import (MW_LIMIT, checkEntities, checkValues, doChunks,
+                     doConcurrent, dumpLines, httpRequest, instrumented,
+                     retryAfter, retrySleep, traced, user_agent)
+from .sparql import LocalSPARQL, SPARQL_ENDPOINTS
+from .mediawiki import reqMediaWiki
+
+
+#%% -- WDQS: WikiData Query Service -------------------------------------------
+#  Use the WQS SPARQL endpoint.
+# See https://query.wikidata.org/
+# See https://www.wikidata.org/wiki/Wikidata:SPARQL_tutorial
+# See https://www.mediawiki.org/wiki/Wikidata_Query_Service/User_Manual
+
+
+#%% def reqWDQS(sparql_query,  method='GET', format='json'):
+@instrumented('wdqs')
+def reqWDQS(sparql_query, method='GET', format='json'):
+  """
+  Make a request to Wikidata Query Service (WDQS) SPARQL endpoint. The
+  endpoint can be changed with setEndpoint('wdqs', ...), for example to a
+  local mirror or to a LocalSPARQL store.
+
+  :param sparql_query: The query in SPARQL language (a SELECT query).
+  :param method: The method used to send the request, GET or POST, mandatory.
+         Default 'GET'. Use 'POST' method for long SELECT clauses.
+  :param format: The response format: only 'json', 'xml' or 'csv' formats are
+         allowed, default 'json'. If format='csv' the function returns a
+         Pandas dataframe in which column names are the variable names of the
+         SELECT query (note that in this case, all data are strings.)
+         See https://www.mediawiki.org/wiki/Wikidata_Query_Service/User_Manual#SPARQL_endpoint
+         and https://www.wikidata.org/wiki/Wikidata:Data_access/es
+
+  :return The response in the format selected.
+  :raise Exception: From response.raise_for_status() or other exception.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  """
+  if format=='json':
+    wdqs_format = "application/sparql-results+json"
+  elif format=='xml':
+    wdqs_format = "application/sparql-results+xml"
+  elif format=='csv':
+    wdqs_format = "text/csv"
+  else:
+    raise ValueError(f"Format '{format}' is not supported")
+  #
+  url = SPARQL_ENDPOINTS['wdqs']
+  if not isinstance(url, str):   # LocalSPARQL store
+    return url.request(sparql_query, format=format)
+  params = {'query': sparql_query}
+  headers = {'user-agent': user_agent,
+             'accept': wdqs_format,
+             'Accept-Encoding': "gzip, deflate"  # default in requests package
+             }
+  # Exit from while in return or exception in response.raise_for_status
+  while True:
+    if method=='GET':
+      response = httpRequest('GET', url=url, params=params, headers=headers)
+    elif method=='POST':
+      response = httpRequest('POST', url=url, data=params, headers=headers)
+    else:
+      raise ValueError(f"Method '{method}' is not supported")
+    # See https://www.mediawiki.org/wiki/Wikidata_Query_Service/User_Manual#Query_limits
+    if response.status_code == 429:
+      t = retryAfter(response)
+      print(f"Received a 429 status-code response. Sleeping {t} seconds",
+            file=sys.stderr)
+      retrySleep(t)
+      continue
+    #
+    response.raise_for_status()
+    rtype = response.headers['Content-Type']
+    if format == 'json' and rtype.startswith("application/sparql-results+json"):
+      return response.json()
+    if format == 'xml' and rtype.startswith("application/sparql-results+xml"):
+      return response.text
+    if format == 'csv' and rtype.startswith("text/csv"):
+      return pd.read_csv(StringIO(response.text, newline=''), dtype=str)
+    else:
+      raise ValueError(f"reqWDQS() format '{format}' or response type '{rtype}' is incorrect")
+
+#%% w_isInstanceOf(entity_list, instanceof='', chunksize=50000, debug=False)
+@traced
+def w_isInstanceOf(entity_list, instanceof='', chunksize=50000, debug=False):
+  """
+  Check using WDQS if the Wikidata entities in 'entity_list' are instances of
+  'instanceof' Wikidata entity class. For example, if instanceof="Q5", checks
+  if entities are instances of the Wikidata entity class Q5, i.e, are humans.
+  Some entity classes are allowed, separated by '|', in this case, the OR
+  operator is considered. If instanceOf='' then no filter is applied: the
+  funtion returns the Wikidata entities class of which each of the entities
+  in the list are instances. Duplicated entitites in the 'entity_list'
+  are deleted before search.
+  Uses `doChunks` function if the number of entities is greather that the value
+  of 'chunksize' parameter.
+  Note that no labels or descriptions of the entities are returned. Please, use
+  the `w_LabelDesc` function for this.
+
+  :param entity_list: Wikidata entity or a list of Wikidata entities.
+  :param instanceof: The Wikidata class to check. Some entity
+         classes are allowed, separated by '|', in this case, the OR
+         operator is considered.
+  :param chunksize: If the number of entities exceeds this number, several
+         requests will be made. This is the maximum number of entities
+         requested in each request. Please, decrease the default value if error
+         is raised.
+  :param debug: Three values are allowed: False (no debugging information is
+         shown), 'info' (only information about chunked queries), 'query' (in
+         addition to the information shown by 'info', the query launched to the
+         API is also showed).
+  :return A data-frame with three columns, first Wikidata entity, second all
+         Wikidata class each instance is instance of them, last TRUE or FALSE
+         if each entity is instance of the `instanceof` parameter, if this one
+         is set.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  Note: It is easy to know which entities are not instances of "instaceof":
+  >>> d = w_isInstanceOf(['Q9022', 'Q557', 'Q873'], instanceof = 'Q5')
+  >>> d
+  >>> d.columns
+  Index(['entity', 'instanceof_Q5'], dtype='object')
+  >>> d[~ d.instanceof_Q5]
+        entity  instanceof_Q5
+  Q9022  Q9022          False
+  """
+  # Checking entity_list
+  entity_list = checkEntities(entity_list)
+  #
+  n = len(entity_list)
+  # Number of entities exceeds chunksize:
+  if n > chunksize:
+    if debug:
+      print(f"INFO: The number of entities ({n}) exceeds chunksize ({chunksize}).", sep="", file=sys.stderr)
+    return doChunks(w_isInstanceOf, entity_list, chunksize,
+                    instanceof=instanceof, debug=debug)
+  #
+  values     = "wd:" + " wd:".join(entity_list)
+  #
+  query = f"""SELECT ?entity
+(GROUP_CONCAT(DISTINCT ?instanc;separator="|") as ?instanceof)
+WHERE {{
+  OPTIONAL {{
+    VALUES ?entity {{ {values} }}
+    OPTIONAL {{?entity wdt:P31 ?instanc.}}
+  }}
+}} GROUP BY ?entity"""
+  #
+  if debug=='query':
+    print(query, file=sys.stderr)
+  #
+  d = reqWDQS(query, method='POST', format="csv")
+  d.entity = d.entity.str.slice(31)
+  d.instanceof = d.instanceof.replace('http://www.wikidata.org/entity/', '', regex=True)
+  #
+  # If instanceof!='' => set new true/false column
+  if instanceof!='':
+    d['instanceof_' + instanceof] = d.instanceof.str.contains(r'\b(?:' + instanceof + r')\b', regex=True)
+  #
+  d.index = d.entity
+  return d
+
+
+#%% w_Wikipedias(entity_list, wikilangs="", instanceof='', chunksize=10000, debug=False)
+@traced
+def w_Wikipedias(entity_list, wikilangs="", instanceof='', chunksize=10000, debug=False):
+  """
+  Get Wikipedia page titles and URLs of the Wikidata entities in entity_list.
+
+  Get from Wikidata all Wikipedia page titles and URL of the Wikidata entities
+  in entity_list. If parameter `wikilangs`='', then returns all Wikipedia page
+  titles, else only the languages in `wikilangs`. The returned dataframe also
+  includes the Wikidata entity classes of which the searched entity is
+  an instance. If parameter `instanceof`!='', then only returns the pages
+  for Wikidata entities which are instances of the Wikidata class indicated in
+  it. The data-frame doesn't return labels or descriptions about entities: the
+  function `w_LabelDesc` can be used for this. Duplicated entities are deleted
+  before search. Index of the data-frame returned are also set to entity_list.
+
+  Uses `doChunks` function if the number of entities is greather that the value
+  of 'chunksize' parameter.
+
+  :param entity_list: Wikidata entity or a list of Wikidata entities.
+  :param wikilangs: List of languages to limit the search, using "|" as
+         separator. Wikipedias page titles are returned in same order as
+         languages in this parameter. If wikilangs='' the function returns
+         Wikipedia page titles in any language, not sorted.
+  :param instanceof: Wikidata entity class to limit the result to the instances
+         of that class. For example, if instanceof='Q5', limit the results to
+         "human".
+  :param chunksize: If the number of entities exceeds this number, several
+         requests will be made. This is the maximum number of entities
+         requested in each request.
+         Default value (1500) is a good choice. If parameter wikilangs!="",
+         this limit can be increased.
+  :param debug: For debugging purposes (defauls False). If debug='info'
+         information about chunked queries is shown. If debug='query' also the
+         query launched is shown.
+  :return A Pandas data-frame with five columns: entities, instanceof, npages,
+          page titles and page URLs. Last three use "|" as separator. Index of
+          the data-frame is also set to the entity_list. Returns None on errors.
+  :example
+    >>> # aux: get a vector of entities (l).
+    >>> df =  w_SearchByLabel(string='Napoleon', langsorder='en', mode='inlabel')
+    >>> l = df.entity  # approx. 3600
+    >>> # Run function with differents parameter values
+    >>> w = w_Wikipedias(entity_list=l, debug='info')
+    >>> w = w_Wikipedias(entity_list=l, wikilangs='es|en|fr', debug='info')
+    >>> # Filter if instanceof=Q5 (human):
+    >>> w_Q5 = w_Wikipedias(entity_list=l, wikilangs='es|en|fr', instanceof='Q5', debug='info')
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  """
+  #
+  # Check entity_list
+  entity_list = checkEntities(entity_list)
+  #
+  n = len(entity_list)
+  # Number of entities exceeds chunksize:
+  if n > chunksize:
+    if debug:
+      print(f"INFO: The number of entities ({n}) exceeds chunksize ({chunksize}).", sep="", file=sys.stderr)
+    return doChunks(w_Wikipedias, entity_list, chunksize, wikilangs=wikilangs,
+                    instanceof=instanceof, debug=debug)
+  #
+  values = "wd:" + " wd:".join(entity_list)
+  #
+  if wikilangs=="":
+    w_filter = ""
+  else:
+    wikiorder = wikilangs.split('|')
+    w_filter = "FILTER(?lang IN ('" + "', '".join(wikiorder) + "'))"
+  #
+  # Note the OPTIONAL before VALUES, otherwise get timeouts
+  query = f"""SELECT DISTINCT ?entity
+(GROUP_CONCAT(DISTINCT ?instanc;separator="|") as ?instanceof)
+(COUNT(DISTINCT ?page) as ?npages)
+(GROUP_CONCAT(DISTINCT ?lang;separator="|") as ?langs)
+(GROUP_CONCAT(DISTINCT ?name;separator="|") as ?names)
+(GROUP_CONCAT(DISTINCT ?page;separator="|") as ?pages)
+WHERE {{
+  OPTIONAL {{
+    VALUES ?entity {{ {values} }}
+    OPTIONAL {{?entity wdt:P31 ?instanc.}}
+    OPTIONAL {{
+    ?page schema:about ?entity;
+          schema:inLanguage ?lang;
+          schema:name ?name;
+          schema:isPartOf [wikibase:wikiGroup "wikipedia"].
+          {w_filter}
+    }}
+  }}
+}} GROUP BY ?entity
+"""
+  #
+  if debug=='query':
+    print(query, file=sys.stderr)
+  #
+  d = reqWDQS(query, method='POST', format='csv')
+  #
+  d.fillna('', inplace=True)
+  # Remove http://www.wikidata.org/entity/" [32 chars]
+  d.entity = d.entity.str.slice(31)
+  d.instanceof = d.instanceof.str.replace('http://www.wikidata.org/entity/', '', regex=False)
+  d.npages = d.npages.astype(np.int16)
+  d.index = d.entity.values
+  # Filtering instanceof
+  if instanceof!='':
+    d = d[d.instanceof.str.contains(r'\b' + instanceof + r'\b')]
+  # Set order of langs, names and pages
+  if wikilangs!='':
+    for qid in d.index:
+      if d.at[qid,'npages']>1:  # Sorting only if number of wikipedia pages > 1
+        l = d.at[qid,'langs'].split('|')
+        order = [l.index(x) for x in wikiorder if x in l]
+        for k in ['langs', 'names', 'pages']:
+          r = d.at[qid,k].split('|')
+          d.at[qid,k] = '|'.join([r[i] for i in order])
+  #
+  return d
+
+#%% w_isValid(entity_list, chunksize=50000, debug=False)
+@traced
+def w_isValid(entity_list, chunksize=50000, debug=False):
+  """
+  Check if the Wikidata entities in 'entity_list' are valid: an entity is valid
+  if it has a label or has a description in Wikidata. If one entity exists but
+  is not valid, is possible that it redirects to another entity, in that
+  case, the target entity is obtained. Other entities may have existed in the
+  past, but have been deleted.
+  Duplicated entities in entity_list are deleted before checking.
+  This function returns a Panda data-frame. The index of the data-frame are
+  also set to entity_list. The data-frame also includes the Wikidata entity
+  classes which are instance of the entities searched.
+
+  Uses `doChunks` function if the number of entities is greather that the value
+  of 'chunksize' parameter.
+
+  Note that no labels or descriptions of the entities are returned. Please, use
+  the w_LabelDesc function for this.
+
+  :param entity_list: Wikidata entity or a list of Wikidata entities.
+  :param chunksize: If the number of entities exceeds this number, several
+         requests will be made. This is the maximum number of entities
+         requested in each request. Please decrease the default value if an
+         error occurs.
+  :param debug: For debugging purposes (defauls False). If debug='info'
+         information about chunked queries is shown. If debug='query' also the
+         query launched is shown.
+  :return A data-frame with four columns: first, the entity itself, second, if
+          that entity is valid in Wikidata (TRUE or FALSE), third, the
+          corresponding Wikidata class of which the entities are instances (if
+          entities are valid, of course), last, if the entity redirects to
+          another Wikidata entity, this entity.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :example
+  >>> d = w_isValid(["Q9021", "Q115637688", "Q105660123"])
+  >>> d
+                  entity  valid instanceof     target
+  Q9021            Q9021   True         Q5
+  Q105660123  Q105660123  False             Q97352588
+  Q115637688  Q115637688  False
+  >>> sum(d.valid)
+  1
+  >>> # Large list
+  ... l = w_SearchByOccupation(Qoc='Q2306091') #  Sociologist
+  ... l = list(l.entity)
+  ... l.extend(["Q115637688", "Q105660123"])  # Adding two new entities
+  >>> v = w_isValid(l, debug='info')
+  >>> # Not valid
+  ... v[~ v.valid]
+                  entity  valid instanceof     target
+  Q105660123  Q105660123  False             Q97352588
+  Q115637688  Q115637688  False
+  """
+  # Checking entity_list
+  entity_list = checkEntities(entity_list)
+  #
+  n = len(entity_list)
+  # Number of entities exceeds chunksize:
+  if n > chunksize:
+    if debug:
+      print(f"INFO: The number of entities ({n}) exceeds chunksize ({chunksize}).", sep="", file=sys.stderr)
+    return doChunks(w_isValid, entity_list, chunksize, debug=debug)
+  #
+  values = "wd:" + " wd:".join(entity_list)
+  #
+  query = """SELECT ?entity ?valid
+(GROUP_CONCAT(DISTINCT ?instanc; separator='|') as ?instanceof) ?redirection
+WHERE {
+  OPTIONAL {
+    VALUES ?entity {""" + values + """ }
+    BIND(EXISTS{?entity rdfs:label []} || EXISTS{?entity schema:description []} AS ?valid).
+    OPTIONAL {?entity wdt:P31 ?instanc.}
+    OPTIONAL {?entity owl:sameAs ?redirection}
+  }
+} GROUP BY ?entity ?valid ?redirection
+"""
+  #
+  if debug=='query':
+    print(query, file=sys.stderr)
+  #
+  d = reqWDQS(query, method='POST', format="csv")
+  #
+  d.entity      = d.entity.str.slice(31)
+  d.redirection = d.redirection.str.slice(31)
+  d.instanceof  = d.instanceof.replace(to_replace='http://www.wikidata.org/entity/', value='', regex=True)
+  d.valid = d.valid.apply(lambda x: True if x=='true' else False)
+  d.index = d.entity.values
+  d.fillna('', inplace=True)
+  return d
+
+
+#%% w_Property(entity_list, Pproperty, includeQ=FALSE, langsorder='en',
+#               chunksize=5000, debug=False)
+@traced
+def w_Property(entity_list, Pproperty, includeQ=False, langsorder='en',
+                chunksize=5000, debug=False):
+  """
+  Get the properties indicated in the parameter 'Pproperty' for the
+  entities in 'entity_list' using the language order in 'langsorder'. The
+  function also returns the Wikidata class of which the entities are instances
+  of. If parameter `includeQ` is True, also is returned the Wikidata entities
+  for the properties. Duplicates in entity_list are deleted before search.
+  Information about properties is returned in the order of languages in
+  'langsorder'.
+
+  Uses `doChunks` function if the number of entities is greather that the value
+  of 'chunksize' parameter.
+
+  Note that no labels or descriptions of the entities are returned. Please, use
+  the w_LabelDesc function for this.
+
+  :param entity_list: Wikidata entity or a list of Wikidata entities.
+  :param Pproperty: Wikidata properties to search, separated with '|',
+         mandatory. For example, is Pproperty="P21", the results contain
+         information of the sex of entities. If Pproperty="P21|P569" also shows
+         the birthdate (P569). If Pproperty='P21|P569|P214' also shows the VIAF
+         identifier (P214). Mandatory.
+  :param includeQ If the value is TRUE the function returns the Wikidata entity
+         (Qxxx) of the Pproperty. If also `langsorder` has language(s), the
+         labels, if any, are returned too. Note that includeQ is only effective
+         if `Pproperty` corresponds with a Wikidata entity, else the same
+         values that label are returned.
+  :param langsorder: Order of languages in which the information will be
+         returned, separated with '|'. If no information is given in the first
+         language, next is used. This parameter is mandatory if parameter
+         `includeQ` is False. If includeQ=True and langsorder='' no labels are
+         returned.
+  :param chunksize: If the number of entities exceeds this number, several
+         requests will be made. This is the maximum number of entities
+         requested in each request. Please decrease the default value if an
+         error occurs.
+  :param debug: For debugging purposes (defauls False). If debug='info'
+         information about chunked queries is shown. If debug='query' also the
+         query launched is shown.
+  :return A data-frame with the entity, the entities of the properties and the
+          labels in langsorder for them.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :example
+  >>> d = w_Property(["Q1252859", "Q712609", "Q381800"], Pproperty='P21|P569|P214',
+                      langsorder='en|es')
+  >>> d
+              entity instanceof   P21                  P569      P214
+  Q381800    Q381800         Q5  male  1862-12-07T00:00:00Z   4938246
+  Q712609    Q712609         Q5  male  1908-05-23T00:00:00Z  36092166
+  Q1252859  Q1252859         Q5  male  1913-11-02T00:00:00Z  40787112
+  >>> # Large list#'
+  ... df = w_SearchByOccupation(Qoc='Q2306091') # ~ 20000
+  ... l = df$entity
+  >>> p = w_Property(l, Pproperty='P21|P569|P214', langsorder='es|en', debug='info')
+  >>> p = w_Property(l, Pproperty='P19', langsorder='', includeQ=True, debug='info')
+
+"""
+  # Checking entity_list
+  entity_list = checkEntities(entity_list)
+  #
+  Pproperty = Pproperty.strip()
+  langsorder = langsorder.strip()
+  if Pproperty=='' or (langsorder=='' and not includeQ):
+    raise ValueError("ERROR: one or more parameters 'Pproperty', 'includeQ' or 'langsorder' are incorrect.")
+  #
+  n = len(entity_list)
+  # Number of entities exceeds chunksize:
+  if n > chunksize:
+    if debug:
+      print(f"INFO: The number of entities ({n}) exceeds chunksize ({chunksize}).", sep="", file=sys.stderr)
+    return doChunks(w_Property, entity_list, chunksize, Pproperty=Pproperty,
+                    includeQ=includeQ, langsorder=langsorder, debug=debug)
+  #
+  values = "wd:" + " wd:".join(entity_list)
+  searchlang = ''
+  #
+  group_concat = []
+  search = []
+  searchlang = []
+  if langsorder!='':
+    langsorder = langsorder.replace("|", ",")
+    searchlang.append(f'\n SERVICE wikibase:label {{bd:serviceParam wikibase:language "{langsorder}".\n  ?instanc rdfs:label ?instancLabel.')
+    group_concat.append("(GROUP_CONCAT(DISTINCT ?instancLabel; separator='|') as ?instanceofLabel)")
+  #
+  pprops = Pproperty.split('|')
+  for p in pprops:
+    if includeQ:
+      group_concat.append(f"(GROUP_CONCAT(DISTINCT ?{p}p;separator='|') as ?{p})")
+    if langsorder!='':
+      group_concat.append(f"(GROUP_CONCAT(DISTINCT STR(?{p}label);separator='|') as ?{p}Label)")
+      searchlang.append(f'  ?{p}p rdfs:label ?{p}label.')
+    search.append(f'    OPTIONAL {{?entity wdt:{p} ?{p}p.}}')
+
+  group_concat = '\n'.join(group_concat)
+  search       = '\n'.join(search)
+  searchlang   = '\n'.join(searchlang)
+  searchlang += '}' if searchlang!='' else ''
+  #
+  query = f"""SELECT ?entity
+(GROUP_CONCAT(DISTINCT ?instanc; separator='|') as ?instanceof)
+{group_concat}
+WHERE {{
+  OPTIONAL {{
+    VALUES ?entity {{ {values} }}
+    OPTIONAL {{?entity wdt:P31 ?instanc.}}
+{search}
+{searchlang}
+  }}
+}} GROUP BY ?entity"""
+  #
+  if debug=='query':
+    print(query, file=sys.stderr)
+  #
+  d = reqWDQS(query, method='POST', format="csv")
+  #
+  d.entity = d.entity.str.slice(31)
+  if includeQ:
+    for p in pprops:
+      d[p] = d[p].replace(to_replace='http://www.wikidata.org/entity/', value='', regex=True)
+  d.instanceof = d.instanceof.replace(to_replace='http://www.wikidata.org/entity/', value='', regex=True)
+  d.index = d.entity.values
+  d.fillna('', inplace=True)
+  return d
+
+
+#%% w_Geoloc(entity_list, langsorder='', chunksize=1000, debug=False)
+@traced
+def w_Geoloc(entity_list, langsorder='', chunksize=1000, debug=False):
+  """
+  Get Latitude and Longitude coordinates, and country of the Wikidata entities
+  in entity_list if any. If 'langsorder'='', then no labels or descriptions
+  of the entities are returned, otherwise the function returns them in the
+  language order indicated in this parameter. Index of the data-frame is also
+  set to entity_list.
+
+  Uses `doChunks` function if the number of entities is greather that the value
+  of 'chunksize' parameter.
+
+  Note that Sometimes an old place has several actualplaces, so, it's necessary
+  select only one (for example, place=Q18097 [Korea] are two replacement
+  places, North Korea and South Korea, so, the Pandas dataframe returned has
+  duplicated index). Other times the place is a border between two countries.
+  There are some approaches (number of references, timestamps, etc.) to solve
+  this problem, but they are not consistent. In general, this happens very
+  seldom, so dropped duplicates can be a good option.
+
+  Note that the Wikidata Action API also get a search to coordinates, but
+  is less efficient. Se this example:
+  See https://www.wikidata.org/w/api.php?action=query&prop=coordinates&titles=Q57860|Q90|Q15695
+
+  :param entity_list: Wikidata entity or a list of Wikidata entities.
+  :param langsorder: Order of languages in which the information will be
+         returned, separated with '|'. If no information is given in the first
+         language, next is used. If langsorder=='', then labels or descriptions
+         are not returned.
+  :param chunksize: If the number of entities in the database or authorities'
+         catalog exceeds this number, then query are made in chunks. Please,
+         decrease the default value if an error occurs.
+  :param debug: For debugging purposes (defauls False). If debug='info'
+         information about chunked queries is shown. If debug='query' also the
+         query launched is shown.
+  :return A data-frame with 'entity', label, Latitude and Longitude, country
+         and label of the country.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :example
+  >>> d = w_Geoloc(["Q57860", "Q90", "Q15695"], langsorder="")
+  >>> d
+          placeQ           lat           lon countryQ
+  Q15695  Q15695        40.965  -5.664166666      Q29
+  Q90        Q90  48.856666666   2.352222222     Q142
+  Q57860  Q57860  59.898888888  10.964166666      Q20
+  >>> d = w_Geoloc(["Q57860", "Q90", "Q15695"], langsorder="es")
+  >>> d
+          placeQ      place           lat           lon countryQ  country
+  Q57860  Q57860  Lørenskog  59.898888888  10.964166666      Q20  Noruega
+  Q15695  Q15695  Salamanca        40.965  -5.664166666      Q29   España
+  Q90        Q90      París  48.856666666   2.352222222     Q142  Francia
+  >>> # Large list
+  ... df = w_SearchByOccupation(Qoc='Q2306091') # ~ 20000
+  ... l = df.entity
+  ... # Get birth-place (P19)
+  ... p = w_Property(l, Pproperty = 'P19', includeQ=True, langsorder='', debug='info')
+  ... # Filter entities that have places
+  ... places = p.P19[p.P19.str.contains(r"^Q\d+$")].unique() # ~ 4000
+  >>> g = w_Geoloc(places, langsorder='en|es', debug='info')
+
+  """
+  # Remove duplicates preserving order
+  entity_list = checkEntities(entity_list)
+  #
+  n = len(entity_list)
+  # Number of entities exceeds chunksize:
+  if n > chunksize:
+    if debug:
+      print(f"INFO: The number of entities ({n}) exceeds chunksize ({chunksize}).", sep="", file=sys.stderr)
+    return doChunks(w_Geoloc, entity_list, chunksize, langsorder=langsorder,
+                    debug=debug)
+  #
+  values = "wd:" + " wd:".join(entity_list)
+  #
+  langsorder = langsorder.strip()
+  if langsorder == '':
+    sss = '?place (STR(SAMPLE(?clat)) as ?placeLat) (STR(SAMPLE(?clon)) as ?placeLon) ?country'
+    sqq = ''
+    sgg = '?place ?country'
+  else:
+    sss = '?place ?placeLabel (STR(SAMPLE(?clat)) as ?placeLat) (STR(SAMPLE(?clon)) as ?placeLon) ?country ?countryLabel'
+    langsorder = langsorder.replace('|', ',')
+    sqq = f"""SERVICE wikibase:label {{bd:serviceParam wikibase:language "{langsorder}".
+    ?place rdfs:label ?placeLabel.\n    ?country rdfs:label ?countryLabel.}}"""
+    sgg = '?place ?placeLabel ?country ?countryLabel'
+  #
+  query = f"""SELECT DISTINCT {sss}
+WHERE {{
+  OPTIONAL {{
+    VALUES ?place {{ {values} }}
+    OPTIONAL {{?place wdt:P1366+ ?placelast.}}
+    OPTIONAL {{?place wdt:P625 ?c1.}}
+    OPTIONAL {{?placelast wdt:625 ?c2.}}
+    BIND(COALESCE(?c1, ?c2) AS ?c).
+    BIND(geof:longitude(?c) AS ?clon)
+    BIND(geof:latitude(?c)  AS ?clat)
+    BIND(COALESCE(?placelast, ?place) AS ?actualplace).
+    OPTIONAL {{
+      ?actualplace wdt:P17 ?country.
+      ?country wdt:P31 ?instance.
+      FILTER (?instance in (wd:Q3624078, wd:Q7275, wd:Q6256)).
+      #not a former country
+      # FILTER NOT EXISTS {{?countryQ wdt:P31 wd:Q3024240}}
+      #and no an ancient civilisation (needed to exclude ancient Egypt)
+      # FILTER NOT EXISTS {{?countryQ wdt:P31 wd:Q28171280}}
+      FILTER (?instance not in (wd:Q3024240, wd:Q28171280)).
+    }}
+  }}
+  {sqq}
+}} GROUP BY {sgg}"""
+
+  if debug=='query':
+    print(query, file=sys.stderr)
+  #
+  d = reqWDQS(query, method="POST", format="csv")
+  #
+  d.place   = d.place.str.slice(31)
+  d.country = d.country.str.slice(31)
+  d.index = d.place.values
+  #
+  # Drop duplicated (see docstring)
+  d = d[~d.index.duplicated(keep='first')]
+  d.fillna('', inplace=True)
+  #
+  return d
+
+#%% w_LabelDesc(entity_list, what='LD', langsorder='en', chunksize=25000,
+#               debug=False)
+@traced
+def w_LabelDesc(entity_list, what='LD', langsorder='en', chunksize=25000, debug=False):
+  """
+  Return label and/or descriptions of the entities in entity_list in language
+  indicated in langsorder. Note that entities can be Wikidata entities (Qxxx)
+  or Wikidata properties (Pxxx).
+
+  Use WDQS API. The Wikibase API has limit to 50 entities per query, so is very
+  slow to obtains the information. It is also limited to a single language and
+  has no language failback.
+
+  Uses `doChunks` function if the number of entities is greather that the value
+  of 'chunksize' parameter.
+
+  :param entity_list: Wikidata entity or a list of Wikidata entities. Note that
+         duplicated entities are delete before search.
+  :param what: Retrieve only Labels (L), only Descriptions (D) or both (LD).
+  :param langsorder: Order of languages in which the information will be
+         returned, separated with '|'. If no information is given in the first
+         language, next is used. This parameter is mandatory, at least one
+         language is required, default 'en'.
+  :param chunksize: If the number of entities exceeds this number, several
+         requests will be made. This is the maximum number of entities
+         requested in each request. Please decrease the default value if an
+         error occurs.
+  :param debug: If True the query launched to the WDQS is shown.
+  :return A Pandas data-frame with one column for the entities, and others for
+          the language and the labels and/or descriptions. The index of the
+          dataframe is also set to the entity list.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :example
+  >>> d = w_LabelDesc(["Q57860", "Q712609", "Q381800", "P569"], what='LD',
+                      langsorder='se|es|en')
+  >>> d
+              entity langLabel           label langsdesc         description
+  Q1252859  Q1252859        en   Rafael Aburto        en   Spanish architect
+  Q712609    Q712609        en  Max Abramovitz        en  American architect
+  Q381800    Q381800        en       Paul Adam        en     French novelist
+  """
+  # Checking entity_list
+  entity_list = checkEntities(entity_list)
+  #
+  langsorder = langsorder.strip()
+  if langsorder=='' or not ('L' in what or 'D' in what):
+    raise ValueError("Parameter 'langsorder' or 'what' is incorrect")
+  #
+  n = len(entity_list)
+  # Number of entities exceeds chunksize:
+  if n > chunksize:
+    if debug:
+      print(f"INFO: The number of entities ({n}) exceeds chunksize ({chunksize}).", sep="", file=sys.stderr)
+    return doChunks(w_LabelDesc, entity_list, chunksize, what=what,
+                    langsorder=langsorder, debug=debug)
+  #
+  values = "wd:" + " wd:".join(entity_list)
+  langsorder = langsorder.replace("|", ",")
+  #
+  ss = ''
+  qs = ''
+  if 'L' in what:
+    ss += ' (LANG(?label) as ?labellang) ?label'
+    qs += ' ?entity rdfs:label ?label.\n'
+  if 'D' in what:
+    ss += ' (LANG(?description) as ?descriptionlang) ?description'
+    qs += ' ?entity schema:description ?description.\n'
+  #
+  query = f"""SELECT ?entity {ss}
+WHERE {{
+  VALUES ?entity {{{values}}}
+  SERVICE wikibase:label {{
+    bd:serviceParam wikibase:language "{langsorder}".
+    {qs}
+  }}
+}}
+"""
+  #
+  if debug=='query':
+    print(query, file=sys.stderr)
+  #
+  d = reqWDQS(query, method='POST', format="csv")
+  #
+  d.fillna('', inplace=True)
+  d.entity = d.entity.str.slice(31)
+  d.index = d.entity.values
+  return d
+
+#%% w_SearchByOccupation(Qoc, mode='entity', langsorder='', wikilangs='',
+#                        chunksize=10000, debug=False):
+@traced
+def w_SearchByOccupation(Qoc, mode='entity', langsorder='', wikilangs='',
+                         chunksize=10000, debug=False):
+  """
+  Return the Wikidata entities which have the occupation indicated in Qoc, the
+  entity for that occupation. For example, if Qoc='Q2306091', returns the
+  Wikidata entities which occupation is Sociologist, among others. Use chunked
+  requests if the number of entities exceeds chunksize. Also returns the
+  Wikidata class of which the entities are instances of. If parameter
+  'langsorder' is '', then no labels or descriptions of the entities are
+  returned, otherwise the function returns them in the language order indicated
+  in 'langsorder'.
+
+  :param Qoc: The Wikidata entity of the occupation.
+  :param mode: The results you want to obtain:
+   - 'entity' returns the Wikidata entities which have the occupation;
+   - 'count' returns the number of Wikidata entities with that occupation;
+   - 'wikipedias' also the Wikipedia page of the entities are returned.
+  :param langsorder: Order of languages in which the information will be
+         returned, separated with '|'. If no information is given in the first
+         language, next is used. If langsorder=='', then labels or descriptions
+         are not returned.
+  :param wikilangs: List of languages of Wikipedias to limit the search, using
+         "|" as separator. Wikipedias page titles are returned in same order as
+         languages in this parameter. If wikilangs='' the function returns
+         Wikipedia page titles of entities in any language, not sorted. This
+         parameter only is applied if mode='wikipedias'.
+  :param chunksize: If the number of entities in the database or authorities'
+         catalog exceeds this number, then query are made in chunks. Please,
+         decrease the default value if error is raised.
+  :param debug: For debugging purposes (defauls False). If debug='info'
+         information about chunked queries is shown. If debug='query' also the
+         query launched is shown.
+  :return A data-frame with 'entity', 'entityLabel', 'entityDescription',
+          'instanceof' and 'instanceofLabel' columns. Index of the data-frame
+          is also set to the list of entities found.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :example
+  >>> w_SearchByOccupation(Qoc="Q2306091", mode='count')
+  >>> d = w_SearchByOccupation(Qoc="Q2306091", langsorder="")
+  >>> d.iloc[:3]
+              entity instanceof
+  Q106694    Q106694         Q5
+  Q1065595  Q1065595         Q5
+  Q1065810  Q1065810         Q5
+  >>> d = w_SearchByOccupation(Qoc="Q2306091", langsorder="en|es|fr")
+  >>> d.iloc[:3]
+              entity       entityLabel  ... instanceof instanceofLabel
+  Q1084790  Q1084790  Christoph Ehmann  ...         Q5           human
+  Q1085054  Q1085054    Christoph Görg  ...         Q5           human
+  Q1085476  Q1085476  Christoph Maeder  ...         Q5           human
+  >>> d = w_SearchByOccupation(Qoc="Q2306091", mode='wikipedias',
+                               wikilangs='en|es|fr', debug='info')
+  """
+  # First: known the number of entities
+  query = 'SELECT (COUNT(DISTINCT ?entity) AS ?count) WHERE {?entity wdt:P106 wd:'+Qoc+'}'
+  d = reqWDQS(query, method='GET', format="csv")
+  nq = int(d['count'][0])
+  if debug:
+    print(f"INFO: The number of entities with that occupation is {nq}.", file=sys.stderr)
+  if mode=='count':
+    return(nq)
+  #
+  langsorder = langsorder.strip()
+  if langsorder == '':
+    ss1 = sq = ss2 = ''
+  else:
+    ss1 = "?entityLabel ?entityDescription"
+    ss2 = "(GROUP_CONCAT(DISTINCT ?instancLabel; separator='|') as ?instanceofLabel)"
+    langsorder = langsorder.replace('|', ',')
+    sq = f"""SERVICE wikibase:label {{bd:serviceParam wikibase:language "{langsorder}".
+      ?entity rdfs:label ?entityLabel.
+      ?entity schema:description ?entityDescription.
+      ?instanc rdfs:label ?instancLabel.}}"""
+  #
+  nlim = nq//chunksize
+  if nlim>0 and debug:
+    print(f"INFO: The number of entities ({nq}) exceeds chunksize ({chunksize}).", file=sys.stderr)
+  for k in range(nlim + 1):
+    offset = chunksize*k
+    if nlim>0 and debug:
+      print(f" INFO: Requesting elements from {offset+1} to {min(offset+chunksize, nq)}", end="",file=sys.stderr)
+    t0 = time()
+    query = f"""SELECT DISTINCT ?entity {ss1}
+(GROUP_CONCAT(DISTINCT ?instanc; separator='|') as ?instanceof)
+{ss2}
+WITH {{
+    SELECT DISTINCT ?entity
+    WHERE {{?entity wdt:P106 wd:{Qoc}.}}
+    ORDER BY ?entity
+    LIMIT {chunksize} OFFSET {offset}
+    }} AS %results
+WHERE {{
+   INCLUDE %results.
+   {sq}
+   OPTIONAL {{?entity wdt:P31 ?instanc.}}
+}} GROUP BY ?entity {ss1}
+"""
+    #
+    if debug=='query':
+      print(query, file=sys.stderr)
+    #
+    d = reqWDQS(query, method="GET", format="csv")
+    #
+    if debug:
+      print(f" ({time()-t0:.2f} seconds)", file=sys.stderr)
+    #
+    d.fillna('', inplace=True)
+    d[['entity','instanceof']] = d[['entity','instanceof']].replace(to_replace='http://www.wikidata.org/entity/', value='', regex=True)
+    d.index = d.entity.values
+    if k==0:
+      output = d
+    else:
+      output = pd.concat([output, d])
+     #
+  if mode=='wikipedias':
+    if debug:
+      print("INFO: Searching for Wikipedias.", file=sys.stderr)
+    w = w_Wikipedias(output.entity, wikilangs=wikilangs, debug=debug)
+    output = pd.concat([output, w.iloc[:,2:]], axis=1)
+  #
+  return output
+
+
+#%% -- Authorities ------------------------------------------------------------
+# Wikidata properties of the identifiers in the databases or authorities'
+# catalogs, by the abbreviation of the library (see w_SearchByIdentifiers,
+# w_SearchByAuthority and AuthorityIndex).
+AUTHORITIES = {
+  'VIAF':   'P214',   'LC':      'P244',  'BNE':   'P950',
+  'ISNI':   'P213',   'JPG':     'P245',  'ULAN':  'P245',
+  'BNF':    'P268',   'GND':     'P227',  'DNB':   'P227',
+  'SUDOC':  'P269',   'idRefID': 'P269',  'NTA':   'P1006',
+  'J9U':    'P8189',  'ELEM':   'P1565',  'NUKAT': 'P1207',
+  'RERO':   'P3065',  'CAOONL': 'P8179',  'NII':   'P4787',
+  'BIBSYS': 'P1015',  'NORAF' : 'P1015',  'BNC':   'P9984',
+  'CANTIC': 'P9984',  'PLWABN': 'P7293',  'NLA' :  'P409',
+  'MNCARS': 'P4439',  'LCCN'  : 'P1144',  'DIALNET': 'P1607',
+  'SCOPUS': 'P1153',  'ORCID' : 'P496' ,  'PUBLONS': 'P3829',
+  'RID'   : 'P3829',  'OCLC'  : 'P243'
+  }
+
+#%% authorityProperty(Pauthority)
+def authorityProperty(Pauthority):
+  """
+  Return the Wikidata property of 'Pauthority': a property (Pxxx) or the
+  abbreviation of a library in AUTHORITIES (case insensitive).
+
+  :raise ValueError: If it is not a property nor an abbreviation.
+  """
+  # Obtain de Pauthority if it is an abreviation of the library.
+  m = re.match(r'^P\d+$', Pauthority)
+  if m is None:
+    if Pauthority.upper() not in AUTHORITIES:
+      raise ValueError(f"Invalid value '{Pauthority}' for parameter 'Pauthority'")
+    Pauthority = AUTHORITIES[Pauthority.upper()]
+  return Pauthority
+
+
+#%% w_SearchByIdentifiers(id_list, Pproperty, langsorder='', chunksize=3000,
+#                        debug=False)
+@traced
+def w_SearchByIdentifiers(id_list, Pauthority, langsorder='', chunksize=3000, debug=False):
+  """
+  Search for entities that can match identifiers in a database or authotities'
+  catalog. The identifiers are in id_list. The database or authorities'
+  catalog to which these identifiers belong must be provided in parameter
+  `Pauthority`. If parameter langsorder='', then no labels or descriptions of
+  the entities are returned, otherwise the function returns them in the
+  language order indicated in `langsorder`. Duplicated entities are deleted
+  before search. Index of the data-frame returned are also set to id_list.
+  Uses `doChunks` function if the number of identifier is greather that the
+  value of 'chunksize' parameter.
+
+  :param id_list: One identifier or a list of identifiers.
+
+  :param Pauthority: Wikidata property identifier of the database or
+         authorities' catalog. For example, if Pauthority = "P4439", then the
+         function searches for entities that have the identifiers in the MNCARS
+         (Museo Nacional Centro de Arte Reina Sofía) database. Following
+         library abbreviations for the databases can be also used in the
+         parameter 'Pauthority':
+
+        library  :  VIAF, LC,   BNE , ISNI, JPG,  ULAN, BNF,  GND,  DNB,  LCCN
+        Pauthority: P214, P244, P950, P213, P245, P245, P268, P227, P227, P1144
+
+        library  :  SUDOC, NTA,   J9U,   ELEM,  NUKAT, MNCARS, DIALNET, SCOPUS
+        Pauthority: P269,  P1006, P8189, P1565, P1207, P4439,  P1607,   P1153
+
+        library:    ORCID, PUBLONS, RID,   OCLC
+        Pauthority: P496,  P3829,   P3829, P243
+
+  :param langsorder: Order of languages in which the information will be
+         returned. If langsorder='', then no labels or descriptions are
+         returned.
+  :param chunksize: If the number of entities exceeds this number, several
+         requests will be made. This is the maximum number of entities
+         requested in each request. Please decrease the default value if an
+         error occurs.
+  :param debug: For debugging purposes (defauls False). If debug='info'
+         information about chunked queries is shown. If debug='query' also the
+         query launched is shown.
+  :return A Pandas data-frame with columns: 'id', 'entity', 'entityLabel',
+          'entityDescription', 'instanceof' and 'instanceofLabel'.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :example
+
+  >>> d = w_SearchByIdentifiers(["4938246", "36092166", "40787112"], Pauthority='P214')
+  >>> d
+                  id    entity instanceof
+  4938246    4938246   Q381800         Q5
+  36092166  36092166   Q712609         Q5
+  40787112  40787112  Q1252859         Q5
+
+  >>> d = w_SearchByIdentifiers(["4938246", "36092166", "40787112"],
+                                langsorder='en|es', Pauthority='P214')
+  >>> d
+                  id    entity     entityLabel   entityDescription instanceof instanceofLabel
+  40787112  40787112  Q1252859   Rafael Aburto   Spanish architect         Q5           human
+  36092166  36092166   Q712609  Max Abramovitz  American architect         Q5           human
+  4938246    4938246   Q381800       Paul Adam     French novelist         Q5           human
+  """
+  #
+  # Strip, remove void values and duplicates preserving order
+  id_list = checkValues(id_list, 'id_list')
+  #
+  Pauthority = authorityProperty(Pauthority)
+  #
+  n = len(id_list)
+  # Number of entities exceeds chunksize:
+  if n > chunksize:
+    if debug:
+      print(f"INFO: The number of entities ({n}) exceeds chunksize ({chunksize}).", sep="", file=sys.stderr)
+    return doChunks(w_SearchByIdentifiers, id_list, chunksize,
+                    Pauthority=Pauthority, langsorder=langsorder, debug=debug)
+  #
+  if langsorder == '':
+    ss1 = sq = ss2 = ''
+  else:
+    ss1 = "?entityLabel ?entityDescription"
+    ss2 = "(GROUP_CONCAT(DISTINCT ?instancLabel; separator='|') as ?instanceofLabel)"
+    langsorder = langsorder.replace('|', ',')
+    sq = f"""SERVICE wikibase:label {{bd:serviceParam wikibase:language "{langsorder}".
+      ?entity rdfs:label ?entityLabel.
+      ?entity schema:description ?entityDescription.
+      ?instanc rdfs:label ?instancLabel.}}"""
+  #
+  langsorder = langsorder.replace("|", ",")
+  values = '"' + '" "'.join(id_list) + '"'
+  #
+  query = f"""
+SELECT DISTINCT ?id ?entity {ss1}
+(GROUP_CONCAT(DISTINCT ?instanc; separator='|') as ?instanceof)
+{ss2}
+WHERE {{
+  OPTIONAL {{
+    VALUES ?id {{{values}}}
+    OPTIONAL {{?entity wdt:{Pauthority} ?id;
+                      wdt:P31 ?instanc.}}
+    {sq}
+  }}
+}} GROUP BY ?id ?entity {ss1}
+"""
+  if debug=='query':
+    print(query, file=sys.stderr)
+  #
+  d = reqWDQS(query, method='POST', format="csv")
+  #
+  d.fillna('', inplace=True)
+  d[['entity','instanceof']] = d[['entity','instanceof']].replace(to_replace='http://www.wikidata.org/entity/', value='', regex=True)
+  d.index = d['id'].values
+  return d
+
+#%% w_SearchByAuthority(Pauthority, langsorder='', instanceof='', chunksize=10000,
+#                        debug=False)
+@traced
+def w_SearchByAuthority(Pauthority, langsorder='', instanceof='', chunksize=10000,
+                         debug=False):
+  """
+  Get all Wikidata entities that have identifiers in the database or
+  authorities' catalog indicated in the parameter 'Pauthority'. Returns the
+  Wikidata entities. If parameter langsorder='', then no labels or descriptions
+  of the entities are returned, otherwise the function returns them in the
+  language order indicated in 'langsorder'. If instanceof!='', then results are
+  filtered to entities that be instanceof Wikidata class(es) in this parameter.
+  If debug='count' function only returns the number of entities without applying
+  filter.
+
+  :param Pauthority: Wikidata property identifier of the database or
+         authorities' catalog. For example, if Pauthority = "P4439", all
+         entities which have an identifier in the MNCARS (Museo Nacional Centro
+         de Arte Reina Sofía) database are returnd. Following libraries
+         abbreviation for the databases can be also used in the parameter
+         'Pauthority':
+
+        library  :  VIAF, LC,   BNE , ISNI, JPG,  ULAN, BNF,  GND,  DNB,  LCCN
+        Pauthority: P214, P244, P950, P213, P245, P245, P268, P227, P227, P1144
+
+        library  :  SUDOC, NTA,   J9U,   ELEM,  NUKAT, MNCARS, DIALNET, SCOPUS
+        Pauthority: P269,  P1006, P8189, P1565, P1207, P4439,  P1607,   P1153
+
+        library:    ORCID, PUBLONS, RID,   OCLC
+        Pauthority: P496,  P3829,   P3829, P243
+
+  :param langsorder: Order of languages in which the information will be
+         returned, separated with '|'. If no information is given in the first
+         language, next is used. If langsorder='', then labels or descriptions
+         are not returned.
+  :param instanceof: Wikidata entity of which the entities searched for are an
+         example or member of it (class). Optional. For example, if
+         instanceof="Q5" the search are filtered to Wikidata entities of class
+         Q5 (human). Some entity classes are allowed, separated with '|'.
+  :param chunksize: If the number of entities in the database or authorities'
+         catalog exceeds this number, then query are made in chunks. The value
+         can increase if langorder=''. Please, decrease the default value if
+         error is raised.
+  :param debug: For debugging purposes (defauls False). If debug='info'
+         information about chunked queries is shown. If debug='query' also the
+         query launched is shown. If debug='count' the function only returns
+         the number of entities.
+  :return A Pandas data-frame with columns: 'entity', 'entityLabel',
+         'entityDescription', 'instanceof', instanceofLabel' and the
+         identifier in the "Pauthority" database.
+         Index of the data-frame is also set to the list of entities found.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :example
+  >>> # P9944: Database of Czech Amateur Theater person ID
+  ... d = w_SearchByAuthority(Pauthority="P9944", langsorder="")
+  >>> d.iloc[:3]
+                entity instanceof P9944
+  Q949091      Q949091         Q5  3355
+  Q955415      Q955415         Q5  1639
+  Q68002114  Q68002114         Q5  5390
+  >>> mncars = w_SearchByAuthority(Pauthority="MNCARS", langsorder="en|es")
+  >>> mncars.iloc[:3]
+                entity           entityLabel  ... instanceofLabel            P4439
+  Q5799578    Q5799578           Darío Urzay  ...      ser humano      urzay-dario
+  Q94502963  Q94502963       Jorge Ballester  ...      ser humano  ballester-jorge
+  Q729079      Q729079  José Hernández Muñoz  ...      ser humano   hernandez-jose
+  >>> # Not human
+  ... noQ5 = mncars[~ mncars.instanceof.str.contains(r'\bQ5\b')]
+  >>> # filter human
+  ... mncarsQ5 = w_SearchByAuthority(Pauthority="MNCARS", langsorder = 'es|en',
+                                     instanceof='Q5')
+  """
+  #
+  Pauthority = authorityProperty(Pauthority)
+  #
+  if langsorder == '':
+    ss1 = sq = ss2 = ''
+  else:
+    ss1 = "?entityLabel ?entityDescription"
+    ss2 = "(GROUP_CONCAT(DISTINCT ?instancLabel; separator='|') as ?instanceofLabel)"
+    langsorder = langsorder.replace('|', ',')
+    sq = f"""SERVICE wikibase:label {{bd:serviceParam wikibase:language "{langsorder}".
+      ?entity rdfs:label ?entityLabel.
+      ?entity schema:description ?entityDescription.
+      ?instanc rdfs:label ?instancLabel.}}"""
+  #
+  if debug and instanceof!='':
+    print(f"INFO: The instanceof filtering ({instanceof}) will be applied when all entities are retrieved", file=sys.stderr)
+    #
+  # First: known the number of entities
+  query = f"SELECT (COUNT(DISTINCT ?entity) AS ?count) WHERE {{?entity wdt:{Pauthority} [].}}"
+  d = reqWDQS(query, method='GET', format="csv")
+  nq = int(d['count'][0])
+  #
+  if debug=='count':
+    return nq
+  #
+  nlim = nq//chunksize
+  if nlim>0 and debug:
+    print(f"INFO: The number of entities ({nq}) exceeds chunksize ({chunksize}).", file=sys.stderr)
+  for k in range(nlim + 1):
+    offset = chunksize*k
+    if nlim>0 and debug:
+      print(f"\tINFO: Requesting elements from {offset+1} to {min(offset+chunksize, nq)}", end="",file=sys.stderr)
+    t0 = time()
+    query = f"""SELECT DISTINCT ?entity {ss1}
+(GROUP_CONCAT(DISTINCT ?instanc; separator='|') as ?instanceof)
+{ss2}
+(GROUP_CONCAT(DISTINCT STR(?authid);separator='|') as ?{Pauthority})
+WITH {{
+  SELECT DISTINCT ?entity ?authid WHERE {{?entity wdt:{Pauthority} ?authid.}}
+  ORDER BY ?entity
+  LIMIT {chunksize} OFFSET {offset}
+  }} AS %results
+WHERE {{
+  INCLUDE %results.
+  {sq}
+  OPTIONAL {{?entity wdt:P31 ?instanc.}}
+}}GROUP BY ?entity {ss1}
+"""
+    #
+    if debug=='query':
+      print(query, file=sys.stderr)
+    #
+    d = reqWDQS(query, method="GET", format="csv")
+    #
+    if nlim>0 and debug:
+      print(f" ({time()-t0:.2f} seconds)", file=sys.stderr)
+    #
+    d.fillna('', inplace=True)
+    d[['entity','instanceof']] = d[['entity','instanceof']].replace(to_replace='http://www.wikidata.org/entity/', value='', regex=True)
+    d.index = d.entity.values
+    if k==0:
+      output = d
+    else:
+      output = pd.concat([output, d])
+     #
+  # Filter instanceof
+  if instanceof!='':
+    output = output[output.instanceof.str.contains(r'\b(?:' + instanceof + r")\b")]
+  #
+  return output
+
+#%% def w_SearchByInstanceof(instanceof, langsorder='', chunksize=2500, debug=False):
+@traced
+def w_SearchByInstanceof(instanceof, langsorder='', chunksize=2500, debug=False):
+  """
+  Get all Wikidata entities which are instance of one o more Wikidata entities
+  like films, cities, etc. If parameter `langsorder`='', then no labels or
+  descriptions of the entities are returned, otherwise the function returns
+  them in the language order indicated in `langsorder`. If debug='count' the
+  function only returns the number of entities.
+
+  :param instanceof: Wikidata entity of which the entities searched for are an
+         example or member of it (class). For example, if instanceof="Q229390"
+         return Wikidata entities of class Q229390 (3D films). More than one
+         entities can be included in the `instanceof` parameter, with '|' or
+         '&' separator:
+         - if '|' (instanceof='Q229390|Q202866') then the OR operator is used.
+         - if '&' (instanceof='Q229390|Q202866') then the AND operator is used.
+
+         Note that '|' and '&' cannot be present at the same time.
+
+  :param langsorder: Order of languages in which the information will be
+         returned, separated with '|'. If no information is given in the first
+         language, next is used. If langsorder=='', then labels or descriptions
+         are not returned.
+  :param chunksize: If the number of entities which are instace of `instanceof`
+         paramenter exceeds this number, then query are made in chunks. The
+         value can increase if langorder=''. Please, reduce the default value
+         if error is raised.
+  :param debug: For debugging purposes (defauls False). If debug='info'
+         information about chunked queries is shown. If debug='query' also the
+         query launched is shown. If debug='count' the function only returns
+         the number of entities.
+  :return A dataframe. Index of the data-frame is also set to the list of
+          entities found.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :examples
+  >>> w = w_SearchByInstanceof('Q229390', langsorder = 'es|en')
+  >>> w = w_SearchByInstanceof('Q229390|Q202866', langsorder = 'es|en')
+  >>> w = w_SearchByInstanceof('Q229390&Q202866', langsorder = 'es|en')
+  """
+  #
+  searchOR = searchAND = False
+  m = re.search("^Q\d+([|&]Q\d+)*$", instanceof)
+  if m is None:
+    raise ValueError(f"Invalid value '{instanceof}' for parameter 'instanceof'")
+  if '|' in instanceof:
+    searchOR = True
+  if '&' in instanceof:
+    searchAND = True
+  if searchOR and searchAND:
+    raise ValueError(f"ERROR: Invalid value '{instanceof}' for parameter 'instanceof'")
+  #
+  if langsorder == '':
+    ss1 = sq = ss2 =  ''
+  else:
+    ss1 = "?entityLabel ?entityDescription"
+    ss2 = "\n(GROUP_CONCAT(DISTINCT ?instancLabel; separator='|') as ?instanceofLabel)"
+    langsorder = langsorder.replace("|", ",")
+    sq = f"""\nSERVICE wikibase:label {{bd:serviceParam wikibase:language "{langsorder}".
+    ?entity rdfs:label ?entityLabel.
+    ?entity schema:description ?entityDescription.
+    ?instanc rdfs:label ?instancLabel.}}"""
+  #
+  # queryC: known the number of entities
+  # queryF: retrieve entites in chunks (LIMIT .. OFFSET ..)
+  if searchOR:
+    iofs = instanceof.split('|')
+    values = 'wd:' +  " wd:".join(iofs)
+    queryC = "SELECT (COUNT(DISTINCT ?entity) AS ?count) WHERE {VALUES ?iof {" + values + "} ?entity wdt:P31 ?iof}\n"
+    queryF = "SELECT DISTINCT ?entity WHERE {VALUES ?iof {" + values + "} ?entity wdt:P31 ?iof}"
+  elif searchAND:
+    iofs = instanceof.split('&')
+    values = 'wd:' + ",wd:".join(iofs)
+    queryC = "SELECT (COUNT(DISTINCT *) AS ?count) WHERE {[] wdt:P31 " + values + "}\n"
+    queryF = "SELECT DISTINCT ?entity WHERE {?entity wdt:P31 " + values + "}"
+  else:
+    queryC = "SELECT (COUNT(DISTINCT *) AS ?count) WHERE {[] wdt:P31 wd:" + instanceof + "}\n"
+    queryF = "SELECT DISTINCT ?entity WHERE {?entity wdt:P31 wd:" + instanceof + "}"
+  #
+  if debug=="query":
+    print(queryC, file=sys.stderr)
+    #
+  d = reqWDQS(queryC, method='GET', format="csv")
+  nq = int(d['count'][0])
+  #
+  if debug:
+    print(f"INFO: The number of entities is {nq}.", file=sys.stderr)
+    #
+  if debug=='count':
+    return(nq)
+    #
+  nlim = int(nq/chunksize)
+  if debug and nlim>0:
+    print(f"INFO: The number of entities ({nq}) exceeds chunksize ({chunksize})", file=sys.stderr)
+  for k in range(nlim + 1):
+    offset = k*chunksize
+    if (offset+1) > nq:
+      break
+    if debug and nlim>0:
+      t0 = time()
+      print(f"  INFO: Requesting elements from {offset+1} to {min(offset+chunksize, nq)}", end="", file=sys.stderr)
+    #
+    query = f"""SELECT DISTINCT ?entity {ss1}
+(GROUP_CONCAT(DISTINCT ?instanc; separator='|') as ?instanceof){ss2}
+WITH {{
+  {queryF}
+  ORDER BY ?entity
+  LIMIT {chunksize} OFFSET {offset}
+  }} AS %results
+WHERE {{
+  INCLUDE %results.
+  OPTIONAL {{?entity wdt:P31 ?instanc.}}{sq}
+}} GROUP BY ?entity {ss1}"""
+    #
+    if debug=="query":
+      print(query, file=sys.stderr)
+      #
+    d = reqWDQS(query, format='csv', method='POST')
+    d.fillna('', inplace=True)
+    d[['entity','instanceof']] = d[['entity','instanceof']].replace(to_replace='http://www.wikidata.org/entity/', value='', regex=True)
+    d.index = d.entity.values
+    #
+    if debug and nlim>0:
+      print(f" ({time() - t0:.2f} seconds)", file=sys.stderr )
+      #
+    if k==0:
+      output = d
+    else:
+      output = pd.concat([output, d])
+  #
+  return output
+
+
+
+#%% w_SearchByLabel(string, mode='inlabel', langs='', langsorder='', instanceof="",
+#                    Pproperty="",debug=False):
+@traced
+def w_SearchByLabel(string, mode='inlabel', langs='', langsorder='', instanceof="",
+                     Pproperty="", debug=False):
+  """
+  Search Wikidata entities by string (usually labels). Search the 'string' in
+  label and altLabel ("Also known as") or in any part of the Wikidata entities
+  using different approaches.
+
+  :param string: String (label or altLabel) to search. Note that single
+         quotation mark must be escaped (string="O\\'Donell"), otherwise an
+         error will be raised.
+  :param mode: The mode to perform search. Default 'inlabel' mode.
+   - 'exact' for an exact search in label or altLabel using case sensitive
+     search and differentiate diacritics. Languages in the parameter `lang` are
+     used, so this parameter is mandatory using this mode.
+   - 'startswith' for entities which label or altLabel starts with the string,
+     similar to a wildcard search "string*". The string is searched in label in
+     the languages of `lang` parameter, but in any language in altLabel, so
+     parameter `lang` is also mandatory in this mode. Diacritics and case are
+     ignored in this mode.
+   - 'cirrus' search words in any order in any part of the entity (which must
+     be a string), not only in label or altLabel. Diacritics and case are
+     ignored. It is a full text search using the ElasticSearch engine.
+     Phrase search can be used if launched with double quotation marks, for
+     example, string='"Antonio Saura"'. Also fuzzy search is possible, for
+     example, string="algermon~1" or string="algernon~2". Also REGEX search can
+     be used (but it is a very limited functionality) using this format:
+     string="insource:/regex/i" (i: is for ignore case, optional).
+     In this mode, parameter `langs` is ignored.
+   - 'inlabel' is an special case of 'cirrus' search for matching whole words
+     (in any order) in any position in label or altLabel. With this mode no
+     fuzzy search can be used, but some languages can be set in the `lang`
+     parameter.
+     Modes 'inlabel' and 'cirrus' use the CirrusSearch of the Wikidata API.
+     Please, for more examples, see https://www.mediawiki.org/wiki/Help:CirrusSearch
+     and https://www.mediawiki.org/wiki/Help:Extension:WikibaseCirrusSearch
+  :param langs: Languages in which the information will be searched, using "|"
+         as separator. In 'exact' or 'startswith' modes this parameter is
+         mandatory, at least one language is required. In 'inlabel'mode, if the
+         parameter `langs`   is set, then the search is restricted to languages
+         in this parameter, otherwise any language. In 'cirrus' mode this p
+         arameter is ignored.
+  :param langsorder: Order of languages in which the information will be
+         returned, using "|" as separator. If `langsorder`='', no labels or
+         descriptions will be returned, otherwise, they are returned in the
+         order of languages in this parameter, if any.
+  :param instanceof: Wikidata entity of which the entities searched for are an
+         example or member of it (class). For example, if instanceof='Q5' the
+         search are filtered to Wikidata entities of class Q5 (human). Some
+         entity classes are allowed, separated with '|'.
+  :param debug: For debugging purposes (defauls False). If debug!=False the
+         query launched is shown.
+  :return: A Pandas data-frame with columns: 'entity', 'entityLabel',
+         'entityDescription', 'instanceof' and 'instanceofLabel'.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :example
+  >>> df = w_SearchByLabel(string='Iranzo', mode="exact", langs='es|en')
+  >>> df = w_SearchByLabel(string='Iranzo', mode="exact", langs='es|en', langsorder='es|en', instanceof = 'Q5|Q101352')
+  >>> ## Search entities which label or altLabel starts with "string"
+  ... df = w_SearchByLabel(string='Iranzo', mode='startswith', langs='en', langsorder='es|en')
+  >>> ## Search in any position in Label or AltLabel (diacritics and case are ignored)
+  ... df = w_SearchByLabel(string='Iranzo', mode='inlabel', langsorder='es|en')
+  >>> ## Search in Chinese (Simplified) (language code: zh) in any part of entity:
+  ... df = w_SearchByLabel(string='伊兰佐', mode='cirrus', langsorder='es|zh|en')
+  >>> d = w_SearchByLabel('Antonio Saura', mode='exact', langs='en|es')
+  >>> d.iloc[:3]
+                  entity          instanceof
+  Q528511        Q528511                  Q5
+  Q3620165      Q3620165  Q2175765|Q22808404
+  Q104866130  Q104866130                  Q5
+  >>> d = w_SearchByLabel('Antonio Saura', mode='inlabel', langs='', langsorder='en|es')
+  >>> len(d)
+  14
+  >>> d = w_SearchByLabel('"Antonio Saura"', mode='inlabel', langs='', langsorder='en|es')
+  >>> len(d)
+  12
+  >>> d = w_SearchByLabel('Antonio Saura', mode='exact', langs='en|es', Pproperty='P21')
+  """
+  #
+  # string = string.strip().replace("'", r"\'")
+  langs = langs.strip()
+  string = string.strip()
+  #
+  if string=='' or mode not in ['exact', 'startswith', 'inlabel', 'cirrus']:
+    raise ValueError("Parameter 'string' or 'mode' is invalid.")
+  if mode in ['exact', 'startswith'] and langs=='':
+    raise ValueError(f"Error: parameter 'langs' is mandatory in mode '{mode}'")
+  if mode=='cirrus' and langs!='':
+    print(f"INFO: in mode {mode} parameter 'langs' is ignored", file=sys.stderr)
+  #
+  p_show = p_query = p_lang = ''
+  if Pproperty!='':
+    p_show  = []
+    p_query = []
+    p_lang  = []
+    for p in Pproperty.split('|'):
+      p_show.append(f"(GROUP_CONCAT(DISTINCT ?{p}p;separator='|') as ?{p})")
+      if langsorder!='':
+        p_show.append(f"(GROUP_CONCAT(DISTINCT STR(?{p}label);separator='|') as ?{p}Label)")
+      p_query.append(f"OPTIONAL {{?entity wdt:{p} ?{p}p.}}")
+      p_lang.append(f"?{p}p rdfs:label ?{p}label.")
+    p_show  = '\n'.join(p_show)
+    p_query = '\n'.join(p_query)
+    p_lang  = '\n'.join(p_lang)
+
+  if langsorder == '':
+    ss1 = ''
+    ss2 = p_show
+    sq  = p_query
+  else:
+    ss1 = "?entityLabel ?entityDescription"
+    ss2 = "(GROUP_CONCAT(DISTINCT ?instancLabel; separator='|') as ?instanceofLabel)"
+    ss2 += "\n"+p_show
+    langsorder = langsorder.replace('|', ',')
+    sq = f"""{p_query}\n  SERVICE wikibase:label {{bd:serviceParam wikibase:language "{langsorder}".
+      ?entity rdfs:label ?entityLabel.
+      ?entity schema:description ?entityDescription.
+      ?instanc rdfs:label ?instancLabel.
+      {p_lang}}}"""
+  #
+  # Start of the query
+  query = f"""SELECT DISTINCT ?entity {ss1}
+(GROUP_CONCAT(DISTINCT ?instanc; separator='|') as ?instanceof)
+{ss2}
+"""
+  #
+  if mode=='exact':   # UNION sentences with each language
+    unionlabel    = '\nUNION\n'.join([f' {{?entity rdfs:label "{string}"@{l}}}' for l in langs.split('|')])
+    unionaltLabel = '\nUNION\n'.join([f' {{?entity skos:altLabel "{string}"@{l}}}' for l in langs.split('|')])
+    #
+    query += f"""WHERE {{
+  {unionlabel}
+  UNION
+  {unionaltLabel}
+"""
+  #
+  elif mode=='startswith':
+    mwapi = []
+    langs = langs.split('|')
+    for l in langs:
+      mwapi.append(f"""{{
+       SERVICE wikibase:mwapi {{
+         bd:serviceParam wikibase:api "EntitySearch";
+                         wikibase:endpoint "www.wikidata.org";
+                         mwapi:language "{l}";
+                         mwapi:search "{string}".
+         ?entity wikibase:apiOutputItem mwapi:item.}}
+      }}""")
+    mwapi = '\n    UNION\n    '.join(mwapi)
+    #
+    query += f"""WITH {{
+    SELECT DISTINCT ?entity
+    WHERE {{
+      {mwapi}
+    }}
+  }} AS %results
+  WHERE {{
+    INCLUDE %results"""
+  #
+  elif mode in ['inlabel', 'cirrus']:
+    if mode=='inlabel':
+      string = 'inlabel:' + string
+      if langs != '':
+        string += '@' + langs.replace('|',',')
+    query += f"""WHERE {{
+  SERVICE wikibase:mwapi {{
+    bd:serviceParam wikibase:api "Search";
+                    wikibase:endpoint "www.wikidata.org";
+                    mwapi:srsearch '{string}'.
+    ?entity wikibase:apiOutputItem mwapi:title.
+  }}"""
+  #
+  else:
+    raise ValueError("Invalid value for parameter 'mode'")
+  #
+  # The final part of the query:
+  query += f"""
+  OPTIONAL {{?entity wdt:P31 ?instanc.}}
+  {sq}
+}} GROUP BY ?entity {ss1}"""
+  #
+  if debug:
+    print(query, file=sys.stderr)
+  #
+  d = reqWDQS(query, method="GET", format="csv")
+  #
+  d.fillna('', inplace=True)
+  d.entity = d.entity.str.slice(31)
+  d.instanceof = d.instanceof.replace(to_replace='http://www.wikidata.org/entity/', value='', regex=True)
+  #
+  if Pproperty!='':
+    for p in Pproperty.split('|'):
+      d[p] = d[p].replace(to_replace='http://www.wikidata.org/entity/', value='', regex=True)
+  #
+  d.index = d.entity.values
+  # Filter instanceof
+  if instanceof!='':
+    d = d[d.instanceof.str.contains(r'\b(?:' + instanceof + r")\b")]
+  #
+  return d
+
+
+#%% entityInfoFields(mode='human')
+def entityInfoFields(mode='human'):
+  """
+  Return the claims (properties) and columns used by w_EntityInfo for the mode
+  'human' or 'film': a tuple (fields, fieldsonlyone, columns). 'fields' is a
+  dict property -> field name; for properties in 'fieldsonlyone' only the most
+  referenced value is taken; 'columns' are the columns of the data-frame.
+  """
+  if mode=='film':
+    # For these claims, more than one ocurrences separated with '|' are token, except
+    # for fields in fieldsonlyone, in which only the most referenced is taken
+    fields = {
+      'P31'  : 'instanceof',         'P577' : 'pubdate',      'P3383': 'poster',
+      'P18'  : 'pic',                'P10'  : 'video',        'P1476': 'title',
+      'P2047': 'duration',           'P144' : 'basedon',      'P135' : 'movement',
+      'P136' : 'genre',              'P495' : 'country',      'P364' : 'originallanguage',
+      'P57'  : 'director',           'P58'  : 'screenwriter', 'P161' : 'castmember',
+      'P725' : 'voiceactor',         'P1431': 'executiveproducer',
+      'P344' : 'photographdirector', 'P1040': 'filmeditor',
+      'P2554': 'productiondesigner', 'P86'  : 'composer',     'P162' : 'producer',
+      'P272' : 'productioncompany',  'P462' : 'color',        'P180' : 'depicts',
+      'P921' : 'mainsubject',        'P166' : 'award',        'P444' : 'reviewscore',
+      'P214' : 'VIAF',               'P480' : 'FilmAffinity', 'P345' : 'IMDb'
+      }
+    # For this claims, only the most referred is taken (note, however, that the
+    # preferred has priority).
+    fieldsonlyone = {'P577', 'P1476', 'P2047'}
+
+    # Note that all fields that are of valuetype = "wikibase-entityid" also
+    # retrieve the labels associated
+    # Columns of the data-frame returned: Qentities and labels if any
+    columns = """entity
+      status labellang label descriptionlang description instanceofQ instanceof
+      pubdate pubyear poster pic video duration title
+      basedonQ basedon movementQ  movement genreQ genre countryQ country
+      originallanguageQ originallanguage directorQ director
+      screenwriterQ screenwriter castmemberQ castmember voiceactorQ voiceactor
+      executiveproducerQ executiveproducer photographdirectorQ photographdirector
+      filmeditorQ filmeditor productiondesignerQ productiondesigner
+      composerQ composer producerQ producer productioncompanyQ productioncompany
+      colorQ color depictsQ depicts mainsubjectQ mainsubject awardQ award
+      reviewscore VIAF FilmAffinity IMDb wikipedias""".split()
+      # Note that wikipedias is added at last as new column of the dataframe
+  else: # people
+    # For these claims, more than one ocurrences separated with '|' are token, except
+    # for fields in fieldsonlyone, in which only the most referenced is taken
+    fields = {
+      'P31' :'instanceof',  'P18' :'pic',        'P21'  :'sex',
+      'P69' :'educatedat',  'P106':'occupation', 'P101' :'fieldofwork',
+      'P135':'movement',    'P136':'genre',      'P737' :'influencedby',
+      'P800':'notablework', 'P463':'memberof',   'P166' :'award',
+      'P214':'viafid',      'P950':'bneid',      'P4439':'mncarsid',
+      'P19' :'bplace',      'P20' :'dplace',
+      'P569':'bdate',       'P570':'ddate',
+      }
+    # For this claims, only the most referred is taken (note, however, that the
+    # preferred has priority).
+    fieldsonlyone = {'P19', 'P20', 'P569', 'P570'}
+
+    # Note that all fields that are of valuetype = "wikibase-entityid" also
+    # retrieve the labels associated
+    # Columns of the data-frame returned: Qentities and labels if any
+    columns = """entity
+      status labellang label descriptionlang description instanceofQ instanceof sexQ sex
+      bdate byear bplaceQ bplace bplaceLat bplaceLon bcountryQ bcountry
+      ddate dyear dplaceQ dplace dplaceLat dplaceLon dcountryQ dcountry
+      occupationQ occupation notableworkQ notablework educatedatQ educatedat
+      fieldofworkQ fieldofwork movementQ movement genreQ genre influencedbyQ influencedby
+      memberofQ memberof awardQ award viafid bneid mncarsid pic wikipedias""".split()
+      # Note that wikipedias is added at last as new column of the dataframe
+  return fields, fieldsonlyone, columns
+
+
+#%% entityInfoRecord(qid, data, fields, fieldsonlyone, columns, llangs, wlangs,
+#                    entity_list, qidsoflabels, qidsofplaces)
+def entityInfoRecord(qid, data, fields, fieldsonlyone, columns, llangs, wlangs,
+                     entity_list, qidsoflabels, qidsofplaces):
+  """
+  Return the record (a dict with 'columns' as keys) of the Wikidata entity
+  'qid' from its JSON data (as returned by the 'wbgetentities' action of the
+  Wikibase API, or as stored in the Wikidata JSON dumps). See w_EntityInfo.
+  The Wikidata entities of the values which need labels are added to the
+  set 'qidsoflabels', and the places (birth or death) to 'qidsofplaces'.
+  """
+  r = {x:None for x in columns}
+  r['entity'] = qid
+  r['status'] = 'ok'
+  # Check if entity is a redirection to other entity
+  if 'redirects' in data:
+    qid_r = data['id']
+    r['status'] = qid_r
+    print(f"INFO: {qid} redirects to {qid_r}, so all information returned is about {qid_r}.", file=sys.stderr)
+    if qid_r in entity_list:
+      print(f" Also note that {qid_r} is in the original entity list too.", file=sys.stderr)
+  # Check if entity is missing
+  if 'missing' in data:
+    print(f"INFO: {qid} is missing.", file=sys.stderr)
+    r['status'] = 'missing'
+    return r
+  #
+  # Get the label and the description of the entity. Retrieves the first
+  # in language order or any one else, if exist, otherwise None.
+  for ld in ['label', 'description']:
+    item = ld + 's'    # label(s) and description(s) items
+    if item not in data or len(data[item])==0:
+      r[ld]        = None
+      r[ld+"lang"] = None
+      continue
+    lds = data[item]
+    existlang = False
+    for lang in llangs:
+      if lang in lds and 'for-language' not in lds[lang]:
+        existlang = True
+        r[ld]        = lds[lang]['value']
+        r[ld+'lang'] = lds[lang]['language']
+        break
+    if not existlang:
+      lang = next(iter(lds))
+      r[ld]        = lds[lang]['value']
+      r[ld+'lang'] = lds[lang]['language']
+  #
+  # Processing claims
+  claims = data['claims']
+  #
+  # For f in fields list retrieve all values, but if f is in fieldsonlyone,
+  # only the most referenced value is taken. For both, if there is a
+  # preferred value, then, this one is taken.
+  for f,fname in fields.items():
+    if f in claims:
+      values = []
+      nrefs  = []
+      is_entity = False  # If the claim store a Qxxx, add qids in the corresponding "Q" field
+      for item in claims[f]:
+        if 'datavalue' not in item['mainsnak']: # Unknown value in the claim, but some information exists about the property.
+          continue
+        valuetype = item['mainsnak']['datavalue']['type']
+        value     = item['mainsnak']['datavalue']['value']
+        # count references
+        if 'references' in item:
+          nrefs.append(len(item['references']))
+        else:
+          nrefs.append(0)
+        # datatypes
+        if valuetype == 'string':
+          v = value
+        elif valuetype == 'wikibase-entityid':
+          is_entity = True
+          v = value['id']
+          # Store qids to search labels later (not for places, because labels
+          # are returned when retrieve places)
+          if f not in ['P19', 'P20']:
+            qidsoflabels.add(v)
+        elif valuetype == 'time':
+          v = value['time']
+        elif valuetype == 'monolingualtext':
+          v = value['text'] + ':' + value['language']
+        elif valuetype == 'quantity':
+          unit = value['unit']
+          m = re.match('http://www.wikidata.org/entity/(Q.*)', unit)
+          if m is not None:
+            unit = m.group(1)
+            qidsoflabels.add(unit)
+          v = value['amount'] + ' : ' + unit
+        else:
+          print(f" WARNING in mm_EntityInfo: valuetype {valuetype} not implemented .", file=sys.stderr)
+        #
+        # Check reviewers for P444 (review score)
+        if f=='P444' and 'qualifiers' in item:
+          for qualifier,dq in item['qualifiers'].items():
+            if qualifier == 'P447':
+              reviewerQ = dq[0]['datavalue']['value']['id']
+              qidsoflabels.add(reviewerQ)
+              v += f' [{reviewerQ}]'
+        #
+        if 'rank' in item and item['rank']=='preferred':
+          values = [v]
+          nrefs  = [0]
+          break
+        else:
+          values.append(v)
+      #
+      if len(values)!=0: # The claim almost has one not erroneous value
+        if f not in fieldsonlyone:
+          r[fname] = '|'.join(set(values))
+        else:
+          # Get the most referred value: # index_max = max(range(len(nrefs)), key=nrefs.__getitem__)
+          index_max = nrefs.index(max(nrefs))
+          v = values[index_max]
+          r[fname] = v
+        # Store qids to search places later
+        if f in ['P19', 'P20']:
+          qidsofplaces.add(v)
+        # Extract year from bdate/ddate/pubdate:
+        if f in ['P569', 'P570', 'P577'] and f in fields:
+          ff = fname.replace("date", "year")  # bdate/ddate => byear/dyear
+          r[ff] = v[1:5]                 # +yyyy-MM-ddThh:mm:ssZ => yyyy
+        # if is_entity add qids to the corresponding "Q" field
+        if is_entity:
+          r[fname+"Q"] = r[fname]
+
+  # Wikipedias
+  sitelinks = data['sitelinks']
+  if len(sitelinks) > 0:
+    wvalues = []
+    if len(wlangs)==0:
+      for wlwiki in sitelinks.keys():
+        if wlwiki.endswith("wiki"):
+          wl = wlwiki[0:-4]
+          title = sitelinks[wlwiki]['title'].replace(" ","_")
+          title = requests.utils.quote(title)
+          wvalues.append(f'https://{wl}.wikipedia.org/wiki/{title}')
+    else:
+      for wl in wlangs:
+        wlwiki = wl+'wiki'
+        if wlwiki in sitelinks.keys():
+          title = sitelinks[wlwiki]['title'].replace(" ","_")
+          title = requests.utils.quote(title)
+          wvalues.append(f'https://{wl}.wikipedia.org/wiki/{title}')
+    if len(wvalues) > 0:
+      r['wikipedias'] = '|'.join(wvalues)
+
+  # Add URL parts to the pic/poster/video to download, if any:
+  for fname in ['poster', 'pic', 'video']:
+    if fname in r and r[fname] is not None:
+      p = [requests.utils.quote(x.replace(" ","_")) for x in r[fname].split('|')]
+      u = 'https://commons.wikimedia.org/wiki/Special:FilePath/'
+      r[fname] = '|'.join([u+x for x in p])
+  return r
+
+
+#%% entityInfoComplete(d, places, labels)
+def entityInfoComplete(d, places, labels):
+  """
+  Complete the records of w_EntityInfo (a dict qid -> record) with the
+  information about places and the labels of the Wikidata entities in them.
+
+  :param d: The dict of records (see entityInfoRecord), modified in place.
+  :param places: A dict placeQ -> {'placeQ', 'place', 'placeLat', 'placeLon',
+         'countryQ', 'country'}.
+  :param labels: A dict qid -> label. The qid is kept if it has no label.
+  """
+  # Add labels, geo-coordinates and country to entities
+  for qid,data in d.items():
+    for f in 'bd': # ['bplaceQ', 'dplaceQ']:
+      if f+'placeQ' in data and data[f+'placeQ'] is not None and data[f+'placeQ'] in places:
+        placeQ = data[f+'placeQ']
+        data.update({f+x:y for x,y in places[placeQ].items()})
+  #
+  # Add labels to entities
+  for qid,data in d.items():
+    for f in data.keys():
+      if data[f] is None:
+        continue
+      if f.endswith('Q') and f not in ['bplaceQ', 'dplaceQ', 'bcountryQ', 'dcountryQ']:
+        # Select the field without the 'Q' in last position:
+        ff = f[:-1]
+        # Now replace the Qentities in those fields with the associated labels
+        data[ff] = '|'.join([labels.get(x, x) for x in data[ff].split('|')])
+      #
+      if f == 'duration':  # data['duration'] = '+125 (Q7727)'
+        m = re.search(': (Q\d+)$', data['duration'])
+        if m is not None:
+          unit = labels.get(m.group(1), m.group(1))
+          data['duration'] = re.sub(': (Q\d+)$', unit, data['duration'])
+      #
+      if f == 'reviewscore': # data['reviewscore']
+        reviewscore = []
+        for rrss in data['reviewscore'].split('|'):
+          m = re.search('(Q\d+)', rrss)
+          if m is not None:
+            reviewscore.append(re.sub('(Q\d+)', labels.get(m.group(1), m.group(1)), rrss))
+        data['reviewscore'] = '|'.join(reviewscore)
+
+
+#%% w_EntityInfo(entity_list, langsorder='en', wikilangs="", debug=False):
+@traced
+def w_EntityInfo(entity_list, mode='human', langsorder='', wikilangs="",
+                  chunksize=MW_LIMIT, debug=False):
+  """
+  Get information about a Wikimedia entity (human or film).
+  This function uses the WikiBase API to obtain information from Wikidata (this
+  API is similar to the MediaWiki API, so uses the reqMediaWiki() function) and
+  the Wikidata Query Service (also uses the reqWDQS() function).
+
+  Get labels, descriptions and some properties of the Wikidata entities in
+  entity_list, for person or films. If person, the information returned is
+  about labels, descriptions, birth and death dates and places, occupations,
+  works, education sites, awards, identifiers in some databases, Wikipedia page
+  titles (which can be limited to the languages in the `wikilangs` parameter,
+  etc. If films, information is about title, directors, screenwriter,
+  castmember, producers, etc.
+
+  :param entity_list: The Wikidata entities to search for properties (person or
+         films.)
+  :param mode: In "human" mode, the list of entities is expected to
+         correspond to people, obtaining information about people. If the
+         mode is "film", information related to films will be requested.
+  :param langsorder: Order of languages in which the information will be
+         returned, separated with '|'. If no information is given in the first
+         language, next is used. For label and description, English is used for
+         language failback, if they are not in English, then information is
+         returned in any else language. The language for label and description
+         are also returned. If langsorder=='', then no other information than
+         labels or descriptions are returned in any language, only Wikidata
+         entities, else, use the order in this parameter to retrieve
+         information.
+  :param wikilangs: List of languages to limit the search of Wikipedia pages,
+         using "|" as separator. Wikipedias pages are returned in same order as
+         languages in this parameter. If wikilangs='' the function returns
+         Wikipedia pages in any language, not sorted.
+  :param debug: For debugging purposes (defauls False). If debug='info'
+         information about chunked queries is shown. If debug='query' also the
+         query launched is shown.
+  :return: A data-frame with the properties of the entities, also the index
+         of the dataframe is set to the list of entities.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :examples
+  >>> df = w_EntityInfo(entity_list='Q134644', langsorder='es|en')
+  >>> df = w_EntityInfo(entity_list='Q134644', langsorder='es|en',
+                        wikilangs='es|en|fr')
+  >>> df = w_EntityInfo(['Q270510', 'Q1675466', 'Q24871'], mode='film',
+                        langsorder='es|en', wikilangs='es|en|fr')
+  >>> # Search string 'abba' inlabel, instanceof='Q5'
+  ... w = w_SearchByLabel('abba', mode='inlabel', langsorder = '', instanceof = 'Q5')
+  ... len(w)
+  310
+  >>> df = w_EntityInfo(w.entity, langsorder='en', wikilangs='en|es|fr', debug='info')
+  >>> # Search 3D films: instanceof='Q229390'
+  ... w = w_SearchByInstanceof(instanceof='Q229390', langsorder = 'en|es',
+                               debug = 'info')
+  ... df = w_EntityInfo(w.entity, mode="film", langsorder='en', wikilangs='en',
+                        debug='info')
+
+  """
+  # Check entity_list
+  entity_list = checkEntities(entity_list)
+  fields, fieldsonlyone, columns = entityInfoFields(mode)
+  #
+  # langsorder: failback: en
+  langsorder = langsorder.strip()
+  llangs = langsorder.split('|')  # label langs
+  if 'en' not in llangs:
+    llangs.append('en')
+  langsorder = '|'.join(llangs)
+  # wikilangs
+  wlangs = []
+  if wikilangs!="":
+    wlangs = wikilangs.split('|')   # wiki langs
+  #
+  d = dict()
+  qidsoflabels = set()  # store entities for searching labels
+  qidsofplaces = set()  # store entities for searching places
+  # Check limits to make chucked queries
+  n = len(entity_list)
+  for k in range(int(n/chunksize)+1):
+    if debug and n>chunksize and k==0:
+      print(f"INFO: The number of entities ({n}) exceeds the MediaWiki API limit ({chunksize}): doing chunked requests.", file=sys.stderr)
+    offset = chunksize*k
+    t_list = entity_list[offset:offset+chunksize]
+    if len(t_list) == 0:
+      break
+    if debug and n>chunksize :
+      print(f" INFO: Getting entities from {offset+1} to {offset+len(t_list)}", file = sys.stderr)
+    #
+    query = {"format" : 'json',
+             "action" : 'wbgetentities',
+             "props"  : 'labels|descriptions|claims|sitelinks',
+             "ids"    : '|'.join(t_list)}
+    #
+    # Only return sitelinks if wikilangs!='' because the wikipedia sites can
+    # easily be selected in the query. If wikilangs='', not only wikipedia,
+    # also other projects are returned.
+    if wikilangs!="":
+      query["sitefilter"] = '|'.join([x+'wiki' for x in wlangs])
+    #
+    j = reqMediaWiki(query=query, project="www.wikidata.org", debug=debug)
+    #
+    if j is None or "success" not in j or j['success'] != 1:
+      raise NameError("ERROR in w_EntityInfo(): reqMediaWiki returns an improper JSON.")
+    #
+    for qid,data in j['entities'].items():  # each qid is a dict()
+      d[qid] = entityInfoRecord(qid, data, fields, fieldsonlyone, columns,
+                                llangs, wlangs, entity_list, qidsoflabels,
+                                qidsofplaces)
+
+  # Search places for labels, coords (Latitude and Longitude) and countries
+  places = dict()
+  if len(qidsofplaces) > 0:
+    if debug:
+      print("INFO: Searching labels, latitude and longitude coordinates, and countries for places.", file=sys.stderr)
+    # Sorted: the same entities give the same queries (see Cassette)
+    places = w_Geoloc(sorted(qidsofplaces), langsorder=langsorder, debug=debug)
+    # Set the right colnames
+    places.columns =  ['placeQ', 'place', 'placeLat', 'placeLon', 'countryQ', 'country']
+    # Convert as dict() to add values to the d dataframe
+    places = places.to_dict(orient='index')
+
+  # Search labels for the rest of Qxxx entities
+  labels = dict()
+  if len(qidsoflabels) > 0:
+    if debug:
+      print("INFO: Searching labels for Wikidata entities.", file=sys.stderr)
+    labels = w_LabelDesc(sorted(qidsoflabels), what='L', langsorder=langsorder, debug=debug)
+    labels = labels.label.to_dict()
+  #
+  entityInfoComplete(d, places, labels)
+
+  # Finally, convert the dict of dicts to a dataframe
+  df = pd.DataFrame.from_dict(d, orient='index')
+  # df.fillna("", inplace=True)
+  return df
+
+
+#%% -- WDQS: authority crosswalk index ----------------------------------------
+# Mapping identifiers between Wikidata and the authorities' catalogs with
+# w_SearchByIdentifiers needs a query per list of identifiers and per catalog.
+# AuthorityIndex harvests once the identifiers of the catalogs (the properties
+# in AUTHORITIES) and answers the lookups locally.
+
+#%% class AuthorityIndex(path)
+class AuthorityIndex:
+  """
+  Local index (a SQLite database) of the identifiers that Wikidata entities
+  have in databases or authorities' catalogs (VIAF, LC, BNE, GND, SUDOC,
+  ULAN, ISNI...; see AUTHORITIES), to map any identifier to any other one
+  (including the Wikidata entity) without querying WDQS.
+
+  The identifiers of each catalog (a Wikidata property) are harvested with
+  the 'build' method, splitting the entities in buckets by the last digits
+  of their identifiers (see 'buckets') requested concurrently, and updated
+  with the 'refresh' method, which requests in the same buckets only the
+  entities modified after the last harvest of the property.
+
+  :param path: The file of the SQLite database (created if not exists), or
+         ':memory:'.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :example
+  >>> index = AuthorityIndex('authorities.sqlite')
+  >>> index.build('VIAF|BNE|LC|GND|SUDOC|ULAN|ISNI', debug='info')
+  >>> index.get('XX1718747', 'BNE', 'VIAF')
+  >>> d = index.search(["4938246", "36092166", "40787112"], 'VIAF', targets='BNE|LC')
+  >>> index.refresh()   # Some days later
+  """
+  def __init__(self, path):
+    self.path = path
+    self.con = sqlite3.connect(path)
+    with self.con:
+      self.con.execute("""CREATE TABLE IF NOT EXISTS ids (
+        property TEXT, id TEXT, entity TEXT,
+        PRIMARY KEY (property, id, entity)) WITHOUT ROWID""")
+      self.con.execute("CREATE INDEX IF NOT EXISTS ids_entity ON ids(entity, property)")
+      self.con.execute("""CREATE TABLE IF NOT EXISTS entities (
+        entity TEXT PRIMARY KEY, instanceof TEXT) WITHOUT ROWID""")
+      self.con.execute("""CREATE TABLE IF NOT EXISTS harvests (
+        property TEXT PRIMARY KEY, time TEXT, count INTEGER)""")
+
+  def close(self):
+    self.con.close()
+
+  def properties(self, Pauthorities=None):
+    """
+    Return the properties of 'Pauthorities' (properties or abbreviations of
+    libraries separated with '|'). If None, the properties harvested, or all
+    the properties in AUTHORITIES if none is harvested.
+    """
+    if Pauthorities is None:
+      props = [r[0] for r in self.con.execute("SELECT property FROM harvests")]
+      return props if len(props) > 0 else list(dict.fromkeys(AUTHORITIES.values()))
+    return list(dict.fromkeys(authorityProperty(x.strip()) for x in Pauthorities.split('|')))
+
+  @staticmethod
+  def buckets(n, chunksize):
+    """
+    The filters which split the entities of a property with 'n' identifiers
+    in buckets of about 'chunksize' identifiers: one bucket for each value of
+    the last k digits of the entities, and one for the rest of the entities
+    (with less than k digits). The key is stable, so an entity is always in
+    the same bucket, and each bucket is an independent query (no ORDER BY,
+    LIMIT and OFFSET over the whole property).
+    """
+    k = 0
+    while n > chunksize * 10**k:
+      k += 1
+    if k == 0:
+      return ['']
+    return ([f'FILTER(STRENDS(STR(?entity), "{x:0{k}d}"))' for x in range(10**k)] +
+            [f'FILTER(!REGEX(STR(?entity), "[0-9]{{{k}}}$"))'])
+
+  def harvestQuery(self, Pauthority, bucket='', since=None):
+    """The SPARQL query to harvest the identifiers of the property in a bucket."""
+    filters = bucket
+    if since is not None:
+      filters += f'\n     ?entity schema:dateModified ?modified. FILTER(?modified > "{since}"^^xsd:dateTime)'
+    return f"""SELECT ?entity ?authid
+(GROUP_CONCAT(DISTINCT ?instanc; separator='|') as ?instanceof)
+WHERE {{
+  {{SELECT DISTINCT ?entity ?authid WHERE {{
+     ?entity wdt:{Pauthority} ?authid.
+     {filters}}}
+  }}
+  OPTIONAL {{?entity wdt:P31 ?instanc.}}
+}} GROUP BY ?entity ?authid
+"""
+
+  def harvest(self, Pauthority, buckets, since=None, max_workers=4, debug=False):
+    """
+    Request the identifiers of the property in the 'buckets' (see 'buckets')
+    concurrently, using 'max_workers' threads, and load them in the staging
+    table (emptied first). Return the number of identifiers staged. If the
+    request of a bucket fails, the exception is raised.
+    """
+    def bucket(filters):
+      query = self.harvestQuery(Pauthority, filters, since)
+      if debug == 'query':
+        print(query, file=sys.stderr)
+      return reqWDQS(query, method='POST', format="csv")
+    #
+    with self.con:
+      self.con.execute("""CREATE TEMP TABLE IF NOT EXISTS staging (
+        property TEXT, id TEXT, entity TEXT,
+        PRIMARY KEY (property, id, entity)) WITHOUT ROWID""")
+      self.con.execute("DELETE FROM staging")
+    for n, (filters, d, error) in enumerate(doConcurrent(bucket, buckets, max_workers=max_workers)):
+      if error is not None:
+        raise error
+      self.store(Pauthority, d, staging=True)
+      if debug:
+        print(f" INFO: Bucket {n+1}/{len(buckets)}: {len(d)} rows", file=sys.stderr)
+    return self.con.execute("SELECT count(*) FROM staging").fetchone()[0]
+
+  def store(self, Pauthority, d, replace=None, staging=False):
+    """
+    Store the identifiers of the property 'Pauthority' harvested (data-frame
+    'd' with columns 'entity', 'authid' and 'instanceof'). If 'replace' is a
+    list of entities, their previous identifiers of the property are deleted.
+    If staging=True the identifiers are stored in the staging table (see
+    'build') instead of the index.
+    """
+    d = d.fillna('')
+    entities = d.entity.str.replace('http://www.wikidata.org/entity/', '', regex=False)
+    instanceof = d.instanceof.str.replace('http://www.wikidata.org/entity/', '', regex=False)
+    table = 'staging' if staging else 'ids'
+    with self.con:
+      if replace is not None:
+        self.con.executemany("DELETE FROM ids WHERE property=? AND entity=?",
+                             [(Pauthority, x) for x in replace])
+      self.con.executemany(f"INSERT OR IGNORE INTO {table} VALUES (?,?,?)",
+                           zip([Pauthority]*len(d), d.authid, entities))
+      self.con.executemany("INSERT OR REPLACE INTO entities VALUES (?,?)",
+                           zip(entities, instanceof))
+
+  def build(self, Pauthorities=None, chunksize=50000, max_workers=4, tolerance=0.001,
+            debug=False):
+    """
+    Harvest all the identifiers of the properties 'Pauthorities' (properties
+    or abbreviations of libraries separated with '|', default all the
+    properties in AUTHORITIES), replacing the previous ones. The number of
+    identifiers is requested first, and then the buckets of about 'chunksize'
+    identifiers (see 'buckets') are requested concurrently, using
+    'max_workers' threads (WDQS allows 5 concurrent queries by client). The
+    buckets are loaded in a staging table, and the identifiers of the
+    property are replaced (and its harvest time updated) only when all the
+    buckets succeed and the number of identifiers staged differs from the
+    number counted less than 'tolerance' (a fraction, for the edits made
+    while harvesting). Otherwise the index keeps the previous identifiers.
+
+    :raise ValueError: If the number of identifiers staged is not the counted.
+    :param debug: If debug='info' information about the buckets is shown. If
+           debug='query' also the queries launched are shown.
+    """
+    for Pauthority in self.properties(Pauthorities):
+      t0 = time()
+      started = pd.Timestamp.now(tz='UTC').strftime('%Y-%m-%dT%H:%M:%SZ')
+      query = f"SELECT (COUNT(*) AS ?count) WHERE {{?entity wdt:{Pauthority} [].}}"
+      nq = int(reqWDQS(query, method='GET', format="csv")['count'][0])
+      buckets = self.buckets(nq, chunksize)
+      if debug:
+        print(f"INFO: Harvesting {nq} identifiers of {Pauthority} ({len(buckets)} buckets)", file=sys.stderr)
+      try:
+        staged = self.harvest(Pauthority, buckets, max_workers=max_workers, debug=debug)
+        if abs(staged - nq) > tolerance * nq:
+          raise ValueError(f"ERROR: {staged} identifiers of {Pauthority} harvested, but {nq} "
+                           "counted. The index keeps the previous identifiers.")
+        # Swap the identifiers of the property in one transaction
+        with self.con:
+          self.con.execute("DELETE FROM ids WHERE property=?", (Pauthority,))
+          self.con.execute("INSERT INTO ids SELECT * FROM staging")
+          self.con.execute("INSERT OR REPLACE INTO harvests VALUES (?,?,?)",
+                           (Pauthority, started, staged))
+      finally:
+        with self.con:
+          self.con.execute("DELETE FROM staging")
+      if debug:
+        print(f"INFO: {staged} identifiers of {Pauthority} ({time()-t0:.2f} seconds)", file=sys.stderr)
+
+  def refresh(self, Pauthorities=None, chunksize=50000, max_workers=4, debug=False):
+    """
+    Update the identifiers of the properties 'Pauthorities' (default, all the
+    properties harvested), requesting only the entities modified after the
+    last harvest of each property, in the same buckets of 'build' (the
+    number of buckets is given by the number of identifiers of the last
+    harvest). The identifiers of the modified entities are replaced, and the
+    harvest time updated, only when all the buckets succeed. Note that the
+    entities which lost all the identifiers of a property are not detected:
+    use 'build' periodically.
+    """
+    for Pauthority in self.properties(Pauthorities):
+      row = self.con.execute("SELECT time, count FROM harvests WHERE property=?",
+                             (Pauthority,)).fetchone()
+      if row is None:
+        self.build(Pauthority, chunksize=chunksize, max_workers=max_workers, debug=debug)
+        continue
+      since, count = row
+      started = pd.Timestamp.now(tz='UTC').strftime('%Y-%m-%dT%H:%M:%SZ')
+      try:
+        self.harvest(Pauthority, self.buckets(count, chunksize), since=since,
+                     max_workers=max_workers, debug=debug)
+        with self.con:
+          modified = self.con.execute("SELECT count(DISTINCT entity) FROM staging").fetchone()[0]
+          self.con.execute("""DELETE FROM ids WHERE property=? AND entity IN
+                              (SELECT entity FROM staging)""", (Pauthority,))
+          self.con.execute("INSERT OR IGNORE INTO ids SELECT * FROM staging")
+          count = self.con.execute("SELECT count(*) FROM ids WHERE property=?",
+                                   (Pauthority,)).fetchone()[0]
+          self.con.execute("INSERT OR REPLACE INTO harvests VALUES (?,?,?)",
+                           (Pauthority, started, count))
+      finally:
+        with self.con:
+          self.con.execute("DELETE FROM staging")
+      if debug:
+        print(f"INFO: {Pauthority}: {modified} entities modified since {since}", file=sys.stderr)
+
+  def get(self, ident, source, target='entity'):
+    """
+    Return the list of identifiers in 'target' of the identifier 'ident' in
+    'source'. Source and target are properties, abbreviations of libraries
+    or 'entity' (the Wikidata entity).
+    """
+    if source == 'entity':
+      sql = "SELECT id FROM ids INDEXED BY ids_entity WHERE entity=? AND property=?"
+      args = (ident, authorityProperty(target))
+    elif target == 'entity':
+      sql = "SELECT entity FROM ids WHERE property=? AND id=?"
+      args = (authorityProperty(source), ident)
+    else:
+      sql = """SELECT DISTINCT id FROM ids INDEXED BY ids_entity WHERE property=?
+               AND entity IN (SELECT entity FROM ids WHERE property=? AND id=?)"""
+      args = (authorityProperty(target), authorityProperty(source), ident)
+    return [r[0] for r in self.con.execute(sql, args)]
+
+  def search(self, id_list, Pauthority, targets=''):
+    """
+    Search the entities of the identifiers in 'id_list' of the catalog
+    'Pauthority' (a property, an abbreviation of a library or 'entity'), as
+    w_SearchByIdentifiers does (with langsorder=''): a data-frame with the
+    columns 'id', 'entity' and 'instanceof', and index the identifiers. The
+    identifiers not found have entity ''. If 'targets' is set (properties or
+    abbreviations of libraries separated with '|'), a column is added for
+    each one with the identifiers of the entity in it (separated with '|').
+    """
+    id_list = checkValues(id_list, 'id_list')
+    source = 'entity' if Pauthority == 'entity' else authorityProperty(Pauthority)
+    rows = []
+    for k in range(0, len(id_list), 10000):   # Limit of variables in SQLite
+      chunk = id_list[k:k+10000]
+      marks = ','.join('?'*len(chunk))
+      if source == 'entity':
+        sql = f"SELECT entity, entity FROM entities WHERE entity IN ({marks})"
+        args = chunk
+      else:
+        sql = f"SELECT id, entity FROM ids WHERE property=? AND id IN ({marks})"
+        args = [source] + chunk
+      rows.extend(self.con.execute(sql, args).fetchall())
+    d = pd.DataFrame(rows, columns=['id', 'entity'])
+    d = pd.DataFrame({'id': id_list}).merge(d, on='id', how='left').fillna('')
+    instanceof = self.entityValues(d.entity[d.entity != ''].unique().tolist(),
+                                   "SELECT entity, instanceof FROM entities WHERE entity IN ({})")
+    d['instanceof'] = d.entity.map(instanceof).fillna('')
+    for target in ([] if targets == '' else targets.split('|')):
+      P = authorityProperty(target.strip())
+      values = self.entityValues(d.entity[d.entity != ''].unique().tolist(),
+                                 "SELECT entity, id FROM ids INDEXED BY ids_entity WHERE entity IN ({}) AND property=?", P)
+      d[P] = d.entity.map(values).fillna('')
+    d.index = d['id'].values
+    return d
+
+  def entityValues(self, entities, sql, *args):
+    """
+    Run the query 'sql' (with the placeholder {} for the list of entities)
+    in chunks, and return a dict entity -> values separated with '|'.
+    """
+    values = dict()
+    for k in range(0, len(entities), 10000):
+      chunk = entities[k:k+10000]
+      for e, v in self.con.execute(sql.format(','.join('?'*len(chunk))), chunk + list(args)):
+        values[e] = v if e not in values else values[e] + '|' + v
+    return values
+
+
+#%% -- WDQS: subgraph materialization ----------------------------------------
+# Analyses that run many w_* queries over the same (large) set of entities can
+# extract the triples of those entities once (w_Materialize) and then run the
+# w_* functions against the local snapshot (see LocalSPARQL and setEndpoint).
+
+#%% ntTerm(b)
+def ntTerm(b):
+  """
+  Return the N-Triples representation of a RDF term in the SPARQL JSON
+  results format (a dict with 'type', 'value', and 'xml:lang' or 'datatype').
+  """
+  if b['type'] == 'uri':
+    return f"<{b['value']}>"
+  if b['type'] == 'bnode':
+    return f"_:{b['value']}"
+  v = b['value'].replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n').replace('\r', '\\r')
+  if 'xml:lang' in b:
+    return f'"{v}"@{b["xml:lang"]}'
+  if 'datatype' in b:
+    return f'"{v}"^^<{b["datatype"]}>'
+  return f'"{v}"'
+
+
+#%% materializeChunk(entities, props, langs)
+def materializeChunk(entities, props, langs):
+  """
+  Return the triples (tuples of terms in SPARQL JSON format) of the entities
+  for the properties 'props' (wdt:), and their labels and descriptions in the
+  languages 'langs'. Used by w_Materialize.
+  """
+  values = "wd:" + " wd:".join(entities)
+  langs = ', '.join(f'"{l}"' for l in langs)
+  union = ''
+  if len(props) > 0:
+    pvalues = "wdt:" + " wdt:".join(props)
+    union = f"""{{ VALUES ?p {{ {pvalues} }} ?s ?p ?o. }}
+  UNION"""
+  query = f"""SELECT ?s ?p ?o
+WHERE {{
+  VALUES ?s {{ {values} }}
+  {union}
+  {{ VALUES ?p {{ rdfs:label schema:description }} ?s ?p ?o. FILTER(LANG(?o) IN ({langs})) }}
+}}"""
+  j = reqWDQS(query, method='POST', format='json')
+  return [(b['s'], b['p'], b['o']) for b in j['results']['bindings']]
+
+
+#%% w_Materialize(entity_list, Pproperty, path, langsorder='en', places='P19|P20',
+#                 chunksize=2500, max_workers=4, directory=None, debug=False)
+@traced
+def w_Materialize(entity_list, Pproperty, path, langsorder='en', places='P19|P20',
+                  chunksize=2500, max_workers=4, directory=None, debug=False):
+  """
+  Extract from WDQS the subgraph of the entities in entity_list and save it in
+  a N-Triples file, to run the w_* functions against it (see LocalSPARQL)
+  instead of WDQS. The triples are requested in chunks of entities, using
+  concurrent requests. The subgraph contains:
+  - The properties in Pproperty (and P31) of the entities, and their labels
+    and descriptions in the languages of langsorder.
+  - The labels of the entities which are values of those properties.
+  - For the places (values of the properties in 'places'): the coordinates
+    (P625), the country (P17) and the places which replace them (P1366, also
+    recursively), as w_Geoloc needs.
+  - For the countries: the classes (P31) and labels.
+
+  :param entity_list: Wikidata entity or a list of Wikidata entities.
+  :param Pproperty: Wikidata properties to extract, separated with '|'.
+  :param path: The N-Triples file (.nt or .nt.gz) where the subgraph is saved.
+  :param langsorder: Languages of the labels and descriptions, separated with '|'.
+  :param places: Properties whose values are places, separated with '|'.
+  :param chunksize: Maximum number of entities in each request.
+  :param max_workers: Maximum number of concurrent requests.
+  :param directory: If not None, the directory of the Oxigraph store (see
+         LocalSPARQL), so the snapshot is indexed on disk.
+  :param debug: For debugging purposes (default False). If debug='info'
+         information about the stages is shown.
+  :return A LocalSPARQL store with the subgraph.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :example
+  >>> store = w_Materialize(entities, 'P21|P106|P19|P20|P569|P570',
+  ...                       'humans.nt.gz', langsorder='es|en')
+  >>> setEndpoint('wdqs', store)
+  >>> p = w_Property(entities, Pproperty='P21|P106', langsorder='es|en')
+  >>> g = w_Geoloc(p.P19.str.split('|').explode().unique(), langsorder='en')
+  >>> # Later, in another session, reuse the snapshot:
+  ... setEndpoint('wdqs', LocalSPARQL('humans.nt.gz'))
+  """
+  entity_list = checkEntities(entity_list)
+  pprops = [p for p in Pproperty.strip().split('|') if p != '']
+  if 'P31' not in pprops:
+    pprops.append('P31')
+  langs = langsorder.strip().split('|')
+  placeprops = set(places.split('|'))
+  wd = 'http://www.wikidata.org/entity/'
+  #
+  triples = set()
+  done = set()
+  def extract(entities, props, stage):
+    entities = [x for x in dict.fromkeys(entities) if (x, tuple(props)) not in done]
+    done.update((x, tuple(props)) for x in entities)
+    chunks = [tuple(entities[k:k+chunksize]) for k in range(0, len(entities), chunksize)]
+    if debug:
+      print(f"INFO: {stage}: {len(entities)} entities in {len(chunks)} requests.", file=sys.stderr)
+    output = []
+    for chunk, result, error in doConcurrent(materializeChunk, chunks, max_workers=max_workers,
+                                             props=props, langs=langs):
+      if error is not None:
+        raise error
+      output.extend(result)
+    triples.update(tuple(ntTerm(x) for x in t) for t in output)
+    return output
+  #
+  def objects(output, props=None):
+    return [o['value'][len(wd):] for s,p,o in output if o['type'] == 'uri'
+            and o['value'].startswith(wd)
+            and (props is None or p['value'].split('/')[-1] in props)]
+  # Entities, labels of the values and places
+  output = extract(entity_list, pprops, 'entities')
+  extract(objects(output), [], 'labels of values')
+  frontier = objects(output, placeprops)
+  countries = []
+  while len(frontier) > 0:   # Places replaced by other places (P1366+)
+    output = extract(frontier, ['P625', 'P17', 'P1366'], 'places')
+    countries.extend(objects(output, {'P17'}))
+    frontier = objects(output, {'P1366'})
+  output = extract(countries, ['P31'], 'countries')
+  #
+  opener = gzip.open if path.endswith('.gz') else open
+  with opener(path, 'wt', encoding='utf-8') as f:
+    for t in triples:
+      f.write(' '.join(t) + ' .\n')
+  if debug:
+    print(f"INFO: {len(triples)} triples saved in {path}.", file=sys.stderr)
+  return LocalSPARQL(path, directory=directory)
+
+
+#%% -- Wikidata JSON dumps ---------------------------------------------------
+# The Wikidata JSON dumps (latest-all.json.gz, latest-all.json.bz2) contain
+# all the entities as a JSON array, one entity per line. For very large
+# entity sets it is cheaper to scan the dump than to make millions of API
+# calls. The functions wd_Dump* return the same data-frames as the w_*
+# functions which use WDQS or the Wikibase API.
+# See https://www.wikidata.org/wiki/Wikidata:Database_download#JSON_dumps_(recommended)
+# See https://dumps.wikimedia.org/wikidatawiki/entities/
+
+# Number of lines (entities) parsed in each task of the process pool.
+DUMP_BATCH = 2000
+
+# Classes of the entities considered as countries (see w_Geoloc)
+COUNTRY_CLASSES    = {'Q3624078', 'Q7275', 'Q6256'}
+NOTCOUNTRY_CLASSES = {'Q3024240', 'Q28171280'}
+
+# Sites ending with "wiki" which are not Wikipedias
+NOT_WIKIPEDIAS = {'commonswiki', 'specieswiki', 'metawiki', 'mediawikiwiki',
+                  'wikidatawiki', 'sourceswiki', 'outreachwiki', 'wikimaniawiki',
+                  'wikifunctionswiki', 'incubatorwiki', 'foundationwiki',
+                  'testwiki', 'test2wiki', 'testwikidatawiki', 'nostalgiawiki',
+                  'strategywiki', 'loginwiki', 'votewiki', 'donatewiki', 'tenwiki'}
+
+
+#%% dumpValue(snak)
+def dumpValue(snak):
+  """
+  Return the value of a snak (the 'mainsnak' of a claim) as a string, like
+  WDQS returns it: the entity id (Qxxx) for entities, the time for dates
+  (without the sign '+'), etc. Return None if the snak has no value.
+  """
+  if 'datavalue' not in snak:
+    return None
+  vtype = snak['datavalue']['type']
+  value = snak['datavalue']['value']
+  if vtype == 'wikibase-entityid':
+    return value['id']
+  if vtype == 'time':
+    return value['time'].lstrip('+')
+  if vtype == 'monolingualtext':
+    return value['text']
+  if vtype == 'quantity':
+    return value['amount'].lstrip('+')
+  if vtype == 'globecoordinate':
+    return f"Point({value['longitude']} {value['latitude']})"
+  return str(value)
+
+
+#%% dumpClaimValues(entity, p)
+def dumpClaimValues(entity, p):
+  """
+  Return the list of values (see dumpValue) of the property 'p' of the
+  entity, without duplicates. Deprecated claims are ignored, as WDQS does
+  with the 'wdt:' prefix.
+  """
+  values = []
+  for claim in entity.get('claims', {}).get(p, []):
+    if claim.get('rank') == 'deprecated':
+      continue
+    v = dumpValue(claim['mainsnak'])
+    if v is not None:
+      values.append(v)
+  return list(dict.fromkeys(values))
+
+
+#%% dumpTerm(entity, llangs, item='labels')
+def dumpTerm(entity, llangs, item='labels'):
+  """
+  Return a tuple (value, lang) with the label (or description if
+  item='descriptions') of the entity in the first language of the list
+  'llangs' in which it exists, else (None, None).
+  """
+  terms = entity.get(item, {})
+  for lang in llangs:
+    if lang in terms:
+      return terms[lang]['value'], terms[lang]['language']
+  return None, None
+
+
+#%% dumpMatch(entity, spec)
+def dumpMatch(entity, spec):
+  """
+  Check if the entity matches the filter 'spec', a dict with the keys 'ids'
+  (a set of entities), 'instanceof' (a set of classes: P31) and 'properties'
+  (a set of properties which the entity must have). None values are not
+  checked. All conditions must be satisfied.
+  """
+  if spec.get('ids') is not None and entity['id'] not in spec['ids']:
+    return False
+  claims = entity.get('claims', {})
+  if spec.get('instanceof') is not None:
+    if len(spec['instanceof'].intersection(dumpClaimValues(entity, 'P31'))) == 0:
+      return False
+  if spec.get('properties') is not None:
+    if not all(p in claims for p in spec['properties']):
+      return False
+  return True
+
+
+_dump_id = re.compile(r'^\{"type":"(?:item|property)","id":"([QP]\d+)"')
+_dump_args = None
+
+def _dumpInit(specs, parts, claims):
+  global _dump_args
+  _dump_args = (specs, parts, claims)
+
+#%% dumpFilterLines(lines, specs, parts=None, claims=None)
+def dumpFilterLines(lines, specs=None, parts=None, claims=None):
+  """
+  Parse the lines of a Wikidata JSON dump and return the entities (dicts)
+  which match any of the filters in 'specs' (see dumpMatch). To reduce the
+  memory (and the transfer between processes), only the 'parts' of the
+  entity are kept (for example ('labels', 'claims')), and of the claims, only
+  the properties in 'claims'. None values keep all. This is the function run
+  by the processes of the pool in dumpScan (which pass the arguments
+  through _dumpInit).
+  """
+  if specs is None:
+    specs, parts, claims = _dump_args
+  # If all filters have ids, the lines are checked before JSON parsing
+  allids = None
+  if all(spec.get('ids') is not None for spec in specs):
+    allids = set().union(*[spec['ids'] for spec in specs])
+  output = []
+  for line in lines:
+    line = line.strip()
+    if line.endswith(','):
+      line = line[:-1]
+    if len(line) < 2:    # The first "[" and last "]" lines
+      continue
+    if allids is not None:
+      m = _dump_id.match(line)
+      if m is not None and m.group(1) not in allids:
+        continue
+    entity = json.loads(line)
+    if not any(dumpMatch(entity, spec) for spec in specs):
+      continue
+    if parts is not None:
+      entity = {k:v for k,v in entity.items() if k in parts or k in ('id', 'type')}
+    if claims is not None and 'claims' in entity:
+      entity['claims'] = {p:v for p,v in entity['claims'].items() if p in claims}
+    output.append(entity)
+  return output
+
+
+#%% dumpScan(path, specs, parts=None, claims=None, processes=None, batchsize=DUMP_BATCH)
+def dumpScan(path, specs, parts=None, claims=None, processes=None,
+             batchsize=DUMP_BATCH):
+  """
+  Scan the Wikidata JSON dump and yield the entities which match any filter in
+  'specs' (see dumpFilterLines). The lines are parsed in batches of
+  'batchsize' lines by a pool of 'processes' processes, while the main
+  process reads (and an external process decompresses, see dumpLines) the
+  dump. The order of the entities in the dump is preserved.
+
+  :param path: The dump file (.json, .json.gz or .json.bz2).
+  :param specs: A list of filters (see dumpMatch).
+  :param parts: The parts of the entities to keep, or None (all).
+  :param claims: The properties of the claims to keep, or None (all).
+  :param processes: Number of parsing processes. Default None (the number of
+         CPUs). If processes=1, lines are parsed in the main process.
+  :param batchsize: Number of lines in each batch.
+  :return A generator of entities (dicts, as in the dump).
+  """
+  def batches():
+    batch = []
+    for line in dumpLines(path):
+      batch.append(line)
+      if len(batch) >= batchsize:
+        yield batch
+        batch = []
+    if len(batch) > 0:
+      yield batch
+  #
+  if processes == 1:
+    for batch in batches():
+      yield from dumpFilterLines(batch, specs, parts, claims)
+    return
+  with multiprocessing.Pool(processes, initializer=_dumpInit,
+                            initargs=(specs, parts, claims)) as pool:
+    for entities in pool.imap(dumpFilterLines, batches()):
+      yield from entities
+
+
+#%% wd_DumpEntities(path, ids=None, instanceof=None, properties=None, parts=None,
+#                   processes=None)
+@traced
+def wd_DumpEntities(path, ids=None, instanceof=None, properties=None, parts=None,
+                    processes=None):
+  """
+  Stream the entities of a Wikidata JSON dump filtered by identifiers, by
+  class (P31) or by the presence of properties. The entities have the same
+  structure as the 'entities' returned by the 'wbgetentities' action of the
+  Wikibase API (see w_EntityInfo).
+
+  :param path: The dump file (.json, .json.gz or .json.bz2). Compressed files
+         are decompressed with pigz/lbzip2 if installed (see dumpLines).
+  :param ids: A Wikidata entity or a list of entities, or None (no filter).
+  :param instanceof: The Wikidata class(es) of the entities, separated with
+         '|' (OR operator), or None (no filter).
+  :param properties: The properties which the entities must have, separated
+         with '|' (AND operator), or None (no filter).
+  :param parts: The parts of the entities returned, separated with '|', for
+         example 'labels|claims'. Default None: all parts.
+  :param processes: Number of processes to parse the dump. Default None (the
+         number of CPUs).
+  :return A generator of entities (dicts).
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  :example
+  >>> for e in wd_DumpEntities('latest-all.json.gz', instanceof='Q229390',
+  ...                          properties='P345'):
+  ...   print(e['id'], e['labels'].get('en'))
+  """
+  spec = {'ids'       : None if ids is None else set(checkEntities(ids)),
+          'instanceof': None if instanceof is None else set(instanceof.split('|')),
+          'properties': None if properties is None else set(properties.split('|'))}
+  parts = None if parts is None else set(parts.split('|'))
+  return dumpScan(path, [spec], parts=parts, processes=processes)
+
+
+#%% wd_DumpLabelDesc(path, entity_list, what='LD', langsorder='en', processes=None)
+@traced
+def wd_DumpLabelDesc(path, entity_list, what='LD', langsorder='en', processes=None):
+  """
+  Same as w_LabelDesc, but using a Wikidata JSON dump instead of WDQS. Return
+  labels and/or descriptions of the entities in entity_list in the language
+  order of 'langsorder'. If an entity has no label in those languages, the
+  label is the entity itself (as the label service of WDQS does).
+
+  :param path: The dump file (see wd_DumpEntities).
+  :param entity_list: Wikidata entity or a list of Wikidata entities.
+  :param what: Retrieve only Labels (L), only Descriptions (D) or both (LD).
+  :param langsorder: Order of languages, separated with '|', default 'en'.
+  :param processes: Number of processes to parse the dump.
+  :return The same data-frame as w_LabelDesc.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  """
+  entity_list = checkEntities(entity_list)
+  langsorder = langsorder.strip()
+  if langsorder=='' or not ('L' in what or 'D' in what):
+    raise ValueError("Parameter 'langsorder' or 'what' is incorrect")
+  llangs = langsorder.split('|')
+  #
+  parts = set()
+  if 'L' in what:
+    parts.add('labels')
+  if 'D' in what:
+    parts.add('descriptions')
+  spec = {'ids': set(entity_list)}
+  entities = {e['id']:e for e in dumpScan(path, [spec], parts=parts, claims=set(),
+                                          processes=processes)}
+  #
+  rows = []
+  for qid in entity_list:
+    e = entities.get(qid, {})
+    row = {'entity': qid}
+    if 'L' in what:
+      label, lang = dumpTerm(e, llangs, 'labels')
+      row['labellang'] = lang if label is not None else ''
+      row['label'] = label if label is not None else qid
+    if 'D' in what:
+      desc, lang = dumpTerm(e, llangs, 'descriptions')
+      row['descriptionlang'] = lang or ''
+      row['description'] = desc or ''
+    rows.append(row)
+  d = pd.DataFrame(rows)
+  d.index = d.entity.values
+  return d
+
+
+#%% wd_DumpProperty(path, entity_list, Pproperty, includeQ=False, langsorder='en',
+#                   processes=None)
+@traced
+def wd_DumpProperty(path, entity_list, Pproperty, includeQ=False, langsorder='en',
+                    processes=None):
+  """
+  Same as w_Property, but using a Wikidata JSON dump instead of WDQS. Get the
+  properties in 'Pproperty' of the entities in 'entity_list'. If langsorder
+  is not '', a second scan of the dump is made to obtain the labels of the
+  entities which are values of the properties.
+
+  :param path: The dump file (see wd_DumpEntities).
+  :param entity_list: Wikidata entity or a list of Wikidata entities.
+  :param Pproperty: Wikidata properties to search, separated with '|'.
+  :param includeQ: If True the values of the properties (Qxxx for entities)
+         are returned (see w_Property).
+  :param langsorder: Order of languages of the labels, separated with '|'.
+  :param processes: Number of processes to parse the dump.
+  :return The same data-frame as w_Property.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  """
+  entity_list = checkEntities(entity_list)
+  Pproperty = Pproperty.strip()
+  langsorder = langsorder.strip()
+  if Pproperty=='' or (langsorder=='' and not includeQ):
+    raise ValueError("ERROR: one or more parameters 'Pproperty', 'includeQ' or 'langsorder' are incorrect.")
+  pprops = Pproperty.split('|')
+  llangs = langsorder.split('|')
+  #
+  spec = {'ids': set(entity_list)}
+  entities = {e['id']:e for e in dumpScan(path, [spec], parts={'claims'},
+                                          claims=set(pprops) | {'P31'},
+                                          processes=processes)}
+  values = dict()
+  for qid in entity_list:
+    e = entities.get(qid, {})
+    values[qid] = {p:dumpClaimValues(e, p) for p in ['P31'] + pprops}
+  #
+  labels = dict()
+  if langsorder != '':
+    qids = {v for vals in values.values() for vv in vals.values() for v in vv
+            if re.match(r'^[QP]\d+$', v)}
+    if len(qids) > 0:
+      spec = {'ids': qids}
+      for e in dumpScan(path, [spec], parts={'labels'}, claims=set(),
+                        processes=processes):
+        label, _ = dumpTerm(e, llangs, 'labels')
+        if label is not None:
+          labels[e['id']] = label
+  #
+  rows = []
+  for qid in entity_list:
+    row = {'entity': qid, 'instanceof': '|'.join(values[qid]['P31'])}
+    if langsorder != '':
+      row['instanceofLabel'] = '|'.join(labels.get(x, x) for x in values[qid]['P31'])
+    for p in pprops:
+      if includeQ:
+        row[p] = '|'.join(values[qid][p])
+      if langsorder != '':
+        row[p+'Label'] = '|'.join(dict.fromkeys(labels.get(x, x) for x in values[qid][p]))
+    rows.append(row)
+  d = pd.DataFrame(rows)
+  d.index = d.entity.values
+  return d
+
+
+#%% dumpWikipedias(entity, wlangs)
+def dumpWikipedias(entity, wlangs):
+  """
+  Return a list of tuples (lang, title, URL) with the Wikipedia pages of the
+  entity in the languages of the list 'wlangs' (in that order), or in all
+  languages if 'wlangs' is void.
+  """
+  sitelinks = entity.get('sitelinks', {})
+  if len(wlangs) > 0:
+    sites = [wl.replace('-', '_') + 'wiki' for wl in wlangs]
+  else:
+    sites = [s for s in sitelinks if s.endswith('wiki') and s not in NOT_WIKIPEDIAS]
+  output = []
+  for site in sites:
+    if site not in sitelinks:
+      continue
+    lang = site[:-4].replace('_', '-')
+    title = sitelinks[site]['title']
+    url = f"https://{lang}.wikipedia.org/wiki/" + requests.utils.quote(title.replace(" ", "_"))
+    output.append((lang, title, url))
+  return output
+
+
+#%% wd_DumpWikipedias(path, entity_list, wikilangs="", instanceof='', processes=None)
+@traced
+def wd_DumpWikipedias(path, entity_list, wikilangs="", instanceof='', processes=None):
+  """
+  Same as w_Wikipedias, but using a Wikidata JSON dump instead of WDQS. Get
+  Wikipedia page titles and URLs of the Wikidata entities in entity_list.
+
+  :param path: The dump file (see wd_DumpEntities).
+  :param entity_list: Wikidata entity or a list of Wikidata entities.
+  :param wikilangs: List of languages to limit the search, using "|" as
+         separator (see w_Wikipedias).
+  :param instanceof: Wikidata entity class to limit the result to the instances
+         of that class.
+  :param processes: Number of processes to parse the dump.
+  :return The same data-frame as w_Wikipedias.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  """
+  entity_list = checkEntities(entity_list)
+  wlangs = [] if wikilangs == '' else wikilangs.split('|')
+  spec = {'ids': set(entity_list)}
+  entities = {e['id']:e for e in dumpScan(path, [spec], parts={'claims', 'sitelinks'},
+                                          claims={'P31'}, processes=processes)}
+  rows = []
+  for qid in entity_list:
+    e = entities.get(qid, {})
+    pages = dumpWikipedias(e, wlangs)
+    rows.append({'entity'    : qid,
+                 'instanceof': '|'.join(dumpClaimValues(e, 'P31')),
+                 'npages'    : len(pages),
+                 'langs'     : '|'.join(x[0] for x in pages),
+                 'names'     : '|'.join(x[1] for x in pages),
+                 'pages'     : '|'.join(x[2] for x in pages)})
+  d = pd.DataFrame(rows)
+  d.npages = d.npages.astype(np.int16)
+  d.index = d.entity.values
+  if instanceof!='':
+    d = d[d.instanceof.str.contains(r'\b' + instanceof + r'\b')]
+  return d
+
+
+#%% wd_DumpEntityInfo(path, entity_list, mode='human', langsorder='', wikilangs="",
+#                     processes=None)
+@traced
+def wd_DumpEntityInfo(path, entity_list, mode='human', langsorder='', wikilangs="",
+                      processes=None):
+  """
+  Same as w_EntityInfo, but using a Wikidata JSON dump instead of the
+  Wikibase API and WDQS. A first scan of the dump obtains the entities; if
+  they have values which are Wikidata entities (occupations, places...), a
+  second scan obtains their labels and the coordinates and country of the
+  places, and a third one the classes and labels of the countries. All the
+  scans are filtered by identifiers, so only the lines of those entities are
+  parsed (see dumpFilterLines).
+
+  Note that the country of a place is taken from its P17 claim (the places
+  replaced by other ones, P1366, are not followed as w_Geoloc does).
+
+  :param path: The dump file (see wd_DumpEntities).
+  :param entity_list: The Wikidata entities (person or films).
+  :param mode: "human" or "film" (see w_EntityInfo).
+  :param langsorder: Order of languages in which the information will be
+         returned, separated with '|' (see w_EntityInfo).
+  :param wikilangs: List of languages to limit the search of Wikipedia pages,
+         using "|" as separator.
+  :param processes: Number of processes to parse the dump.
+  :return The same data-frame as w_EntityInfo.
+  :author Angel Zazo, Department of Computer Science and Automatics, University of Salamanca
+  """
+  entity_list = checkEntities(entity_list)
+  fields, fieldsonlyone, columns = entityInfoFields(mode)
+  langsorder = langsorder.strip()
+  llangs = langsorder.split('|')  # label langs
+  if 'en' not in llangs:
+    llangs.append('en')
+  wlangs = [] if wikilangs == "" else wikilangs.split('|')
+  #
+  spec = {'ids': set(entity_list)}
+  entities = {e['id']:e for e in dumpScan(path, [spec],
+                                          parts={'labels', 'descriptions', 'claims', 'sitelinks'},
+                                          claims=set(fields), processes=processes)}
+  d = dict()
+  qidsoflabels = set()
+  qidsofplaces = set()
+  for qid in entity_list:
+    data = entities.get(qid, {'missing': ''})
+    if 'sitelinks' in data and len(wlangs) > 0:
+      data['sitelinks'] = {s:v for s,v in data['sitelinks'].items()
+                           if s[:-4] in wlangs}
+    data.setdefault('sitelinks', {})
+    d[qid] = entityInfoRecord(qid, data, fields, fieldsonlyone, columns, llangs,
+                              wlangs, entity_list, qidsoflabels, qidsofplaces)
+  #
+  places = dict()
+  labels = dict()
+  if len(qidsoflabels) > 0 or len(qidsofplaces) > 0:
+    # Second scan: labels of entities and places. Third scan: countries of
+    # the places (P17) not found in the second one
+    found = dict()
+    qids = qidsoflabels | qidsofplaces
+    for k in range(2):
+      if len(qids) == 0:
+        break
+      for e in dumpScan(path, [{'ids': qids}], parts={'labels', 'claims'},
+                        claims={'P31', 'P17', 'P625'}, processes=processes):
+        found[e['id']] = e
+        label, _ = dumpTerm(e, llangs, 'labels')
+        if label is not None:
+          labels[e['id']] = label
+      qids = {c for placeQ in qidsofplaces
+              for c in dumpClaimValues(found.get(placeQ, {}), 'P17')} - set(found)
+    countries = {qid for qid,e in found.items()
+                 if len(NOTCOUNTRY_CLASSES.intersection(dumpClaimValues(e, 'P31'))) == 0
+                 and len(COUNTRY_CLASSES.intersection(dumpClaimValues(e, 'P31'))) > 0}
+    for placeQ in qidsofplaces:
+      e = found.get(placeQ, {})
+      lat = lon = countryQ = ''
+      for claim in e.get('claims', {}).get('P625', []):
+        if 'datavalue' in claim['mainsnak']:
+          lat = str(claim['mainsnak']['datavalue']['value']['latitude'])
+          lon = str(claim['mainsnak']['datavalue']['value']['longitude'])
+          break
+      for c in dumpClaimValues(e, 'P17'):
+        if c in countries:
+          countryQ = c
+          break
+      places[placeQ] = {'placeQ'  : placeQ,
+                        'place'   : labels.get(placeQ, placeQ),
+                        'placeLat': lat,
+                        'placeLon': lon,
+                        'countryQ': countryQ,
+                        'country' : labels.get(countryQ, countryQ)}
+  #
+  entityInfoComplete(d, places, labels)
+  return pd.DataFrame.from_dict(d, orient='index')